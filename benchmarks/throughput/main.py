@@ -1,56 +1,248 @@
 """
 Module: main.py
+Description: Throughput benchmark for PdfConverter on synthetic PDFs
+
+Reports pages/sec and peak RSS for each worker count, and wall time for every
+builder, processor and the renderer.  Runs on CPU by default, so results are
+comparable between machines without a GPU.
 
 External Dependencies:
-- torch: https://pytorch.org/docs/
+- click: https://click.palletsprojects.com/
+- tabulate: https://github.com/astanin/python-tabulate
+- pymupdf: https://pymupdf.readthedocs.io/
 
 Sample Input:
->>> # See function docstrings for specific examples
+>>> python benchmarks/throughput/main.py --pdf_count 4 --pages_per_pdf 10 --workers 1,2,4
 
 Expected Output:
->>> # See function docstrings for expected results
+>>> # Table of workers / pages/sec / speedup / peak RSS, a table of per-stage
+>>> # wall time, and conversion_results/benchmark/throughput/result.json
 
 Example Usage:
->>> # Import and use as needed based on module functionality
+>>> # Fail when pages/sec drops more than 10% against a saved run
+>>> python benchmarks/throughput/main.py --baseline baseline.json --max_regression 0.1
 """
 
+import os
+os.environ["PYTORCH_ENABLE_MPS_FALLBACK"] = "1"  # Transformers uses .isin for an op, which is not supported on MPS
+os.environ["IN_STREAMLIT"] = "true"  # Avoid multiprocessing inside surya
+
+import json
+import multiprocessing as mp
+import resource
+import sys
+import tempfile
 import time
-import torch
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
 
 import click
-import pypdfium2 as pdfium
-from tqdm import tqdm
+from tabulate import tabulate
+
+from benchmarks.throughput.synthetic import generate_corpus
+
+
+class StageTimer:
+    """Proxy that adds the wall time of each call to a shared timings dict."""
+
+    def __init__(self, wrapped: Any, timings: Dict[str, float]):
+        self.wrapped = wrapped
+        self.timings = timings
+        self.name = type(wrapped).__name__
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.wrapped(*args, **kwargs)
+        finally:
+            self.timings[self.name] += time.perf_counter() - start
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.wrapped, name)
+
+
+def peak_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def worker_init(device: str | None):
+    if device:
+        os.environ["TORCH_DEVICE"] = device
+
+    from extractor.core.models import create_model_dict
+
+    global model_refs
+    model_refs = create_model_dict()
+
+
+def convert_one(args: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+    filepath, config = args
+    from extractor.core.converters.pdf import PdfConverter
+
+    timings: Dict[str, float] = defaultdict(float)
+    converter = PdfConverter(artifact_dict=model_refs, config=config)
+    converter.processor_list = [StageTimer(processor, timings) for processor in converter.processor_list]
+
+    # Builders and the renderer are resolved per conversion, so time whatever comes back
+    resolve_dependencies = converter.resolve_dependencies
+    converter.resolve_dependencies = lambda cls: StageTimer(resolve_dependencies(cls), timings)
+
+    start = time.time()
+    build_start = time.perf_counter()
+    document = converter.build_document(filepath)
+    build_time = time.perf_counter() - build_start
+    converter.resolve_dependencies(converter.renderer)(document)
+    end = time.time()
+
+    # DocumentBuilder itself (provider setup and page rendering) is not proxied
+    renderer_name = converter.renderer.__name__
+    stage_total = sum(t for name, t in timings.items() if name != renderer_name)
+    timings["DocumentBuilder (provider, page images)"] = max(0.0, build_time - stage_total)
+
+    return {
+        "filepath": filepath,
+        "pages": len(document.pages),
+        "start": start,
+        "end": end,
+        "timings": dict(timings),
+        "pid": os.getpid(),
+        "peak_rss": peak_rss_bytes(),
+    }
+
+
+def run_workers(files: List[str], config: Dict[str, Any], workers: int, iterations: int, device: str | None) -> Dict[str, Any]:
+    task_args = [(f, config) for _ in range(iterations) for f in files]
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(processes=workers, initializer=worker_init, initargs=(device,)) as pool:
+        results = list(pool.imap_unordered(convert_one, task_args))
+
+    # Measured from the first conversion start, so model loading is excluded
+    elapsed = max(r["end"] for r in results) - min(r["start"] for r in results)
+    pages = sum(r["pages"] for r in results)
+    timings = defaultdict(float)
+    for r in results:
+        for name, t in r["timings"].items():
+            timings[name] += t
+
+    peak_rss = {}
+    for r in results:
+        peak_rss[r["pid"]] = max(peak_rss.get(r["pid"], 0), r["peak_rss"])
+
+    return {
+        "workers": workers,
+        "pages": pages,
+        "documents": len(results),
+        "seconds": elapsed,
+        "pages_per_sec": pages / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mb": max(peak_rss.values()) / 1024 ** 2,
+        "total_rss_mb": sum(peak_rss.values()) / 1024 ** 2,
+        "timings": dict(timings),
+    }
+
+
+def check_baseline(runs: List[Dict[str, Any]], baseline_path: str, max_regression: float) -> List[str]:
+    with open(baseline_path, "r") as f:
+        baseline = {run["workers"]: run for run in json.load(f)["runs"]}
+
+    failures = []
+    for run in runs:
+        previous = baseline.get(run["workers"])
+        if previous is None or previous["pages_per_sec"] <= 0:
+            continue
+        change = run["pages_per_sec"] / previous["pages_per_sec"] - 1
+        if change < -max_regression:
+            failures.append(
+                f"{run['workers']} workers: {run['pages_per_sec']:.2f} pages/sec vs "
+                f"{previous['pages_per_sec']:.2f} in baseline ({change:+.1%})"
+            )
+    return failures
+
+
+@click.command(help="Benchmark PdfConverter throughput on synthetic PDFs.")
+@click.option("--pdf_dir", type=str, default=os.path.join(tempfile.gettempdir(), "extractor_throughput_pdfs"), help="Directory for the generated PDFs.")
+@click.option("--pdf_count", type=int, default=4, help="Number of synthetic PDFs.")
+@click.option("--pages_per_pdf", type=int, default=10, help="Pages in each synthetic PDF.")
+@click.option("--seed", type=int, default=0, help="Seed for the synthetic PDFs.")
+@click.option("--workers", type=str, default="1,2,4", help="Comma separated worker counts to measure.")
+@click.option("--iterations", type=int, default=1, help="Number of passes over the PDFs per worker count.")
+@click.option("--device", type=str, default="cpu", help="Torch device for the models. Pass an empty string to autodetect.")
+@click.option("--result_path", type=str, default=None, help="Output path for results. Defaults to conversion_results/benchmark/throughput.")
+@click.option("--baseline", type=str, default=None, help="Earlier result.json to compare pages/sec against.")
+@click.option("--max_regression", type=float, default=0.1, help="Allowed drop in pages/sec against the baseline, as a fraction.")
+def main(
+        pdf_dir: str,
+        pdf_count: int,
+        pages_per_pdf: int,
+        seed: int,
+        workers: str,
+        iterations: int,
+        device: str,
+        result_path: str | None,
+        baseline: str | None,
+        max_regression: float
+):
+    # Must be set before extractor.core.settings is imported, here and in the workers
+    if device:
+        os.environ["TORCH_DEVICE"] = device
+
+    from extractor.core.settings import settings
 
-from marker.converters.pdf import PdfConverter
-from marker.models import create_model_dict
+    result_path = result_path or os.path.join(settings.OUTPUT_DIR, "benchmark", "throughput")
+    files = generate_corpus(pdf_dir, pdf_count, pages_per_pdf, seed)
+    config = {"disable_tqdm": True, "disable_multiprocessing": True}
+    worker_counts = [int(w) for w in workers.split(",") if w.strip()]
 
+    runs = []
+    for count in worker_counts:
+        print(f"Converting {len(files)} PDFs x {iterations} with {count} workers...")
+        runs.append(run_workers(files, config, count, iterations, device or None))
 
-@click.command(help="Benchmark PDF to MD conversion throughput.")
-@click.argument("pdf_path", type=str)
-def main(pdf_path):
-    print(f"Converting {pdf_path} to markdown...")
-    pdf = pdfium.PdfDocument(pdf_path)
-    page_count = len(pdf)
-    pdf.close()
-    model_dict = create_model_dict()
-    torch.cuda.reset_peak_memory_stats()
+    single = runs[0]["pages_per_sec"] if runs else 0.0
+    scaling = [
+        [
+            run["workers"],
+            run["pages"],
+            f"{run['seconds']:.2f}",
+            f"{run['pages_per_sec']:.2f}",
+            f"{run['pages_per_sec'] / single:.2f}x" if single else "-",
+            f"{run['peak_rss_mb']:.0f}",
+            f"{run['total_rss_mb']:.0f}",
+        ]
+        for run in runs
+    ]
+    print(tabulate(scaling, headers=["Workers", "Pages", "Seconds", "Pages/sec", "Speedup", "Peak RSS/worker (MB)", "Total RSS (MB)"]))
 
-    times = []
-    for i in tqdm(range(10), desc="Benchmarking"):
-        block_converter = PdfConverter(
-            artifact_dict=model_dict,
-            config={"disable_tqdm": True}
-        )
-        start = time.time()
-        block_converter(pdf_path)
-        total = time.time() - start
-        times.append(total)
+    # Stage times are most meaningful without contention, so report the first run
+    first = runs[0]
+    stage_total = sum(first["timings"].values())
+    stages = [
+        [name, f"{t:.2f}", f"{1000 * t / first['pages']:.1f}", f"{100 * t / stage_total:.1f}%"]
+        for name, t in sorted(first["timings"].items(), key=lambda item: item[1], reverse=True)
+    ]
+    print()
+    print(f"Stage wall time with {first['workers']} workers")
+    print(tabulate(stages, headers=["Stage", "Seconds", "ms/page", "Share"]))
 
-    max_gpu_vram = torch.cuda.max_memory_allocated() / 1024 ** 3
+    os.makedirs(result_path, exist_ok=True)
+    output = {
+        "corpus": {"pdf_count": pdf_count, "pages_per_pdf": pages_per_pdf, "seed": seed, "iterations": iterations},
+        "device": device or None,
+        "runs": runs,
+    }
+    with open(os.path.join(result_path, "result.json"), "w") as f:
+        json.dump(output, f, indent=2)
 
-    print(f"Converted {page_count} pages in {sum(times)/len(times):.2f} seconds.")
-    print(f"Max GPU VRAM: {max_gpu_vram:.2f} GB")
+    if baseline:
+        failures = check_baseline(runs, baseline, max_regression)
+        if failures:
+            print("\nThroughput regressed against the baseline:")
+            for failure in failures:
+                print(f"  - {failure}")
+            sys.exit(1)
+        print(f"\nThroughput is within {max_regression:.0%} of the baseline.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,16 +1,29 @@
 """
 Search and debug functionality for Marker document models.
-"""
 Module: search.py
 
+Searches go through a DocumentIndex built once per document: an inverted
+token index over block HTML, block type, id and metadata key maps, preorder
+subtree spans and a bbox grid.  The index can be written next to a JSON
+output and loaded again, so repeated searches skip tokenizing the document.
+"""
+
+import bisect
+import hashlib
 import json
-from typing import Dict, List, Optional, Any, Union
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple, Union
 from pathlib import Path
 from pydantic import BaseModel
 
 from extractor.core.schema.document import Document
 from extractor.core.schema.blocks.base import BlockOutput
 
+TOKEN_RE = re.compile(r"\w+")
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".index.json"
+
 
 class SearchResult(BaseModel):
     """A single search result."""
@@ -37,160 +50,328 @@ class SearchCriteria(BaseModel):
     metadata_key: Optional[str] = None  # Key that should exist in metadata
     metadata_value: Optional[Any] = None  # Value to match in metadata
     max_results: int = 100  # Maximum number of results to return
+    within_id: Optional[str] = None  # Only match blocks inside this block, e.g. a section or page
+
+
+def _node_bbox(node) -> Optional[List[float]]:
+    # bbox might be a list or a property
+    if hasattr(node, 'bbox'):
+        if isinstance(node.bbox, list):
+            return node.bbox
+        return getattr(node.bbox, 'bbox', None)
+    elif hasattr(node, 'polygon') and node.polygon:
+        # Handle polygon which might have bbox property
+        if hasattr(node.polygon, 'bbox'):
+            return node.polygon.bbox
+    return None
+
+
+def _node_metadata(node, exclude: Iterable[str]) -> Dict[str, Any]:
+    if hasattr(node, 'metadata'):
+        metadata = node.metadata or {}
+        # Documents loaded from JSON with an object hook have namespace metadata
+        if not isinstance(metadata, dict):
+            metadata = dict(vars(metadata)) if hasattr(metadata, '__dict__') else {}
+        return metadata
+    metadata = {}
+    if hasattr(node, '__dict__'):
+        # Extract custom attributes as metadata
+        for key, value in node.__dict__.items():
+            if not key.startswith('_') and key not in exclude:
+                metadata[key] = value
+    return metadata
+
+
+def hash_file(filepath: Union[str, Path]) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DocumentIndex:
+    """
+    Lookup structures over a document tree, built in one preorder walk.
+
+    Blocks are numbered in preorder, so the blocks inside any block form a
+    contiguous span of positions and results sort into document order.
+    """
+
+    def __init__(self, document: Union[Document, BlockOutput], bbox_cell_size: float = 64, tokens: Optional[Dict[str, List[int]]] = None):
+        self.bbox_cell_size = bbox_cell_size
+        self.nodes: List[Any] = []
+        self.ids: List[str] = []
+        self.types: List[Any] = []
+        self.parents: List[int] = []
+        self.ends: List[int] = []  # One past the last position inside each block
+        self.bboxes: List[Optional[List[float]]] = []
+        self.children_counts: List[int] = []
+        self.leaves: Set[int] = set()  # Blocks without a children attribute
+        self.with_images: Set[int] = set()
+        self.with_html: List[int] = []
+        self.by_id: Dict[str, List[int]] = defaultdict(list)
+        self.by_type: Dict[Any, List[int]] = defaultdict(list)
+        self.by_metadata_key: Dict[str, List[int]] = defaultdict(list)
+        self.bbox_grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.large_bboxes: List[int] = []  # Too many cells to grid, always checked
+        self._metadata: Dict[int, Dict[str, Any]] = {}
+        self._lower_html: Dict[int, str] = {}
+        self._term_cache: Dict[str, Set[int]] = {}
+
+        self._walk(document)
+        self.by_children = sorted(range(len(self.nodes)), key=self.children_counts.__getitem__)
+        self.sorted_children_counts = [self.children_counts[pos] for pos in self.by_children]
+        if tokens is None:
+            tokens = defaultdict(list)
+            for pos in self.with_html:
+                for token in set(TOKEN_RE.findall(self.lower_html(pos))):
+                    tokens[token].append(pos)
+        self.tokens: Dict[str, List[int]] = dict(tokens)
+
+    def _walk(self, root):
+        # Iterative, so deeply nested documents don't hit the recursion limit
+        stack = [(root, -1, False)]
+        while stack:
+            node, parent, done = stack.pop()
+            if done:
+                self.ends[parent] = len(self.nodes)
+                continue
+
+            pos = len(self.nodes)
+            node_id = str(getattr(node, 'id', str(type(node).__name__)))
+            node_type = getattr(node, 'block_type', type(node).__name__)
+            self.nodes.append(node)
+            self.ids.append(node_id)
+            self.types.append(node_type)
+            self.parents.append(parent)
+            self.ends.append(pos + 1)
+            self.by_id[node_id].append(pos)
+            self.by_type[node_type].append(pos)
+
+            if getattr(node, 'html', None):
+                self.with_html.append(pos)
+            if hasattr(node, 'images') and bool(node.images):
+                self.with_images.add(pos)
+            for key in self.metadata(pos):
+                self.by_metadata_key[key].append(pos)
+
+            bbox = _node_bbox(node)
+            self.bboxes.append(bbox)
+            if bbox:
+                self._add_bbox(pos, bbox)
+
+            children = getattr(node, 'children', None) if hasattr(node, 'children') else None
+            if not hasattr(node, 'children'):
+                self.leaves.add(pos)
+            self.children_counts.append(len(children) if children else 0)
+            if children:
+                stack.append((None, pos, True))
+                stack.extend((child, pos, False) for child in reversed(children))
+
+    def _add_bbox(self, pos: int, bbox: List[float]):
+        size = self.bbox_cell_size
+        x0, y0, x1, y1 = (int(bbox[0] // size), int(bbox[1] // size), int(bbox[2] // size), int(bbox[3] // size))
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > 64:
+            self.large_bboxes.append(pos)
+            return
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                self.bbox_grid[(x, y)].append(pos)
+
+    def metadata(self, pos: int) -> Dict[str, Any]:
+        metadata = self._metadata.get(pos)
+        if metadata is None:
+            metadata = _node_metadata(self.nodes[pos], ['id', 'children', 'html', 'polygon'])
+            self._metadata[pos] = metadata
+        return metadata
+
+    def lower_html(self, pos: int) -> str:
+        html = self._lower_html.get(pos)
+        if html is None:
+            html = self.nodes[pos].html.lower()
+            self._lower_html[pos] = html
+        return html
+
+    def path(self, pos: int) -> List[str]:
+        path = []
+        while pos != -1:
+            path.append(self.ids[pos])
+            pos = self.parents[pos]
+        return path[::-1]
+
+    def _term_postings(self, term: str) -> Set[int]:
+        postings = self._term_cache.get(term)
+        if postings is None:
+            # Query terms may be part of a longer word, so match against the vocabulary
+            postings = set()
+            for token, positions in self.tokens.items():
+                if term in token:
+                    postings.update(positions)
+            if len(self._term_cache) > 4096:
+                self._term_cache.clear()
+            self._term_cache[term] = postings
+        return postings
+
+    def text_matches(self, text: str) -> Set[int]:
+        """Blocks whose HTML contains `text`, ignoring case."""
+        needle = text.lower()
+        candidates = None
+        for term in sorted(set(TOKEN_RE.findall(needle)), key=len, reverse=True):
+            postings = self._term_postings(term)
+            candidates = postings if candidates is None else candidates & postings
+            if not candidates:
+                return set()
+        if candidates is None:
+            candidates = self.with_html
+        return {pos for pos in candidates if needle in self.lower_html(pos)}
+
+    def point_matches(self, x: float, y: float) -> Set[int]:
+        """Blocks whose bbox contains the point."""
+        cell = (int(x // self.bbox_cell_size), int(y // self.bbox_cell_size))
+        return {
+            pos for pos in [*self.bbox_grid.get(cell, ()), *self.large_bboxes]
+            if self.bboxes[pos][0] <= x <= self.bboxes[pos][2] and self.bboxes[pos][1] <= y <= self.bboxes[pos][3]
+        }
+
+    def children_between(self, minimum: Optional[int] = None, maximum: Optional[int] = None) -> List[int]:
+        lo = 0 if minimum is None else bisect.bisect_left(self.sorted_children_counts, minimum)
+        hi = len(self.by_children) if maximum is None else bisect.bisect_right(self.sorted_children_counts, maximum)
+        return self.by_children[lo:hi]
+
+    def type_matches(self, block_type: Any) -> List[int]:
+        # Compared by equality like the block types themselves, since enum and str hashes differ
+        return [pos for key, positions in self.by_type.items() if key == block_type for pos in positions]
+
+    def subtree(self, node_id: str) -> List[range]:
+        """Positions inside every block with this id, the blocks included."""
+        return [range(pos, self.ends[pos]) for pos in self.by_id.get(node_id, ())]
+
+    def save(self, path: Union[str, Path], source_hash: Optional[str] = None):
+        """Write the token index, the costly part to build, next to the document."""
+        with open(path, 'w') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'source_hash': source_hash,
+                'nodes': len(self.nodes),
+                'bbox_cell_size': self.bbox_cell_size,
+                'tokens': self.tokens,
+            }, f)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], document: Union[Document, BlockOutput], source_hash: Optional[str] = None) -> Optional["DocumentIndex"]:
+        """Load a saved index for `document`, or None if it is missing or stale."""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION or data.get('source_hash') != source_hash:
+            return None
+        index = cls(document, bbox_cell_size=data['bbox_cell_size'], tokens=data['tokens'])
+        if len(index.nodes) != data.get('nodes'):
+            return None
+        return index
 
 
 class DocumentSearcher:
     """Search and debug functionality for document models."""
     
-    def __init__(self, document: Document):
+    def __init__(self, document: Document, index: Optional[DocumentIndex] = None):
         self.document = document
+        self._index = index
+    
+    @property
+    def index(self) -> DocumentIndex:
+        """The document index, built on first use."""
+        if self._index is None:
+            self._index = DocumentIndex(self.document)
+        return self._index
     
     def search(self, criteria: SearchCriteria) -> List[SearchResult]:
         """Search the document based on given criteria."""
-        results = []
-        self._search_recursive(self.document, criteria, results, [])
-        return results[:criteria.max_results]
-    
-    def _search_recursive(
-        self, 
-        node: Union[Document, BlockOutput], 
-        criteria: SearchCriteria, 
-        results: List[SearchResult],
-        path: List[str]
-    ):
-        """Recursively search through the document structure."""
-        # Check if current node matches criteria
-        match_reasons = []
-        
-        # Extract node properties
-        node_id = getattr(node, 'id', str(type(node).__name__))
-        node_type = getattr(node, 'block_type', type(node).__name__)
-        node_html = getattr(node, 'html', None)
-        node_bbox = None
-        
-        # Handle bbox which might be a list or a property
-        if hasattr(node, 'bbox'):
-            if isinstance(node.bbox, list):
-                node_bbox = node.bbox
-            else:
-                node_bbox = getattr(node.bbox, 'bbox', None)
-        elif hasattr(node, 'polygon') and node.polygon:
-            # Handle polygon which might have bbox property
-            if hasattr(node.polygon, 'bbox'):
-                node_bbox = node.polygon.bbox
-        
-        # Check text match
-        if criteria.text and node_html:
-            if criteria.text.lower() in node_html.lower():
-                match_reasons.append(f"text contains '{criteria.text}'")
+        index = self.index
         
-        # Check block type
+        # A block is returned when any criterion matches it
+        matches: Set[int] = set()
+        if criteria.text:
+            matches |= index.text_matches(criteria.text)
         if criteria.block_type:
-            if node_type == criteria.block_type:
-                match_reasons.append(f"block type is '{criteria.block_type}'")
-            else:
-                # Skip this node if block type doesn't match
-                if not hasattr(node, 'children'):
-                    return
-        
-        # Check section ID
+            matches.update(index.type_matches(criteria.block_type))
         if criteria.section_id:
-            if str(node_id) == criteria.section_id:
-                match_reasons.append(f"section ID matches '{criteria.section_id}'")
-        
-        # Check images
+            matches.update(index.by_id.get(criteria.section_id, ()))
         if criteria.has_images is not None:
-            has_images = hasattr(node, 'images') and bool(node.images)
-            if has_images == criteria.has_images:
-                match_reasons.append(f"has images: {criteria.has_images}")
-        
-        # Check children count
-        children_count = 0
-        if hasattr(node, 'children') and node.children:
-            children_count = len(node.children)
-        
+            if criteria.has_images:
+                matches |= index.with_images
+            else:
+                matches.update(pos for pos in range(len(index.nodes)) if pos not in index.with_images)
         if criteria.min_children is not None:
-            if children_count >= criteria.min_children:
-                match_reasons.append(f"has at least {criteria.min_children} children")
-        
+            matches.update(index.children_between(minimum=criteria.min_children))
         if criteria.max_children is not None:
-            if children_count <= criteria.max_children:
-                match_reasons.append(f"has at most {criteria.max_children} children")
+            matches.update(index.children_between(maximum=criteria.max_children))
+        if criteria.bbox_contains:
+            matches |= index.point_matches(*criteria.bbox_contains)
+        if criteria.metadata_key:
+            matches.update(index.by_metadata_key.get(criteria.metadata_key, ()))
+        
+        # Leaf blocks of another type are skipped even when other criteria match
+        if criteria.block_type:
+            matches = {pos for pos in matches if pos not in index.leaves or index.types[pos] == criteria.block_type}
+        if criteria.within_id is not None:
+            spans = index.subtree(criteria.within_id)
+            matches = {pos for pos in matches if any(pos in span for span in spans)}
+        
+        return [self._result(pos, criteria) for pos in sorted(matches)[:criteria.max_results]]
+    
+    def _result(self, pos: int, criteria: SearchCriteria) -> SearchResult:
+        index = self.index
+        node_html = getattr(index.nodes[pos], 'html', None)
+        node_type = index.types[pos]
+        node_bbox = index.bboxes[pos]
+        node_metadata = index.metadata(pos)
+        children_count = index.children_counts[pos]
         
-        # Check bbox contains point
+        match_reasons = []
+        if criteria.text and node_html and criteria.text.lower() in index.lower_html(pos):
+            match_reasons.append(f"text contains '{criteria.text}'")
+        if criteria.block_type and node_type == criteria.block_type:
+            match_reasons.append(f"block type is '{criteria.block_type}'")
+        if criteria.section_id and index.ids[pos] == criteria.section_id:
+            match_reasons.append(f"section ID matches '{criteria.section_id}'")
+        if criteria.has_images is not None and (pos in index.with_images) == criteria.has_images:
+            match_reasons.append(f"has images: {criteria.has_images}")
+        if criteria.min_children is not None and children_count >= criteria.min_children:
+            match_reasons.append(f"has at least {criteria.min_children} children")
+        if criteria.max_children is not None and children_count <= criteria.max_children:
+            match_reasons.append(f"has at most {criteria.max_children} children")
         if criteria.bbox_contains and node_bbox:
             x, y = criteria.bbox_contains
-            if (node_bbox[0] <= x <= node_bbox[2] and 
-                node_bbox[1] <= y <= node_bbox[3]):
+            if node_bbox[0] <= x <= node_bbox[2] and node_bbox[1] <= y <= node_bbox[3]:
                 match_reasons.append(f"bbox contains point ({x}, {y})")
-        
-        # Check metadata
-        node_metadata = {}
-        if hasattr(node, 'metadata'):
-            node_metadata = node.metadata
-        elif hasattr(node, '__dict__'):
-            # Extract custom attributes as metadata
-            for key, value in node.__dict__.items():
-                if not key.startswith('_') and key not in ['id', 'children', 'html', 'polygon']:
-                    node_metadata[key] = value
-        
-        if criteria.metadata_key:
-            if criteria.metadata_key in node_metadata:
-                match_reasons.append(f"has metadata key '{criteria.metadata_key}'")
-                
-                if criteria.metadata_value is not None:
-                    if node_metadata[criteria.metadata_key] == criteria.metadata_value:
-                        match_reasons.append(
-                            f"metadata[{criteria.metadata_key}] = {criteria.metadata_value}"
-                        )
-        
-        # Add to results if any criteria matched
-        if match_reasons:
-            result = SearchResult(
-                id=str(node_id),
-                block_type=node_type,
-                path=path + [str(node_id)],
-                content=node_html[:200] + "..." if node_html and len(node_html) > 200 else node_html,
-                html=node_html,
-                bbox=node_bbox,
-                metadata=node_metadata,
-                children_count=children_count,
-                match_reason="; ".join(match_reasons)
-            )
-            results.append(result)
-        
-        # Recursively search children
-        if hasattr(node, 'children') and node.children:
-            for child in node.children:
-                self._search_recursive(
-                    child, 
-                    criteria, 
-                    results, 
-                    path + [str(node_id)]
+        if criteria.metadata_key and criteria.metadata_key in node_metadata:
+            match_reasons.append(f"has metadata key '{criteria.metadata_key}'")
+            if criteria.metadata_value is not None and node_metadata[criteria.metadata_key] == criteria.metadata_value:
+                match_reasons.append(
+                    f"metadata[{criteria.metadata_key}] = {criteria.metadata_value}"
                 )
+        
+        return SearchResult(
+            id=index.ids[pos],
+            block_type=node_type,
+            path=index.path(pos),
+            content=node_html[:200] + "..." if node_html and len(node_html) > 200 else node_html,
+            html=node_html,
+            bbox=node_bbox,
+            metadata=node_metadata,
+            children_count=children_count,
+            match_reason="; ".join(match_reasons)
+        )
     
     def get_node_by_id(self, node_id: str) -> Optional[Dict]:
         """Get a specific node by its ID and return its full structure."""
-        result = self._find_node_by_id(self.document, node_id)
-        if result:
-            return self._node_to_dict(result)
-        return None
-    
-    def _find_node_by_id(
-        self, 
-        node: Union[Document, BlockOutput], 
-        target_id: str
-    ) -> Optional[Union[Document, BlockOutput]]:
-        """Find a node by ID recursively."""
-        if hasattr(node, 'id') and str(node.id) == target_id:
-            return node
-        
-        if hasattr(node, 'children') and node.children:
-            for child in node.children:
-                result = self._find_node_by_id(child, target_id)
-                if result:
-                    return result
-        
+        positions = self.index.by_id.get(node_id)
+        if positions:
+            return self._node_to_dict(self.index.nodes[positions[0]])
         return None
     
     def _node_to_dict(self, node: Union[Document, BlockOutput]) -> Dict:
@@ -309,13 +490,47 @@ class DocumentSearcher:
                 self._analyze_structure(child, summary, depth + 1)
 
 
+def index_path_for(document_path: Union[str, Path]) -> Path:
+    """Path of the saved index next to a JSON document."""
+    document_path = Path(document_path)
+    return document_path.with_name(document_path.name + INDEX_SUFFIX)
+
+
+def load_searcher(document_path: Union[str, Path], persist_index: bool = True) -> DocumentSearcher:
+    """
+    Load a JSON document for searching.
+    
+    With `persist_index`, the index is read from `<document>.index.json` when it
+    matches the document's contents, and written there otherwise.
+    """
+    # Create document model (simplified - normally would use proper deserialization)
+    from types import SimpleNamespace
+    with open(document_path, 'r') as f:
+        doc = json.load(f, object_hook=lambda d: SimpleNamespace(**d))
+    
+    if not persist_index:
+        return DocumentSearcher(doc)
+    
+    source_hash = hash_file(document_path)
+    index_path = index_path_for(document_path)
+    index = DocumentIndex.load(index_path, doc, source_hash)
+    if index is None:
+        index = DocumentIndex(doc)
+        try:
+            index.save(index_path, source_hash)
+        except OSError:
+            pass  # Read-only output directories still search, just without reuse
+    return DocumentSearcher(doc, index)
+
+
 def search_document(
     document_path: Path,
     text: Optional[str] = None,
     block_type: Optional[str] = None,
     section_id: Optional[str] = None,
     has_images: Optional[bool] = None,
-    format_output: bool = True
+    format_output: bool = True,
+    persist_index: bool = True
 ) -> Union[List[SearchResult], str]:
     """
     Search a document for specific content or structure.
@@ -327,20 +542,12 @@ def search_document(
         section_id: Specific section ID
         has_images: Filter by presence of images
         format_output: Whether to format output as JSON string
+        persist_index: Reuse or write the index saved next to the document
     
     Returns:
         List of search results or formatted JSON string
     """
-    # Load document
-    with open(document_path, 'r') as f:
-        doc_data = json.load(f)
-    
-    # Create document model (simplified - normally would use proper deserialization)
-    from types import SimpleNamespace
-    doc = json.loads(json.dumps(doc_data), object_hook=lambda d: SimpleNamespace(**d))
-    
-    # Create searcher
-    searcher = DocumentSearcher(doc)
+    searcher = load_searcher(document_path, persist_index)
     
     # Build criteria
     criteria = SearchCriteria(
@@ -355,4 +562,4 @@ def search_document(
     
     if format_output:
         return json.dumps([r.model_dump() for r in results], indent=2)
-    return results
\ No newline at end of file
+    return results
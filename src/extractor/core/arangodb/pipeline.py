@@ -26,13 +26,20 @@ Expected Output:
     }
 """
 
+import hashlib
 import json
 import os
-from typing import Dict, Any, List, Optional, Tuple
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
+import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
 
 # Try to import pyArango, fallback to requests if not available
 try:
@@ -43,7 +50,9 @@ try:
 except ImportError:
     logger.warning("pyArango not available, using requests for HTTP API")
     PYARANGO_AVAILABLE = False
-    import requests
+
+# Responses from a busy or restarting server, worth resending the batch for
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 
 
 class ArangoDBPipeline:
@@ -52,7 +61,7 @@ class ArangoDBPipeline:
     
     Features:
     - Automatic collection creation
-    - Batch imports for performance
+    - Bulk imports through the document import API (config "bulk_import")
     - Relationship preservation
     - Query helpers for common operations
     - Export with structure reconstruction
@@ -65,6 +74,21 @@ class ArangoDBPipeline:
         self.username = self.config.get("username", "root")
         self.password = self.config.get("password", "")
         self.database = self.config.get("database", "marker_docs")
+        self.base_url = f"http://{self.host}:{self.port}"
+        
+        # Bulk import settings
+        self.bulk_import = self.config.get("bulk_import", False)
+        self.batch_size = self.config.get("batch_size", 1000)
+        self.on_duplicate = self.config.get("on_duplicate", "update")
+        self.import_workers = self.config.get("import_workers", 1)
+        self.pool_size = self.config.get("pool_size", 4)
+        # Batches that fail to connect or get a RETRY_STATUS_CODES response are resent with exponential backoff
+        self.max_retries = self.config.get("max_retries", 3)
+        self.retry_backoff = self.config.get("retry_backoff", 0.5)
+        # One keep-alive session per importing thread, requests.Session isn't thread safe
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
         
         self.connection = None
         self.db = None
@@ -92,7 +116,6 @@ class ArangoDBPipeline:
                 self.db = None
         else:
             # Fallback to HTTP API
-            self.base_url = f"http://{self.host}:{self.port}"
             self._test_connection()
     
     def _test_connection(self):
@@ -155,17 +178,24 @@ class ArangoDBPipeline:
             logger.error(f"Failed to create collection {name}: {response.text}")
     
     def import_marker_output(self, marker_output: Dict[str, Any], 
-                           source_file: Optional[str] = None) -> Dict[str, Any]:
+                           source_file: Optional[str] = None,
+                           bulk: Optional[bool] = None) -> Dict[str, Any]:
         """
         Import Marker output into ArangoDB.
         
         Args:
             marker_output: Marker output with graph structure
             source_file: Optional source file path
+            bulk: Use the bulk import API. Defaults to the "bulk_import" config value.
             
         Returns:
             Import statistics
         """
+        if bulk is None:
+            bulk = self.bulk_import
+        if bulk:
+            return self.bulk_import_marker_output(marker_output, source_file)
+        
         start_time = datetime.now()
         stats = {
             "documents": 0,
@@ -237,6 +267,229 @@ class ArangoDBPipeline:
         
         return stats
     
+    def bulk_import_marker_output(self, marker_output: Dict[str, Any],
+                                  source_file: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Import Marker output with the document import API.
+        
+        Vertices and edges are sent as JSONL in batches of `batch_size` over one
+        keep-alive session.  Keys are generated client-side, so edge endpoints
+        are known without waiting for server ids, and re-importing the same
+        output is handled by `on_duplicate` instead of creating copies.
+        
+        Args:
+            marker_output: Marker output with graph structure
+            source_file: Optional source file path
+            
+        Returns:
+            Import statistics, including per-batch throughput under "batches"
+        """
+        start_time = time.perf_counter()
+        stats = {
+            "documents": 0,
+            "vertices": 0,
+            "edges": 0,
+            "errors": [],
+            "batches": []
+        }
+        
+        try:
+            self.create_collections()
+            imported_at = datetime.now().isoformat()
+            
+            vertex_mapping = {}
+            vertex_docs = {}
+            for vertex_type, vertices in marker_output.get("vertices", {}).items():
+                docs = []
+                for vertex in vertices:
+                    old_id = vertex.get("_id", vertex.get("_key"))
+                    doc = {k: v for k, v in vertex.items() if k != "_id"}
+                    # Keyed on identity, not content, so changed content updates the same document
+                    identity = old_id if old_id is not None else doc
+                    doc["_key"] = doc.get("_key") or self._generate_key(vertex_type, source_file, identity)
+                    doc["imported_at"] = imported_at
+                    if source_file:
+                        doc["source_file"] = source_file
+                    vertex_mapping[old_id] = f"{vertex_type}/{doc['_key']}"
+                    docs.append(doc)
+                vertex_docs[vertex_type] = docs
+            
+            edge_docs = {}
+            for edge_type, edges in marker_output.get("edges", {}).items():
+                docs = []
+                for edge in edges:
+                    old_from = edge.get("_from")
+                    old_to = edge.get("_to")
+                    if old_from not in vertex_mapping or old_to not in vertex_mapping:
+                        stats["errors"].append(f"Missing vertex for edge: {old_from} -> {old_to}")
+                        continue
+                    doc = {k: v for k, v in edge.items() if k != "_id"}
+                    doc["_from"] = vertex_mapping[old_from]
+                    doc["_to"] = vertex_mapping[old_to]
+                    doc["_key"] = doc.get("_key") or self._generate_key(edge_type, doc["_from"], doc["_to"], doc.get("type"))
+                    docs.append(doc)
+                edge_docs[edge_type] = docs
+            
+            # Vertices first, so edges to vertices that failed to import can be left out
+            failed = set()
+            for collection, docs in vertex_docs.items():
+                created = self._bulk_import_collection(collection, docs, stats, failed)
+                stats["vertices"] += created
+                if collection == "documents":
+                    stats["documents"] += created
+            
+            for collection, docs in edge_docs.items():
+                if failed:
+                    kept = []
+                    for doc in docs:
+                        if doc["_from"] in failed or doc["_to"] in failed:
+                            stats["errors"].append(f"Skipped edge to a failed vertex: {doc['_from']} -> {doc['_to']}")
+                        else:
+                            kept.append(doc)
+                    docs = kept
+                stats["edges"] += self._bulk_import_collection(collection, docs, stats, set())
+            
+            duration = time.perf_counter() - start_time
+            total = stats["vertices"] + stats["edges"]
+            logger.info(
+                f"Bulk import completed in {duration:.2f}s: {stats['vertices']} vertices, "
+                f"{stats['edges']} edges ({total / duration if duration > 0 else 0:.0f} docs/s)"
+            )
+            
+            if stats["errors"]:
+                logger.warning(f"Import had {len(stats['errors'])} errors")
+            
+        except Exception as e:
+            logger.error(f"Bulk import failed: {e}")
+            stats["errors"].append(str(e))
+        
+        return stats
+    
+    @staticmethod
+    def _generate_key(*parts: Any) -> str:
+        """Deterministic document key, so re-imports hit on_duplicate instead of adding copies."""
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _get_session(self) -> requests.Session:
+        """Keep-alive session for the calling thread's bulk requests."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.auth = (self.username, self.password)
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+    
+    @staticmethod
+    def _batches(docs: List[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        for i in range(0, len(docs), batch_size):
+            yield docs[i:i + batch_size]
+    
+    def _bulk_import_collection(self, collection: str, docs: List[Dict[str, Any]], stats: Dict[str, Any],
+                                failed: set) -> int:
+        """
+        Import docs into one collection in batches. Returns the number created or updated.
+        
+        The "collection/key" ids of docs that failed to import are added to `failed`.
+        """
+        if not docs:
+            return 0
+        
+        batches = self._batches(docs, max(1, self.batch_size))
+        if self.import_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.import_workers) as executor:
+                results = list(executor.map(lambda batch: self._import_batch(collection, batch), batches))
+        else:
+            results = [self._import_batch(collection, batch) for batch in batches]
+        
+        imported = 0
+        for result in results:
+            failed.update(result.pop("failed_ids"))
+            stats["batches"].append(result)
+            stats["errors"].extend(result.pop("error_details"))
+            imported += result["created"] + result["updated"]
+        return imported
+    
+    def _import_batch(self, collection: str, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Send one JSONL batch to the import API."""
+        body = "\n".join(json.dumps(doc, default=str) for doc in batch)
+        result = {
+            "collection": collection,
+            "size": len(batch),
+            "created": 0,
+            "updated": 0,
+            "ignored": 0,
+            "errors": 0,
+            "seconds": 0.0,
+            "docs_per_sec": 0.0,
+            "retries": 0,
+            "error_details": [],
+            "failed_ids": []
+        }
+        batch_ids = [f"{collection}/{doc['_key']}" for doc in batch]
+        
+        start = time.perf_counter()
+        response, error = None, None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Keys are deterministic, so resending a batch the server partly applied updates instead of duplicating
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+                result["retries"] = attempt
+            try:
+                response = self._get_session().post(
+                    f"{self.base_url}/_db/{self.database}/_api/import",
+                    params={
+                        "collection": collection,
+                        "type": "documents",
+                        "onDuplicate": self.on_duplicate,
+                        "details": "true"
+                    },
+                    data=body.encode("utf-8"),
+                    headers={"Content-Type": "application/x-ldjson"}
+                )
+            except requests.RequestException as e:
+                response, error = None, e
+                continue
+            if response.status_code not in RETRY_STATUS_CODES:
+                break
+        
+        if response is None:
+            result["errors"] = len(batch)
+            result["error_details"].append(f"Batch import into {collection} failed: {error}")
+            result["failed_ids"] = batch_ids
+            return result
+        result["seconds"] = time.perf_counter() - start
+        
+        if response.status_code not in (200, 201):
+            result["errors"] = len(batch)
+            result["error_details"].append(f"Batch import into {collection} failed: {response.text}")
+            result["failed_ids"] = batch_ids
+            return result
+        
+        body = response.json()
+        for field in ("created", "updated", "ignored", "errors"):
+            result[field] = body.get(field, 0)
+        details = body.get("details", [])
+        result["error_details"].extend(details)
+        if result["errors"]:
+            # Details read "at position N: ...", N being the line in this batch
+            positions = {int(m.group(1)) for m in (re.search(r"at position (\d+)", d) for d in details) if m}
+            if len(positions) >= result["errors"] and all(p < len(batch) for p in positions):
+                result["failed_ids"] = [batch_ids[p] for p in sorted(positions)]
+            else:
+                # Can't tell which ones failed, so treat the whole batch as failed
+                result["failed_ids"] = batch_ids
+        result["docs_per_sec"] = len(batch) / result["seconds"] if result["seconds"] > 0 else 0.0
+        logger.debug(
+            f"Imported batch of {len(batch)} into {collection} in {result['seconds']:.3f}s "
+            f"({result['docs_per_sec']:.0f} docs/s, {result['errors']} errors)"
+        )
+        return result
+    
     def _import_vertex(self, collection: str, vertex: Dict[str, Any]) -> Optional[str]:
         """Import a single vertex."""
         if PYARANGO_AVAILABLE and self.db:
@@ -405,6 +658,11 @@ class ArangoDBPipeline:
     
     def close(self):
         """Close database connection."""
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+        self._local = threading.local()
         if PYARANGO_AVAILABLE and self.connection:
             # PyArango doesn't have explicit close
             self.connection = None
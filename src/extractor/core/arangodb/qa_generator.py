@@ -57,6 +57,7 @@ DEFAULT_QUESTION_DISTRIBUTION = {
 }
 DEFAULT_MIN_LENGTH_THRESHOLD = 100  # Minimum text length for generating questions
 DEFAULT_EXPORT_FORMATS = ["unsloth"]
+DEFAULT_EMBEDDING_BATCH_SIZE = 32
 
 
 def load_marker_output(file_path: str) -> Dict[str, Any]:
@@ -183,6 +184,46 @@ def extract_question_contexts(
     return contexts
 
 
+def deduplicate_contexts(
+    contexts: List[Dict[str, Any]],
+    similarity_threshold: float,
+    batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE
+) -> List[Dict[str, Any]]:
+    """
+    Drop contexts that are near-duplicates of an earlier context.
+    
+    All contexts are embedded in one batched call, so repeated runs over the
+    same document are served from the embedding cache.
+    
+    Args:
+        contexts: Context dictionaries from extract_question_contexts
+        similarity_threshold: Cosine similarity at or above which a context is a duplicate
+        batch_size: Number of contexts per embedding model call
+        
+    Returns:
+        Contexts with near-duplicates removed, in their original order
+    """
+    if len(contexts) < 2:
+        return contexts
+    
+    import numpy as np
+    from extractor.core.utils.embedding_utils import get_embeddings
+    
+    embeddings = np.array(get_embeddings([c["content"] for c in contexts], batch_size=batch_size))
+    # Embeddings are normalized, so dot products are cosine similarities
+    similarities = embeddings @ embeddings.T
+    
+    kept = []
+    for idx, context in enumerate(contexts):
+        if any(similarities[idx, k] >= similarity_threshold for k in kept):
+            continue
+        kept.append(idx)
+    
+    if len(kept) < len(contexts):
+        logger.info(f"Dropped {len(contexts) - len(kept)} near-duplicate contexts")
+    return [contexts[idx] for idx in kept]
+
+
 def generate_question_from_context(
     context: Dict[str, Any], 
     question_type: str = "factual"
@@ -350,7 +391,8 @@ def generate_qa_pairs(
     question_distribution: Dict[str, float] = None,
     min_length: int = DEFAULT_MIN_LENGTH_THRESHOLD,
     export_formats: List[str] = DEFAULT_EXPORT_FORMATS,
-    random_seed: Optional[int] = None
+    random_seed: Optional[int] = None,
+    dedupe_threshold: Optional[float] = None
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Generate QA pairs from extractor output.
@@ -365,6 +407,8 @@ def generate_qa_pairs(
         min_length: Minimum text length for contexts
         export_formats: List of export formats
         random_seed: Random seed for reproducibility
+        dedupe_threshold: Cosine similarity at which contexts count as duplicates.
+            None keeps every context.
         
     Returns:
         Tuple of (QA pairs list, stats dictionary)
@@ -409,6 +453,9 @@ def generate_qa_pairs(
     
     # Extract contexts for question generation
     contexts = extract_question_contexts(marker_output, min_length)
+    contexts_extracted = len(contexts)
+    if dedupe_threshold is not None:
+        contexts = deduplicate_contexts(contexts, dedupe_threshold)
     
     # Calculate number of questions to generate per type
     type_counts = {}
@@ -476,7 +523,8 @@ def generate_qa_pairs(
     stats = {
         "document_id": doc_id,
         "document_title": doc_title,
-        "contexts_extracted": len(contexts),
+        "contexts_extracted": contexts_extracted,
+        "contexts_deduplicated": contexts_extracted - len(contexts),
         "contexts_used": len(used_contexts),
         "qa_pairs_generated": len(qa_pairs),
         "question_type_counts": {qt: sum(1 for qa in qa_pairs if qa["type"] == qt) for qt in question_types},
@@ -513,6 +561,7 @@ if __name__ == "__main__":
     parser.add_argument("--question-types", "-t", type=str, default=",".join(DEFAULT_QUESTION_TYPES), help="Comma-separated question types")
     parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducibility")
     parser.add_argument("--min-length", type=int, default=DEFAULT_MIN_LENGTH_THRESHOLD, help="Minimum text length for contexts")
+    parser.add_argument("--dedupe-threshold", type=float, default=None, help="Drop contexts at least this similar to an earlier one")
     args = parser.parse_args()
     
     # List to track all validation failures
@@ -597,7 +646,8 @@ if __name__ == "__main__":
             max_questions=10,
             question_types=question_types,
             random_seed=args.seed,
-            min_length=args.min_length
+            min_length=args.min_length,
+            dedupe_threshold=args.dedupe_threshold
         )
         
         # Check if QA pairs were generated
@@ -14,12 +14,13 @@ Example Usage:
 >>> # Add usage examples
 """
 
-from typing import Annotated
+from typing import Annotated, List, Optional
 
 from extractor.core.builders import BaseBuilder
 from extractor.core.builders.layout import LayoutBuilder
 from extractor.core.builders.line import LineBuilder
 from extractor.core.builders.ocr import OcrBuilder
+from extractor.core.providers.page_images import PageImageCache, PageRenderer, page_renderer
 from extractor.core.providers.pdf import PdfProvider
 from extractor.core.schema import BlockTypes
 from extractor.core.schema.document import Document
@@ -43,6 +44,20 @@ class DocumentBuilder(BaseBuilder):
         bool,
         "Disable OCR processing.",
     ] = False
+    lazy_page_images: Annotated[
+        bool,
+        "Render page images on first use instead of rendering every page at both resolutions up front.",
+    ] = True
+    page_image_memory_mb: Annotated[
+        Optional[int],
+        "The memory budget in MB for rendered page images of one document.  Least recently used images are dropped first.",
+        "Default is 1024. None disables the limit.",
+    ] = 1024
+    page_image_spill_dir: Annotated[
+        Optional[str],
+        "Directory to write evicted page images to, so they are read back instead of rendered again.",
+        "Default is None, which re-renders evicted images.",
+    ] = None
 
     def __call__(self, provider: PdfProvider, layout_builder: LayoutBuilder, line_builder: LineBuilder, ocr_builder: OcrBuilder):
         document = self.build_document(provider)
@@ -54,16 +69,36 @@ class DocumentBuilder(BaseBuilder):
 
     def build_document(self, provider: PdfProvider):
         PageGroupClass: PageGroup = get_block_class(BlockTypes.Page)
-        lowres_images = provider.get_images(provider.page_range, self.lowres_image_dpi)
-        highres_images = provider.get_images(provider.page_range, self.highres_image_dpi)
         initial_pages = [
             PageGroupClass(
                 page_id=p,
-                lowres_image=lowres_images[i],
-                highres_image=highres_images[i],
                 polygon=provider.get_page_bbox(p),
                 refs=provider.get_page_refs(p)
-            ) for i, p in enumerate(provider.page_range)
+            ) for p in provider.page_range
         ]
+        self.attach_page_images(provider, initial_pages)
         DocumentClass: Document = get_block_class(BlockTypes.Document)
         return DocumentClass(filepath=provider.filepath, pages=initial_pages)
+
+    def attach_page_images(self, source: PdfProvider | PageRenderer, pages: List[PageGroup]):
+        """Give pages their images, rendered by a provider or page renderer now or on first use."""
+        page_ids = [page.page_id for page in pages]
+        if self.lazy_page_images:
+            image_cache = PageImageCache(
+                source,
+                self.lowres_image_dpi,
+                self.highres_image_dpi,
+                max_bytes=self.page_image_memory_mb * 1024 * 1024 if self.page_image_memory_mb is not None else None,
+                spill_dir=self.page_image_spill_dir,
+                page_ids=page_ids,
+            )
+            for page in pages:
+                page.set_image_source(image_cache)
+            return
+
+        render_pages = page_renderer(source)
+        lowres_images = render_pages(page_ids, self.lowres_image_dpi)
+        highres_images = render_pages(page_ids, self.highres_image_dpi)
+        for page, lowres_image, highres_image in zip(pages, lowres_images, highres_images):
+            page.lowres_image = lowres_image
+            page.highres_image = highres_image
@@ -108,6 +108,10 @@ Respond only with one of `Figure`, `Picture`, `ComplexRegion`, `Table`, or `Form
 
     def __call__(self, document: Document, provider: PdfProvider):
         super().__call__(document, provider)
+        self.relabel_document(document)
+
+    def relabel_document(self, document: Document):
+        """Relabel a document's blocks, keeping the surya labels if the LLM fails."""
         try:
             self.relabel_blocks(document)
         except Exception as e:
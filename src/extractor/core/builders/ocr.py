@@ -99,15 +99,21 @@ class OcrBuilder(BaseBuilder):
         if sum(len(b) for b in line_boxes)==0:
             return
 
+        recognition_results = self.recognize(images, line_boxes)
+        self.add_recognition_results(pages, recognition_results, line_ids)
+
+    def recognize(self, images: List[any], line_boxes: List[List[float]]):
+        # Images may come from several documents, so they share one recognition batch
         self.recognition_model.disable_tqdm = self.disable_tqdm
-        recognition_results = self.recognition_model(
+        return self.recognition_model(
             images=images,
             bboxes=line_boxes,
-            langs=[self.languages] * len(pages),
+            langs=[self.languages] * len(images),
             recognition_batch_size=int(self.get_recognition_batch_size()),
             sort_lines=False
         )
 
+    def add_recognition_results(self, pages: List[PageGroup], recognition_results, line_ids: List[List[BlockId]]):
         SpanClass: Span = get_block_class(BlockTypes.Span)
         for document_page, page_recognition_result, page_line_ids in zip(pages, recognition_results, line_ids):
             for line_id, ocr_line in zip(page_line_ids, page_recognition_result.text_lines):
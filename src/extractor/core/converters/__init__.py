@@ -29,7 +29,7 @@ from pydantic import BaseModel
 
 from extractor.core.processors import BaseProcessor
 from extractor.core.processors.llm import BaseLLMSimpleBlockProcessor
-from extractor.core.processors.llm.llm_meta import LLMSimpleBlockMetaProcessor
+from extractor.core.processors.llm.llm_scheduler import LLMSchedulerProcessor
 from extractor.core.util import assign_config, download_font
 
 
@@ -78,12 +78,14 @@ class BaseConverter:
         llm_positions = [i for i, p in enumerate(processors) if issubclass(type(p), BaseLLMSimpleBlockProcessor)]
         insert_position = max(0, llm_positions[-1] - len(simple_llm_processors) + 1)
 
-        meta_processor = LLMSimpleBlockMetaProcessor(
+        # Complex processors keep their place and run one after another; they only share the rate budget
+        scheduler = LLMSchedulerProcessor(
             processor_lst=simple_llm_processors,
             llm_service=self.llm_service,
             config=self.config,
         )
-        other_processors.insert(insert_position, meta_processor)
+        scheduler.share_budget(other_processors)
+        other_processors.insert(insert_position, scheduler)
         return other_processors
 
 
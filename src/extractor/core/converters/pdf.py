@@ -23,14 +23,20 @@ Example Usage:
 '# Research Paper Title\\n\\n## Abstract\\n\\nThis paper presents...'
 """
 
+import gc
 import os
 os.environ["TOKENIZERS_PARALLELISM"] = "false"  # disables a tokenizers warning
 
 from collections import defaultdict
-from typing import Annotated, Any, Dict, List, Optional, Type, Tuple
+from contextlib import nullcontext
+from loguru import logger
+from typing import Annotated, Any, Dict, Iterator, List, Optional, Sequence, Type, Tuple
 
 from extractor.core.processors import BaseProcessor
+from extractor.core.processors.llm.llm_scheduler import LLMSchedulerProcessor
 from extractor.core.processors.llm.llm_table_merge import LLMTableMergeProcessor
+from extractor.core.providers.pdf import PdfProvider
+from extractor.core.providers.page_images import PdfPageRenderer
 from extractor.core.providers.registry import provider_from_filepath
 from extractor.core.builders.document import DocumentBuilder
 from extractor.core.builders.layout import LayoutBuilder
@@ -43,6 +49,7 @@ from extractor.core.processors.blockquote import BlockquoteProcessor
 from extractor.core.processors.code import CodeProcessor
 from extractor.core.processors.debug import DebugProcessor
 from extractor.core.processors.document_toc import DocumentTOCProcessor
+from extractor.core.processors.engine import ProcessorEngine
 from extractor.core.processors.equation import EquationProcessor
 from extractor.core.processors.footnote import FootnoteProcessor
 from extractor.core.processors.ignoretext import IgnoreTextProcessor
@@ -59,11 +66,16 @@ from extractor.core.processors.sectionheader import SectionHeaderProcessor
 from extractor.core.processors.table import TableProcessor
 from extractor.core.processors.text import TextProcessor
 from extractor.core.processors.llm.llm_equation import LLMEquationProcessor
+from extractor.core.renderers import BaseRenderer, SharedRender
 from extractor.core.renderers.markdown import MarkdownRenderer
 from extractor.core.schema import BlockTypes
 from extractor.core.schema.blocks import Block
-from extractor.core.schema.registry import register_block_class
-from extractor.core.util import strings_to_classes
+from extractor.core.schema.document import Document
+from extractor.core.schema.registry import get_block_class, register_block_class
+from extractor.core.util import config_dict, config_value, strings_to_classes
+from extractor.core.utils.document_cache import DocumentCache, config_fingerprint
+from extractor.core.utils.page_cache import PageCache, hash_pdf_pages, plan_reuse, remap_page, snapshot_page
+from extractor.core.utils.profiling import PipelineProfiler
 from extractor.core.processors.llm.llm_handwriting import LLMHandwritingProcessor
 from extractor.core.processors.order import OrderProcessor
 from extractor.core.services.litellm import LiteLLMService
@@ -91,6 +103,57 @@ class PdfConverter(BaseConverter):
         bool,
         "Enable higher quality processing with LLMs.",
     ] = False
+    use_document_cache: Annotated[
+        bool,
+        "Reuse built documents for files whose contents and configuration were converted before.",
+    ] = False
+    document_cache_dir: Annotated[
+        Optional[str],
+        "The directory to store cached documents in.",
+        "Default is None, which will use ~/.marker/cache/documents."
+    ] = None
+    stream_window_pages: Annotated[
+        int,
+        "The number of pages converted at a time by `stream`.",
+    ] = 50
+    incremental: Annotated[
+        bool,
+        "Reuse pages from an earlier conversion of the same document whose content did not change.",
+        "Only changed pages go through the builders and page-local processors.",
+    ] = False
+    page_cache_dir: Annotated[
+        Optional[str],
+        "The directory to store pages for incremental conversion in.",
+        "Default is None, which will use ~/.marker/cache/pages."
+    ] = None
+    incremental_document_key: Annotated[
+        Optional[str],
+        "Identifies the document across revisions for incremental conversion.",
+        "Default is None, which uses the absolute path of the file."
+    ] = None
+    processor_workers: Annotated[
+        int,
+        "The number of threads that run fused page-local processors, one page per thread.",
+    ] = 1
+    profile_pipeline: Annotated[
+        bool,
+        "Record wall time, CPU time, peak memory, model batches and LLM calls for every builder and processor.",
+        "The profile is stored in `document.metadata['profile']`.",
+    ] = False
+    profile_pages: Annotated[
+        bool,
+        "When profiling, run page-local processors one page at a time to record each page separately.",
+        "Model calls are no longer batched across pages, so this is slower.",
+    ] = False
+    profile_trace_dir: Annotated[
+        Optional[str],
+        "When profiling, write a trace file per document to this directory.",
+        "Default is None, which writes no trace files.",
+    ] = None
+    profile_trace_format: Annotated[
+        str,
+        "The trace file format, `chrome` for the Trace Event Format or `otel` for OTLP/JSON spans.",
+    ] = "chrome"
     default_processors: Tuple[BaseProcessor, ...] = (
         OrderProcessor,
         LineMergeProcessor,
@@ -175,26 +238,290 @@ class PdfConverter(BaseConverter):
         if self.use_llm:
             self.layout_builder_class = LLMLayoutBuilder
 
+        self.profiler: Optional[PipelineProfiler] = None
+
+    def pipeline_fingerprint(self) -> str:
+        return config_fingerprint(
+            self.config,
+            [self.layout_builder_class, LineBuilder, OcrBuilder, StructureBuilder, *self.processor_list, self.llm_service],
+        )
+
     def build_document(self, filepath: str):
+        return self._profiled(filepath, self._build_cached, filepath)
+
+    def _build_cached(self, filepath: str):
+        build = self._build_incremental if self.incremental else self._build_document
+        cache, key = self._document_cache_entry(filepath)
+        if cache is None:
+            return build(filepath)
+
+        document = self._cached_document(cache, key, filepath)
+        if document is not None:
+            return document
+
+        document = build(filepath)
+        cache.set(key, document)
+        return document
+
+    def _document_cache_entry(self, filepath: str) -> Tuple[Optional[DocumentCache], Optional[str]]:
+        """The document cache and key for a file, or (None, None) when the file is not cached."""
+        if not self.use_document_cache:
+            return None, None
+        if provider_from_filepath(filepath) is not PdfProvider:
+            # Other formats convert through a temporary PDF, which is gone by the time of a hit
+            return None, None
+
+        try:
+            fingerprint = self.pipeline_fingerprint()
+        except TypeError as e:
+            logger.warning(f"Not using the document cache: {e}")
+            return None, None
+
+        cache = DocumentCache(self.document_cache_dir)
+        with self._stage("DocumentCache", "cache"):
+            key = cache.compute_key(filepath, fingerprint)
+        return cache, key
+
+    def _cached_document(self, cache: DocumentCache, key: str, filepath: str) -> Optional[Document]:
+        with self._stage("DocumentCache", "cache"):
+            document = cache.get(key)
+        if document is not None:
+            # Cached documents are stored without page images, which render from the file without extracting its text
+            renderer = PdfPageRenderer(filepath, config_value(self.config, "flatten_pdf", PdfProvider.flatten_pdf))
+            DocumentBuilder(self.config).attach_page_images(renderer, document.pages)
+        return document
+
+    def _profiled(self, filepath: str, build, *args, trace_suffix: str = ""):
+        """Run build with a fresh profiler when profiling, and attach the profile to the document."""
+        if not self.profile_pipeline:
+            return build(*args)
+
+        self.profiler = PipelineProfiler(os.path.basename(filepath))
+        try:
+            document = build(*args)
+        finally:
+            profiler, self.profiler = self.profiler, None
+
+        # On a cache hit the profile only shows the lookup
+        document.metadata = {**(document.metadata or {}), "profile": profiler.to_dict()}
+        if self.profile_trace_dir:
+            extension = "otel.json" if self.profile_trace_format == "otel" else "trace.json"
+            name = f"{os.path.splitext(os.path.basename(filepath))[0]}{trace_suffix}.{extension}"
+            profiler.save_trace(os.path.join(self.profile_trace_dir, name), self.profile_trace_format)
+        return document
+
+    def _stage(self, name: str, category: str, **kwargs):
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(name, category, **kwargs)
+
+    def _run_stage(self, stage_callable, category: str, *args, pages: Optional[int] = None):
+        if self.profiler is None:
+            return stage_callable(*args)
+        return self.profiler.run(stage_callable, category, *args, pages=pages)
+
+    def _run_processors(self, processors: List[BaseProcessor], document: Document):
+        # Profiles keep one stage per processor, so fusing is left off while profiling
+        if self.profiler is not None:
+            for processor in processors:
+                self._run_processor(processor, document)
+            return
+
+        # Planned on every run, so a reassigned processor_list takes effect
+        ProcessorEngine(processors, self.processor_workers)(document)
+
+    def _run_processor(self, processor: BaseProcessor, document: Document):
+        if self.profiler is None:
+            processor(document)
+            return
+
+        pages = document.pages
+        if not (self.profile_pages and processor.page_local and len(pages) > 1):
+            self.profiler.run(processor, "processor", document, pages=len(pages))
+            return
+
+        # Page-local processors give the same result on one page at a time
+        name = type(processor).__name__
+        with self.profiler.stage(name, "processor", pages=len(pages)):
+            try:
+                for page in pages:
+                    document.pages = [page]
+                    self.profiler.run(processor, "page", document, name=name, pages=1, page_id=page.page_id)
+            finally:
+                document.pages = pages
+
+    def _build_pages(self, filepath: str, config) -> Tuple[Document, Any, DocumentBuilder]:
         provider_cls = provider_from_filepath(filepath)
         layout_builder = self.resolve_dependencies(self.layout_builder_class)
         line_builder = self.resolve_dependencies(LineBuilder)
         ocr_builder = self.resolve_dependencies(OcrBuilder)
-        provider = provider_cls(filepath, self.config)
-        document = DocumentBuilder(self.config)(provider, layout_builder, line_builder, ocr_builder)
+        provider = self._run_stage(provider_cls, "provider", filepath, config)
+        document_builder = DocumentBuilder(config)
+        if self.profiler is not None:
+            pages = len(provider.page_range)
+            layout_builder, line_builder, ocr_builder = (
+                self.profiler.wrap(builder, "builder", pages=pages)
+                for builder in (layout_builder, line_builder, ocr_builder)
+            )
+        document = self._run_stage(document_builder, "builder", provider, layout_builder, line_builder, ocr_builder, pages=len(provider.page_range))
         structure_builder_cls = self.resolve_dependencies(StructureBuilder)
-        structure_builder_cls(document)
+        self._run_stage(structure_builder_cls, "builder", document, pages=len(document.pages))
+        return document, provider, document_builder
 
-        for processor in self.processor_list:
-            processor(document)
+    def _build_document(self, filepath: str, config=None):
+        if config is None:
+            config = self.config
+        document, _, _ = self._build_pages(filepath, config)
+        self._run_processors(self.processor_list, document)
 
         return document
 
+    def split_processors(self) -> Tuple[List[BaseProcessor], List[BaseProcessor]]:
+        """
+        Split the processors into page-local and document-level ones, keeping their order.
+
+        An LLM scheduler that mixes both kinds is split into two schedulers.
+        """
+        page_local, document_level = [], []
+        for processor in self.processor_list:
+            if processor.page_local:
+                page_local.append(processor)
+            elif isinstance(processor, LLMSchedulerProcessor):
+                local_llm = [p for p in processor.processors if p.page_local]
+                if local_llm:
+                    page_local.append(LLMSchedulerProcessor(local_llm, self.llm_service, self.config))
+                document_level.append(
+                    LLMSchedulerProcessor([p for p in processor.processors if not p.page_local], self.llm_service, self.config)
+                )
+            else:
+                document_level.append(processor)
+        return page_local, document_level
+
+    def _build_incremental(self, filepath: str) -> Document:
+        """
+        Build a document, reusing the pages of an earlier run that did not change.
+
+        Changed pages go through the builders and the page-local processors,
+        then the document-level processors run over every page.  The processors
+        keep their relative order within each group.
+        """
+        if provider_from_filepath(filepath) is not PdfProvider:
+            logger.info(f"Incremental conversion only applies to PDFs, converting {filepath} in full")
+            return self._build_document(filepath)
+
+        if config_value(self.config, "page_range") is not None:
+            page_ids = list(config_value(self.config, "page_range"))
+        else:
+            page_ids = list(range(PdfProvider.count_pages(filepath)))
+
+        page_cache = PageCache(self.page_cache_dir)
+        document_key = self.incremental_document_key or os.path.abspath(filepath)
+        fingerprint = self.pipeline_fingerprint()
+        with self._stage("PageCache", "cache", pages=len(page_ids)):
+            hashes = hash_pdf_pages(filepath, page_ids)
+            stored = page_cache.load(document_key, fingerprint)
+
+            restored = {}
+            entries = {}
+            for page_id, stored_id in plan_reuse(hashes, stored).items():
+                page = page_cache.get_page(document_key, stored[stored_id])
+                if page is not None:
+                    restored[page_id] = remap_page(page, page_id)
+                    entries[page_id] = stored[stored_id]
+        changed = [page_id for page_id in page_ids if page_id not in restored]
+
+        # Restored pages render their images from a provider like any other page
+        config = {**config_dict(self.config), "page_range": changed or page_ids[:1]}
+        if changed:
+            document, provider, document_builder = self._build_pages(filepath, config)
+        else:
+            provider = PdfProvider(filepath, config)
+            document_builder = DocumentBuilder(config)
+            document = get_block_class(BlockTypes.Document)(filepath=provider.filepath, pages=[])
+        document_builder.attach_page_images(provider, list(restored.values()))
+
+        page_local, document_level = self.split_processors()
+        # The document holds only the changed pages at this point
+        if changed:
+            self._run_processors(page_local, document)
+
+        # Stored before the document-level processors, which see every page together
+        snapshots = {page.page_id: snapshot_page(page) for page in document.pages}
+        for page in document.pages:
+            entries[page.page_id] = {"hash": hashes.get(page.page_id), "movable": not page.refs}
+
+        document.pages = sorted(document.pages + list(restored.values()), key=lambda page: page.page_id)
+        for processor in document_level:
+            self._run_processor(processor, document)
+
+        page_cache.save(document_key, fingerprint, entries, snapshots)
+        logger.info(f"Reused {len(restored)} of {len(page_ids)} pages, converted {len(changed)}")
+        return document
+
     def __call__(self, filepath: str):
         document = self.build_document(filepath)
         renderer = self.resolve_dependencies(self.renderer)
         return renderer(document)
 
+    def render_many(self, document: Document, renderers: Sequence[str | Type[BaseRenderer]]) -> Dict[str, Any]:
+        """
+        Render one document with several renderers, keyed by renderer class name.
+
+        The renderers share a single render of the block tree, along with the
+        section hierarchy, page stats and image crops, so each extra format
+        only costs its own serialization.
+        """
+        shared = SharedRender(document)
+        outputs = {}
+        for renderer_cls in renderers:
+            if isinstance(renderer_cls, str):
+                renderer_cls = strings_to_classes([renderer_cls])[0]
+            renderer = self.resolve_dependencies(renderer_cls)
+            renderer.shared = shared
+            outputs[renderer_cls.__name__] = renderer(document)
+        return outputs
+
+    def convert_many(self, filepath: str, renderers: Sequence[str | Type[BaseRenderer]]) -> Dict[str, Any]:
+        return self.render_many(self.build_document(filepath), renderers)
+
+    def stream(self, filepath: str) -> Iterator[Tuple[List[int], Any]]:
+        """
+        Convert a PDF `stream_window_pages` pages at a time.
+
+        Yields (page_ids, rendered) for each window.  Provider lines and page
+        images for a window are released before the next window is built, so
+        memory is bounded by the window size rather than the document size.
+        Processors that look across pages (TOC, table merging, section levels)
+        only see the pages of the current window.
+        """
+        if provider_from_filepath(filepath) is not PdfProvider:
+            # Other providers convert to a temporary PDF up front, so there is nothing to window
+            document = self.build_document(filepath)
+            yield [page.page_id for page in document.pages], self.resolve_dependencies(self.renderer)(document)
+            return
+
+        if config_value(self.config, "page_range") is not None:
+            page_ids = list(config_value(self.config, "page_range"))
+        else:
+            page_ids = list(range(PdfProvider.count_pages(filepath)))
+
+        renderer = self.resolve_dependencies(self.renderer)
+        window_size = max(1, self.stream_window_pages)
+        for start in range(0, len(page_ids), window_size):
+            window = page_ids[start:start + window_size]
+            window_config = {**config_dict(self.config), "page_range": window}
+            document = self._profiled(filepath, self._build_document, filepath, window_config, trace_suffix=f"_{window[0]}-{window[-1]}")
+            rendered = renderer(document)
+
+            for page in document.pages:
+                page.lowres_image = None
+                page.highres_image = None
+                page.set_image_source(None)
+            del document
+            gc.collect()
+
+            yield window, rendered
+
 
 def convert_single_pdf(pdf_path: str, **kwargs) -> str:
     """Convert a single PDF to markdown
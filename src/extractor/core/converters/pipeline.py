@@ -0,0 +1,177 @@
+"""
+Module: pipeline.py
+Description: Pipelined PDF conversion that pools model batches across documents
+
+External Dependencies:
+- surya-ocr: https://github.com/VikParuchuri/surya
+
+Sample Input:
+>>> filepaths = ["report_a.pdf", "report_b.pdf", "report_c.pdf"]
+>>> config = {"pipeline_batch_pages": 64, "pipeline_workers": 2}
+
+Expected Output:
+>>> # Yields (filepath, rendered) tuples in input order
+>>> # Layout and OCR batches are shared between documents
+
+Example Usage:
+>>> from extractor.core.converters.pipeline import PipelinedPdfConverter
+>>> from extractor.core.models import create_model_dict
+>>> converter = PipelinedPdfConverter(artifact_dict=create_model_dict(), config={"pipeline_workers": 2})
+>>> for filepath, rendered in converter.convert_many(filepaths):
+...     print(filepath, len(rendered.markdown))
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Annotated, Iterable, Iterator, List, Optional, Tuple
+
+from extractor.core.builders.document import DocumentBuilder
+from extractor.core.builders.line import LineBuilder
+from extractor.core.builders.llm_layout import LLMLayoutBuilder
+from extractor.core.builders.ocr import OcrBuilder
+from extractor.core.builders.structure import StructureBuilder
+from extractor.core.converters.pdf import PdfConverter
+from extractor.core.providers import BaseProvider
+from extractor.core.providers.registry import provider_from_filepath
+from extractor.core.schema.document import Document
+from extractor.core.utils.document_cache import DocumentCache
+
+
+class PipelinedPdfConverter(PdfConverter):
+    """
+    A PdfConverter that converts many files at once.
+
+    Page images from several documents are pooled into shared layout and
+    recognition batches, and each document is handed to the processor chain
+    as soon as its builders finish, so processors for one batch run while
+    the models work on the next one.
+
+    Document cache hits skip the builders.  Profiled and incremental runs
+    convert one file at a time, like PdfConverter.
+    """
+    pipeline_batch_pages: Annotated[
+        int,
+        "The number of pages to pool across documents before running the layout and OCR models.",
+    ] = 64
+    pipeline_workers: Annotated[
+        int,
+        "The number of threads used to run the processor chain on finished documents.",
+        "Processor instances are shared between threads, so only raise this for thread-safe processor lists.",
+    ] = 1
+
+    def convert_many(self, filepaths: Iterable[str]) -> Iterator[Tuple[str, object]]:
+        """Convert several files, yielding (filepath, rendered) in input order."""
+        renderer = self.resolve_dependencies(self.renderer)
+        for filepath, document in self.build_documents(filepaths):
+            yield filepath, renderer(document)
+
+    def build_documents(self, filepaths: Iterable[str]) -> Iterator[Tuple[str, Document]]:
+        if self.profile_pipeline or self.incremental:
+            # Per-document profiles and page reuse need each document's own builder runs
+            for filepath in filepaths:
+                yield filepath, self.build_document(filepath)
+            return
+
+        pending: deque[Tuple[str, Future]] = deque()
+        with ThreadPoolExecutor(max_workers=max(1, self.pipeline_workers)) as executor:
+            for batch in self.batch_providers(filepaths):
+                to_build = [(filepath, provider) for filepath, provider, _, document in batch if document is None]
+                built = iter(self.build_batch(to_build))
+                for filepath, _, cache_entry, document in batch:
+                    if document is not None:
+                        pending.append((filepath, finished(document)))
+                        continue
+                    _, document = next(built)
+                    pending.append((filepath, executor.submit(self.process_document, document, *cache_entry)))
+
+                # Hand back whatever has finished while the next batch is built
+                while pending and pending[0][1].done():
+                    filepath, future = pending.popleft()
+                    yield filepath, future.result()
+
+            while pending:
+                filepath, future = pending.popleft()
+                yield filepath, future.result()
+
+    def batch_providers(self, filepaths: Iterable[str]) -> Iterator[List[Tuple[str, Optional[BaseProvider], Tuple, Optional[Document]]]]:
+        """
+        Group files into batches of about `pipeline_batch_pages` pages.
+
+        Each entry is (filepath, provider, cache entry, document), where the
+        document is set for document cache hits, which need no building.
+        """
+        batch, batch_pages = [], 0
+        for filepath in filepaths:
+            cache, key = self._document_cache_entry(filepath)
+            if cache is not None:
+                document = self._cached_document(cache, key, filepath)
+                if document is not None:
+                    batch.append((filepath, None, (None, None), document))
+                    continue
+
+            provider_cls = provider_from_filepath(filepath)
+            provider = provider_cls(filepath, self.config)
+            batch.append((filepath, provider, (cache, key), None))
+            batch_pages += len(provider.page_range)
+            if batch_pages >= self.pipeline_batch_pages:
+                yield batch
+                batch, batch_pages = [], 0
+        if batch:
+            yield batch
+
+    def build_batch(self, batch: List[Tuple[str, BaseProvider]]) -> List[Tuple[str, Document]]:
+        if not batch:
+            return []
+        layout_builder = self.resolve_dependencies(self.layout_builder_class)
+        line_builder = self.resolve_dependencies(LineBuilder)
+        ocr_builder = self.resolve_dependencies(OcrBuilder)
+        structure_builder = self.resolve_dependencies(StructureBuilder)
+        document_builder = DocumentBuilder(self.config)
+
+        documents = [document_builder.build_document(provider) for _, provider in batch]
+
+        # One layout batch for every page in the batch
+        layout_builder.build_pages([page for document in documents for page in document.pages])
+        if isinstance(layout_builder, LLMLayoutBuilder):
+            for document in documents:
+                layout_builder.relabel_document(document)
+
+        # Line detection depends on document-level OCR decisions, so it stays per document
+        for document, (_, provider) in zip(documents, batch):
+            line_builder(document, provider)
+
+        if not document_builder.disable_ocr:
+            self.ocr_batch(ocr_builder, documents, [provider for _, provider in batch])
+
+        for document in documents:
+            structure_builder(document)
+
+        return [(filepath, document) for (filepath, _), document in zip(batch, documents)]
+
+    def ocr_batch(self, ocr_builder: OcrBuilder, documents: List[Document], providers: List[BaseProvider]):
+        pages, images, line_boxes, line_ids = [], [], [], []
+        for document, provider in zip(documents, providers):
+            pages_to_ocr = [page for page in document.pages if page.text_extraction_method == 'surya']
+            doc_images, doc_boxes, doc_line_ids = ocr_builder.get_ocr_images_boxes_ids(document, pages_to_ocr, provider)
+            pages.extend(pages_to_ocr)
+            images.extend(doc_images)
+            line_boxes.extend(doc_boxes)
+            line_ids.extend(doc_line_ids)
+
+        if sum(len(b) for b in line_boxes) == 0:
+            return
+
+        recognition_results = ocr_builder.recognize(images, line_boxes)
+        ocr_builder.add_recognition_results(pages, recognition_results, line_ids)
+
+    def process_document(self, document: Document, cache: Optional[DocumentCache] = None, key: Optional[str] = None) -> Document:
+        self._run_processors(self.processor_list, document)
+        if cache is not None:
+            cache.set(key, document)
+        return document
+
+
+def finished(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
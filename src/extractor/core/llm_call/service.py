@@ -104,6 +104,12 @@ class ValidatedLiteLLMService(LiteLLMService):
         if timeout is None:
             timeout = self.timeout
         
+        # Validation strategies change the final response, so they are part of the key
+        cache_key = self.response_cache_key(self._validated_model_key(), prompt, image, response_schema)
+        cached = self.get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
         # Prepare messages
         messages = self._prepare_messages(prompt, image)
         
@@ -131,9 +137,8 @@ class ValidatedLiteLLMService(LiteLLMService):
             if api_key:
                 kwargs["api_key"] = api_key
             
-            # Add base URL if provided
-            if self.litellm_base_url:
-                kwargs["api_base"] = self.litellm_base_url
+            # Base URL, temperature and max tokens, as in the cache key
+            kwargs.update(self.generation_settings())
             
             # Add response format for supported models
             if response_format and (
@@ -174,8 +179,13 @@ class ValidatedLiteLLMService(LiteLLMService):
             config=retry_config,
         )
         
+        self.cache_response(cache_key, result)
         return result
     
+    def _validated_model_key(self) -> str:
+        """Model name plus the validation setup, for response cache keys."""
+        return f"{self.litellm_model}|validated:{','.join(self.validation_strategies)}"
+    
     def _prepare_messages(self, prompt: str, image: Any) -> List[Dict[str, Any]]:
         """Prepare messages for LLM call."""
         if not isinstance(image, list):
@@ -69,6 +69,48 @@ def text_from_rendered(rendered: BaseModel):
         raise ValueError(f"Invalid output type: {type(rendered)}")
 
 
+def can_merge_rendered(output_format: str) -> bool:
+    return output_format in ("markdown", "html", "json")
+
+
+def _merge_metadata(parts: list[dict]) -> dict:
+    merged = {}
+    for metadata in parts:
+        for key, value in (metadata or {}).items():
+            if key not in merged:
+                merged[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list) and isinstance(merged[key], list):
+                merged[key].extend(value)
+    return merged
+
+
+def merge_rendered(parts: list[BaseModel]) -> BaseModel:
+    """
+    Join outputs rendered from consecutive page ranges of one document.
+
+    Image names and page stats carry page ids, which are the same as in a
+    conversion of the whole document, so the parts combine without renaming.
+    """
+    if len(parts) == 1:
+        return parts[0]
+
+    images = {}
+    for part in parts:
+        images.update(getattr(part, "images", None) or {})
+    metadata = _merge_metadata([part.metadata for part in parts])
+
+    first = parts[0]
+    if isinstance(first, MarkdownOutput):
+        return MarkdownOutput(markdown="\n\n".join(part.markdown for part in parts), images=images, metadata=metadata)
+    elif isinstance(first, HTMLOutput):
+        return HTMLOutput(html="\n".join(part.html for part in parts), images=images, metadata=metadata)
+    elif isinstance(first, JSONOutput):
+        children = [child for part in parts for child in part.children]
+        return JSONOutput(children=children, block_type=first.block_type, metadata=metadata)
+    else:
+        raise ValueError(f"Can't merge output type: {type(first)}")
+
+
 def convert_if_not_rgb(image: Image.Image) -> Image.Image:
     if image.mode != "RGB":
         image = image.convert("RGB")
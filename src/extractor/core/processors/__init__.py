@@ -27,6 +27,16 @@ from extractor.core.util import assign_config
 
 class BaseProcessor:
     block_types: Tuple[BlockTypes] | None = None  # What block types this processor is responsible for
+    page_local: bool = False  # Whether each page is processed independently of the other pages
+    batched: bool = False  # Whether model calls are batched across pages, so the processor runs as one pass
+    # Block types the processor reads and writes, used to reorder and fuse page-local processors.
+    # None means any block type.  A block type covers those blocks with their lines and spans;
+    # Line and Span mean lines and spans under any block.  BlockTypes.Page stands for the order of
+    # a page's top-level blocks: reading it means reading the whole order, and moving blocks writes
+    # it together with the moved block types.  Reading the order of some types only means reading
+    # those types.
+    reads: Tuple[BlockTypes, ...] | None = None
+    writes: Tuple[BlockTypes, ...] | None = None
 
     def __init__(self, config: Optional[BaseModel | dict] = None):
         assign_config(self, config)
@@ -25,6 +25,7 @@ class BlockquoteProcessor(BaseProcessor):
     """
     A processor for tagging blockquotes.
     """
+    page_local = True
     block_types: Annotated[
         Tuple[BlockTypes],
         "The block types to process.",
@@ -48,6 +49,14 @@ class BlockquoteProcessor(BaseProcessor):
     def __init__(self, config):
         super().__init__(config)
 
+    @property
+    def reads(self):
+        return (BlockTypes.Page, *self.block_types)
+
+    @property
+    def writes(self):
+        return tuple(self.block_types)
+
     def __call__(self, document: Document):
         for page in document.pages:
             for block in page.contained_blocks(document, self.block_types):
@@ -19,9 +19,12 @@ from extractor.core.processors import BaseProcessor
 from extractor.core.schema import BlockTypes
 from extractor.core.schema.blocks import Code
 from extractor.core.schema.document import Document
+from extractor.core.services.utils.code_language_cache import get_language_cache, restore_metadata
 from extractor.core.services.utils.tree_sitter_utils import extract_code_metadata, get_supported_language
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 import logging
+import threading
+import time
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -37,6 +40,7 @@ class CodeProcessor(BaseProcessor):
     3. Falls back to heuristic detection when tree-sitter fails
     4. Sets the language attribute on Code blocks
     """
+    page_local = True
     block_types = (BlockTypes.Code, )
     
     # Configuration attributes
@@ -45,17 +49,45 @@ class CodeProcessor(BaseProcessor):
     min_confidence = 0.7
     fallback_language = 'text'
     store_tree_sitter_metadata = True  # Store extracted functions/classes/etc
+    common_languages = ('python', 'javascript', 'java', 'cpp', 'go', 'bash', 'rust')
+    max_candidate_languages = 7
+    use_detection_cache = False  # Keep tree-sitter scores on disk, keyed by a hash of the code
+    detection_cache_dir = None  # Default is ~/.marker/cache/code
     
     def __init__(self, config=None):
         super().__init__(config)
         self._detection_cache = {}
+        # Tree-sitter scores for the blocks of the document being processed, per thread
+        self._batch = threading.local()
+        self._language_cache = None
+        if self.use_detection_cache:
+            self._language_cache = get_language_cache(self.detection_cache_dir)
     
+    @property
+    def reads(self):
+        return tuple(self.block_types)
+
+    @property
+    def writes(self):
+        return tuple(self.block_types)
+
     def __call__(self, document: Document):
+        blocks = []
         for page in document.pages:
             for block in page.contained_blocks(document, self.block_types):
                 self.format_block(document, block)
-                if self.enable_language_detection and not block.language:
-                    self.detect_language(block)
+                blocks.append(block)
+
+        if not self.enable_language_detection:
+            return
+
+        pending = [block for block in blocks if not block.language]
+        self._batch.scores = self.score_languages(self._needs_tree_sitter([block.code for block in pending]))
+        try:
+            for block in pending:
+                self.detect_language(block)
+        finally:
+            self._batch.scores = {}
 
     def format_block(self, document: Document, block: Code):
         min_left = 9999  # will contain x- coord of column 0
@@ -120,52 +152,7 @@ class CodeProcessor(BaseProcessor):
         else:
             # Try tree-sitter detection for a more thorough analysis
             try:
-                # Only try a few most likely languages based on heuristics
-                languages_to_try = []
-                
-                # Add languages based on heuristic detection
-                if heuristic_confidence >= 0.3:
-                    languages_to_try.append(heuristic_lang)
-                
-                # Add commonly used languages
-                common_langs = ['python', 'javascript', 'java', 'cpp', 'go', 'bash', 'rust']
-                for lang in common_langs:
-                    if lang not in languages_to_try:
-                        languages_to_try.append(lang)
-                
-                best_language = None
-                best_score = 0
-                best_metadata = None
-                
-                for lang in languages_to_try[:7]:  # Try a few more languages
-                    if get_supported_language(lang):
-                        try:
-                            metadata = extract_code_metadata(block.code, lang)
-                            if metadata.get('tree_sitter_success') and not metadata.get('error'):
-                                # Base score for successful parsing
-                                # Give higher base score for successful parsing even without functions/classes
-                                score = 0.6
-                                
-                                # Bonus for finding functions/classes
-                                if metadata.get('functions'):
-                                    score += 0.2 * min(len(metadata['functions']), 2)
-                                if metadata.get('classes'):
-                                    score += 0.2 * min(len(metadata['classes']), 2)
-                                    
-                                # Bonus if it matches heuristic detection
-                                if lang == heuristic_lang and heuristic_confidence >= 0.3:
-                                    score += heuristic_confidence * 0.3
-                                    
-                                if score > best_score:
-                                    best_score = score
-                                    best_language = lang
-                                    # Store the metadata for later use
-                                    best_metadata = metadata
-                                    
-                        except Exception as e:
-                            logger.debug(f"Error trying language {lang}: {e}")
-                            continue
-                
+                best_language, best_score, best_metadata = self._tree_sitter_scores(block.code)
                 if best_language and best_score >= 0.5:  # Lower threshold for simple code
                     detected_language = best_language
                     confidence = min(best_score, 1.0)
@@ -205,6 +192,123 @@ class CodeProcessor(BaseProcessor):
         
         return detected_language
     
+    def candidate_languages(self, heuristic_lang: str, heuristic_confidence: float) -> List[str]:
+        """The languages to try with tree-sitter, most likely first."""
+        languages_to_try = []
+        if heuristic_confidence >= 0.3:
+            languages_to_try.append(heuristic_lang)
+        for lang in self.common_languages:
+            if lang not in languages_to_try:
+                languages_to_try.append(lang)
+        return languages_to_try[:self.max_candidate_languages]
+
+    def _needs_tree_sitter(self, codes: List[str]) -> List[str]:
+        # Blocks answered by the in-memory cache or by confident heuristics are never parsed
+        needed = {}
+        for code in codes:
+            if not code or hash(code[:500]) in self._detection_cache:
+                continue
+            if self._heuristic_detection(code)[1] < 0.8:
+                needed.setdefault(hash(code[:500]), code)
+        return list(needed.values())
+
+    def score_languages(self, codes: List[str]) -> Dict[str, Tuple[Optional[str], float, Optional[dict]]]:
+        """
+        Score code blocks against their candidate languages with tree-sitter, in one pass.
+
+        Languages form the outer loop, so each grammar's parser and query are
+        reused across every block.  A block is no longer tried once parsing it
+        has taken `detection_timeout` seconds.  Returns the best
+        (language, score, metadata) per code, ties going to the language
+        tried first for that block, with (None, 0, None) if nothing parsed.
+        """
+        codes = list(dict.fromkeys(codes))
+        results = self._stored_scores(codes)
+        candidates = {}
+        for code in codes:
+            if code in results:
+                continue
+            heuristic_lang, heuristic_confidence = self._heuristic_detection(code)
+            candidates[code] = (self.candidate_languages(heuristic_lang, heuristic_confidence), heuristic_lang, heuristic_confidence)
+
+        languages = list(dict.fromkeys(lang for langs, _, _ in candidates.values() for lang in langs))
+        scores = {code: {} for code in candidates}
+        elapsed = {code: 0.0 for code in candidates}
+        for lang in languages:
+            if not get_supported_language(lang):
+                continue
+            for code, (langs, heuristic_lang, heuristic_confidence) in candidates.items():
+                if lang not in langs or elapsed[code] >= self.detection_timeout:
+                    continue
+                start = time.perf_counter()
+                try:
+                    scores[code][lang] = self._score_language(code, lang, heuristic_lang, heuristic_confidence)
+                except Exception as e:
+                    logger.debug(f"Error trying language {lang}: {e}")
+                finally:
+                    elapsed[code] += time.perf_counter() - start
+
+        for code, (langs, _, _) in candidates.items():
+            best_language = None
+            best_score = 0
+            best_metadata = None
+            for lang in langs:
+                score, metadata = scores[code].get(lang, (None, None))
+                if score is not None and score > best_score:
+                    best_score = score
+                    best_language = lang
+                    best_metadata = metadata
+            results[code] = (best_language, best_score, best_metadata)
+        self._store_scores({code: results[code] for code in candidates})
+        return results
+
+    def _score_language(self, code: str, lang: str, heuristic_lang: str, heuristic_confidence: float) -> Tuple[Optional[float], Optional[dict]]:
+        metadata = extract_code_metadata(code, lang)
+        if not metadata.get('tree_sitter_success') or metadata.get('error'):
+            return None, None
+
+        # Base score for successful parsing
+        # Give higher base score for successful parsing even without functions/classes
+        score = 0.6
+        
+        # Bonus for finding functions/classes
+        if metadata.get('functions'):
+            score += 0.2 * min(len(metadata['functions']), 2)
+        if metadata.get('classes'):
+            score += 0.2 * min(len(metadata['classes']), 2)
+            
+        # Bonus if it matches heuristic detection
+        if lang == heuristic_lang and heuristic_confidence >= 0.3:
+            score += heuristic_confidence * 0.3
+        return score, metadata
+
+    def _tree_sitter_scores(self, code: str) -> Tuple[Optional[str], float, Optional[dict]]:
+        batch_scores = getattr(self._batch, "scores", None) or {}
+        if code in batch_scores:
+            return batch_scores[code]
+        return self.score_languages([code])[code]
+
+    def _language_cache_key(self, code: str) -> str:
+        return self._language_cache.compute_key(code, self.common_languages[:self.max_candidate_languages], self.fallback_language)
+
+    def _stored_scores(self, codes: List[str]) -> Dict[str, Tuple[Optional[str], float, Optional[dict]]]:
+        if self._language_cache is None or not codes:
+            return {}
+        keys = {self._language_cache_key(code): code for code in codes}
+        stored = self._language_cache.get_many(list(keys))
+        return {
+            keys[key]: (value["language"], value["score"], restore_metadata(value["metadata"]))
+            for key, value in stored.items()
+        }
+
+    def _store_scores(self, scores: Dict[str, Tuple[Optional[str], float, Optional[dict]]]):
+        if self._language_cache is None or not scores:
+            return
+        self._language_cache.set_many({
+            self._language_cache_key(code): {"language": language, "score": score, "metadata": metadata}
+            for code, (language, score, metadata) in scores.items()
+        })
+
     def _heuristic_detection(self, code: str) -> tuple[str, float]:
         """
         Enhanced heuristic-based language detection.
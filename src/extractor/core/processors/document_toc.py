@@ -25,6 +25,15 @@ class DocumentTOCProcessor(BaseProcessor):
     """
     block_types = (BlockTypes.SectionHeader, )
 
+    @property
+    def reads(self):
+        # Only the order of the section headers, not the whole page order
+        return tuple(self.block_types)
+
+    @property
+    def writes(self):
+        return ()
+
     def __call__(self, document: Document):
         toc = []
         for page in document.pages:
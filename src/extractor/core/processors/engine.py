@@ -0,0 +1,130 @@
+"""
+Module: engine.py
+Description: Plans and runs processors, fusing page-local ones into per-page stages
+
+Sample Input:
+>>> processors = [OrderProcessor(), LineMergeProcessor(config), DocumentTOCProcessor(), PageHeaderProcessor(),
+...               IgnoreTextProcessor(), LineNumbersProcessor()]
+
+Expected Output:
+>>> # PageHeaderProcessor moves ahead of the TOC, LineNumbersProcessor changes the text IgnoreTextProcessor compares
+>>> [step.names for step in plan_processors(processors)]
+[['OrderProcessor', 'LineMergeProcessor', 'PageHeaderProcessor'], ['DocumentTOCProcessor'], ['IgnoreTextProcessor'], ['LineNumbersProcessor']]
+
+Example Usage:
+>>> from extractor.core.processors.engine import ProcessorEngine
+>>> ProcessorEngine(processors, workers=4)(document)
+"""
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+from extractor.core.processors import BaseProcessor
+from extractor.core.schema.document import Document
+
+
+def fusable(processor: BaseProcessor) -> bool:
+    return processor.page_local and not processor.batched
+
+
+def conflicts(first: BaseProcessor, second: BaseProcessor) -> bool:
+    """Whether running the two processors in the other order could change the result."""
+    if None in (first.reads, first.writes, second.reads, second.writes):
+        return True
+    first_reads, first_writes = set(first.reads), set(first.writes)
+    second_reads, second_writes = set(second.reads), set(second.writes)
+    return bool(
+        first_writes & (second_reads | second_writes)
+        or second_writes & first_reads
+    )
+
+
+class ProcessorStep:
+    """Processors that run together, either fused page by page or as one document-wide pass."""
+
+    def __init__(self, processors: List[BaseProcessor], fused: bool):
+        self.processors = processors
+        self.fused = fused
+
+    @property
+    def names(self) -> List[str]:
+        return [type(processor).__name__ for processor in self.processors]
+
+
+def plan_processors(processors: Sequence[BaseProcessor]) -> List[ProcessorStep]:
+    """
+    Group processors into steps, keeping the result of running them in order.
+
+    Each page-local processor that does not batch model calls joins the
+    latest fused step if it can move ahead of every step after that one,
+    i.e. it conflicts with none of their processors.  Otherwise it starts a
+    new fused step.  Everything else is a step of its own, in order.
+    """
+    steps: List[ProcessorStep] = []
+    for processor in processors:
+        if not fusable(processor):
+            steps.append(ProcessorStep([processor], fused=False))
+            continue
+
+        target = None
+        for step in reversed(steps):
+            if step.fused:
+                target = step
+                break
+            if any(conflicts(other, processor) for other in step.processors):
+                break
+
+        if target is None:
+            steps.append(ProcessorStep([processor], fused=True))
+        else:
+            target.processors.append(processor)
+    return steps
+
+
+class ProcessorEngine:
+    """
+    Runs processors step by step.
+
+    A fused step runs all its processors on one page before moving to the
+    next page, on a view of the document that holds only that page.  With
+    more than one worker, pages run in a thread pool shared by every fused
+    step of the run, so per-thread caches (e.g. tree-sitter parsers) last
+    the whole run.  Other steps run over the whole document.
+    """
+
+    def __init__(self, processors: Sequence[BaseProcessor], workers: int = 1):
+        self.steps = plan_processors(processors)
+        self.workers = workers
+
+    def __call__(self, document: Document):
+        executor = None
+        if self.workers > 1 and len(document.pages) > 1 and any(step.fused for step in self.steps):
+            executor = ThreadPoolExecutor(max_workers=min(self.workers, len(document.pages)))
+        try:
+            for step in self.steps:
+                if step.fused and len(document.pages) > 1:
+                    self.run_fused(step, document, executor)
+                else:
+                    for processor in step.processors:
+                        processor(document)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def run_fused(self, step: ProcessorStep, document: Document, executor: Optional[Executor] = None):
+        if executor is None and self.workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(document.pages))) as pool:
+                return self.run_fused(step, document, pool)
+
+        views = [document.model_copy(update={"pages": [page]}) for page in document.pages]
+
+        def run_page(view: Document):
+            for processor in step.processors:
+                processor(view)
+
+        if executor is not None:
+            # Consumed so errors from any page propagate
+            list(executor.map(run_page, views))
+        else:
+            for view in views:
+                run_page(view)
@@ -351,15 +351,11 @@ class EnhancedTableProcessor(BaseProcessor):
             document: The document to process
         """
         for page in document.pages:
-            child_contained_blocks = page.contained_blocks(document, self.contained_block_types)
             for block in page.contained_blocks(document, self.block_types):
-                intersections = matrix_intersection_area(
-                    [c.polygon.bbox for c in child_contained_blocks], 
-                    [block.polygon.bbox]
-                )
-                for child, intersection in zip(child_contained_blocks, intersections):
+                # Only blocks overlapping the table can be enclosed by it
+                for child in page.blocks_intersecting(block.polygon.bbox, self.contained_block_types):
                     # Adjust this to percentage of the child block that is enclosed by the table
-                    intersection_pct = intersection / max(child.polygon.area, 1)
+                    intersection_pct = child.polygon.intersection_area(block.polygon) / max(child.polygon.area, 1)
                     if intersection_pct > 0.95 and child.id in page.structure:
                         page.structure.remove(child.id)
     
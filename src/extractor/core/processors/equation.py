@@ -30,6 +30,8 @@ class EquationProcessor(BaseProcessor):
     """
     A processor for recognizing equations in the document.
     """
+    page_local = True
+    batched = True
     block_types: Annotated[
         Tuple[BlockTypes],
         "The block types to process.",
@@ -61,6 +63,18 @@ class EquationProcessor(BaseProcessor):
 
         self.texify_model = texify_model
 
+    @property
+    def reads(self):
+        if self.texify_inline_spans:
+            return None  # Math lines inside any block
+        return tuple(self.block_types)
+
+    @property
+    def writes(self):
+        if self.texify_inline_spans:
+            return None
+        return tuple(self.block_types)
+
     def __call__(self, document: Document):
         equation_data = []
 
@@ -26,8 +26,18 @@ class FootnoteProcessor(BaseProcessor):
     """
     A processor for pushing footnotes to the bottom, and relabeling mislabeled text blocks.
     """
+    page_local = True
     block_types = (BlockTypes.Footnote,)
 
+    @property
+    def reads(self):
+        return tuple(self.block_types)
+
+    @property
+    def writes(self):
+        # Moves footnotes to the bottom and marks their superscripts
+        return (BlockTypes.Page, *self.block_types)
+
     def __call__(self, document: Document):
         for page in document.pages:
             self.push_footnotes_to_bottom(page, document)
@@ -58,6 +58,15 @@ class IgnoreTextProcessor(BaseProcessor):
         "Higher values enforce stricter matching.",
     ] = 90
 
+    @property
+    def reads(self):
+        # The first and last of these blocks on each page, and their text
+        return tuple(self.block_types)
+
+    @property
+    def writes(self):
+        return tuple(self.block_types)
+
     def __call__(self, document: Document):
         first_blocks = []
         last_blocks = []
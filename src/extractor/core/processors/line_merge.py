@@ -28,6 +28,7 @@ class LineMergeProcessor(BaseProcessor):
     """
     A processor for merging inline math lines.
     """
+    page_local = True
     block_types = (BlockTypes.Text, BlockTypes.TextInlineMath, BlockTypes.Caption, BlockTypes.Footnote, BlockTypes.SectionHeader)
     min_merge_pct: Annotated[
         float,
@@ -129,6 +130,14 @@ class LineMergeProcessor(BaseProcessor):
                 line.formats.append("math")
 
 
+    @property
+    def reads(self):
+        return tuple(self.block_types)
+
+    @property
+    def writes(self):
+        return tuple(self.block_types)
+
     def __call__(self, document: Document):
         # Merging lines only needed for inline math
         if not self.use_llm:
@@ -25,6 +25,7 @@ class LineNumbersProcessor(BaseProcessor):
     """
     A processor for ignoring line numbers.
     """
+    page_local = True
     block_types = (BlockTypes.Text, BlockTypes.TextInlineMath)
     strip_numbers_threshold: Annotated[
         float,
@@ -48,6 +49,15 @@ class LineNumbersProcessor(BaseProcessor):
     def __init__(self, config):
         super().__init__(config)
 
+    @property
+    def reads(self):
+        # Line number spans are looked for in every line on the page
+        return (*self.block_types, BlockTypes.Line, BlockTypes.Span)
+
+    @property
+    def writes(self):
+        return (*self.block_types, BlockTypes.Span)
+
     def __call__(self, document: Document):
         self.ignore_line_number_spans(document)
         self.ignore_line_starts_ends(document)
@@ -39,6 +39,18 @@ class ListProcessor(BaseProcessor):
     def __init__(self, config):
         super().__init__(config)
 
+    @property
+    def reads(self):
+        # The block after each list, skipping the ignored types, so the order of everything else
+        return tuple(
+            block_type for block_type in BlockTypes
+            if block_type != BlockTypes.Page and block_type not in self.ignored_block_types
+        )
+
+    @property
+    def writes(self):
+        return (*self.block_types, BlockTypes.ListItem)
+
     def __call__(self, document: Document):
         self.list_group_continuation(document)
         self.list_group_indentation(document)
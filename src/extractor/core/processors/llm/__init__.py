@@ -20,9 +20,10 @@ Example Usage:
 >>> # Add usage examples
 """
 
+import threading
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Annotated, TypedDict, List, Sequence
+from typing import Annotated, Optional, TypedDict, List, Sequence
 
 from pydantic import BaseModel
 from tqdm import tqdm
@@ -56,6 +57,8 @@ class BaseLLMProcessor(BaseProcessor):
     """
     A processor for using LLMs to convert blocks.
     """
+    page_local = True
+    batched = True
     model_name: Annotated[
         str,
         "The model name to use in provider/model format (e.g., 'gemini/gemini-2.0-flash' or 'openai/gpt-4o-mini').",
@@ -99,7 +102,13 @@ class BaseLLMProcessor(BaseProcessor):
 class BaseLLMComplexBlockProcessor(BaseLLMProcessor):
     """
     A processor for using LLMs to convert blocks with more complex logic.
+
+    Jobs run in a thread pool, but only one at a time touches the document:
+    a job holds the document lock except while it waits on `llm_response`.
+    The page indexes kept up to date by block edits are not thread-safe.
     """
+    _document_lock: Optional[threading.Lock] = None
+
     def __call__(self, document: Document):
         if not self.use_llm or self.llm_service is None:
             return
@@ -112,21 +121,47 @@ class BaseLLMComplexBlockProcessor(BaseLLMProcessor):
     def process_rewriting(self, document: Document, page: PageGroup, block: Block):
         raise NotImplementedError()
 
+    def llm_response(self, *args, **kwargs):
+        """Call the LLM service, letting other jobs edit the document in the meantime."""
+        lock = self._document_lock
+        if lock is None:
+            return self.llm_service(*args, **kwargs)
+        lock.release()
+        try:
+            return self.llm_service(*args, **kwargs)
+        finally:
+            lock.acquire()
+
+    def run_job(self, document: Document, *job):
+        with self._document_lock:
+            self.process_rewriting(document, *job)
+
+    def rewriting_jobs(self, document: Document) -> List[tuple]:
+        """The argument tuples passed to `process_rewriting`, one per LLM job."""
+        return [
+            (page, block)
+            for page in document.pages
+            for block in page.contained_blocks(document, self.block_types)
+        ]
+
     def rewrite_blocks(self, document: Document):
         # Don't show progress if there are no blocks to process
-        total_blocks = sum(len(page.contained_blocks(document, self.block_types)) for page in document.pages)
-        if total_blocks == 0:
+        jobs = self.rewriting_jobs(document)
+        if not jobs:
             return
 
         pbar = tqdm(desc=f"{self.__class__.__name__} running", disable=self.disable_tqdm)
-        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
-            for future in as_completed([
-                executor.submit(self.process_rewriting, document, page, block)
-                for page in document.pages
-                for block in page.contained_blocks(document, self.block_types)
-            ]):
-                future.result()  # Raise exceptions if any occurred
-                pbar.update(1)
+        self._document_lock = threading.Lock()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                for future in as_completed([
+                    executor.submit(self.run_job, document, *job)
+                    for job in jobs
+                ]):
+                    future.result()  # Raise exceptions if any occurred
+                    pbar.update(1)
+        finally:
+            self._document_lock = None
 
         pbar.close()
 
@@ -141,6 +176,10 @@ class BaseLLMSimpleBlockProcessor(BaseLLMProcessor):
         assign_config(self, config)
 
     def __call__(self, result: dict, prompt_data: PromptData, document: Document):
+        self.apply_response(result, prompt_data, document)
+
+    def apply_response(self, result: dict, prompt_data: PromptData, document: Document):
+        # Subclasses may override __call__ to run standalone, so wrappers call this instead
         try:
             self.rewrite_block(result, prompt_data, document)
         except Exception as e:
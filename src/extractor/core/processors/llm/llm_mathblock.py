@@ -2,9 +2,7 @@
 Module: llm_mathblock.py
 
 External Dependencies:
-- concurrent: [Documentation URL]
 - pydantic: https://docs.pydantic.dev/
-- tqdm: [Documentation URL]
 - marker: [Documentation URL]
 
 Sample Input:
@@ -17,11 +15,9 @@ Example Usage:
 >>> # Add usage examples
 """
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Tuple, Annotated
 
 from pydantic import BaseModel
-from tqdm import tqdm
 
 from extractor.core.output import json_to_html, unwrap_outer_tag
 from extractor.core.processors.llm import BaseLLMComplexBlockProcessor
@@ -92,9 +88,9 @@ Adversarial training <i>(AT)</i> <a href='#page-9-1'>[23]</a>, which aims to min
 ```
 """
 
-    def rewrite_blocks(self, document: Document):
+    def rewriting_jobs(self, document: Document) -> List[tuple]:
         if not self.redo_inline_math:
-            return
+            return []
 
         # Get inline math blocks
         inline_blocks: List[InlineMath] = [
@@ -153,27 +149,7 @@ Adversarial training <i>(AT)</i> <a href='#page-9-1'>[23]</a>, which aims to min
                 if b not in detected_blocks and b not in inline_blocks:
                     additional_text_blocks.append((page, b))
 
-        inference_blocks = inline_blocks + detected_blocks + additional_text_blocks
-
-        # Don't show progress if there are no blocks to process
-        total_blocks = len(inference_blocks)
-        if total_blocks == 0:
-            return
-
-        pbar = tqdm(
-            desc=f"{self.__class__.__name__} running", disable=self.disable_tqdm
-        )
-        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
-            for future in as_completed(
-                [
-                    executor.submit(self.process_rewriting, document, b[0], b[1])
-                    for b in inference_blocks
-                ]
-            ):
-                future.result()  # Raise exceptions if any occurred
-                pbar.update(1)
-
-        pbar.close()
+        return inline_blocks + detected_blocks + additional_text_blocks
 
     def get_block_text(self, block: Block, document: Document) -> str:
         html = json_to_html(block.render(document))
@@ -190,7 +166,7 @@ Adversarial training <i>(AT)</i> <a href='#page-9-1'>[23]</a>, which aims to min
         prompt = self.text_math_rewriting_prompt.replace("{extracted_html}", block_text)
 
         image = self.extract_image(document, block)
-        response = self.llm_service(prompt, image, block, LLMTextSchema)
+        response = self.llm_response(prompt, image, block, LLMTextSchema)
 
         if not response or "corrected_html" not in response:
             block.update_metadata(llm_error_count=1)
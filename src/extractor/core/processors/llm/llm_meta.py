@@ -34,6 +34,10 @@ class LLMSimpleBlockMetaProcessor(BaseLLMProcessor):
         super().__init__(llm_service, config)
         self.processors = processor_lst
 
+    @property
+    def page_local(self) -> bool:
+        return all(processor.page_local for processor in self.processors)
+
     def __call__(self, document: Document):
         if not self.use_llm or self.llm_service is None:
             return
@@ -60,7 +64,7 @@ class LLMSimpleBlockMetaProcessor(BaseLLMProcessor):
                     future_data = futures_map.pop(future)
                     processor: BaseLLMSimpleBlockProcessor = self.processors[future_data["processor_idx"]]
                     # finalize the result
-                    processor(result, future_data["prompt_data"], document)
+                    processor.apply_response(result, future_data["prompt_data"], document)
                 except Exception as e:
                     print(f"Error processing LLM response: {e}")
 
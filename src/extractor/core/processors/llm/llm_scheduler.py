@@ -0,0 +1,225 @@
+"""
+Module: llm_scheduler.py
+Description: Runs the simple LLM processors' prompts against one shared concurrency and rate budget
+
+External Dependencies:
+- asyncio: https://docs.python.org/3/library/asyncio.html
+- tqdm: [Documentation URL]
+- granger_common: Optional, provides the shared RateLimiter
+
+Sample Input:
+>>> processors = [LLMFormProcessor(config), LLMEquationProcessor(config)]
+>>> config = {"use_llm": True, "llm_global_concurrency": 8, "llm_requests_per_second": 5}
+
+Expected Output:
+>>> # All prompts from both processors are in flight together (at most 8 at once),
+>>> # and responses are applied to the document in processor order
+
+Example Usage:
+>>> from extractor.core.processors.llm.llm_scheduler import LLMSchedulerProcessor
+>>> scheduler = LLMSchedulerProcessor(processors, llm_service, config)
+>>> scheduler(document)
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Annotated, Any, Dict, List, Optional, Set
+
+from loguru import logger
+from tqdm import tqdm
+
+from extractor.core.processors.llm import (
+    BaseLLMComplexBlockProcessor,
+    BaseLLMProcessor,
+    BaseLLMSimpleBlockProcessor,
+)
+from extractor.core.schema import BlockTypes
+from extractor.core.schema.document import Document
+from extractor.core.services import BaseService
+
+try:
+    from granger_common.rate_limiter import RateLimiter
+    RATE_LIMITER_AVAILABLE = True
+except ImportError:
+    RATE_LIMITER_AVAILABLE = False
+
+
+def run_coroutine(coro):
+    """Run a coroutine to completion, even when called from inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class BudgetedService:
+    """
+    Wraps an LLM service so every call waits on the scheduler's rate budget.
+
+    Complex processors run on their own, in their place in the processor
+    list, and call their service from inside `process_rewriting`.  Handing
+    them this wrapper keeps their requests within the same rate budget.
+    """
+
+    def __init__(self, service: BaseService, scheduler: "LLMSchedulerProcessor"):
+        self.service = service
+        self.scheduler = scheduler
+
+    def __call__(self, *args, **kwargs):
+        self.scheduler.acquire()
+        return self.service(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.service, name)
+
+
+class LLMSchedulerProcessor(BaseLLMProcessor):
+    """
+    A wrapper for the simple LLM processors, so their requests share one budget.
+
+    Prompts from every processor are dispatched together instead of one
+    processor after another.  A processor only waits for earlier processors
+    that rewrite the same block types.  Prompts are built and responses
+    applied on the scheduler's own thread, in processor order, so only the
+    requests themselves run concurrently.
+    """
+    llm_global_concurrency: Annotated[
+        int,
+        "The maximum number of LLM requests in flight across all LLM processors.",
+        "Replaces the per-processor max_concurrency when processors run through the scheduler.",
+    ] = 8
+    llm_requests_per_second: Annotated[
+        Optional[float],
+        "The maximum number of LLM requests per second across all LLM processors.",
+        "Default is None, which disables rate limiting.",
+    ] = None
+    llm_burst_size: Annotated[
+        Optional[int],
+        "The number of LLM requests allowed in a burst when rate limiting.",
+        "Default is None, which allows 3x llm_requests_per_second.",
+    ] = None
+    # Lines live inside these blocks, so line-level rewrites change their text
+    line_container_types = (
+        BlockTypes.Text,
+        BlockTypes.TextInlineMath,
+        BlockTypes.Caption,
+        BlockTypes.SectionHeader,
+        BlockTypes.Footnote,
+        BlockTypes.ListItem,
+        BlockTypes.Handwriting,
+    )
+
+    def __init__(self, processor_lst: List[BaseLLMSimpleBlockProcessor], llm_service: BaseService, config=None):
+        super().__init__(llm_service, config)
+        self.processors = processor_lst
+        self.dependencies = self.processor_dependencies()
+
+        self.rate_limiter = None
+        if self.llm_requests_per_second:
+            if RATE_LIMITER_AVAILABLE:
+                self.rate_limiter = RateLimiter(
+                    calls_per_second=self.llm_requests_per_second,
+                    burst_size=self.llm_burst_size,
+                    name="llm_processors",
+                )
+            else:
+                logger.warning("granger_common not available - LLM requests will not be rate limited")
+
+    def share_budget(self, processors: List[BaseLLMProcessor]):
+        """Make the complex processors' requests wait on this scheduler's rate budget."""
+        if self.llm_service is None:
+            return
+        for processor in processors:
+            if not isinstance(processor, BaseLLMComplexBlockProcessor) or processor.llm_service is None:
+                continue
+            service = processor.llm_service
+            if isinstance(service, BudgetedService):
+                service = service.service
+            processor.llm_service = BudgetedService(service, self)
+
+    @property
+    def page_local(self) -> bool:
+        return all(processor.page_local for processor in self.processors)
+
+    def touched_block_types(self, processor: BaseLLMProcessor) -> Optional[Set[BlockTypes]]:
+        if processor.block_types is None:
+            return None
+        block_types = set(processor.block_types) | set(getattr(processor, "additional_block_types", ()))
+        if BlockTypes.Line in block_types:
+            block_types |= set(self.line_container_types)
+        return block_types
+
+    def processor_dependencies(self) -> List[List[int]]:
+        touched = [self.touched_block_types(processor) for processor in self.processors]
+        dependencies = []
+        for i, block_types in enumerate(touched):
+            dependencies.append([
+                j for j in range(i)
+                if block_types is None or touched[j] is None or block_types & touched[j]
+            ])
+        return dependencies
+
+    def acquire(self):
+        if self.rate_limiter is None:
+            return
+        # RateLimiter gives up after max_retry_wait, but a dropped request is worse than a late one
+        while not self.rate_limiter.acquire():
+            pass
+
+    def get_response(self, prompt_data: Dict[str, Any]):
+        self.acquire()
+        return self.llm_service(prompt_data["prompt"], prompt_data["image"], prompt_data["block"], prompt_data["schema"])
+
+    def __call__(self, document: Document):
+        if not self.use_llm or self.llm_service is None:
+            return
+
+        pbar = tqdm(desc="LLM processors running", disable=self.disable_tqdm)
+        with ThreadPoolExecutor(max_workers=self.llm_global_concurrency) as executor:
+            run_coroutine(self.schedule(document, executor, pbar))
+        pbar.close()
+
+    async def schedule(self, document: Document, executor: Executor, pbar: tqdm):
+        applied = [asyncio.Event() for _ in self.processors]
+        await asyncio.gather(*[
+            self.run_processor(i, document, executor, applied, pbar)
+            for i in range(len(self.processors))
+        ])
+
+    async def run_processor(self, idx: int, document: Document, executor: Executor, applied: List[asyncio.Event], pbar: tqdm):
+        processor = self.processors[idx]
+        loop = asyncio.get_running_loop()
+        try:
+            for dependency in self.dependencies[idx]:
+                await applied[dependency].wait()
+
+            # Prompts are built and applied on the loop thread, so document updates never overlap
+            prompts = processor.block_prompts(document)
+            responses = await asyncio.gather(*[
+                self.track(loop.run_in_executor(executor, self.get_response, prompt_data), pbar)
+                for prompt_data in prompts
+            ], return_exceptions=True)
+
+            if idx > 0:
+                await applied[idx - 1].wait()
+            for prompt_data, response in zip(prompts, responses):
+                if isinstance(response, Exception):
+                    logger.error(f"Error processing LLM response in {processor.__class__.__name__}: {response}")
+                    continue
+                processor.apply_response(response, prompt_data, document)
+        except Exception:
+            logger.exception(f"Error running {processor.__class__.__name__}")
+        finally:
+            if idx > 0:
+                await applied[idx - 1].wait()
+            applied[idx].set()
+
+    @staticmethod
+    async def track(future, pbar: tqdm):
+        try:
+            return await future
+        finally:
+            pbar.update(1)
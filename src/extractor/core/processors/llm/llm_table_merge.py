@@ -2,9 +2,7 @@
 Module: llm_table_merge.py
 
 External Dependencies:
-- concurrent: [Documentation URL]
 - pydantic: https://docs.pydantic.dev/
-- tqdm: [Documentation URL]
 - PIL: [Documentation URL]
 - marker: [Documentation URL]
 
@@ -18,11 +16,9 @@ Example Usage:
 >>> # Add usage examples
 """
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Annotated, List, Tuple, Literal
 
 from pydantic import BaseModel
-from tqdm import tqdm
 from PIL import Image
 
 from extractor.core.output import json_to_html
@@ -33,6 +29,7 @@ from extractor.core.schema.document import Document
 
 
 class LLMTableMergeProcessor(BaseLLMComplexBlockProcessor):
+    page_local = False  # Merges tables that continue onto the next page
     block_types: Annotated[
         Tuple[BlockTypes],
         "The block types to process.",
@@ -167,8 +164,7 @@ Table 2
                 max_cols = cols
         return max_cols
 
-    def rewrite_blocks(self, document: Document):
-        pbar = tqdm(desc=f"{self.__class__.__name__} running", disable=self.disable_tqdm)
+    def rewriting_jobs(self, document: Document) -> List[tuple]:
         table_runs = []
         table_run = []
         prev_block = None
@@ -230,15 +226,7 @@ Table 2
         if table_run:
             table_runs.append(table_run)
 
-        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
-            for future in as_completed([
-                executor.submit(self.process_rewriting, document, blocks)
-                for blocks in table_runs
-            ]):
-                future.result()  # Raise exceptions if any occurred
-                pbar.update(1)
-
-        pbar.close()
+        return [(blocks,) for blocks in table_runs]
 
     def process_rewriting(self, document: Document, blocks: List[Block]):
         if len(blocks) < 2:
@@ -261,7 +249,7 @@ Table 2
 
             prompt = self.table_merge_prompt.replace("{{table1}}", start_html).replace("{{table2}}", curr_html)
 
-            response = self.llm_service(
+            response = self.llm_response(
                 prompt,
                 [start_image, curr_image],
                 curr_block,
@@ -27,7 +27,10 @@ class OrderProcessor(BaseProcessor):
     """
     A processor for sorting the blocks in order if needed.  This can help when the layout image was sliced.
     """
+    page_local = True
     block_types = tuple()
+    reads = (BlockTypes.Page, BlockTypes.Span)
+    writes = tuple(BlockTypes)  # Any block may move
 
     def __call__(self, document: Document):
         for page in document.pages:
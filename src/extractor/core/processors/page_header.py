@@ -24,8 +24,18 @@ class PageHeaderProcessor(BaseProcessor):
     """
     A processor for moving PageHeaders to the top
     """
+    page_local = True
     block_types = (BlockTypes.PageHeader,)
 
+    @property
+    def reads(self):
+        return tuple(self.block_types)
+
+    @property
+    def writes(self):
+        # Moves page headers to the top
+        return (BlockTypes.Page, *self.block_types)
+
     def __call__(self, document: Document):
         for page in document.pages:
             self.move_page_header_to_top(page, document)
@@ -31,6 +31,7 @@ class ReferenceProcessor(BaseProcessor):
     """
     A processor for adding references to the document.
     """
+    page_local = True
 
     def __init__(self, config):
         super().__init__(config)
@@ -54,6 +54,14 @@ class SectionHeaderProcessor(BaseProcessor):
         "The minimum height of a heading to consider it a heading.",
     ] = 0.99
 
+    @property
+    def reads(self):
+        return tuple(self.block_types)
+
+    @property
+    def writes(self):
+        return tuple(self.block_types)
+
     def __call__(self, document: Document):
         line_heights: Dict[int, float] = {}
         for page in document.pages:
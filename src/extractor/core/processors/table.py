@@ -57,6 +57,8 @@ class TableProcessor(BaseProcessor):
     """
     A processor for recognizing tables in the document.
     """
+    page_local = True
+    batched = True
     block_types = (BlockTypes.Table, BlockTypes.TableOfContents, BlockTypes.Form)
     detect_boxes: Annotated[
         bool,
@@ -123,6 +125,15 @@ class TableProcessor(BaseProcessor):
         self.recognition_model = recognition_model
         self.table_rec_model = table_rec_model
 
+    @property
+    def reads(self):
+        return (*self.block_types, *self.contained_block_types)
+
+    @property
+    def writes(self):
+        # Adds cells to the tables and takes the blocks inside them off the page
+        return (BlockTypes.Page, *self.block_types, *self.contained_block_types, BlockTypes.TableCell)
+
     def __call__(self, document: Document):
         filepath = document.filepath  # Path to original pdf file
 
@@ -233,12 +244,11 @@ class TableProcessor(BaseProcessor):
         # Clean out other blocks inside the table
         # This can happen with stray text blocks inside the table post-merging
         for page in document.pages:
-            child_contained_blocks = page.contained_blocks(document, self.contained_block_types)
             for block in page.contained_blocks(document, self.block_types):
-                intersections = matrix_intersection_area([c.polygon.bbox for c in child_contained_blocks], [block.polygon.bbox])
-                for child, intersection in zip(child_contained_blocks, intersections):
+                # Only blocks overlapping the table can be enclosed by it
+                for child in page.blocks_intersecting(block.polygon.bbox, self.contained_block_types):
                     # Adjust this to percentage of the child block that is enclosed by the table
-                    intersection_pct = intersection / max(child.polygon.area, 1)
+                    intersection_pct = child.polygon.intersection_area(block.polygon) / max(child.polygon.area, 1)
                     if intersection_pct > 0.95 and child.id in page.structure:
                         page.structure.remove(child.id)
 
@@ -16,13 +16,10 @@ Example usage:
     processor.process_with_params(document, table_block, optimal_params)
 """
 
-import time
+import functools
 import logging
 from typing import Dict, List, Any, Optional, Tuple, Union
-import traceback
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from tqdm import tqdm
 
 from extractor.core.config.table import TableOptimizerConfig, OptimizationMetric
 from extractor.core.schema import BlockTypes
@@ -38,6 +35,14 @@ try:
 except ImportError:
     CAMELOT_AVAILABLE = False
 
+from extractor.core.utils.camelot_search import CamelotParameterSearch
+
+# camelot.read_pdf rejects arguments that don't apply to the flavor
+FLAVOR_PARAMS = {
+    "lattice": ("line_scale", "copy_text", "shift_text", "split_text", "line_tol", "joint_tol"),
+    "stream": ("edge_tol", "row_tol", "column_tol", "split_text"),
+}
+
 
 class TableOptimizer:
     """
@@ -57,8 +62,21 @@ class TableOptimizer:
         self.config = config
         self.logger = logging.getLogger(__name__)
         
+        self.metrics = getattr(self.config, "metrics", None) or [
+            OptimizationMetric.ACCURACY.value,
+            OptimizationMetric.COMPLETENESS.value,
+            OptimizationMetric.STRUCTURE.value,
+            OptimizationMetric.SPEED.value,
+        ]
+        self.parameter_search = CamelotParameterSearch(
+            max_workers=self.config.n_workers,
+            quality_threshold=self.config.early_stop_threshold,
+            attempt_timeout=self.config.timeout_seconds,
+            namespace="table_optimizer"
+        )
+        
         # Define default parameter space if not provided
-        if not self.config.param_space:
+        if not getattr(self.config, "param_space", None):
             self.param_space = {
                 "flavor": ["lattice", "stream"],
                 "line_width": [10, 15, 20],
@@ -107,62 +125,26 @@ class TableOptimizer:
             (page_height - bbox[1]) / page_height,  # Flip Y coordinate
         ]
         
-        # Camelot page index is 1-based
-        page_idx = table_block.page_id + 1
-        
         # Generate parameter combinations to test
         param_combinations = self._generate_parameter_combinations()
         
-        # Test each combination
-        results = []
-        for params in tqdm(param_combinations, desc="Optimizing table parameters", disable=not self.config.enabled):
-            try:
-                start_time = time.time()
-                
-                # Set timeout for this optimization attempt
-                if time.time() - start_time > self.config.timeout:
-                    self.logger.warning(f"Optimization timed out after {self.config.timeout} seconds")
-                    continue
-                    
-                table_result = camelot.read_pdf(
-                    filepath,
-                    pages=str(page_idx),
-                    flavor=params["flavor"],
-                    table_areas=[camelot_bbox],
-                    line_scale=params.get("line_scale", 40),
-                    line_width=params.get("line_width", 15),
-                    copy_text=params.get("copy_text", True),
-                    edge_tol=params.get("edge_tol", 50),
-                    row_tol=params.get("row_tol", 2)
-                )
-                
-                if len(table_result) == 0 or table_result[0].df.empty:
-                    continue
-                    
-                camelot_table = table_result[0]
-                
-                # Calculate metrics
-                metrics = self._calculate_metrics(camelot_table, params, time.time() - start_time)
-                
-                results.append({
-                    "params": params,
-                    "metrics": metrics,
-                    "score": self._calculate_score(metrics)
-                })
-                
-            except Exception as e:
-                self.logger.error(f"Error optimizing with params {params}: {str(e)}")
-                traceback.print_exc()
-                continue
-                
+        # Each candidate's score is normalized by the total metric weight, so
+        # early_stop_threshold is on the same 0-1 scale as the metrics
+        score_fn = functools.partial(_score_candidate, metrics=[str(getattr(m, "value", m)) for m in self.metrics])
+        result = self.parameter_search.search(
+            filepath,
+            table_block.page_id,
+            param_combinations,
+            score_fn,
+            table_areas=[camelot_bbox]
+        )
+        
         # Find optimal parameters
-        if not results:
+        if not result.tables:
             self.logger.warning("No valid parameter combinations found")
             return {}
             
-        # Sort by score (descending)
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[0]["params"]
+        return result.params
     
     def _generate_parameter_combinations(self) -> List[Dict[str, Any]]:
         """
@@ -177,10 +159,25 @@ class TableOptimizer:
         keys = list(self.param_space.keys())
         values = list(self.param_space.values())
         
-        # Generate combinations
+        # Generate combinations, keeping only the arguments each flavor accepts.
+        # Many combinations only differ in arguments the flavor ignores, so
+        # this also drops duplicate Camelot runs.
         combinations = []
+        seen = set()
         for combo in itertools.product(*values):
-            combinations.append(dict(zip(keys, combo)))
+            params = dict(zip(keys, combo))
+            flavor = params.get("flavor", "lattice")
+            allowed = FLAVOR_PARAMS.get(flavor, ())
+            params = {"flavor": flavor, **{k: v for k, v in params.items() if k in allowed}}
+            if params.get("copy_text") is True:
+                params["copy_text"] = ["v"]
+            elif params.get("copy_text") is False:
+                del params["copy_text"]
+            
+            signature = repr(sorted(params.items()))
+            if signature not in seen:
+                seen.add(signature)
+                combinations.append(params)
             
         return combinations
     
@@ -196,27 +193,7 @@ class TableOptimizer:
         Returns:
             Dictionary of metrics
         """
-        metrics = {}
-        
-        # Basic metrics from Camelot
-        metrics["accuracy"] = float(camelot_table.accuracy)
-        metrics["whitespace"] = float(camelot_table.whitespace)
-        
-        # Calculate completeness (ratio of non-empty cells)
-        df = camelot_table.df
-        total_cells = df.size
-        non_empty_cells = df.notnull().sum().sum()
-        metrics["completeness"] = float(non_empty_cells / total_cells) if total_cells > 0 else 0.0
-        
-        # Calculate structure score (how well aligned the cells are)
-        row_lengths = [len(row) for row in df.itertuples(index=False)]
-        row_length_variance = np.var(row_lengths) if row_lengths else 0
-        metrics["structure"] = 1.0 / (1.0 + row_length_variance)  # Higher variance = worse structure
-        
-        # Speed metric (inverse of execution time, normalized)
-        metrics["speed"] = 1.0 / (1.0 + execution_time)  # Higher time = lower speed score
-        
-        return metrics
+        return _calculate_metrics(camelot_table, execution_time)
     
     def _calculate_score(self, metrics: Dict[str, float]) -> float:
         """
@@ -228,16 +205,50 @@ class TableOptimizer:
         Returns:
             Overall score
         """
-        score = 0.0
+        return _calculate_score(metrics, [str(getattr(m, "value", m)) for m in self.metrics])
+
+
+def _calculate_metrics(camelot_table, execution_time: float) -> Dict[str, float]:
+    metrics = {}
+    
+    # Basic metrics from Camelot, which reports percentages
+    metrics["accuracy"] = float(camelot_table.accuracy) / 100.0
+    metrics["whitespace"] = float(camelot_table.whitespace) / 100.0
+    
+    # Calculate completeness (ratio of non-empty cells)
+    df = camelot_table.df
+    total_cells = df.size
+    non_empty_cells = (df.astype(str).apply(lambda col: col.str.strip()) != "").sum().sum()
+    metrics["completeness"] = float(non_empty_cells / total_cells) if total_cells > 0 else 0.0
+    
+    # Calculate structure score (how well aligned the cells are)
+    row_lengths = [len(row) for row in df.itertuples(index=False)]
+    row_length_variance = np.var(row_lengths) if row_lengths else 0
+    metrics["structure"] = 1.0 / (1.0 + row_length_variance)  # Higher variance = worse structure
+    
+    # Speed metric (inverse of execution time, normalized)
+    metrics["speed"] = 1.0 / (1.0 + execution_time)  # Higher time = lower speed score
+    
+    return metrics
+
+
+def _calculate_score(metrics: Dict[str, float], metric_names: List[str]) -> float:
+    score = 0.0
+    total_weight = 0.0
+    
+    # Use configured metrics in order of priority
+    for i, metric in enumerate(metric_names):
+        # Lower priority metrics have less weight
+        weight = 1.0 / (i + 1)
+        score += weight * metrics.get(metric, 0.0)
+        total_weight += weight
         
-        # Use configured metrics in order of priority
-        for i, metric in enumerate(self.config.metrics):
-            # Lower priority metrics have less weight
-            weight = 1.0 / (i + 1)
-            metric_value = metrics.get(metric, 0.0)
-            score += weight * metric_value
-            
-        return score
+    return score / total_weight if total_weight else 0.0
+
+
+def _score_candidate(tables: List[Any], params: Dict[str, Any], seconds: float, metrics: List[str]) -> float:
+    """Score the first table of a search candidate. Module-level so worker processes can unpickle it."""
+    return _calculate_score(_calculate_metrics(tables[0], seconds), metrics)
 
 
 class TableQualityEvaluator:
@@ -21,14 +21,13 @@ Example Usage:
 """
 
 import base64
-import os
 import re
-import tempfile
 from io import BytesIO
 
 from PIL import Image
 
 from extractor.core.providers.pdf import PdfProvider
+from extractor.core.providers.utils import TemporaryPdf
 
 css = '''
 @page {
@@ -70,9 +69,8 @@ td {
 
 class DocumentProvider(PdfProvider):
     def __init__(self, filepath: str, config=None):
-        temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=f".pdf")
-        self.temp_pdf_path = temp_pdf.name
-        temp_pdf.close()
+        self.temp_pdf = TemporaryPdf()
+        self.temp_pdf_path = self.temp_pdf.path
 
         # Convert DOCX to PDF
         try:
@@ -83,10 +81,6 @@ class DocumentProvider(PdfProvider):
         # Initialize the PDF provider with the temp pdf path
         super().__init__(self.temp_pdf_path, config)
 
-    def __del__(self):
-        if os.path.exists(self.temp_pdf_path):
-            os.remove(self.temp_pdf_path)
-
     def convert_docx_to_pdf(self, filepath: str):
         from weasyprint import CSS, HTML
         import mammoth
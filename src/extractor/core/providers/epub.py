@@ -20,12 +20,11 @@ Example Usage:
 """
 
 import base64
-import os
-import tempfile
 
 from bs4 import BeautifulSoup
 
 from extractor.core.providers.pdf import PdfProvider
+from extractor.core.providers.utils import TemporaryPdf
 
 css = '''
 @page {
@@ -67,9 +66,8 @@ td {
 
 class EpubProvider(PdfProvider):
     def __init__(self, filepath: str, config=None):
-        temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=f".pdf")
-        self.temp_pdf_path = temp_pdf.name
-        temp_pdf.close()
+        self.temp_pdf = TemporaryPdf()
+        self.temp_pdf_path = self.temp_pdf.path
 
         # Convert Epub to PDF
         try:
@@ -80,10 +78,6 @@ class EpubProvider(PdfProvider):
         # Initialize the PDF provider with the temp pdf path
         super().__init__(self.temp_pdf_path, config)
 
-    def __del__(self):
-        if os.path.exists(self.temp_pdf_path):
-            os.remove(self.temp_pdf_path)
-
     def convert_epub_to_pdf(self, filepath):
         from weasyprint import CSS, HTML
         from ebooklib import epub
@@ -16,16 +16,14 @@ Example Usage:
 >>> # Add usage examples
 """
 
-import os
-import tempfile
 
 from extractor.core.providers.pdf import PdfProvider
+from extractor.core.providers.utils import TemporaryPdf
 
 class HTMLProvider(PdfProvider):
     def __init__(self, filepath: str, config=None):
-        temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=f".pdf")
-        self.temp_pdf_path = temp_pdf.name
-        temp_pdf.close()
+        self.temp_pdf = TemporaryPdf()
+        self.temp_pdf_path = self.temp_pdf.path
 
         # Convert HTML to PDF
         try:
@@ -37,10 +35,6 @@ class HTMLProvider(PdfProvider):
         print(self.temp_pdf_path)
         super().__init__(self.temp_pdf_path, config)
 
-    def __del__(self):
-        if os.path.exists(self.temp_pdf_path):
-            os.remove(self.temp_pdf_path)
-
     def convert_html_to_pdf(self, filepath: str):
         from weasyprint import HTML
 
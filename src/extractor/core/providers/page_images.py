@@ -0,0 +1,204 @@
+"""
+Module: page_images.py
+Description: Lazily rendered page images held under a memory budget
+
+External Dependencies:
+- PIL: https://pillow.readthedocs.io/
+
+Sample Input:
+>>> cache = PageImageCache(provider, lowres_dpi=96, highres_dpi=192, max_bytes=256 * 1024 ** 2)
+>>> cache = PageImageCache(PdfPageRenderer("paper.pdf"), 96, 192, page_ids=range(12))  # No provider needed
+
+Expected Output:
+>>> cache.get(3, highres=True)  # rendered on first access, then served from memory
+<PIL.Image.Image image mode=RGB size=1632x2112>
+
+Example Usage:
+>>> from extractor.core.providers.page_images import PageImageCache
+>>> page.set_image_source(cache)
+>>> page.get_image(highres=True)
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pypdfium2 as pdfium
+from PIL import Image
+
+from extractor.core.providers import BaseProvider
+from extractor.core.providers.pdf import PdfProvider
+
+ImageKey = Tuple[int, bool]
+# render(page_ids, dpi) -> one image per page
+PageRenderer = Callable[[List[int], int], List[Image.Image]]
+
+
+def image_nbytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+class PdfPageRenderer:
+    """
+    Renders pages of a PDF file.
+
+    Holds only the path and render settings, not the provider with its
+    extracted lines, and pickles as just those.  `keep_alive` holds on to
+    whatever owns a temporary PDF, so the file outlives the provider.
+    """
+
+    def __init__(self, filepath: str, flatten_pdf: bool = True, keep_alive: Any = None):
+        self.filepath = filepath
+        self.flatten_pdf = flatten_pdf
+        self.keep_alive = keep_alive
+
+    def __call__(self, page_ids: List[int], dpi: int) -> List[Image.Image]:
+        doc = pdfium.PdfDocument(self.filepath)
+        try:
+            # Must be called on the parent pdf, before retrieving pages to render correctly
+            if self.flatten_pdf:
+                doc.init_forms()
+            return [PdfProvider._render_image(doc, page_id, dpi, self.flatten_pdf) for page_id in page_ids]
+        finally:
+            doc.close()
+
+    def __getstate__(self):
+        return {"filepath": self.filepath, "flatten_pdf": self.flatten_pdf}
+
+    def __setstate__(self, state):
+        self.filepath = state["filepath"]
+        self.flatten_pdf = state["flatten_pdf"]
+        self.keep_alive = None
+
+
+def page_renderer(source: BaseProvider | PageRenderer) -> PageRenderer:
+    """The renderer for a provider, or the source itself when it already is one."""
+    if isinstance(source, PdfProvider):
+        return PdfPageRenderer(source.filepath, source.flatten_pdf, keep_alive=getattr(source, "temp_pdf", None))
+    if isinstance(source, BaseProvider):
+        # Other providers, e.g. images, render from what they hold in memory
+        return source.get_images
+    return source
+
+
+class PageImageCache:
+    """
+    Renders page images from a provider, or a page renderer, on first access.
+
+    Rendered images are kept in an LRU bounded by `max_bytes`.  Evicted images
+    are rendered again when they are next needed, or, with a `spill_dir`,
+    written there as PNG and read back, which is cheaper for complex pages.
+    Images handed out stay valid after eviction, the cache only drops its own
+    reference.
+
+    Pickling keeps the renderer and the images rendered so far, which are
+    within `max_bytes`.  The rest render on first access after unpickling.
+    """
+
+    def __init__(
+        self,
+        source: BaseProvider | PageRenderer,
+        lowres_dpi: int,
+        highres_dpi: int,
+        max_bytes: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+        page_ids: Optional[Sequence[int]] = None,
+    ):
+        self.render_pages = page_renderer(source)
+        # Pages served by this cache, the provider's page range by default
+        if page_ids is None and isinstance(source, BaseProvider):
+            page_ids = getattr(source, "page_range", None)
+        self.page_ids = list(page_ids) if page_ids is not None else None
+        self.lowres_dpi = lowres_dpi
+        self.highres_dpi = highres_dpi
+        self.max_bytes = max_bytes
+        self.images: OrderedDict[ImageKey, Image.Image] = OrderedDict()
+        self.nbytes = 0
+        self.spilled: Dict[ImageKey, str] = {}
+        self.spill_dir = tempfile.mkdtemp(prefix="page_images_", dir=spill_dir) if spill_dir else None
+        self.renders = 0
+        self._lock = threading.Lock()
+
+    def get(self, page_id: int, highres: bool) -> Image.Image:
+        key = (page_id, highres)
+        with self._lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.images.move_to_end(key)
+                return image
+
+            # Rendering happens under the lock since pdfium is not thread-safe
+            image = self._load_spilled(key) or self._render(key)
+            self.images[key] = image
+            self.nbytes += image_nbytes(image)
+            self._evict()
+            return image
+
+    def _render(self, key: ImageKey) -> Image.Image:
+        page_id, highres = key
+        self.renders += 1
+        dpi = self.highres_dpi if highres else self.lowres_dpi
+        return self.render_pages([page_id], dpi)[0]
+
+    def _load_spilled(self, key: ImageKey) -> Optional[Image.Image]:
+        path = self.spilled.get(key)
+        if path is None:
+            return None
+        with Image.open(path) as image:
+            return image.copy()
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        # Always keep the image that was just requested
+        while self.nbytes > self.max_bytes and len(self.images) > 1:
+            key, image = self.images.popitem(last=False)
+            self.nbytes -= image_nbytes(image)
+            if self.spill_dir is not None and key not in self.spilled:
+                path = os.path.join(self.spill_dir, f"{key[0]}_{'highres' if key[1] else 'lowres'}.png")
+                image.save(path, format="PNG", compress_level=1)
+                self.spilled[key] = path
+
+    def release(self):
+        """Drop every image and spilled file.  Later accesses render again."""
+        with self._lock:
+            self.images.clear()
+            self.nbytes = 0
+            self.spilled.clear()
+            if self.spill_dir is not None:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+                os.makedirs(self.spill_dir, exist_ok=True)
+
+    def __getstate__(self):
+        # Providers hold open files and native handles, so only the renderer travels
+        with self._lock:
+            images = dict(self.images)
+        return {
+            "render_pages": self.render_pages,
+            "page_ids": self.page_ids,
+            "lowres_dpi": self.lowres_dpi,
+            "highres_dpi": self.highres_dpi,
+            "max_bytes": self.max_bytes,
+            "images": images,
+        }
+
+    def __setstate__(self, state):
+        self.render_pages = state["render_pages"]
+        self.page_ids = state.get("page_ids")
+        self.lowres_dpi = state["lowres_dpi"]
+        self.highres_dpi = state["highres_dpi"]
+        self.max_bytes = state.get("max_bytes")
+        self.images = OrderedDict(state["images"])
+        self.nbytes = sum(image_nbytes(image) for image in self.images.values())
+        self.spilled = {}
+        self.spill_dir = None
+        self.renders = 0
+        self._lock = threading.Lock()
+        self._evict()
+
+    def __del__(self):
+        if getattr(self, "spill_dir", None):
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
@@ -193,6 +193,14 @@ class PdfProvider(BaseProvider):
     def __len__(self) -> int:
         return self.page_count
 
+    @staticmethod
+    def count_pages(filepath: str) -> int:
+        doc = pdfium.PdfDocument(filepath)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+
     def font_flags_to_format(self, flags: Optional[int]) -> Set[str]:
         if flags is None:
             return {"plain"}
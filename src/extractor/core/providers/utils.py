@@ -15,6 +15,10 @@ Example Usage:
 >>> # Add usage examples
 """
 
+import os
+import tempfile
+
+
 def alphanum_ratio(text):
     text = text.replace(" ", "")
     text = text.replace("\n", "")
@@ -25,3 +29,22 @@ def alphanum_ratio(text):
 
     ratio = alphanumeric_count / len(text)
     return ratio
+
+
+class TemporaryPdf:
+    """
+    A temporary PDF file that is deleted once nothing references it.
+
+    Providers that convert their input to PDF keep one, and so do the page
+    renderers they hand out, so lazily rendered page images keep working
+    after the provider itself is gone.
+    """
+
+    def __init__(self):
+        temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
+        self.path = temp_pdf.name
+        temp_pdf.close()
+
+    def __del__(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
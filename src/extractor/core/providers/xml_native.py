@@ -6,6 +6,11 @@ This module implements XML extraction using lxml for performance
 and defusedxml for security when parsing untrusted sources.
 Supports XML 1.0, 1.1, namespaces, XPath, and recent standards.
 
+Files too large to load whole can be read in streaming mode, which uses
+iterparse to emit blocks as elements close, detects tables in the same pass
+and drops each element once it has been read, so memory stays bounded by the
+depth of the document rather than its size.
+
 External Dependencies:
 - lxml: https://lxml.de/ (for performance and full XPath support)
 - defusedxml: https://pypi.org/project/defusedxml/ (for security)
@@ -15,11 +20,14 @@ Example Usage:
 >>> provider = NativeXMLProvider()
 >>> document = provider.extract_document("data.xml")
 >>> print(document.source_type)  # SourceType.XML
+>>> streaming = NativeXMLProvider({"streaming": True})
+>>> for block in streaming.iter_blocks("export.xml"):
+...     print(block.type, block.content)
 """
 
 import hashlib
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union, Set
+from typing import List, Dict, Any, Iterator, Optional, Union, Set
 from datetime import datetime
 import re
 
@@ -49,6 +57,61 @@ from extractor.core.schema.unified_document import (
 )
 
 
+TABLE_TAGS = ['table', 'grid', 'matrix']
+ROW_TAGS = ['tr', 'row', 'record']
+CELL_TAGS = ['td', 'th', 'cell', 'field', 'column']
+METADATA_TAGS = ['title', 'author', 'created', 'modified', 'description']
+KEYWORD_TAGS = ['keyword', 'keywords', 'tag', 'tags', 'subject', 'category']
+
+
+class _StreamFrame:
+    """State of an open element while streaming."""
+    __slots__ = (
+        'element', 'tag', 'path', 'depth', 'seq', 'in_table', 'text_done', 'has_text', 'last_child',
+        'has_children', 'parts', 'parts_chars', 'fields', 'tabular', 'row_tag', 'row_structure',
+        'columns', 'rows', 'rows_emitted', 'n_children', 'metadata_tag', 'node',
+    )
+
+    def __init__(self, element, path: str, depth: int, seq: int, in_table: bool, collect_text: bool, collect_fields: bool):
+        self.element = element
+        self.tag = element.tag
+        self.path = path
+        self.depth = depth
+        self.seq = seq  # Position in document order
+        self.in_table = in_table  # Inside an explicit table, whose subtree is kept until it closes
+        self.text_done = False
+        self.has_text = False
+        self.last_child = None  # Closed child whose tail text may still be pending
+        self.has_children = False
+        # Text pieces in itertext order, only kept when an ancestor or this element needs the text
+        self.parts: Optional[List[str]] = [] if collect_text else None
+        self.parts_chars = 0
+        # (tag, text) of each child, only kept while this element could be a row of its parent's table
+        self.fields: Optional[List[tuple]] = [] if collect_fields else None
+        # Repeated structure detection over this element's children
+        self.tabular = True
+        self.row_tag = None
+        self.row_structure: Optional[Set[str]] = None
+        self.columns: List[str] = []
+        self.rows: List[List[str]] = []
+        self.rows_emitted = 0
+        self.n_children = 0
+        self.metadata_tag: Optional[str] = None
+        self.node: Optional[HierarchyNode] = None
+
+    def add_text(self, text: str, max_chars: int):
+        if self.parts is None:
+            return
+        if self.parts_chars + len(text) > max_chars:
+            text = text[:max(0, max_chars - self.parts_chars)]
+        if text:
+            self.parts.append(text)
+            self.parts_chars += len(text)
+
+    def text(self) -> str:
+        return ' '.join(self.parts).strip() if self.parts is not None else ''
+
+
 class NativeXMLProvider:
     """Native XML extraction with modern standards support"""
     
@@ -60,6 +123,15 @@ class NativeXMLProvider:
         self.preserve_namespaces = self.config.get('preserve_namespaces', True)
         self.extract_attributes = self.config.get('extract_attributes', True)
         self.xpath_queries = self.config.get('xpath_queries', {})
+        # Streaming mode, always or for files of at least streaming_threshold_mb
+        self.streaming = self.config.get('streaming', False)
+        self.streaming_threshold_mb = self.config.get('streaming_threshold_mb', None)
+        # Limits that keep streaming memory bounded on very large files
+        self.stream_hierarchy_depth = self.config.get('stream_hierarchy_depth', 3)
+        self.stream_max_hierarchy_nodes = self.config.get('stream_max_hierarchy_nodes', 10000)
+        self.stream_max_text_chars = self.config.get('stream_max_text_chars', 65536)
+        self.stream_max_row_fields = self.config.get('stream_max_row_fields', 1024)
+        self.stream_max_table_rows = self.config.get('stream_max_table_rows', 10000)
         
         # Choose parser
         if self.use_secure and DEFUSED_AVAILABLE:
@@ -77,6 +149,9 @@ class NativeXMLProvider:
         filepath = Path(filepath)
         logger.info(f"Extracting XML document: {filepath}")
         
+        if self._should_stream(filepath):
+            return self._extract_document_streaming(filepath)
+        
         # Parse XML
         try:
             if self.use_lxml and LXML_AVAILABLE:
@@ -124,6 +199,271 @@ class NativeXMLProvider:
         logger.info(f"Extracted {len(blocks)} blocks from XML")
         return doc
     
+    def iter_blocks(self, filepath: Union[str, Path]) -> Iterator[BaseBlock]:
+        """
+        Stream content and table blocks from an XML file as its elements close.
+        
+        Text blocks come in the same order as extract_document produces them.
+        Tables are yielded when their element closes, and large repeated
+        structures in parts of at most stream_max_table_rows rows.
+        """
+        for block, _ in self._stream_blocks(Path(filepath), {}):
+            yield block
+    
+    def _should_stream(self, filepath: Path) -> bool:
+        if self.streaming:
+            return True
+        if self.streaming_threshold_mb is None:
+            return False
+        try:
+            return filepath.stat().st_size >= self.streaming_threshold_mb * 1024 * 1024
+        except OSError:
+            return False
+    
+    def _iterparse(self, filepath: Path):
+        """Open an iterparse stream with the same parser choice as tree mode"""
+        events = ('start', 'end', 'start-ns')
+        if LXML_AVAILABLE and (self.use_lxml or self.parser is etree):
+            # Comments and PIs would otherwise show up as children without a string tag
+            return etree.iterparse(str(filepath), events=events, remove_comments=True, remove_pis=True)
+        return self.parser.iterparse(str(filepath), events=events)
+    
+    def _extract_document_streaming(self, filepath: Path) -> UnifiedDocument:
+        """Extract an XML file in one streaming pass without holding the tree in memory"""
+        logger.info("Using streaming mode")
+        if self.xpath_queries:
+            logger.warning("XPath queries need the whole tree and are skipped in streaming mode")
+        
+        summary: Dict[str, Any] = {}
+        blocks = []
+        tables = []
+        try:
+            for block, table_order in self._stream_blocks(filepath, summary):
+                if table_order is None:
+                    blocks.append(block)
+                else:
+                    tables.append((table_order, block))
+        except Exception as e:
+            logger.error(f"Failed to parse XML: {e}")
+            raise
+        
+        # Tables in the same order as tree mode
+        blocks.extend(table for _, table in sorted(tables, key=lambda item: item[0]))
+        
+        metadata = DocumentMetadata()
+        format_metadata = {
+            'file_type': 'xml',
+            'root_tag': summary.get('root_tag'),
+            'encoding': 'utf-8',
+            'namespaces': summary.get('namespaces', {}) if self.preserve_namespaces else {}
+        }
+        for tag, text in summary.get('metadata', {}).items():
+            self._apply_metadata_text(metadata, format_metadata, tag, text)
+        metadata.file_size = filepath.stat().st_size
+        metadata.format_metadata = format_metadata
+        
+        doc = UnifiedDocument(
+            id=self._generate_doc_id(filepath),
+            source_type=SourceType.XML,
+            source_path=str(filepath),
+            blocks=blocks,
+            hierarchy=summary.get('hierarchy'),
+            metadata=metadata,
+            full_text=self._extract_full_text(blocks),
+            keywords=list(summary.get('keywords', {}))
+        )
+        
+        logger.info(f"Extracted {len(blocks)} blocks from XML")
+        return doc
+    
+    def _stream_blocks(self, filepath: Path, summary: Dict[str, Any]) -> Iterator[tuple]:
+        """
+        Walk the iterparse events of a file and yield (block, table_order) pairs.
+        
+        table_order is None for text blocks, and a sort key reproducing the
+        tree mode table order for tables.  Root tag, namespaces, metadata
+        texts, keywords and the hierarchy are collected into summary.
+        
+        An element's text is complete once its first child starts, and a
+        child's tail once the next sibling starts or the parent ends, so blocks
+        are emitted at those events.  Each child is removed from the tree after
+        its tail is read, except inside explicit tables, which are extracted
+        from their subtree when they close.
+        """
+        max_chars = self.stream_max_text_chars
+        namespaces: Dict[str, str] = {}
+        metadata_texts = summary.setdefault('metadata', {})
+        metadata_seen: Set[str] = set()
+        keywords = summary.setdefault('keywords', {})  # Ordered set
+        stack: List[_StreamFrame] = []
+        seq = 0
+        node_count = 0
+        
+        def read_text(frame: _StreamFrame) -> Optional[BaseBlock]:
+            frame.text_done = True
+            text = frame.element.text
+            if frame.metadata_tag and text:
+                metadata_texts[frame.metadata_tag] = text
+            if not text:
+                return None
+            frame.add_text(text, max_chars)
+            if not text.strip():
+                return None
+            frame.has_text = True
+            return self._text_block(frame.element, frame.path)
+        
+        def read_tail(frame: _StreamFrame) -> Optional[BaseBlock]:
+            child = frame.last_child
+            frame.last_child = None
+            tail = child.tail
+            if not frame.in_table:
+                child.clear()
+                frame.element.remove(child)
+            if not tail:
+                return None
+            frame.add_text(tail, max_chars)
+            return self._tail_block(tail, frame.path) if tail.strip() else None
+        
+        def stop_table(frame: _StreamFrame):
+            frame.tabular = False
+            frame.columns = []
+            frame.rows = []
+        
+        def table_part(frame: _StreamFrame):
+            table = self._repeated_structure_table(frame.tag, frame.columns, frame.rows)
+            if frame.rows_emitted or len(frame.rows) >= self.stream_max_table_rows:
+                table.metadata.attributes['row_offset'] = frame.rows_emitted
+            order = (1, frame.seq, frame.rows_emitted)
+            frame.rows_emitted += len(frame.rows)
+            frame.rows = []
+            return table, order
+        
+        for event, item in self._iterparse(filepath):
+            if event == 'start-ns':
+                if not stack:
+                    prefix, uri = item
+                    namespaces[prefix or ''] = uri
+                continue
+            
+            if event == 'start':
+                element = item
+                parent = stack[-1] if stack else None
+                seq += 1
+                if parent is None:
+                    summary['root_tag'] = element.tag
+                    nsmap = getattr(element, 'nsmap', None)  # lxml
+                    summary['namespaces'] = dict(nsmap) if nsmap else namespaces
+                    frame = _StreamFrame(element, element.tag, 0, seq, False, element.tag in KEYWORD_TAGS, False)
+                else:
+                    if not parent.text_done:
+                        block = read_text(parent)
+                        if block:
+                            yield block, None
+                    if parent.last_child is not None:
+                        block = read_tail(parent)
+                        if block:
+                            yield block, None
+                    
+                    parent.has_children = True
+                    parent.n_children += 1
+                    if parent.tabular:
+                        if parent.row_tag is None:
+                            parent.row_tag = element.tag
+                        elif element.tag != parent.row_tag:
+                            stop_table(parent)
+                    
+                    collect_text = (
+                        element.tag in KEYWORD_TAGS
+                        or parent.parts is not None
+                        or parent.fields is not None
+                    )
+                    frame = _StreamFrame(
+                        element,
+                        f"{parent.path}/{element.tag}",
+                        parent.depth + 1,
+                        seq,
+                        parent.in_table or element.tag in TABLE_TAGS,
+                        collect_text,
+                        parent.tabular,
+                    )
+                    if element.tag in METADATA_TAGS and element.tag not in metadata_seen:
+                        metadata_seen.add(element.tag)
+                        frame.metadata_tag = element.tag
+                
+                if frame.depth <= self.stream_hierarchy_depth and node_count < self.stream_max_hierarchy_nodes:
+                    node_count += 1
+                    frame.node = HierarchyNode(
+                        id=f"xml-{node_count}",
+                        title=element.tag,
+                        level=frame.depth,
+                        block_id=f"xml-elem-{node_count}"
+                    )
+                    if parent is None:
+                        summary['hierarchy'] = frame.node
+                stack.append(frame)
+                continue
+            
+            # End of an element: its text, children and tail of the last child are complete
+            frame = stack.pop()
+            element = frame.element
+            if not frame.text_done:
+                block = read_text(frame)
+                if block:
+                    yield block, None
+            if frame.last_child is not None:
+                block = read_tail(frame)
+                if block:
+                    yield block, None
+            
+            if frame.in_table and frame.tag in TABLE_TAGS:
+                table = self._extract_table_from_element(element, ROW_TAGS, CELL_TAGS)
+                if table:
+                    yield table, (0, TABLE_TAGS.index(frame.tag), frame.seq)
+            if frame.tabular and frame.n_children >= 2 and frame.rows:
+                yield table_part(frame)
+            
+            if frame.depth > 0 and frame.tag in KEYWORD_TAGS:
+                text = frame.text()
+                if text:
+                    keywords.update(dict.fromkeys(self._split_keywords(text)))
+            
+            if not stack:
+                element.clear()
+                continue
+            
+            parent = stack[-1]
+            parent.last_child = element
+            if parent.parts is not None and frame.parts:
+                for part in frame.parts:
+                    parent.add_text(part, max_chars)
+            if parent.fields is not None:
+                if len(parent.fields) < self.stream_max_row_fields:
+                    parent.fields.append((frame.tag, frame.text()))
+                else:
+                    parent.fields = None
+            
+            # This element is one row of the parent's repeated structure
+            if parent.tabular:
+                if frame.fields is None:
+                    stop_table(parent)
+                else:
+                    structure = {tag for tag, _ in frame.fields}
+                    if parent.row_structure is None:
+                        parent.row_structure = structure
+                        parent.columns = [tag for tag, _ in frame.fields]
+                        if len(structure) < 2:
+                            stop_table(parent)
+                    elif structure != parent.row_structure:
+                        stop_table(parent)
+                if parent.tabular:
+                    parent.rows.append([text for _, text in frame.fields])
+                    if len(parent.rows) >= self.stream_max_table_rows:
+                        yield table_part(parent)
+            
+            if frame.node is not None and parent.node is not None and (frame.has_children or frame.has_text):
+                frame.node.parent_id = parent.node.id
+                parent.node.children.append(frame.node)
+    
     def _generate_doc_id(self, filepath: Path) -> str:
         """Generate unique document ID"""
         return hashlib.md5(str(filepath).encode()).hexdigest()
@@ -153,25 +493,10 @@ class NativeXMLProvider:
         
         # Common metadata patterns
         # Try to find common metadata elements
-        for tag in ['title', 'author', 'created', 'modified', 'description']:
+        for tag in METADATA_TAGS:
             elements = root.findall(f".//{tag}")
             if elements and elements[0].text:
-                if tag == 'title':
-                    metadata.title = elements[0].text.strip()
-                elif tag == 'author':
-                    metadata.author = elements[0].text.strip()
-                elif tag == 'created':
-                    try:
-                        metadata.created_date = datetime.fromisoformat(elements[0].text.strip())
-                    except:
-                        pass
-                elif tag == 'modified':
-                    try:
-                        metadata.modified_date = datetime.fromisoformat(elements[0].text.strip())
-                    except:
-                        pass
-                elif tag == 'description':
-                    format_metadata['description'] = elements[0].text.strip()
+                self._apply_metadata_text(metadata, format_metadata, tag, elements[0].text)
         
         # File metadata
         metadata.file_size = filepath.stat().st_size if filepath.exists() else None
@@ -179,6 +504,24 @@ class NativeXMLProvider:
         
         return metadata
     
+    def _apply_metadata_text(self, metadata: DocumentMetadata, format_metadata: Dict[str, Any], tag: str, text: str):
+        if tag == 'title':
+            metadata.title = text.strip()
+        elif tag == 'author':
+            metadata.author = text.strip()
+        elif tag == 'created':
+            try:
+                metadata.created_date = datetime.fromisoformat(text.strip())
+            except:
+                pass
+        elif tag == 'modified':
+            try:
+                metadata.modified_date = datetime.fromisoformat(text.strip())
+            except:
+                pass
+        elif tag == 'description':
+            format_metadata['description'] = text.strip()
+    
     def _extract_blocks(self, element, parent_path: str = "") -> List[BaseBlock]:
         """Recursively extract content blocks from XML elements"""
         blocks = []
@@ -188,20 +531,7 @@ class NativeXMLProvider:
         
         # Extract text content if present
         if element.text and element.text.strip():
-            block = BaseBlock(
-                id=self._generate_block_id(),
-                type=self._determine_block_type(element),
-                content=element.text.strip(),
-                metadata=BlockMetadata(
-                    attributes={
-                        'xml_path': current_path,
-                        'tag': element.tag,
-                        'attributes': dict(element.attrib) if self.extract_attributes else {}
-                    },
-                    confidence=0.95
-                )
-            )
-            blocks.append(block)
+            blocks.append(self._text_block(element, current_path))
         
         # Process child elements
         for child in element:
@@ -210,22 +540,39 @@ class NativeXMLProvider:
             
             # Also check tail text (text after child element)
             if child.tail and child.tail.strip():
-                tail_block = BaseBlock(
-                    id=self._generate_block_id(),
-                    type=BlockType.PARAGRAPH,
-                    content=child.tail.strip(),
-                    metadata=BlockMetadata(
-                        attributes={
-                            'xml_path': current_path,
-                            'context': 'tail_text'
-                        },
-                        confidence=0.9
-                    )
-                )
-                blocks.append(tail_block)
+                blocks.append(self._tail_block(child.tail, current_path))
         
         return blocks
     
+    def _text_block(self, element, path: str) -> BaseBlock:
+        return BaseBlock(
+            id=self._generate_block_id(),
+            type=self._determine_block_type(element),
+            content=element.text.strip(),
+            metadata=BlockMetadata(
+                attributes={
+                    'xml_path': path,
+                    'tag': element.tag,
+                    'attributes': dict(element.attrib) if self.extract_attributes else {}
+                },
+                confidence=0.95
+            )
+        )
+    
+    def _tail_block(self, tail: str, path: str) -> BaseBlock:
+        return BaseBlock(
+            id=self._generate_block_id(),
+            type=BlockType.PARAGRAPH,
+            content=tail.strip(),
+            metadata=BlockMetadata(
+                attributes={
+                    'xml_path': path,
+                    'context': 'tail_text'
+                },
+                confidence=0.9
+            )
+        )
+    
     def _determine_block_type(self, element) -> BlockType:
         """Determine block type based on element tag and context"""
         tag_lower = element.tag.lower()
@@ -244,7 +591,7 @@ class NativeXMLProvider:
         
         # Table patterns (individual cells)
         if tag_lower in ['td', 'th', 'cell', 'tablecell']:
-            return BlockType.TABLECELL
+            return BlockType.CELL
         
         # Default to paragraph
         return BlockType.PARAGRAPH
@@ -253,15 +600,10 @@ class NativeXMLProvider:
         """Detect and extract table structures from XML"""
         tables = []
         
-        # Common table patterns
-        table_tags = ['table', 'grid', 'matrix']
-        row_tags = ['tr', 'row', 'record']
-        cell_tags = ['td', 'th', 'cell', 'field', 'column']
-        
         # Find potential tables
-        for table_tag in table_tags:
+        for table_tag in TABLE_TAGS:
             for table_elem in root.findall(f".//{table_tag}"):
-                table = self._extract_table_from_element(table_elem, row_tags, cell_tags)
+                table = self._extract_table_from_element(table_elem, ROW_TAGS, CELL_TAGS)
                 if table:
                     tables.append(table)
         
@@ -380,9 +722,11 @@ class NativeXMLProvider:
             return None
             
         # Get column names from first element
-        first_elem = elements[0]
-        columns = [child.tag for child in first_elem]
-        
+        columns = [child.tag for child in elements[0]]
+        rows = [[self._get_element_text(child) for child in elem] for elem in elements]
+        return self._repeated_structure_table(parent.tag, columns, rows)
+    
+    def _repeated_structure_table(self, source_tag: str, columns: List[str], rows: List[List[str]]) -> TableBlock:
         # Create header row
         cells = []
         for col_idx, col_name in enumerate(columns):
@@ -393,9 +737,8 @@ class NativeXMLProvider:
             ))
         
         # Create data rows
-        for row_idx, elem in enumerate(elements, 1):
-            for col_idx, child in enumerate(elem):
-                content = self._get_element_text(child)
+        for row_idx, row in enumerate(rows, 1):
+            for col_idx, content in enumerate(row):
                 cells.append(TableCell(
                     row=row_idx,
                     col=col_idx,
@@ -406,13 +749,13 @@ class NativeXMLProvider:
             id=self._generate_block_id(),
             type=BlockType.TABLE,
             content={},
-            rows=len(elements) + 1,
+            rows=len(rows) + 1,
             cols=len(columns),
             cells=cells,
             headers=[0],  # First row is headers
             metadata=BlockMetadata(
                 attributes={
-                    'source_tag': parent.tag,
+                    'source_tag': source_tag,
                     'detection_method': 'repeated_structure'
                 },
                 confidence=0.85
@@ -526,19 +869,20 @@ class NativeXMLProvider:
         keywords = []
         
         # Look for common keyword elements
-        keyword_tags = ['keyword', 'keywords', 'tag', 'tags', 'subject', 'category']
-        
-        for tag in keyword_tags:
+        for tag in KEYWORD_TAGS:
             elements = root.findall(f".//{tag}")
             for elem in elements:
                 text = self._get_element_text(elem)
                 if text:
-                    # Split by common delimiters
-                    parts = re.split(r'[,;|]', text)
-                    keywords.extend([p.strip() for p in parts if p.strip()])
+                    keywords.extend(self._split_keywords(text))
         
         return list(set(keywords))  # Remove duplicates
     
+    def _split_keywords(self, text: str) -> List[str]:
+        # Split by common delimiters
+        parts = re.split(r'[,;|]', text)
+        return [p.strip() for p in parts if p.strip()]
+    
     def _generate_block_id(self) -> str:
         """Generate unique block ID"""
         self.block_counter += 1
@@ -34,6 +34,46 @@ from extractor.core.settings import settings
 from extractor.core.util import assign_config
 
 
+class SharedRender:
+    """
+    One render of a document, shared by every renderer it is handed to.
+
+    The block output tree (with its section hierarchy and breadcrumbs), page
+    stats and image crops are computed the first time a renderer asks for
+    them and reused by the rest.  The document must not change while it is
+    shared.
+    """
+
+    def __init__(self, document: Document):
+        self.document = document
+        self._output = None
+        self._page_stats = None
+        self._images = {}
+
+    @property
+    def output(self):
+        if self._output is None:
+            self._output = self.document.render()
+        return self._output
+
+    def page_stats(self, compute):
+        if self._page_stats is None:
+            self._page_stats = compute()
+        return self._page_stats
+
+    def image(self, image_id, highres: bool, to_base64: bool = False):
+        key = (str(image_id), highres, to_base64)
+        if key not in self._images:
+            if to_base64:
+                image_buffer = io.BytesIO()
+                self.image(image_id, highres).save(image_buffer, format=settings.OUTPUT_IMAGE_FORMAT)
+                self._images[key] = base64.b64encode(image_buffer.getvalue()).decode(settings.OUTPUT_ENCODING)
+            else:
+                image_block = self.document.get_block(image_id)
+                self._images[key] = image_block.get_image(self.document, highres=highres)
+        return self._images[key]
+
+
 class BaseRenderer:
     image_blocks: Annotated[Tuple[BlockTypes, ...], "The block types to consider as images."] = (BlockTypes.Picture, BlockTypes.Figure)
     extract_images: Annotated[bool, "Extract images from the document."] = True
@@ -41,16 +81,32 @@ class BaseRenderer:
         Literal["lowres", "highres"],
         "The mode to use for extracting images.",
     ] = "highres"
+    shared: Optional[SharedRender] = None
 
 
     def __init__(self, config: Optional[BaseModel | dict] = None):
         assign_config(self, config)
 
+    def shared_for(self, document: Document) -> Optional[SharedRender]:
+        if self.shared is not None and self.shared.document is document:
+            return self.shared
+        return None
+
+    def render_document(self, document: Document):
+        shared = self.shared_for(document)
+        if shared is not None:
+            return shared.output
+        return document.render()
+
     def __call__(self, document):
         # Children are in reading order
         raise NotImplementedError
 
     def extract_image(self, document: Document, image_id, to_base64=False):
+        shared = self.shared_for(document)
+        if shared is not None:
+            return shared.image(image_id, self.image_extraction_mode == "highres", to_base64)
+
         image_block = document.get_block(image_id)
         cropped = image_block.get_image(document, highres=self.image_extraction_mode == "highres")
 
@@ -94,6 +150,12 @@ class BaseRenderer:
         return html
 
     def generate_page_stats(self, document: Document, document_output):
+        shared = self.shared_for(document)
+        if shared is not None:
+            return shared.page_stats(lambda: self._page_stats(document))
+        return self._page_stats(document)
+
+    def _page_stats(self, document: Document):
         page_stats = []
         for page in document.pages:
             block_counts = Counter([str(block.block_type) for block in page.children]).most_common()
@@ -61,6 +61,7 @@ class ArangoDBEnhancedRenderer(BaseRenderer):
         self.extract_entities = self.config.get("extract_entities", True)
         self.extract_relationships = self.config.get("extract_relationships", True)
         self.include_embeddings = self.config.get("include_embeddings", False)
+        self.embedding_batch_size = self.config.get("embedding_batch_size", 32)
     
     def __call__(self, document: Document) -> str:
         """
@@ -185,6 +186,9 @@ class ArangoDBEnhancedRenderer(BaseRenderer):
         if self.extract_relationships:
             self._extract_entity_relationships(vertices["entities"], edges)
         
+        if self.include_embeddings:
+            self._add_embeddings(vertices["blocks"] + vertices["sections"])
+        
         # Validate all documents before returning
         validator = ArangoDBDocumentValidator()
         validation_errors = []
@@ -330,6 +334,16 @@ class ArangoDBEnhancedRenderer(BaseRenderer):
                         "weight": 1.0
                     })
     
+    def _add_embeddings(self, vertices: List[Dict[str, Any]]):
+        """Embed block text and section titles in one batched call."""
+        from extractor.core.utils.embedding_utils import get_embeddings
+        
+        targets = [(v, v.get("text") or v.get("title")) for v in vertices]
+        targets = [(v, text) for v, text in targets if text]
+        embeddings = get_embeddings([text for _, text in targets], batch_size=self.embedding_batch_size)
+        for (vertex, _), embedding in zip(targets, embeddings):
+            vertex["embedding"] = embedding
+    
     def _extract_title(self, document: Document) -> str:
         """Extract document title from first heading or metadata."""
         # Check metadata first
@@ -53,7 +53,7 @@ import json
 import os
 import time
 import uuid
-from typing import Any, Dict, List, Optional, Union
+from typing import Annotated, Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel
 
@@ -73,6 +73,7 @@ class BlockOutputArangoDB(BaseModel):
     json_data: Optional[Dict[str, Any]] = None  # JSON data for tables
     breadcrumbs: Optional[List[Dict[str, Any]]] = None  # Section breadcrumbs
     metadata: Optional[Dict[str, Any]] = None  # Additional metadata (extraction details, quality metrics, etc.)
+    embedding: Optional[List[float]] = None  # Text embedding, when include_embeddings is set
 
 
 class PageOutput(BaseModel):
@@ -125,6 +126,14 @@ class ArangoDBRenderer(BaseRenderer):
     Renderer that produces ArangoDB-ready JSON output for ArangoDB integration.
     Creates document structure with blocks, metadata, validation, and raw corpus text.
     """
+    include_embeddings: Annotated[
+        bool,
+        "Add a text embedding to every block.",
+    ] = False
+    embedding_batch_size: Annotated[
+        int,
+        "The number of block texts to embed per model call.",
+    ] = 32
     
     def __call__(self, document: Document) -> ArangoDBOutput:
         """
@@ -137,7 +146,8 @@ class ArangoDBRenderer(BaseRenderer):
             ArangoDBOutput containing document structure, metadata, validation, and raw corpus
         """
         # Get document output
-        document_output = document.render()
+        document_output = self.render_document(document)
+        section_hierarchy = document_output.section_hierarchy or {}
         
         # Extract document ID or generate one if not available
         doc_id = getattr(document, 'id', None) or f"{os.path.basename(document.filepath).split('.')[0]}_{uuid.uuid4().hex[:8]}"
@@ -156,7 +166,7 @@ class ArangoDBRenderer(BaseRenderer):
         # Process each page
         for page in document.pages:
             # Extract blocks for this page
-            page_blocks = self._extract_page_blocks(document, page)
+            page_blocks = self._extract_page_blocks(document, page, section_hierarchy)
             if page_blocks:
                 pages.append(PageOutput(blocks=page_blocks))
             
@@ -174,6 +184,9 @@ class ArangoDBRenderer(BaseRenderer):
                 tables=page_tables
             ))
         
+        if self.include_embeddings:
+            self._add_embeddings([block for page in pages for block in page.blocks])
+        
         # Combine all text for full corpus
         full_text = "\n\n".join(filter(None, full_text_content))
         
@@ -228,21 +241,24 @@ class ArangoDBRenderer(BaseRenderer):
             )
         )
     
-    def _extract_page_blocks(self, document: Document, page) -> List[BlockOutputArangoDB]:
+    def _extract_page_blocks(self, document: Document, page, section_hierarchy: Optional[Dict[str, Any]] = None) -> List[BlockOutputArangoDB]:
         """
         Extract blocks from a page in the required format.
         
         Args:
             document: Document object
             page: Page object to extract blocks from
+            section_hierarchy: The document's section hierarchy, computed if not given
             
         Returns:
             List of BlockOutput objects
         """
         blocks = []
+        if section_hierarchy is None:
+            section_hierarchy = document.get_section_hierarchy()
         
         # Get all blocks for this page
-        page_blocks = [block for block in document.contained_blocks() if block.page_id == page.page_id]
+        page_blocks = page.contained_blocks(document)
         
         # Sort blocks by vertical position
         page_blocks.sort(key=lambda b: b.polygon.bbox[1] if b.polygon else 0)
@@ -268,7 +284,7 @@ class ArangoDBRenderer(BaseRenderer):
                 continue
             
             # Get breadcrumbs for this block
-            breadcrumbs = self._extract_breadcrumbs_for_block(document, block)
+            breadcrumbs = self._extract_breadcrumbs_for_block(document, block, section_hierarchy)
             
             # Create block output based on type
             if block_type == 'section_header':
@@ -349,20 +365,29 @@ class ArangoDBRenderer(BaseRenderer):
         
         return blocks
     
+    def _add_embeddings(self, blocks: List[BlockOutputArangoDB]):
+        """Embed every block's text in one batched call."""
+        from extractor.core.utils.embedding_utils import get_embeddings
+        
+        embeddings = get_embeddings([block.text for block in blocks], batch_size=self.embedding_batch_size)
+        for block, embedding in zip(blocks, embeddings):
+            block.embedding = embedding
     
-    def _extract_breadcrumbs_for_block(self, document: Document, block) -> Optional[List[Dict[str, Any]]]:
+    def _extract_breadcrumbs_for_block(self, document: Document, block, hierarchy: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
         """
         Extract breadcrumbs for a block based on its section context.
         
         Args:
             document: Document object
             block: Block to get breadcrumbs for
+            hierarchy: The document's section hierarchy, computed if not given
             
         Returns:
             List of breadcrumb dictionaries or None
         """
         # Get the section hierarchy
-        hierarchy = document.get_section_hierarchy()
+        if hierarchy is None:
+            hierarchy = document.get_section_hierarchy()
         
         # Find which section this block belongs to
         current_section = None
@@ -415,7 +440,7 @@ class ArangoDBRenderer(BaseRenderer):
             Combined text content of the page
         """
         # Get all text blocks for this page
-        page_blocks = [block for block in document.contained_blocks() if block.page_id == page.page_id]
+        page_blocks = page.contained_blocks(document)
         
         # Sort blocks by vertical position
         page_blocks.sort(key=lambda b: b.polygon.bbox[1] if b.polygon else 0)
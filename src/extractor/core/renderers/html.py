@@ -19,12 +19,14 @@ Example Usage:
 >>> # Add usage examples
 """
 
+import re
 import textwrap
+import uuid
 
 from PIL import Image
 from typing import Annotated, Literal, Tuple
 
-from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
+from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning, NavigableString
 from pydantic import BaseModel
 
 from extractor.core.renderers import BaseRenderer
@@ -60,66 +62,91 @@ class HTMLRenderer(BaseRenderer):
     ] = False
 
     def extract_image(self, document, image_id):
+        shared = self.shared_for(document)
+        if shared is not None:
+            return shared.image(image_id, self.image_extraction_mode == "highres")
+
         image_block = document.get_block(image_id)
         cropped = image_block.get_image(document, highres=self.image_extraction_mode == "highres")
         return cropped
 
     def extract_html(self, document, document_output, level=0):
-        soup = BeautifulSoup(document_output.html, 'html.parser')
+        output, images = self.assemble_html(document, document_output, uuid.uuid4().hex)
+        if level == 0:
+            output = self.merge_consecutive_tags(output, 'b')
+            output = self.merge_consecutive_tags(output, 'i')
+            output = self.merge_consecutive_math(output) # Merge consecutive inline math tags
+            output = textwrap.dedent(f"""
+            <!DOCTYPE html>
+            <html>
+                <head>
+                    <meta charset="utf-8" />
+                </head>
+                <body>
+                    {output}
+                </body>
+            </html>
+""")
+
+        return output, images
 
+    def assemble_html(self, document, block_output, nonce: str):
+        """
+        Serialize a block with its content-refs replaced by its children's HTML.
+
+        Each block's HTML is parsed once.  Content-refs are swapped for
+        placeholders, and the children's serialized HTML is spliced in after
+        serializing.  Parsing serialized HTML again gives the same string, so
+        this matches replacing the refs with a parse of the children's HTML.
+        """
+        html = block_output.html
+        if "<" not in html and ">" not in html and "&" not in html:
+            # Plain text serializes to itself
+            return html, {}
+
+        soup = BeautifulSoup(html, 'html.parser')
         content_refs = soup.find_all('content-ref')
+        if not content_refs:
+            return str(soup), {}
+
+        children = {}
+        for item in block_output.children or []:
+            children.setdefault(str(item.id), item)
+
         ref_block_id = None
         images = {}
+        replacements = []
         for ref in content_refs:
-            src = ref.get('src')
-            sub_images = {}
+            item = children.get(ref.get('src'))
             content = ""
-            for item in document_output.children:
-                if item.id == src:
-                    content, sub_images_ = self.extract_html(document, item, level + 1)
-                    sub_images.update(sub_images_)
-                    ref_block_id: BlockId = item.id
-                    break
+            sub_images = {}
+            if item is not None:
+                content, sub_images = self.assemble_html(document, item, nonce)
+                ref_block_id: BlockId = item.id
 
             if ref_block_id.block_type in self.image_blocks:
                 if self.extract_images:
                     image = self.extract_image(document, ref_block_id)
                     image_name = f"{ref_block_id.to_path()}.{settings.OUTPUT_IMAGE_FORMAT.lower()}"
                     images[image_name] = image
-                    ref.replace_with(BeautifulSoup(f"<p>{content}<img src='{image_name}'></p>", 'html.parser'))
-                else:
-                    # This will be the image description if using llm mode, or empty if not
-                    ref.replace_with(BeautifulSoup(f"{content}", 'html.parser'))
+                    content = f"<p>{content}{soup.new_tag('img', src=image_name)}</p>"
+                # Otherwise this is the image description if using llm mode, or empty if not
             elif ref_block_id.block_type in self.page_blocks:
                 images.update(sub_images)
                 if self.paginate_output:
-                    content = f"<div class='page' data-page-id='{ref_block_id.page_id}'>{content}</div>"
-                ref.replace_with(BeautifulSoup(f"{content}", 'html.parser'))
+                    page_div = soup.new_tag('div', attrs={'class': 'page', 'data-page-id': str(ref_block_id.page_id)})
+                    content = f"{str(page_div)[:-len('</div>')]}{content}</div>"
             else:
                 images.update(sub_images)
-                ref.replace_with(BeautifulSoup(f"{content}", 'html.parser'))
 
-        output = str(soup)
-        if level == 0:
-            output = self.merge_consecutive_tags(output, 'b')
-            output = self.merge_consecutive_tags(output, 'i')
-            output = self.merge_consecutive_math(output) # Merge consecutive inline math tags
-            output = textwrap.dedent(f"""
-            <!DOCTYPE html>
-            <html>
-                <head>
-                    <meta charset="utf-8" />
-                </head>
-                <body>
-                    {output}
-                </body>
-            </html>
-""")
+            ref.replace_with(NavigableString(f"{nonce}{len(replacements)}:"))
+            replacements.append(content)
 
+        output = re.sub(f"{nonce}(\\d+):", lambda match: replacements[int(match.group(1))], str(soup))
         return output, images
 
     def __call__(self, document) -> HTMLOutput:
-        document_output = document.render()
+        document_output = self.render_document(document)
         full_html, images = self.extract_html(document, document_output)
         soup = BeautifulSoup(full_html, 'html.parser')
         full_html = soup.prettify() # Add indentation to the HTML
@@ -121,7 +121,7 @@ class JSONRenderer(BaseRenderer):
             )
 
     def __call__(self, document: Document) -> JSONOutput:
-        document_output = document.render()
+        document_output = self.render_document(document)
         json_output = []
         for page_output in document_output.children:
             json_output.append(self.extract_json(document, page_output))
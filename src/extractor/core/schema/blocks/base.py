@@ -19,13 +19,14 @@ Example Usage:
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Sequence, Tuple
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, PrivateAttr, field_validator
 from PIL import Image
 
 from extractor.core.schema import BlockTypes
 from extractor.core.schema.polygon import PolygonBox
+from extractor.core.schema.structure import StructureList
 
 if TYPE_CHECKING:
     from extractor.core.schema.document import Document
@@ -89,6 +90,11 @@ class BlockId(BaseModel):
         return str(self).replace('/', '_')
 
 
+# Attributes whose assignment has to reach the page's spatial and structure indexes
+TRACKED_ATTRIBUTES = frozenset(("polygon", "structure", "removed", "block_type", "children"))
+_model_setattr = BaseModel.__setattr__
+
+
 class Block(BaseModel):
     polygon: PolygonBox
     block_description: str
@@ -105,9 +111,73 @@ class Block(BaseModel):
     lowres_image: Image.Image | None = None
     highres_image: Image.Image | None = None
     removed: bool = False # Has block been replaced by new block?
+    _spatial_index: Any = PrivateAttr(default=None)  # Page spatial index holding this block, if built
+    _structure_indexes: Tuple[Any, ...] = PrivateAttr(default=())  # Page structure indexes listing this block
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    @field_validator("structure")
+    @classmethod
+    def track_structure(cls, v):
+        return None if v is None else StructureList(v)
+
+    def __setattr__(self, name, value):
+        # Untracked attributes go straight to pydantic, without building a super() proxy
+        if name not in TRACKED_ATTRIBUTES:
+            _model_setattr(self, name, value)
+            return
+
+        if name == "structure" and value is not None and not (
+            type(value) is StructureList and (value.owner is None or value.owner is self)
+        ):
+            value = StructureList(value)
+        old = self.__dict__.get(name)
+        super().__setattr__(name, value)
+
+        if name == "structure":
+            if value is not None:
+                value.owner = self
+            self.structure_event("reset")
+        elif name == "polygon":
+            # Keep the page's spatial index in sync when a block is moved or resized
+            if self._spatial_index is not None:
+                value.watch(self)
+                self.polygon_changed()
+        elif name == "removed":
+            if bool(old) != bool(value):
+                self.structure_event("flagged", value)
+        elif name == "block_type":
+            if old != value:
+                self.structure_event("retyped", old)
+        else:
+            self.structure_event("children")
+
+    def polygon_changed(self):
+        """Move this block in the page's spatial index, if the page has built one."""
+        if self._spatial_index is not None and self.block_id is not None:
+            self._spatial_index.update(self.block_id, self.polygon.bbox)
+
+    def structure_event(self, event: str, *args):
+        """Pass an edit of this block on to the structure indexes listing it."""
+        for index in self._structure_indexes:
+            index.apply(self, event, *args)
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        # Pickles from before a private attribute was added lack it
+        private = self.__pydantic_private__ if self.__pydantic_private__ is not None else {}
+        for name, attribute in self.__private_attributes__.items():
+            if name not in private:
+                private[name] = attribute.get_default()
+        # Page indexes are rebuilt after unpickling, not carried over
+        private["_structure_indexes"] = ()
+        private["_spatial_index"] = None
+        object.__setattr__(self, "__pydantic_private__", private)
+        # Older pickles hold plain lists, whose in-place edits would go unnoticed
+        structure = self.__dict__.get("structure")
+        if structure is not None:
+            self.__dict__["structure"] = StructureList(structure, owner=self)
+
     @property
     def id(self) -> BlockId:
         return BlockId(
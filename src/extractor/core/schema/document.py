@@ -24,7 +24,7 @@ import logging
 from typing import Dict, List, Sequence, Any, Optional
 from concurrent.futures import ThreadPoolExecutor
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from extractor.core.schema import BlockTypes
 from extractor.core.schema.blocks import Block, BlockId, BlockOutput
@@ -54,6 +54,15 @@ class Document(BaseModel):
     table_of_contents: List[TocItem] | None = None
     debug_data_path: str | None = None # Path that debug data was saved to
     metadata: Dict[str, Any] | None = None  # Metadata for the document
+    _page_index: Dict[int, int] = PrivateAttr(default_factory=dict)  # page_id -> position in self.pages
+
+    def _page_position(self, page_id) -> int | None:
+        idx = self._page_index.get(page_id)
+        if idx is None or idx >= len(self.pages) or self.pages[idx].page_id != page_id:
+            # Pages were added, removed or reordered since the map was built
+            self._page_index = {page.page_id: i for i, page in enumerate(self.pages)}
+            idx = self._page_index.get(page_id)
+        return idx
 
     def get_block(self, block_id: BlockId):
         page = self.get_page(block_id.page_id)
@@ -62,11 +71,18 @@ class Document(BaseModel):
             return block
         return None
 
+    def get_parent(self, block: Block) -> Block | None:
+        """The block whose structure holds this one, or None if it is not reachable from its page."""
+        page = self.get_page(block.page_id)
+        if page is None:
+            return None
+        return page.get_parent(self, block)
+
     def get_page(self, page_id):
-        for page in self.pages:
-            if page.page_id == page_id:
-                return page
-        return None
+        idx = self._page_position(page_id)
+        if idx is None:
+            return None
+        return self.pages[idx]
 
     def get_next_block(self, block: Block, ignored_block_types: List[BlockTypes] = None):
         if ignored_block_types is None:
@@ -80,14 +96,14 @@ class Document(BaseModel):
             return next_block
 
         # If no block found, search subsequent pages
-        for page in self.pages[self.pages.index(page) + 1:]:
+        for page in self.pages[self._page_position(page.page_id) + 1:]:
             next_block = page.get_next_block(None, ignored_block_types)
             if next_block:
                 return next_block
         return None
 
     def get_next_page(self, page: PageGroup):
-        page_idx = self.pages.index(page)
+        page_idx = self._page_position(page.page_id)
         if page_idx + 1 < len(self.pages):
             return self.pages[page_idx + 1]
         return None
@@ -103,7 +119,7 @@ class Document(BaseModel):
         return prev_page.get_block(prev_page.structure[-1])
     
     def get_prev_page(self, page: PageGroup):
-        page_idx = self.pages.index(page)
+        page_idx = self._page_position(page.page_id)
         if page_idx > 0:
             return self.pages[page_idx - 1]
         return None
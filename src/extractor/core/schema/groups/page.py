@@ -23,15 +23,16 @@ from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from PIL import Image, ImageDraw
 
 from pdftext.schema import Reference
-from pydantic import computed_field
+from pydantic import PrivateAttr, computed_field
 
 from extractor.core.providers import ProviderOutput
 from extractor.core.schema import BlockTypes
 from extractor.core.schema.blocks import Block, BlockId, Text
 from extractor.core.schema.blocks.base import BlockMetadata
 from extractor.core.schema.groups.base import Group
-from extractor.core.schema.polygon import PolygonBox
-from extractor.core.util import matrix_intersection_area
+from extractor.core.schema.polygon import PolygonArray, PolygonBox
+from extractor.core.schema.spatial import SpatialIndex
+from extractor.core.schema.structure import StructureIndex
 
 LINE_MAPPING_TYPE = List[Tuple[int, ProviderOutput]]
 
@@ -52,6 +53,10 @@ class PageGroup(Group):
     maximum_assignment_distance: float = 20  # pixels
     block_description: str = "A single page in the document."
     refs: List[Reference] | None = None
+    spatial_cell_size: float = 64  # Grid cell size for the spatial index, in page units
+    _block_index: SpatialIndex | None = PrivateAttr(default=None)
+    _image_source: Any = PrivateAttr(default=None)
+    _structure_index: StructureIndex = PrivateAttr(default_factory=StructureIndex)
 
     def incr_block_id(self):
         if self.block_id is None:
@@ -65,6 +70,104 @@ class PageGroup(Group):
         else:
             self.children.append(block)
 
+        if self._block_index is not None:
+            self._track_block(block)
+
+    def _track_block(self, block: Block):
+        block._spatial_index = self._block_index
+        block.polygon.watch(block)
+        self._block_index.insert(block.block_id, block.polygon.bbox)
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        # Built on first use, then kept up to date by add_child, replace_block and polygon changes
+        if self._block_index is None:
+            self._block_index = SpatialIndex(cell_size=self.spatial_cell_size)
+            for block in self.children or []:
+                if not block.removed:
+                    self._track_block(block)
+        return self._block_index
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        # Unpickled blocks aren't watching their polygons, so the index is rebuilt on first use
+        self._block_index = None
+
+    def reset_spatial_index(self):
+        # Needed only if a polygon's corners are edited one by one, e.g. box.polygon[0][1] = y
+        for block in self.children or []:
+            block._spatial_index = None
+        self._block_index = None
+
+    def structure_index(self, document) -> StructureIndex:
+        # Built on first use, then patched as blocks on this page change
+        if not self._structure_index.is_current(document, self):
+            if self._structure_index.root is not None and self._structure_index.root is not self:
+                # A copy of this page shares the original's index, so it gets its own
+                self._structure_index = StructureIndex()
+            self._structure_index.build(document, self)
+        return self._structure_index
+
+    def contained_blocks(self, document, block_types: Sequence[BlockTypes] = None) -> List[Block]:
+        index = self.structure_index(document)
+        if index.stale:
+            # A structure the index can't represent, e.g. a block listed twice
+            return super().contained_blocks(document, block_types)
+        return index.blocks(block_types)
+
+    def get_parent(self, document, block: Block) -> Block | None:
+        index = self.structure_index(document)
+        if index.stale:
+            for holder in [self] + super().contained_blocks(document):
+                if block.id in (holder.structure or []):
+                    return holder
+            return None
+        return index.parent(block)
+
+    def _block_filter(self, block_types: Sequence[BlockTypes] | None, exclude: Sequence[BlockId] = ()):
+        excluded = {block_id.block_id for block_id in exclude}
+
+        def keep(block_id: int) -> bool:
+            block = self.children[block_id]
+            if block.removed or block_id in excluded:
+                return False
+            return block_types is None or block.block_type in block_types
+
+        return keep
+
+    def blocks_intersecting(
+        self, bbox: List[float], block_types: Sequence[BlockTypes] | None = None
+    ) -> List[Block]:
+        ids = self.spatial_index.intersecting(bbox, self._block_filter(block_types))
+        return [self.children[block_id] for block_id in ids]
+
+    def nearest_blocks(
+        self,
+        block: Block | PolygonBox,
+        k: int = 1,
+        block_types: Sequence[BlockTypes] | None = None,
+        max_distance: float | None = None,
+    ) -> List[Block]:
+        polygon = block if isinstance(block, PolygonBox) else block.polygon
+        exclude = () if isinstance(block, PolygonBox) else (block.id,)
+        ids = self.spatial_index.nearest(
+            polygon.bbox, k, self._block_filter(block_types, exclude), max_distance
+        )
+        return [self.children[block_id] for block_id in ids]
+
+    def blocks_below(
+        self,
+        block: Block | PolygonBox,
+        block_types: Sequence[BlockTypes] | None = None,
+        max_distance: float | None = None,
+    ) -> List[Block]:
+        polygon = block if isinstance(block, PolygonBox) else block.polygon
+        exclude = () if isinstance(block, PolygonBox) else (block.id,)
+        ids = self.spatial_index.below(
+            polygon.bbox, self._block_filter(block_types, exclude), max_distance
+        )
+        return [self.children[block_id] for block_id in ids]
+
     def get_image(
         self,
         *args,
@@ -73,6 +176,8 @@ class PageGroup(Group):
         **kwargs,
     ):
         image = self.highres_image if highres else self.lowres_image
+        if image is None and self._image_source is not None:
+            image = self._image_source.get(self.page_id, highres)
 
         # Avoid double OCR for certain elements
         if remove_blocks:
@@ -90,6 +195,10 @@ class PageGroup(Group):
 
         return image
 
+    def set_image_source(self, source):
+        # Anything with get(page_id, highres), e.g. a PageImageCache; explicit images take precedence
+        self._image_source = source
+
     @computed_field
     @property
     def current_children(self) -> List[Block]:
@@ -152,12 +261,12 @@ class PageGroup(Group):
     ):
         max_intersections = {}
 
-        block_bboxes = [block.polygon.bbox for block in blocks]
-        line_bboxes = [
-            provider_output.line.polygon.bbox for provider_output in provider_outputs
-        ]
+        block_boxes = PolygonArray.from_polygons([block.polygon for block in blocks])
+        line_boxes = PolygonArray.from_polygons(
+            [provider_output.line.polygon for provider_output in provider_outputs]
+        )
 
-        intersection_matrix = matrix_intersection_area(line_bboxes, block_bboxes)
+        intersection_matrix = line_boxes.intersection_area(block_boxes)
 
         for line_idx, line in enumerate(provider_outputs):
             intersection_line = intersection_matrix[line_idx]
@@ -184,6 +293,9 @@ class PageGroup(Group):
 
         # Mark block as removed
         block.removed = True
+        if self._block_index is not None:
+            self._block_index.remove(block.block_id)
+            block._spatial_index = None
 
     def identify_missing_blocks(
         self,
@@ -297,21 +409,24 @@ class PageGroup(Group):
                 assigned_line_idxs.add(line_idx)
 
         # If no intersection, assign by distance
-        for line_idx in set(provider_line_idxs).difference(assigned_line_idxs):
-            min_dist = None
-            min_dist_idx = None
-            provider_output: ProviderOutput = provider_outputs[line_idx]
-            line = provider_output.line
-            for block in valid_blocks:
-                # We want to assign to blocks closer in y than x
-                dist = line.polygon.center_distance(block.polygon, x_weight=5)
-                if min_dist_idx is None or dist < min_dist:
-                    min_dist = dist
-                    min_dist_idx = block.id
-
-            if min_dist_idx is not None and min_dist < self.maximum_assignment_distance:
-                block_lines[min_dist_idx].append((line_idx, provider_output))
-                assigned_line_idxs.add(line_idx)
+        unassigned_line_idxs = sorted(set(provider_line_idxs).difference(assigned_line_idxs))
+        if unassigned_line_idxs and valid_blocks:
+            unassigned_boxes = PolygonArray.from_polygons(
+                [provider_outputs[line_idx].line.polygon for line_idx in unassigned_line_idxs]
+            )
+            # We want to assign to blocks closer in y than x
+            distances = unassigned_boxes.center_distance(
+                PolygonArray.from_polygons([block.polygon for block in valid_blocks]),
+                x_weight=5,
+            )
+            closest = distances.argmin(axis=1)
+            for row, line_idx in enumerate(unassigned_line_idxs):
+                min_dist = distances[row, closest[row]]
+                if min_dist < self.maximum_assignment_distance:
+                    block_lines[valid_blocks[closest[row]].id].append(
+                        (line_idx, provider_outputs[line_idx])
+                    )
+                    assigned_line_idxs.add(line_idx)
 
         # This creates new blocks to hold anything too far away
         new_blocks = self.identify_missing_blocks(
@@ -7,13 +7,16 @@ External Dependencies:
 - pydantic: https://docs.pydantic.dev/
 
 Sample Input:
->>> # Add specific examples based on module functionality
+>>> boxes = PolygonArray.from_polygons([line.polygon for line in lines])
+>>> blocks = PolygonArray.from_polygons([block.polygon for block in blocks])
 
 Expected Output:
->>> # Add expected output examples
+>>> boxes.intersection_area(blocks).shape
+(len(lines), len(blocks))
 
 Example Usage:
->>> # Add usage examples
+>>> from extractor.core.schema.polygon import PolygonArray
+>>> gaps = boxes.minimum_gap(blocks)
 """
 
 from __future__ import annotations
@@ -21,11 +24,46 @@ import copy
 from typing import List
 
 import numpy as np
-from pydantic import BaseModel, field_validator, computed_field
+from pydantic import BaseModel, PrivateAttr, field_validator, computed_field
+
+
+class PolygonWatchers:
+    """
+    The blocks using a box as their polygon, told when the box changes in place.
+
+    Lets a page's spatial index follow `box.polygon = ...` (e.g. from
+    `fit_to_bounds`) as well as `block.polygon = box`.  Never copied or
+    pickled along with the box, so a copy of a box has no watchers.
+    """
+    __slots__ = ("box", "blocks")
+
+    def __init__(self, box: PolygonBox | None = None):
+        self.box = box
+        self.blocks = []
+
+    def __reduce__(self):
+        return PolygonWatchers, ()
+
+    def __copy__(self):
+        return PolygonWatchers()
+
+    def __deepcopy__(self, memo):
+        return PolygonWatchers()
+
+    def add(self, block):
+        if not any(watcher is block for watcher in self.blocks):
+            self.blocks.append(block)
+
+    def notify(self):
+        # Blocks given another polygon since drop out
+        self.blocks = [block for block in self.blocks if block.polygon is self.box]
+        for block in self.blocks:
+            block.polygon_changed()
 
 
 class PolygonBox(BaseModel):
     polygon: List[List[float]]
+    _watchers: PolygonWatchers | None = PrivateAttr(default=None)
 
     @field_validator('polygon')
     @classmethod
@@ -48,25 +86,54 @@ class PolygonBox(BaseModel):
         assert v[2][0] >= min_x, 'bottom right corner should have a greater x value than bottom left corner' + corner_error
         return v
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name == "polygon":
+            watchers = (self.__pydantic_private__ or {}).get("_watchers")
+            # A shallow model_copy shares the original's watchers
+            if watchers is not None and watchers.box is self:
+                watchers.notify()
+
+    def __eq__(self, other):
+        # Boxes are equal by their corners, whoever is watching them
+        if not isinstance(other, PolygonBox):
+            return NotImplemented
+        return self.polygon == other.polygon
+
+    def watch(self, block):
+        """Call block.polygon_changed() whenever this box's corners are reassigned."""
+        if self.__pydantic_private__ is None:
+            # Pickled before boxes had private attributes
+            object.__setattr__(self, "__pydantic_private__", {})
+        watchers = self.__pydantic_private__.get("_watchers")
+        if watchers is None or watchers.box is not self:
+            watchers = self.__pydantic_private__["_watchers"] = PolygonWatchers(self)
+        watchers.add(block)
+
     @property
     def height(self):
-        return self.bbox[3] - self.bbox[1]
+        bbox = self.bbox
+        return bbox[3] - bbox[1]
 
     @property
     def width(self):
-        return self.bbox[2] - self.bbox[0]
+        bbox = self.bbox
+        return bbox[2] - bbox[0]
 
     @property
     def area(self):
-        return self.width * self.height
+        bbox = self.bbox
+        return (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
 
     @property
     def center(self):
-        return [(self.bbox[0] + self.bbox[2]) / 2, (self.bbox[1] + self.bbox[3]) / 2]
+        bbox = self.bbox
+        return [(bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2]
 
     @property
     def size(self):
-        return [self.width, self.height]
+        bbox = self.bbox
+        return [bbox[2] - bbox[0], bbox[3] - bbox[1]]
 
     @property
     def x_start(self):
@@ -139,34 +206,38 @@ class PolygonBox(BaseModel):
         def dist(p1, p2):
             return ((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2) ** 0.5
 
-        left = other.bbox[2] < self.bbox[0]
-        right = self.bbox[2] < other.bbox[0]
-        bottom = other.bbox[3] < self.bbox[1]
-        top = self.bbox[3] < other.bbox[1]
+        a = self.bbox
+        b = other.bbox
+        left = b[2] < a[0]
+        right = a[2] < b[0]
+        bottom = b[3] < a[1]
+        top = a[3] < b[1]
         if top and left:
-            return dist((self.bbox[0], self.bbox[3]), (other.bbox[2], other.bbox[1]))
+            return dist((a[0], a[3]), (b[2], b[1]))
         elif left and bottom:
-            return dist((self.bbox[0], self.bbox[1]), (other.bbox[2], other.bbox[3]))
+            return dist((a[0], a[1]), (b[2], b[3]))
         elif bottom and right:
-            return dist((self.bbox[2], self.bbox[1]), (other.bbox[0], other.bbox[3]))
+            return dist((a[2], a[1]), (b[0], b[3]))
         elif right and top:
-            return dist((self.bbox[2], self.bbox[3]), (other.bbox[0], other.bbox[1]))
+            return dist((a[2], a[3]), (b[0], b[1]))
         elif left:
-            return self.bbox[0] - other.bbox[2]
+            return a[0] - b[2]
         elif right:
-            return other.bbox[0] - self.bbox[2]
+            return b[0] - a[2]
         elif bottom:
-            return self.bbox[1] - other.bbox[3]
+            return a[1] - b[3]
         elif top:
-            return other.bbox[1] - self.bbox[3]
+            return b[1] - a[3]
         else:
             return 0
 
     def center_distance(self, other: PolygonBox, x_weight: float = 1, y_weight: float = 1, absolute=False):
+        center = self.center
+        other_center = other.center
         if not absolute:
-            return ((self.center[0] - other.center[0]) ** 2 * x_weight + (self.center[1] - other.center[1]) ** 2 * y_weight) ** 0.5
+            return ((center[0] - other_center[0]) ** 2 * x_weight + (center[1] - other_center[1]) ** 2 * y_weight) ** 0.5
         else:
-            return abs(self.center[0] - other.center[0]) * x_weight + abs(self.center[1] - other.center[1]) * y_weight
+            return abs(center[0] - other_center[0]) * x_weight + abs(center[1] - other_center[1]) * y_weight
 
     def tl_distance(self, other: PolygonBox):
         return ((self.bbox[0] - other.bbox[0]) ** 2 + (self.bbox[1] - other.bbox[1]) ** 2) ** 0.5
@@ -193,20 +264,25 @@ class PolygonBox(BaseModel):
         self.polygon = new_corners
 
     def overlap_x(self, other: PolygonBox):
-        return max(0, min(self.bbox[2], other.bbox[2]) - max(self.bbox[0], other.bbox[0]))
+        a = self.bbox
+        b = other.bbox
+        return max(0, min(a[2], b[2]) - max(a[0], b[0]))
 
     def overlap_y(self, other: PolygonBox):
-        return max(0, min(self.bbox[3], other.bbox[3]) - max(self.bbox[1], other.bbox[1]))
+        a = self.bbox
+        b = other.bbox
+        return max(0, min(a[3], b[3]) - max(a[1], b[1]))
 
     def intersection_area(self, other: PolygonBox):
         return self.overlap_x(other) * self.overlap_y(other)
 
     def intersection_pct(self, other: PolygonBox):
-        if self.area == 0:
+        area = self.area
+        if area == 0:
             return 0
 
         intersection = self.intersection_area(other)
-        return intersection / self.area
+        return intersection / area
 
     def merge(self, others: List[PolygonBox]) -> PolygonBox:
         corners = []
@@ -235,3 +311,104 @@ class PolygonBox(BaseModel):
             bbox[2] = max(bbox[2], bbox[0] + 1)
             bbox[3] = max(bbox[3], bbox[1] + 1)
         return cls(polygon=[[bbox[0], bbox[1]], [bbox[2], bbox[1]], [bbox[2], bbox[3]], [bbox[0], bbox[3]]])
+
+
+
+class PolygonArray:
+    """
+    N axis-aligned boxes stored as one contiguous (N, 4) float64 array of
+    [x0, y0, x1, y1] rows, with batched versions of the PolygonBox geometry.
+
+    Pairwise methods take another PolygonArray with M boxes and return an
+    (N, M) matrix.  Wrapping an existing float64 array does not copy it.
+    """
+
+    def __init__(self, bboxes: np.ndarray):
+        bboxes = np.asarray(bboxes, dtype=np.float64)
+        if bboxes.size == 0:
+            bboxes = bboxes.reshape(0, 4)
+        if bboxes.ndim != 2 or bboxes.shape[1] != 4:
+            raise ValueError(f"bboxes must have shape (N, 4), got {bboxes.shape}")
+        self.bboxes = bboxes
+
+    @classmethod
+    def from_bboxes(cls, bboxes) -> PolygonArray:
+        return cls(bboxes)
+
+    @classmethod
+    def from_polygons(cls, polygons: List[PolygonBox]) -> PolygonArray:
+        if not polygons:
+            return cls(np.zeros((0, 4)))
+        corners = np.array([p.polygon for p in polygons], dtype=np.float64)  # (N, 4, 2)
+        return cls(np.concatenate([corners.min(axis=1), corners.max(axis=1)], axis=1))
+
+    def __len__(self) -> int:
+        return self.bboxes.shape[0]
+
+    def __getitem__(self, idx) -> PolygonArray:
+        # Slices are views, so selecting a range of boxes does not copy
+        return PolygonArray(np.atleast_2d(self.bboxes[idx]))
+
+    def to_polygons(self) -> List[PolygonBox]:
+        return [PolygonBox.from_bbox(bbox) for bbox in self.bboxes.tolist()]
+
+    @property
+    def widths(self) -> np.ndarray:
+        return self.bboxes[:, 2] - self.bboxes[:, 0]
+
+    @property
+    def heights(self) -> np.ndarray:
+        return self.bboxes[:, 3] - self.bboxes[:, 1]
+
+    @property
+    def areas(self) -> np.ndarray:
+        return self.widths * self.heights
+
+    @property
+    def centers(self) -> np.ndarray:
+        return (self.bboxes[:, :2] + self.bboxes[:, 2:]) / 2
+
+    def overlap_x(self, other: PolygonArray) -> np.ndarray:
+        a = self.bboxes[:, np.newaxis, :]
+        b = other.bboxes[np.newaxis, :, :]
+        return np.maximum(0, np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]))
+
+    def overlap_y(self, other: PolygonArray) -> np.ndarray:
+        a = self.bboxes[:, np.newaxis, :]
+        b = other.bboxes[np.newaxis, :, :]
+        return np.maximum(0, np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]))
+
+    def intersection_area(self, other: PolygonArray) -> np.ndarray:
+        return self.overlap_x(other) * self.overlap_y(other)
+
+    def intersection_pct(self, other: PolygonArray) -> np.ndarray:
+        # Fraction of each box in self covered by each box in other, 0 for empty boxes
+        areas = self.areas[:, np.newaxis]
+        intersection = self.intersection_area(other)
+        return np.divide(intersection, areas, out=np.zeros_like(intersection), where=areas > 0)
+
+    def contains(self, other: PolygonArray, threshold: float = 1.0) -> np.ndarray:
+        # True where at least `threshold` of other[j] lies inside self[i]
+        return other.intersection_pct(self).T >= threshold
+
+    def minimum_gap(self, other: PolygonArray) -> np.ndarray:
+        a = self.bboxes[:, np.newaxis, :]
+        b = other.bboxes[np.newaxis, :, :]
+        dx = np.maximum(0, np.maximum(b[..., 0] - a[..., 2], a[..., 0] - b[..., 2]))
+        dy = np.maximum(0, np.maximum(b[..., 1] - a[..., 3], a[..., 1] - b[..., 3]))
+        return np.hypot(dx, dy)
+
+    def center_distance(self, other: PolygonArray, x_weight: float = 1, y_weight: float = 1, absolute=False) -> np.ndarray:
+        delta = self.centers[:, np.newaxis, :] - other.centers[np.newaxis, :, :]
+        if not absolute:
+            return np.sqrt(delta[..., 0] ** 2 * x_weight + delta[..., 1] ** 2 * y_weight)
+        return np.abs(delta[..., 0]) * x_weight + np.abs(delta[..., 1]) * y_weight
+
+    def merge(self) -> PolygonBox:
+        # Bounding box of every box in the array
+        if len(self) == 0:
+            raise ValueError("Cannot merge an empty PolygonArray")
+        return PolygonBox.from_bbox([
+            float(self.bboxes[:, 0].min()), float(self.bboxes[:, 1].min()),
+            float(self.bboxes[:, 2].max()), float(self.bboxes[:, 3].max()),
+        ])
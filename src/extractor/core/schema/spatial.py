@@ -0,0 +1,178 @@
+"""
+Module: spatial.py
+Description: Uniform grid index over block bounding boxes
+
+Sample Input:
+>>> index = SpatialIndex(cell_size=50)
+>>> index.insert(0, [0, 0, 100, 20])
+>>> index.insert(1, [0, 40, 100, 60])
+
+Expected Output:
+>>> index.intersecting([10, 10, 20, 50])
+[0, 1]
+>>> index.below([0, 0, 100, 20])
+[1]
+
+Example Usage:
+>>> from extractor.core.schema.spatial import SpatialIndex
+>>> index = SpatialIndex()
+>>> index.insert(block.block_id, block.polygon.bbox)
+>>> nearby = index.nearest(other.polygon.bbox, k=3)
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+Cell = Tuple[int, int]
+
+
+def bbox_gap(a: Sequence[float], b: Sequence[float]) -> float:
+    # Same result as PolygonBox.minimum_gap, on raw bboxes
+    dx = max(0.0, b[0] - a[2], a[0] - b[2])
+    dy = max(0.0, b[1] - a[3], a[1] - b[3])
+    return math.hypot(dx, dy)
+
+
+class SpatialIndex:
+    """
+    Grid index mapping block ids to the cells their bboxes cover.
+
+    Block ids are the per-page `block_id` integers.  Queries return ids in
+    ascending order (intersecting) or by distance (nearest, below), so results
+    are deterministic.
+    """
+
+    def __init__(self, cell_size: float = 64):
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, Set[int]] = defaultdict(set)
+        self.bboxes: Dict[int, Tuple[float, float, float, float]] = {}
+        # Grows on insert and never shrinks, so it is always an upper bound
+        self.bounds: Optional[List[float]] = None
+
+    def __len__(self) -> int:
+        return len(self.bboxes)
+
+    def __contains__(self, block_id: int) -> bool:
+        return block_id in self.bboxes
+
+    def _cells(self, bbox: Sequence[float]) -> Iterator[Cell]:
+        x0 = math.floor(bbox[0] / self.cell_size)
+        y0 = math.floor(bbox[1] / self.cell_size)
+        x1 = math.floor(bbox[2] / self.cell_size)
+        y1 = math.floor(bbox[3] / self.cell_size)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+
+    def insert(self, block_id: int, bbox: Sequence[float]):
+        if block_id in self.bboxes:
+            self.remove(block_id)
+        bbox = tuple(float(v) for v in bbox)
+        self.bboxes[block_id] = bbox
+        if self.bounds is None:
+            self.bounds = list(bbox)
+        else:
+            self.bounds = [
+                min(self.bounds[0], bbox[0]), min(self.bounds[1], bbox[1]),
+                max(self.bounds[2], bbox[2]), max(self.bounds[3], bbox[3]),
+            ]
+        for cell in self._cells(bbox):
+            self.cells[cell].add(block_id)
+
+    def remove(self, block_id: int):
+        bbox = self.bboxes.pop(block_id, None)
+        if bbox is None:
+            return
+        for cell in self._cells(bbox):
+            members = self.cells.get(cell)
+            if members is not None:
+                members.discard(block_id)
+                if not members:
+                    del self.cells[cell]
+
+    def update(self, block_id: int, bbox: Sequence[float]):
+        self.insert(block_id, bbox)
+
+    def _candidates(self, bbox: Sequence[float]) -> Set[int]:
+        candidates = set()
+        for cell in self._cells(bbox):
+            candidates |= self.cells.get(cell, set())
+        return candidates
+
+    def intersecting(self, bbox: Sequence[float], predicate: Optional[Callable[[int], bool]] = None) -> List[int]:
+        """Ids whose bbox overlaps `bbox` with a non-zero area."""
+        hits = []
+        for block_id in self._candidates(bbox):
+            other = self.bboxes[block_id]
+            if min(bbox[2], other[2]) - max(bbox[0], other[0]) <= 0:
+                continue
+            if min(bbox[3], other[3]) - max(bbox[1], other[1]) <= 0:
+                continue
+            if predicate is None or predicate(block_id):
+                hits.append(block_id)
+        return sorted(hits)
+
+    def nearest(
+        self,
+        bbox: Sequence[float],
+        k: int = 1,
+        predicate: Optional[Callable[[int], bool]] = None,
+        max_distance: Optional[float] = None,
+    ) -> List[int]:
+        """The `k` ids with the smallest gap to `bbox`, closest first."""
+        if not self.bboxes:
+            return []
+
+        extent = bbox_gap(bbox, self.bounds) + max(
+            self.bounds[2] - self.bounds[0], self.bounds[3] - self.bounds[1]
+        )
+        limit = extent if max_distance is None else min(extent, max_distance)
+
+        # Grow the search window one cell at a time until k results are known to be closest
+        radius = 0.0
+        while True:
+            window = (bbox[0] - radius, bbox[1] - radius, bbox[2] + radius, bbox[3] + radius)
+            scored = []
+            for block_id in self._candidates(window):
+                if predicate is not None and not predicate(block_id):
+                    continue
+                gap = bbox_gap(bbox, self.bboxes[block_id])
+                if max_distance is not None and gap > max_distance:
+                    continue
+                scored.append((gap, block_id))
+            scored.sort()
+            # Anything outside the window is at least `radius` away
+            if (len(scored) >= k and scored[k - 1][0] <= radius) or radius >= limit:
+                return [block_id for _, block_id in scored[:k]]
+            radius += self.cell_size
+
+    def below(
+        self,
+        bbox: Sequence[float],
+        predicate: Optional[Callable[[int], bool]] = None,
+        max_distance: Optional[float] = None,
+    ) -> List[int]:
+        """Ids that start below `bbox` and overlap it horizontally, closest first."""
+        if not self.bboxes:
+            return []
+        bottom = self.bounds[3]
+        if max_distance is not None:
+            bottom = min(bottom, bbox[3] + max_distance)
+        window = (bbox[0], bbox[3], bbox[2], max(bottom, bbox[3]))
+
+        scored = []
+        for block_id in self._candidates(window):
+            other = self.bboxes[block_id]
+            if other[1] < bbox[3]:
+                continue
+            if min(bbox[2], other[2]) - max(bbox[0], other[0]) <= 0:
+                continue
+            gap = other[1] - bbox[3]
+            if max_distance is not None and gap > max_distance:
+                continue
+            if predicate is None or predicate(block_id):
+                scored.append((gap, block_id))
+        return [block_id for _, block_id in sorted(scored)]
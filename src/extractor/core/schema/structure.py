@@ -0,0 +1,341 @@
+"""
+Module: structure.py
+Description: Change tracking for block structures and a per-page block type index
+
+Sample Input:
+>>> index = page.structure_index(document)
+
+Expected Output:
+>>> [block.id for block in index.blocks((BlockTypes.Table,))]
+[/page/0/Table/4, /page/0/Table/9]
+>>> index.parent(table).id
+/page/0/TableGroup/3
+
+Example Usage:
+>>> from extractor.core.schema.structure import StructureIndex
+>>> tables = page.contained_blocks(document, (BlockTypes.Table,))  # Served from the index
+"""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from extractor.core.schema import BlockTypes
+
+if TYPE_CHECKING:
+    from extractor.core.schema.blocks.base import Block, BlockId
+
+
+class StructureList(list):
+    """
+    A block's structure list that reports in-place edits to the block owning it.
+
+    Processors edit structures in place (append, insert, remove, slice
+    assignment) as often as they reassign them, so both have to reach the
+    indexes built over them.  Single-item edits are reported as such, so the
+    index can patch just that child's subtree.
+    """
+    __slots__ = ("owner",)
+
+    def __init__(self, items=(), owner: Optional[Block] = None):
+        super().__init__(items)
+        self.owner = owner
+
+    def __reduce__(self):
+        # The owner is set again when the block is restored or first indexed
+        return StructureList, (list(self),)
+
+    def _notify(self, event: str, *args):
+        if self.owner is not None:
+            self.owner.structure_event(event, *args)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            super().__setitem__(key, value)
+            self._notify("reset")
+            return
+        position = range(len(self))[key]
+        old = self[position]
+        super().__setitem__(position, value)
+        self._notify("replaced", position, old)
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            super().__delitem__(key)
+            self._notify("reset")
+            return
+        old = self[key]
+        super().__delitem__(key)
+        self._notify("removed", old)
+
+    def __iadd__(self, other):
+        start = len(self)
+        result = super().__iadd__(other)
+        for position in range(start, len(self)):
+            self._notify("added", position)
+        return result
+
+    def append(self, item):
+        super().append(item)
+        self._notify("added", len(self) - 1)
+
+    def extend(self, items):
+        start = len(self)
+        super().extend(items)
+        for position in range(start, len(self)):
+            self._notify("added", position)
+
+    def insert(self, index, item):
+        # Where list.insert puts the item
+        position = min(max(index + len(self) if index < 0 else index, 0), len(self))
+        super().insert(index, item)
+        self._notify("added", position)
+
+    def remove(self, item):
+        super().remove(item)
+        self._notify("removed", item)
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._notify("removed", item)
+        return item
+
+    def clear(self):
+        super().clear()
+        self._notify("reset")
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._notify("reset")
+
+    def reverse(self):
+        super().reverse()
+        self._notify("reset")
+
+
+class StructureIndex:
+    """
+    The live blocks under one page, in structure order, grouped by block type.
+
+    `blocks` returns exactly what walking the structure with
+    `Block.contained_blocks` returns: a depth-first walk that skips removed
+    blocks and everything under them.  The index also records each block's
+    parent.
+
+    The index is built on the first query, and from then on patched in place
+    as blocks on the page change: adding, replacing or removing a structure
+    item, reassigning a structure, or changing a block's `removed` flag or
+    type only touches the subtrees involved.  Each block gets a sortable rank,
+    so patches slot new subtrees between their neighbours.  Edits the index
+    can't patch (page children reassigned, a block un-removed, ranks too
+    close together, a block reachable twice) mark it stale and the next query
+    rebuilds it.  It never survives pickling or copying.
+    """
+
+    def __init__(self):
+        self.stale = True
+        self.document = None
+        self.root: Optional[Block] = None
+        self.ranks: List[float] = []  # Sorted, parallel to entries
+        self.entries: List[Block] = []
+        self.rank_of: Dict[int, float] = {}  # id(block) -> rank
+        self.block_at: Dict[float, Block] = {}
+        self.by_type: Dict[BlockTypes, List[float]] = {}  # Sorted ranks per block type
+        self.parents: Dict[int, Block] = {}  # id(block) -> the block whose structure holds it
+
+    def __reduce__(self):
+        return StructureIndex, ()
+
+    def is_current(self, document, root: Block) -> bool:
+        return not self.stale and self.document is document and self.root is root
+
+    def invalidate(self):
+        self.stale = True
+
+    def build(self, document, root: Block):
+        self.document = document
+        self.root = root
+        self.ranks = []
+        self.entries = []
+        self.rank_of = {}
+        self.block_at = {}
+        self.by_type = {}
+        self.parents = {}
+        self.stale = False
+        self._register(root)
+        self._insert(self._walk(root), 0)
+
+    def _register(self, block: Block):
+        structure = block.structure
+        if structure is not None and not (type(structure) is StructureList and (structure.owner is None or structure.owner is block)):
+            # Plain lists, e.g. from old pickles, and lists shared with another block
+            structure = StructureList(structure, owner=block)
+            block.__dict__["structure"] = structure
+        elif structure is not None:
+            structure.owner = block
+        if not any(index is self for index in block._structure_indexes):
+            block._structure_indexes = block._structure_indexes + (self,)
+
+    def _walk(self, parent: Block, block_ids: Optional[Sequence[BlockId]] = None) -> List[Tuple[Block, Block]]:
+        """(block, parent) pairs for the live blocks under parent, depth first."""
+        found = []
+        stack = [(parent, iter(parent.structure or []) if block_ids is None else iter(block_ids))]
+        while stack:
+            holder, children = stack[-1]
+            block_id = next(children, None)
+            if block_id is None:
+                stack.pop()
+                continue
+            block = self.document.get_block(block_id)
+            if block.removed:
+                # Registered anyway, so un-removing it reaches the index
+                self._register(block)
+                continue
+            found.append((block, holder))
+            stack.append((block, iter(block.structure or [])))
+        return found
+
+    def _insert(self, found: List[Tuple[Block, Block]], position: int):
+        """Give the blocks ranks between their neighbours at position, and index them."""
+        if not found:
+            return
+        count = len(found)
+        if position > 0:
+            low = self.ranks[position - 1]
+            high = self.ranks[position] if position < len(self.ranks) else low + count + 1
+        else:
+            high = self.ranks[0] if self.ranks else float(count + 1)
+            low = high - count - 1
+        step = (high - low) / (count + 1)
+        new_ranks = [low + step * (i + 1) for i in range(count)]
+        if not (low < new_ranks[0] and new_ranks[-1] < high and len(set(new_ranks)) == count):
+            self.stale = True
+            return
+
+        for rank, (block, parent) in zip(new_ranks, found):
+            if id(block) in self.rank_of:
+                # Reachable twice, which the walk would list twice
+                self.stale = True
+                return
+            self._register(block)
+            self.rank_of[id(block)] = rank
+            self.block_at[rank] = block
+            self.parents[id(block)] = parent
+            insort(self.by_type.setdefault(block.block_type, []), rank)
+        self.ranks[position:position] = new_ranks
+        self.entries[position:position] = [block for block, _ in found]
+
+    def _position(self, block: Block) -> Optional[int]:
+        rank = self.rank_of.get(id(block))
+        if rank is None:
+            return None
+        return bisect_left(self.ranks, rank)
+
+    def _descends(self, block: Block, ancestor: Block) -> bool:
+        parent = self.parents.get(id(block))
+        while parent is not None:
+            if parent is ancestor:
+                return True
+            parent = self.parents.get(id(parent))
+        return False
+
+    def _subtree_end(self, position: int) -> int:
+        block = self.entries[position]
+        end = position + 1
+        while end < len(self.entries) and self._descends(self.entries[end], block):
+            end += 1
+        return end
+
+    def _remove(self, start: int, end: int):
+        for rank, block in zip(self.ranks[start:end], self.entries[start:end]):
+            del self.rank_of[id(block)]
+            del self.block_at[rank]
+            del self.parents[id(block)]
+            type_ranks = self.by_type[block.block_type]
+            del type_ranks[bisect_left(type_ranks, rank)]
+        del self.ranks[start:end]
+        del self.entries[start:end]
+
+    def _tracks(self, block: Block) -> bool:
+        return block is self.root or id(block) in self.rank_of
+
+    def _insert_child(self, holder: Block, structure_position: int):
+        """Index the child at structure_position of holder, after its indexed siblings."""
+        structure = holder.structure
+        # Right after the previous live sibling's subtree, or right after holder
+        position = 0 if holder is self.root else self._position(holder) + 1
+        for block_id in reversed(structure[:structure_position]):
+            sibling = self.document.get_block(block_id)
+            sibling_position = self._position(sibling)
+            if sibling_position is not None and self.parents[id(sibling)] is holder:
+                position = self._subtree_end(sibling_position)
+                break
+        self._insert(self._walk(holder, structure[structure_position:structure_position + 1]), position)
+
+    def _remove_child(self, holder: Block, block_id: BlockId):
+        block = self.document.get_block(block_id)
+        position = self._position(block)
+        if position is not None and self.parents[id(block)] is holder:
+            self._remove(position, self._subtree_end(position))
+
+    def _reset(self, holder: Block):
+        if holder is self.root:
+            self.stale = True
+            return
+        self._register(holder)
+        position = self._position(holder)
+        self._remove(position + 1, self._subtree_end(position))
+        self._insert(self._walk(holder), position + 1)
+
+    def apply(self, block: Block, event: str, *args):
+        """Patch the index for an edit to block, or mark it stale."""
+        if self.stale:
+            return
+        if event == "flagged" and not args[0]:
+            # Where an un-removed block goes depends on who holds it now
+            self.stale = True
+            return
+        if not self._tracks(block):
+            return
+        try:
+            if event == "added":
+                self._insert_child(block, args[0])
+            elif event == "removed":
+                self._remove_child(block, args[0])
+            elif event == "replaced":
+                position, old_id = args
+                self._remove_child(block, old_id)
+                self._insert_child(block, position)
+            elif event == "reset":
+                self._reset(block)
+            elif event == "flagged":
+                position = self._position(block)
+                self._remove(position, self._subtree_end(position))
+            elif event == "retyped":
+                old_type = args[0]
+                rank = self.rank_of[id(block)]
+                old_ranks = self.by_type[old_type]
+                del old_ranks[bisect_left(old_ranks, rank)]
+                insort(self.by_type.setdefault(block.block_type, []), rank)
+            else:
+                self.stale = True
+        except Exception:
+            # e.g. an id this index can't resolve, the rebuild will surface it
+            self.stale = True
+
+    def blocks(self, block_types: Sequence | None = None) -> List[Block]:
+        if block_types is None:
+            return list(self.entries)
+        if not isinstance(block_types, (tuple, list, set, frozenset)) or not all(isinstance(t, BlockTypes) for t in block_types):
+            # Matches anything `in` matches, e.g. plain strings
+            return [block for block in self.entries if block.block_type in block_types]
+
+        type_ranks = [self.by_type[block_type] for block_type in set(block_types) if self.by_type.get(block_type)]
+        if len(type_ranks) == 1:
+            return [self.block_at[rank] for rank in type_ranks[0]]
+        return [self.block_at[rank] for rank in heapq.merge(*type_ranks)]
+
+    def parent(self, block: Block) -> Optional[Block]:
+        return self.parents.get(id(block))
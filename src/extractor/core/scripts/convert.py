@@ -29,20 +29,31 @@ os.environ["GLOG_minloglevel"] = "2"
 os.environ["PYTORCH_ENABLE_MPS_FALLBACK"] = "1" # Transformers uses .isin for a simple op, which is not supported on MPS
 os.environ["IN_STREAMLIT"] = "true" # Avoid multiprocessing inside surya
 
-import math
+import hashlib
+import pickle
+import shutil
 import traceback
+from collections import defaultdict
 
 import click
 import torch.multiprocessing as mp
 from tqdm import tqdm
 import gc
 
+from extractor import __version__
 from extractor.core.config.parser import ConfigParser
 from extractor.core.config.printer import CustomClickPrinter
 from extractor.core.logger import configure_logging
 from extractor.core.models import create_model_dict
-from extractor.core.output import output_exists, save_output
+from extractor.core.output import can_merge_rendered, merge_rendered, output_exists, save_output
 from extractor.core.settings import settings
+from extractor.core.utils.batch_schedule import (
+    ConversionManifest,
+    auto_pages_per_task,
+    count_file_pages,
+    options_fingerprint,
+    plan_tasks,
+)
 
 configure_logging()
 
@@ -66,15 +77,8 @@ def worker_exit():
         pass
 
 
-def process_single_pdf(args):
-    fpath, cli_options = args
+def render_file(fpath, cli_options):
     config_parser = ConfigParser(cli_options)
-
-    out_folder = config_parser.get_output_folder(fpath)
-    base_name = config_parser.get_base_filename(fpath)
-    if cli_options.get('skip_existing') and output_exists(out_folder, base_name):
-        return
-
     converter_cls = config_parser.get_converter_cls()
     config_dict = config_parser.generate_config_dict()
     config_dict["disable_tqdm"] = True
@@ -90,19 +94,68 @@ def process_single_pdf(args):
             llm_service=config_parser.get_llm_service()
         )
         rendered = converter(fpath)
-        out_folder = config_parser.get_output_folder(fpath)
-        save_output(rendered, out_folder, base_name)
         if cli_options.get("debug_print"):
             print(f"Converted {fpath}")
-        del rendered
         del converter
+        return rendered
     except Exception as e:
         print(f"Error converting {fpath}: {e}")
         print(traceback.format_exc())
+        return None
     finally:
         gc.collect()
 
 
+def process_task(args):
+    """Convert one task.  Parts of split files are pickled to parts_dir for the parent to merge."""
+    task, cli_options, parts_dir = args
+    if task.page_range is None:
+        config_parser = ConfigParser(cli_options)
+        rendered = render_file(task.filepath, cli_options)
+        if rendered is None:
+            return task, None, False
+        save_output(rendered, config_parser.get_output_folder(task.filepath), config_parser.get_base_filename(task.filepath))
+        return task, None, True
+
+    rendered = render_file(task.filepath, {**cli_options, "page_range": task.page_range_str})
+    if rendered is None:
+        return task, None, False
+    part_path = os.path.join(parts_dir, hashlib.sha1(task.key.encode()).hexdigest() + ".pkl")
+    with open(part_path + ".tmp", "wb") as f:
+        pickle.dump(rendered, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(part_path + ".tmp", part_path)
+    return task, part_path, True
+
+
+def merge_parts(filepath, tasks, manifest, cli_options):
+    """Save a split file once every part is converted.  Returns whether it was saved."""
+    part_paths = [manifest.part_path(task) for task in tasks]
+    if any(path is None or not os.path.exists(path) for path in part_paths):
+        return False
+
+    parts = []
+    for path in part_paths:
+        with open(path, "rb") as f:
+            parts.append(pickle.load(f))
+    config_parser = ConfigParser(cli_options)
+    save_output(merge_rendered(parts), config_parser.get_output_folder(filepath), config_parser.get_base_filename(filepath))
+    manifest.mark_file(filepath, [task.key for task in tasks])
+    for path in part_paths:
+        os.remove(path)
+    return True
+
+
+def assign_chunk(files, page_counts, chunk_idx, num_chunks):
+    """Deal files to chunks largest first, each to the chunk with the fewest pages so far."""
+    loads = [0] * num_chunks
+    chunks = [[] for _ in range(num_chunks)]
+    for f in sorted(files, key=lambda f: (-(page_counts.get(f) or 1), f)):
+        idx = loads.index(min(loads))
+        chunks[idx].append(f)
+        loads[idx] += page_counts.get(f) or 1
+    return sorted(chunks[chunk_idx])
+
+
 @click.command(cls=CustomClickPrinter)
 @click.argument("in_folder", type=str)
 @click.option("--chunk_idx", type=int, default=0, help="Chunk index to convert")
@@ -112,27 +165,70 @@ def process_single_pdf(args):
 @click.option("--skip_existing", is_flag=True, default=False, help="Skip existing converted files.")
 @click.option("--debug_print", is_flag=True, default=False, help="Print debug information.")
 @click.option("--max_tasks_per_worker", type=int, default=10, help="Maximum number of tasks per worker process.")
+@click.option("--pages_per_task", type=int, default=None, help="Split PDFs longer than this into page ranges converted in parallel. Defaults to a size based on the total pages and workers, 0 disables splitting.")
+@click.option("--resume", is_flag=True, default=False, help="Skip files and pages the progress manifest records as converted by an earlier run with the same options.")
+@click.option("--manifest", type=str, default=None, help="Progress manifest used to resume an interrupted run. Defaults to a file in the output directory.")
 @ConfigParser.common_options
 def convert_cli(in_folder: str, **kwargs):
     in_folder = os.path.abspath(in_folder)
     files = [os.path.join(in_folder, f) for f in os.listdir(in_folder)]
     files = [f for f in files if os.path.isfile(f)]
+    page_counts = {f: count_file_pages(f) for f in files}
 
     # Handle chunks if we're processing in parallel
-    # Ensure we get all files into a chunk
-    chunk_size = math.ceil(len(files) / kwargs["num_chunks"])
-    start_idx = kwargs["chunk_idx"] * chunk_size
-    end_idx = start_idx + chunk_size
-    files_to_convert = files[start_idx:end_idx]
+    # Chunks are balanced by page count rather than file count
+    files_to_convert = assign_chunk(files, page_counts, kwargs["chunk_idx"], kwargs["num_chunks"])
 
     # Limit files converted if needed
     if kwargs["max_files"]:
         files_to_convert = files_to_convert[:kwargs["max_files"]]
 
+    if kwargs["skip_existing"]:
+        config_parser = ConfigParser(kwargs)
+        files_to_convert = [
+            f for f in files_to_convert
+            if not output_exists(config_parser.get_output_folder(f), config_parser.get_base_filename(f))
+        ]
+
     # Disable nested multiprocessing
     kwargs["disable_multiprocessing"] = True
 
-    total_processes = min(len(files_to_convert), kwargs["workers"])
+    pages_per_task = kwargs["pages_per_task"]
+    if kwargs.get("page_range") or not can_merge_rendered(kwargs["output_format"]):
+        pages_per_task = 0
+    elif pages_per_task is None:
+        pages_per_task = auto_pages_per_task(sum(page_counts[f] or 1 for f in files_to_convert), kwargs["workers"])
+
+    output_dir = kwargs["output_dir"]
+    manifest_path = kwargs["manifest"] or os.path.join(
+        output_dir,
+        "convert_manifest.json" if kwargs["num_chunks"] == 1 else f"convert_manifest_{kwargs['chunk_idx']}_of_{kwargs['num_chunks']}.json"
+    )
+    # Output from another version of the converter is never resumed
+    fingerprint = options_fingerprint({**kwargs, "in_folder": in_folder, "version": __version__})
+    manifest = ConversionManifest(manifest_path, fingerprint, resume=kwargs["resume"])
+    parts_dir = os.path.join(output_dir, ".convert_parts")
+    if not kwargs["resume"]:
+        # Parts left by an earlier run are only merged when resuming it
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    os.makedirs(parts_dir, exist_ok=True)
+
+    all_tasks = plan_tasks(files_to_convert, page_counts, pages_per_task)
+    file_tasks = defaultdict(list)
+    for task in all_tasks:
+        file_tasks[task.filepath].append(task)
+    for tasks in file_tasks.values():
+        tasks.sort(key=lambda task: task.page_range or (0, 0))
+
+    # Split files whose parts all finished before an interruption only need merging
+    for filepath, tasks in file_tasks.items():
+        if tasks[0].page_range is not None and not manifest.file_done(filepath):
+            merge_parts(filepath, tasks, manifest, kwargs)
+    tasks_to_run = [task for task in all_tasks if not manifest.is_done(task)]
+    if len(tasks_to_run) < len(all_tasks):
+        print(f"Resuming from {manifest_path}: {len(all_tasks) - len(tasks_to_run)} of {len(all_tasks)} tasks already converted")
+
+    total_processes = max(1, min(len(tasks_to_run), kwargs["workers"]))
 
     try:
         mp.set_start_method('spawn') # Required for CUDA, forkserver doesn't work'
@@ -146,14 +242,22 @@ def convert_cli(in_folder: str, **kwargs):
         for k, v in model_dict.items():
             v.model.share_memory()
 
-    print(f"Converting {len(files_to_convert)} pdfs in chunk {kwargs['chunk_idx'] + 1}/{kwargs['num_chunks']} with {total_processes} processes and saving to {kwargs['output_dir']}")
-    task_args = [(f, kwargs) for f in files_to_convert]
+    print(f"Converting {len(files_to_convert)} pdfs as {len(tasks_to_run)} tasks in chunk {kwargs['chunk_idx'] + 1}/{kwargs['num_chunks']} with {total_processes} processes and saving to {output_dir}")
+    # Largest tasks first; the pool hands the next task to whichever worker is free
+    task_args = [(task, kwargs, parts_dir) for task in tasks_to_run]
 
     with mp.Pool(processes=total_processes, initializer=worker_init, initargs=(model_dict,), maxtasksperchild=kwargs["max_tasks_per_worker"]) as pool:
-        pbar = tqdm(total=len(task_args), desc="Processing PDFs", unit="pdf")
-        for _ in pool.imap_unordered(process_single_pdf, task_args):
-            pbar.update(1)
+        pbar = tqdm(total=sum(task.pages for task in tasks_to_run), desc="Processing PDFs", unit="page")
+        for task, part_path, ok in pool.imap_unordered(process_task, task_args):
+            pbar.update(task.pages)
+            if not ok:
+                continue
+            if task.page_range is None:
+                manifest.mark_file(task.filepath, [task.key])
+            else:
+                manifest.mark_task(task, part_path)
+                merge_parts(task.filepath, file_tasks[task.filepath], manifest, kwargs)
         pbar.close()
 
     # Delete all CUDA tensors
-    del model_dict
\ No newline at end of file
+    del model_dict
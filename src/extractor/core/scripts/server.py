@@ -22,7 +22,12 @@ Example Usage:
 >>> # Add usage examples
 """
 
+import asyncio
+import threading
+import time
 import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import click
 import os
@@ -35,27 +40,180 @@ from extractor.core.output import text_from_rendered
 
 import base64
 from contextlib import asynccontextmanager
-from typing import Optional, Annotated
+from typing import Any, Callable, Dict, Optional, Annotated
 import io
 
-from fastapi import FastAPI, Form, File, UploadFile
+from fastapi import FastAPI, Form, File, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
 from extractor.core.converters.pdf import PdfConverter
 from extractor.core.models import create_model_dict
 from extractor.core.settings import settings
 
 app_data = {}
+queue_settings = {
+    "workers": 1,  # Surya predictors are not guaranteed thread-safe, raise with care
+    "max_queue_size": 8,
+    "job_timeout": 600,
+    "job_ttl": 3600,
+}
 
 
 UPLOAD_DIRECTORY = "./uploads"
 os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
 
+OUTPUT_FORMATS = ("markdown", "json", "html")
+
+
+class ConversionQueue:
+    """
+    Bounded job queue that runs conversions on a worker pool, off the event loop.
+
+    Every worker shares the single app_data["models"] dict.  Queued and
+    synchronous jobs count against the same max_queue_size.  A job that runs
+    past its timeout, counted from when it starts running, is reported as
+    timed out; the worker thread finishes in the background and its result
+    is discarded.  Threads can't be killed, so until then the job still
+    counts against max_queue_size.
+    """
+
+    def __init__(self, workers: int, max_queue_size: int, job_timeout: float, job_ttl: float):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="marker-convert")
+        self.max_queue_size = max_queue_size
+        self.job_timeout = job_timeout
+        self.job_ttl = job_ttl
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def in_flight(self) -> int:
+        # Timed out jobs keep their worker until the conversion returns, so they still take up capacity
+        return sum(1 for job in self.jobs.values() if not job["future"].done())
+
+    def submit(self, params: "CommonParams", on_finish: Optional[Callable[[], None]] = None) -> str | None:
+        """
+        Queue a conversion, or return None when the queue is full.
+
+        on_finish runs on the worker once the conversion is over, whatever
+        its outcome, e.g. to delete an uploaded file.
+        """
+        with self.lock:
+            self._prune()
+            if self.in_flight() >= self.max_queue_size:
+                return None
+
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+            }
+            self.jobs[job_id]["future"] = self.executor.submit(self._run, job_id, params, on_finish)
+        return job_id
+
+    def _run(self, job_id: str, params: "CommonParams", on_finish: Optional[Callable[[], None]] = None):
+        job = self.jobs[job_id]
+        try:
+            with self.lock:
+                job["status"] = "running"
+                job["started_at"] = time.time()
+            try:
+                result = _run_conversion(params)
+            except Exception as e:
+                traceback.print_exc()
+                result = {"success": False, "error": str(e)}
+
+            with self.lock:
+                job["finished_at"] = time.time()
+                if self._expired(job):
+                    return
+                job["result"] = result
+                job["status"] = "completed" if result.get("success") else "failed"
+        finally:
+            if on_finish is not None:
+                on_finish()
+
+    def _expired(self, job: Dict[str, Any]) -> bool:
+        if job["status"] == "timeout":
+            return True
+        if job["status"] == "running" and time.time() - job["started_at"] > self.job_timeout:
+            job["status"] = "timeout"
+            job["result"] = None
+            return True
+        return False
+
+    def _prune(self):
+        now = time.time()
+        stale = [
+            job_id for job_id, job in self.jobs.items()
+            if job["future"].done() and now - (job["finished_at"] or job["submitted_at"]) > self.job_ttl
+        ]
+        for job_id in stale:
+            del self.jobs[job_id]
+
+    def status(self, job_id: str) -> Dict[str, Any] | None:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            self._expired(job)
+            return {
+                "job_id": job_id,
+                "status": job["status"],
+                "submitted_at": job["submitted_at"],
+                "started_at": job["started_at"],
+                "finished_at": job["finished_at"],
+            }
+
+    def result(self, job_id: str) -> Dict[str, Any] | None:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return None if job is None else job["result"]
+
+    async def run(self, params: "CommonParams", on_finish: Optional[Callable[[], None]] = None) -> Dict[str, Any] | None:
+        """Run a conversion for a synchronous endpoint, or return None when the queue is full."""
+        job_id = self.submit(params, on_finish)
+        if job_id is None:
+            return None
+
+        # Synchronous endpoints share the queue, but never block the event loop
+        with self.lock:
+            future = asyncio.wrap_future(self.jobs[job_id]["future"])
+        while True:
+            status = self.status(job_id)
+            if status["status"] == "timeout":
+                return {
+                    "success": False,
+                    "error": f"Conversion timed out after {self.job_timeout} seconds",
+                }
+            if status["status"] not in ("queued", "running"):
+                break
+            # Queue wait doesn't count against the timeout, so check back until the job starts
+            wait = 1.0 if status["started_at"] is None else status["started_at"] + self.job_timeout - time.time()
+            try:
+                await asyncio.wait_for(asyncio.shield(future), timeout=max(0.0, wait))
+            except asyncio.TimeoutError:
+                pass
+
+        with self.lock:
+            # Nobody polls a synchronous job, so its result isn't kept around
+            job = self.jobs.pop(job_id)
+        return job["result"]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app_data["models"] = create_model_dict()
+    app_data["queue"] = ConversionQueue(**queue_settings)
 
     yield
 
+    if "queue" in app_data:
+        app_data["queue"].shutdown()
+        del app_data["queue"]
     if "models" in app_data:
         del app_data["models"]
 
@@ -71,6 +229,7 @@ async def root():
 <ul>
     <li><a href="/docs">API Documentation</a></li>
     <li><a href="/marker">Run marker (post request only)</a></li>
+    <li><a href="/marker/jobs">Submit a queued marker job (post request only)</a></li>
 </ul>
 """
     )
@@ -106,9 +265,18 @@ class CommonParams(BaseModel):
     ] = "markdown"
 
 
-async def _convert_pdf(params: CommonParams):
-    assert params.output_format in ["markdown", "json", "html"], "Invalid output format"
+def _check_output_format(output_format: Optional[str]):
+    if output_format not in OUTPUT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid output format {output_format!r}, expected one of {', '.join(OUTPUT_FORMATS)}.",
+        )
+
+
+def _run_conversion(params: CommonParams):
     try:
+        if params.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Invalid output format {params.output_format!r}")
         options = params.model_dump()
         print(options)
         config_parser = ConfigParser(options)
@@ -146,13 +314,52 @@ async def _convert_pdf(params: CommonParams):
         "success": True,
     }
 
+async def _convert_pdf(params: CommonParams, on_finish: Optional[Callable[[], None]] = None):
+    results = await app_data["queue"].run(params, on_finish)
+    if results is None:
+        raise HTTPException(status_code=429, detail="Conversion queue is full, retry later.")
+    return results
+
+
 @app.post("/marker")
 async def convert_pdf(
     params: CommonParams
 ):
+    _check_output_format(params.output_format)
     return await _convert_pdf(params)
 
 
+@app.post("/marker/jobs", status_code=202)
+async def submit_job(
+    params: CommonParams
+):
+    _check_output_format(params.output_format)
+    job_id = app_data["queue"].submit(params)
+    if job_id is None:
+        raise HTTPException(status_code=429, detail="Conversion queue is full, retry later.")
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/marker/jobs/{job_id}")
+async def job_status(job_id: str):
+    status = app_data["queue"].status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown job id.")
+    return status
+
+
+@app.get("/marker/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    status = app_data["queue"].status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown job id.")
+    if status["status"] in ("queued", "running"):
+        return JSONResponse(status_code=202, content=status)
+    if status["status"] == "timeout":
+        raise HTTPException(status_code=504, detail="Conversion timed out.")
+    return app_data["queue"].result(job_id)
+
+
 
 @app.post("/marker/upload")
 async def convert_pdf_upload(
@@ -165,6 +372,7 @@ async def convert_pdf_upload(
         ..., description="The PDF file to convert.", media_type="application/pdf"
     ),
 ):
+    _check_output_format(output_format)
     upload_path = os.path.join(UPLOAD_DIRECTORY, file.filename)
     with open(upload_path, "wb+") as upload_file:
         file_contents = await file.read()
@@ -178,16 +386,29 @@ async def convert_pdf_upload(
         paginate_output=paginate_output,
         output_format=output_format,
     )
-    results = await _convert_pdf(params)
-    os.remove(upload_path)
-    return results
+
+    def remove_upload():
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+
+    try:
+        # The worker deletes the file once it is done with it, even after a timeout
+        return await _convert_pdf(params, on_finish=remove_upload)
+    except HTTPException:
+        # Never queued
+        remove_upload()
+        raise
 
 
 @click.command()
 @click.option("--port", type=int, default=8000, help="Port to run the server on")
 @click.option("--host", type=str, default="127.0.0.1", help="Host to run the server on")
-def server_cli(port: int, host: str):
+@click.option("--workers", type=int, default=1, help="Number of conversion worker threads sharing the loaded models")
+@click.option("--max_queue_size", type=int, default=8, help="Maximum queued and running jobs before returning 429")
+@click.option("--job_timeout", type=float, default=600, help="Seconds before a job is reported as timed out")
+def server_cli(port: int, host: str, workers: int, max_queue_size: int, job_timeout: float):
     import uvicorn
+    queue_settings.update(workers=workers, max_queue_size=max_queue_size, job_timeout=job_timeout)
     # Run the server
     uvicorn.run(
         app,
@@ -17,12 +17,13 @@ Example Usage:
 >>> # Add usage examples
 """
 
-from typing import Optional, List, Annotated
+from typing import Any, Optional, List, Annotated
 
 import PIL
 from pydantic import BaseModel
 
 from extractor.core.schema.blocks import Block
+from extractor.core.services.utils.llm_response_cache import get_response_cache
 from extractor.core.util import assign_config, verify_config_keys
 
 
@@ -35,6 +36,23 @@ class BaseService:
         int,
         "The maximum number of retries to use for the service."
     ] = 2
+    use_response_cache: Annotated[
+        bool,
+        "Whether to cache LLM responses on disk, keyed by model, prompt, images, response schema and generation settings.",
+    ] = False
+    response_cache_dir: Annotated[
+        Optional[str],
+        "The directory to store cached LLM responses in.",
+        "Default is None, which will use ~/.marker/cache/llm."
+    ] = None
+    response_cache_max_entries: Annotated[
+        int,
+        "The maximum number of LLM responses to keep in the disk cache.",
+    ] = 20000
+    response_cache_max_bytes: Annotated[
+        int,
+        "The maximum total size in bytes of the LLM responses kept in the disk cache.",
+    ] = 512 * 1024 * 1024
 
     def __init__(self, config: Optional[BaseModel | dict] = None):
         assign_config(self, config)
@@ -42,6 +60,44 @@ class BaseService:
         # Ensure we have all necessary fields filled out (API keys, etc.)
         verify_config_keys(self)
 
+        self.response_cache = None
+        if self.use_response_cache:
+            self.response_cache = get_response_cache(
+                self.response_cache_dir,
+                max_size=self.response_cache_max_entries,
+                max_bytes=self.response_cache_max_bytes,
+            )
+
+    def generation_settings(self) -> dict:
+        """Request settings besides the model and prompt that change the response, e.g. temperature."""
+        return {}
+
+    def response_cache_key(
+        self,
+        model: str,
+        prompt: str,
+        image: PIL.Image.Image | List[PIL.Image.Image] | None,
+        response_schema: type[BaseModel],
+    ) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        return self.response_cache.compute_key(model, prompt, image, response_schema, self.generation_settings())
+
+    def get_cached_response(self, key: Optional[str]) -> Optional[dict]:
+        if key is None:
+            return None
+        return self.response_cache.get(key)
+
+    def cache_response(self, key: Optional[str], response: Any):
+        # Empty responses are failures, which should be retried next time
+        if key is None or not response:
+            return
+        try:
+            self.response_cache.set(key, response)
+        except (TypeError, ValueError):
+            # Not JSON serializable, leave it uncached
+            pass
+
     def __call__(
         self,
         prompt: str,
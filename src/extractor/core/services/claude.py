@@ -47,6 +47,8 @@ class ClaudeService(BaseService):
         "The maximum number of tokens to use for a single Claude request."
     ] = 8192
 
+    def generation_settings(self) -> dict:
+        return {"max_tokens": self.max_claude_tokens}
 
     def img_to_base64(self, img: PIL.Image.Image):
         image_bytes = BytesIO()
@@ -113,6 +115,11 @@ class ClaudeService(BaseService):
         if not isinstance(image, list):
             image = [image]
 
+        cache_key = self.response_cache_key(self.claude_model_name, prompt, image, response_schema)
+        cached = self.get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
         schema_example = response_schema.model_json_schema()
         system_prompt = f"""
 Follow the instructions given by the user prompt.  You must provide your response in JSON format matching this schema:
@@ -150,7 +157,9 @@ Respond only with the JSON schema, nothing else.  Do not include ```json, ```,
                 )
                 # Extract and validate response
                 response_text = response.content[0].text
-                return self.validate_response(response_text, response_schema)
+                result = self.validate_response(response_text, response_schema)
+                self.cache_response(cache_key, result)
+                return result
             except (RateLimitError, APITimeoutError) as e:
                 # Rate limit exceeded
                 tries += 1
@@ -57,6 +57,14 @@ class LiteLLMService(BaseService):
         Optional[str],
         "Optional base URL for the API (for custom endpoints)."
     ] = ""
+    litellm_temperature: Annotated[
+        Optional[float],
+        "The sampling temperature. Default is None, which uses the provider's default."
+    ] = None
+    litellm_max_tokens: Annotated[
+        Optional[int],
+        "The maximum number of tokens in a response. Default is None, which uses the provider's default."
+    ] = None
     enable_cache: Annotated[
         bool,
         "Whether to enable caching for LLM responses. This can reduce API costs and improve performance."
@@ -77,6 +85,16 @@ class LiteLLMService(BaseService):
             print("LiteLLM cache not available (marker/services/utils/litellm_cache.py not found)")
             print("Continuing without cache")
 
+    def generation_settings(self) -> dict:
+        settings = {}
+        if self.litellm_base_url and self.litellm_base_url.strip():
+            settings["api_base"] = self.litellm_base_url
+        if self.litellm_temperature is not None:
+            settings["temperature"] = self.litellm_temperature
+        if self.litellm_max_tokens is not None:
+            settings["max_tokens"] = self.litellm_max_tokens
+        return settings
+
     def get_api_key(self, model: str):
         """
         Get the appropriate API key based on the model provider.
@@ -186,21 +204,23 @@ class LiteLLMService(BaseService):
         # Parse model provider and name from litellm_model
         model = self.litellm_model
 
+        cache_key = self.response_cache_key(model, prompt, image, response_schema)
+        cached = self.get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+
         # Get the appropriate API key based on the model provider
         api_key = self.get_api_key(model)
         if not api_key:
             raise ValueError(f"No API key found for model {model}. Please provide an API key directly or set the appropriate environment variable.")
 
-        # Configure litellm
+        # Configure litellm, with the same settings the response cache is keyed on
         litellm_config = {
             "api_key": api_key,
             "timeout": timeout,
+            **self.generation_settings(),
         }
 
-        # Add base_url if provided and not empty
-        if self.litellm_base_url and self.litellm_base_url.strip():
-            litellm_config["api_base"] = self.litellm_base_url
-
         tries = 0
         while tries < max_retries:
             try:
@@ -247,7 +267,9 @@ class LiteLLMService(BaseService):
                 block.update_metadata(llm_tokens_used=total_tokens, llm_request_count=1)
 
                 # Use clean_json_string instead of json.loads
-                return clean_json_string(response_text, return_dict=True)
+                result = clean_json_string(response_text, return_dict=True)
+                self.cache_response(cache_key, result)
+                return result
             except litellm.exceptions.Timeout as e:
                 # Timeout error
                 tries += 1
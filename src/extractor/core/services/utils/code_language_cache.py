@@ -0,0 +1,106 @@
+"""
+Module: code_language_cache.py
+Description: Disk-backed cache of code block language detection results
+
+Detection runs heuristics and then parses the block with up to seven
+tree-sitter grammars, which adds up for books with hundreds of listings.
+Results are keyed by a hash of the full block text and the detector
+settings, and stored in the same SQLite store as the table extraction cache.
+
+Sample Input:
+>>> cache = get_language_cache()
+>>> key = cache.compute_key("def f():\\n    return 1", ("python", "javascript"), "text")
+
+Expected Output:
+>>> cache.get(key)
+{'language': 'python', 'score': 0.8, 'metadata': {'functions': [...], 'classes': [], ...}}
+
+Example Usage:
+>>> from extractor.core.services.utils.code_language_cache import get_language_cache
+>>> cache = get_language_cache()
+>>> cache.set(key, {"language": "python", "score": 0.6, "metadata": None})
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+from extractor.core.utils.table_cache import TableExtractionCache
+
+
+class CodeLanguageCache(TableExtractionCache):
+    """
+    Disk-based cache of detected code languages and their tree-sitter metadata.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_size: int = 50000,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory to store the cache database. Defaults to ~/.marker/cache/code.
+            max_size: Maximum number of detection results to keep.
+            max_bytes: Maximum total size of cached results in bytes. None disables the limit.
+            ttl_seconds: Seconds after which a result expires. None disables expiry.
+        """
+        cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".marker", "cache", "code")
+        super().__init__(cache_dir, max_size=max_size, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+    def compute_key(self, code: str, candidates: Sequence[str], fallback_language: str) -> str:
+        """
+        Compute the cache key for one code block.
+
+        Args:
+            code: Full text of the code block
+            candidates: Languages tried with tree-sitter, in order
+            fallback_language: Language used when nothing is detected
+
+        Returns:
+            Cache key as a string
+        """
+        payload = json.dumps(
+            {
+                "code": hashlib.sha256(code.encode("utf-8")).hexdigest(),
+                "candidates": list(candidates),
+                "fallback": fallback_language,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+_caches: Dict[tuple, CodeLanguageCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_language_cache(cache_dir: Optional[str] = None, max_size: int = 50000) -> CodeLanguageCache:
+    """
+    Get the shared language cache for a directory.
+
+    Returns:
+        CodeLanguageCache: The cache instance
+    """
+    key = (cache_dir, max_size)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = CodeLanguageCache(cache_dir, max_size=max_size)
+        return _caches[key]
+
+
+def restore_metadata(metadata: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Turn the line spans that JSON stored as lists back into tuples."""
+    if not metadata:
+        return metadata
+    for key in ("functions", "classes"):
+        for item in metadata.get(key) or []:
+            if isinstance(item.get("line_span"), list):
+                item["line_span"] = tuple(item["line_span"])
+    return metadata
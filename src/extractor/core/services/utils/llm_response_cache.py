@@ -0,0 +1,190 @@
+"""
+Module: llm_response_cache.py
+Description: Disk-backed cache of LLM responses for the block processors
+
+Unlike litellm_cache.py, which configures LiteLLM's Redis or in-memory cache,
+this cache lives on local disk, survives worker restarts and works for every
+service, including ClaudeService which does not go through LiteLLM.  Entries
+are keyed by (model, prompt, image hashes, response schema, generation
+settings such as temperature and max tokens) and stored in the
+same SQLite store as the table extraction cache, so size limits and hit-rate
+counters come for free.
+
+External Dependencies:
+- PIL: https://pillow.readthedocs.io/
+- pydantic: https://docs.pydantic.dev/
+
+Sample Input:
+>>> cache = get_response_cache()
+>>> key = cache.compute_key("openai/gpt-4o-mini", "Describe this table", image, TableSchema)
+
+Expected Output:
+>>> cache.get(key)
+{'corrected_html': '<table>...</table>'}
+>>> cache.stats()["hit_rate"]
+0.93
+
+Example Usage:
+>>> from extractor.core.services.utils.llm_response_cache import get_response_cache
+>>> cache = get_response_cache(max_size=50000)
+>>> cache.set(key, response)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+from PIL import Image
+from pydantic import BaseModel
+
+from extractor.core.utils.table_cache import TableExtractionCache
+
+
+def hash_image(image: Image.Image) -> str:
+    """Hash the pixels of an image, independent of how it would be encoded."""
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class LLMResponseCache(TableExtractionCache):
+    """
+    Disk-based cache for LLM responses.
+
+    Only successful, non-empty responses should be stored, so failed requests
+    are retried on the next run.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_size: int = 20000,
+        max_bytes: Optional[int] = 512 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory to store the cache database. Defaults to ~/.marker/cache/llm.
+            max_size: Maximum number of responses to keep.
+            max_bytes: Maximum total size of cached responses in bytes. None disables the limit.
+            ttl_seconds: Seconds after which a response expires. None disables expiry.
+        """
+        cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".marker", "cache", "llm")
+        super().__init__(cache_dir, max_size=max_size, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+    def compute_key(
+        self,
+        model: str,
+        prompt: Union[str, List[Dict[str, Any]]],
+        image: Union[Image.Image, List[Image.Image], None],
+        response_schema: Optional[type[BaseModel]],
+        settings: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Compute the cache key for one LLM request.
+
+        Args:
+            model: Model name, including anything else that changes the response
+            prompt: Prompt text, or the full message list
+            image: Image or images sent with the prompt
+            response_schema: Pydantic schema the response is validated against
+            settings: Generation settings sent with the request, e.g. temperature and max tokens
+
+        Returns:
+            Cache key as a string
+        """
+        if image is None:
+            images = []
+        elif isinstance(image, list):
+            images = image
+        else:
+            images = [image]
+
+        schema = response_schema.model_json_schema() if response_schema is not None else None
+        payload = json.dumps(
+            {
+                "model": model,
+                "prompt": prompt,
+                "images": [hash_image(img) for img in images if img is not None],
+                "schema": schema,
+                "settings": settings or {},
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+_caches: Dict[tuple, LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(
+    cache_dir: Optional[str] = None,
+    max_size: int = 20000,
+    max_bytes: Optional[int] = 512 * 1024 * 1024,
+) -> LLMResponseCache:
+    """
+    Get the shared response cache for a directory.
+
+    Services with the same settings share one instance, so the session hit
+    counters cover every service in the process.
+
+    Returns:
+        LLMResponseCache: The cache instance
+    """
+    key = (cache_dir, max_size, max_bytes)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = LLMResponseCache(cache_dir, max_size=max_size, max_bytes=max_bytes)
+        return _caches[key]
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    all_validation_failures = []
+
+    class _Schema(BaseModel):
+        text: str
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = LLMResponseCache(cache_dir=temp_dir)
+        image = Image.new("RGB", (20, 10), "white")
+        key = cache.compute_key("openai/gpt-4o-mini", "prompt", image, _Schema)
+
+        if cache.get(key) is not None:
+            all_validation_failures.append("Empty cache returned a value")
+
+        cache.set(key, {"text": "hello"})
+        if cache.get(key) != {"text": "hello"}:
+            all_validation_failures.append("Cached response was not returned")
+
+        if key != cache.compute_key("openai/gpt-4o-mini", "prompt", [image.copy()], _Schema):
+            all_validation_failures.append("Identical requests produced different keys")
+
+        other = Image.new("RGB", (20, 10), "black")
+        if key == cache.compute_key("openai/gpt-4o-mini", "prompt", other, _Schema):
+            all_validation_failures.append("Different images produced the same key")
+
+        if key == cache.compute_key("claude-3-7-sonnet-20250219", "prompt", image, _Schema):
+            all_validation_failures.append("Different models produced the same key")
+
+        stats = cache.stats()
+        if stats["hits"] != 1 or stats["misses"] != 1:
+            all_validation_failures.append(f"Unexpected hit/miss counts: {stats}")
+
+    if all_validation_failures:
+        print(f"❌ VALIDATION FAILED - {len(all_validation_failures)} failures:")
+        for failure in all_validation_failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+
+    print("✅ VALIDATION PASSED - LLM response cache works as expected")
+    sys.exit(0)
@@ -16,9 +16,11 @@ Key features:
 6. Line number tracking for better context
 """
 
+import functools
 import os
 import json
 import logging
+import threading
 from typing import Optional, Dict, List, Any, Tuple, Union
 
 # Try to use loguru if available, otherwise use standard logging
@@ -162,6 +164,110 @@ LANGUAGE_MAPPINGS = {
 }
 
 
+# Metadata query patterns by language; other languages fall back to the Python patterns
+QUERY_PATTERNS = {
+    "python": """
+        (function_definition
+            name: (identifier) @func_name
+            parameters: (parameters) @params
+            body: (block) @body
+        ) @function
+
+        (class_definition
+            name: (identifier) @class_name
+            body: (block) @class_body
+        ) @class
+    """,
+    "javascript": """
+        (function_declaration
+            name: (identifier) @func_name
+            parameters: (formal_parameters) @params
+            body: (statement_block) @body
+        ) @function
+
+        (method_definition
+            name: (property_identifier) @method_name
+            parameters: (formal_parameters) @params
+            body: (statement_block) @body
+        ) @method
+
+        (class_declaration
+            name: (identifier) @class_name
+            body: (class_body) @class_body
+        ) @class
+    """,
+    "typescript": """
+        (function_declaration
+            name: (identifier) @func_name
+            parameters: (formal_parameters) @params
+            body: (statement_block) @body
+        ) @function
+
+        (method_definition
+            name: (property_identifier) @method_name
+            parameters: (formal_parameters) @params
+            body: (statement_block) @body
+        ) @method
+
+        (class_declaration
+            name: (identifier) @class_name
+            body: (class_body) @class_body
+        ) @class
+    """,
+    "java": """
+        (method_declaration
+            name: (identifier) @method_name
+            parameters: (formal_parameters) @params
+            body: (block) @body
+        ) @method
+
+        (class_declaration
+            name: (identifier) @class_name
+            body: (class_body) @class_body
+        ) @class
+    """,
+    "cpp": """
+        (function_definition
+            declarator: (function_declarator
+                declarator: (identifier) @func_name
+                parameters: (parameter_list) @params
+            )
+            body: (compound_statement) @body
+        ) @function
+
+        (class_specifier
+            name: (type_identifier) @class_name
+            body: (field_declaration_list) @class_body
+        ) @class
+    """,
+    "go": """
+        (function_declaration
+            name: (identifier) @func_name
+            parameters: (parameter_list) @params
+            body: (block) @body
+        ) @function
+
+        (method_declaration
+            name: (field_identifier) @method_name
+            parameters: (parameter_list) @params
+            body: (block) @body
+        ) @method
+    """,
+    "ruby": """
+        (method
+            name: (identifier) @method_name
+            parameters: (method_parameters) @params
+            body: (body_statement) @body
+        ) @method
+
+        (class
+            name: (constant) @class_name
+            body: (body_statement) @class_body
+        ) @class
+    """
+}
+
+
 def get_language_by_extension(file_path: str) -> Optional[str]:
     """
     Determine the programming language from a file path's extension.
@@ -210,12 +316,56 @@ def get_supported_language(code_type: str) -> Optional[str]:
     if not language_name:
         logger.debug(f"No language mapping for code type: {code_type}")
         return None
+    if not _language_available(language_name):
+        return None
+    return language_name
+
+
+@functools.lru_cache(maxsize=None)
+def _language_available(language_name: str) -> bool:
     try:
         tlp.get_language(language_name)
-        return language_name
+        return True
     except Exception as e:
         logger.debug(f"Language {language_name} not supported by tree-sitter-language-pack: {e}")
-        return None
+        return False
+
+
+# Parsers and compiled queries are reused for the life of the process.  They
+# keep per-call state, so each thread gets its own.
+_thread_local = threading.local()
+
+
+def get_parser(language_id: str) -> Parser:
+    """Return this thread's parser for a language, creating it on first use."""
+    parsers = _thread_local.__dict__.setdefault("parsers", {})
+    if language_id not in parsers:
+        parsers[language_id] = tlp.get_parser(language_id)
+    return parsers[language_id]
+
+
+class _QueryFailure(str):
+    """Cached in place of a query that didn't compile, holding the error message."""
+
+
+def get_query(language_id: str):
+    """
+    Return this thread's compiled metadata query for a language.
+
+    Languages without their own pattern use the Python one, which may not
+    compile; the failure is cached and every call raises a new ValueError.
+    """
+    queries = _thread_local.__dict__.setdefault("queries", {})
+    if language_id not in queries:
+        query_str = QUERY_PATTERNS.get(language_id, QUERY_PATTERNS["python"])
+        try:
+            queries[language_id] = tlp.get_language(language_id).query(query_str)
+        except Exception as e:
+            queries[language_id] = _QueryFailure(f"{type(e).__name__}: {e}")
+    query = queries[language_id]
+    if isinstance(query, _QueryFailure):
+        raise ValueError(f"Metadata query for {language_id} does not compile: {query}")
+    return query
 
 
 def extract_parameter_type(node: Node) -> Optional[str]:
@@ -490,121 +640,14 @@ def extract_code_metadata(code: str, language: str) -> Dict[str, Any]:
             return metadata
             
         # Get parser for the language
-        parser = tlp.get_parser(language_id)
+        parser = get_parser(language_id)
         
         # Parse the code
         tree = parser.parse(bytes(code, "utf8"))
         root_node = tree.root_node
         
-        # Language-specific query patterns
-        queries = {
-            "python": """
-                (function_definition
-                    name: (identifier) @func_name
-                    parameters: (parameters) @params
-                    body: (block) @body
-                ) @function
-
-                (class_definition
-                    name: (identifier) @class_name
-                    body: (block) @class_body
-                ) @class
-            """,
-            "javascript": """
-                (function_declaration
-                    name: (identifier) @func_name
-                    parameters: (formal_parameters) @params
-                    body: (statement_block) @body
-                ) @function
-
-                (method_definition
-                    name: (property_identifier) @method_name
-                    parameters: (formal_parameters) @params
-                    body: (statement_block) @body
-                ) @method
-
-                (class_declaration
-                    name: (identifier) @class_name
-                    body: (class_body) @class_body
-                ) @class
-            """,
-            "typescript": """
-                (function_declaration
-                    name: (identifier) @func_name
-                    parameters: (formal_parameters) @params
-                    body: (statement_block) @body
-                ) @function
-
-                (method_definition
-                    name: (property_identifier) @method_name
-                    parameters: (formal_parameters) @params
-                    body: (statement_block) @body
-                ) @method
-
-                (class_declaration
-                    name: (identifier) @class_name
-                    body: (class_body) @class_body
-                ) @class
-            """,
-            "java": """
-                (method_declaration
-                    name: (identifier) @method_name
-                    parameters: (formal_parameters) @params
-                    body: (block) @body
-                ) @method
-
-                (class_declaration
-                    name: (identifier) @class_name
-                    body: (class_body) @class_body
-                ) @class
-            """,
-            "cpp": """
-                (function_definition
-                    declarator: (function_declarator
-                        declarator: (identifier) @func_name
-                        parameters: (parameter_list) @params
-                    )
-                    body: (compound_statement) @body
-                ) @function
-
-                (class_specifier
-                    name: (type_identifier) @class_name
-                    body: (field_declaration_list) @class_body
-                ) @class
-            """,
-            "go": """
-                (function_declaration
-                    name: (identifier) @func_name
-                    parameters: (parameter_list) @params
-                    body: (block) @body
-                ) @function
-
-                (method_declaration
-                    name: (field_identifier) @method_name
-                    parameters: (parameter_list) @params
-                    body: (block) @body
-                ) @method
-            """,
-            "ruby": """
-                (method
-                    name: (identifier) @method_name
-                    parameters: (method_parameters) @params
-                    body: (body_statement) @body
-                ) @method
-
-                (class
-                    name: (constant) @class_name
-                    body: (body_statement) @class_body
-                ) @class
-            """
-        }
-        
-        # Fallback to python query for unsupported languages
-        query_str = queries.get(language_id, queries["python"])
-        lang_obj = tlp.get_language(language_id)
-        
         try:
-            query = lang_obj.query(query_str)
+            query = get_query(language_id)
             capture_results = query.captures(root_node)
             
             # Process the captures based on the format (no logging of object types)
@@ -23,13 +23,13 @@ Example Usage:
 import inspect
 import os
 from importlib import import_module
-from typing import List, Annotated, Optional
+from typing import List, Annotated, get_args
 
 import numpy as np
 import requests
 from pydantic import BaseModel
 
-from extractor.core.schema.polygon import PolygonBox
+from extractor.core.schema.polygon import PolygonArray, PolygonBox
 from extractor.core.settings import settings
 
 
@@ -57,9 +57,7 @@ def verify_config_keys(obj):
     for attr_name, annotation in annotations.items():
         if isinstance(annotation, type(Annotated[str, ""])):
             # Check if it's an Optional field
-            is_optional = False
-            if hasattr(annotation, "__origin__") and annotation.__origin__ is Optional:
-                is_optional = True
+            is_optional = type(None) in get_args(annotation.__origin__)
 
             value = getattr(obj, attr_name)
             # Only add to none_vals if the value is None (not if it's an empty string)
@@ -94,6 +92,18 @@ def assign_config(cls, config: BaseModel | dict | None):
             setattr(cls, split_k, dict_config[k])
 
 
+def config_dict(config: BaseModel | dict | None) -> dict:
+    if config is None:
+        return {}
+    if isinstance(config, BaseModel):
+        return config.dict()
+    return dict(config)
+
+
+def config_value(config: BaseModel | dict | None, key: str, default=None):
+    return config_dict(config).get(key, default)
+
+
 def parse_range_str(range_str: str) -> List[int]:
     range_lst = range_str.split(",")
     page_lst = []
@@ -111,21 +121,7 @@ def matrix_intersection_area(boxes1: List[List[float]], boxes2: List[List[float]
     if len(boxes1) == 0 or len(boxes2) == 0:
         return np.zeros((len(boxes1), len(boxes2)))
 
-    boxes1 = np.array(boxes1)
-    boxes2 = np.array(boxes2)
-
-    boxes1 = boxes1[:, np.newaxis, :]  # Shape: (N, 1, 4)
-    boxes2 = boxes2[np.newaxis, :, :]  # Shape: (1, M, 4)
-
-    min_x = np.maximum(boxes1[..., 0], boxes2[..., 0])  # Shape: (N, M)
-    min_y = np.maximum(boxes1[..., 1], boxes2[..., 1])
-    max_x = np.minimum(boxes1[..., 2], boxes2[..., 2])
-    max_y = np.minimum(boxes1[..., 3], boxes2[..., 3])
-
-    width = np.maximum(0, max_x - min_x)
-    height = np.maximum(0, max_y - min_y)
-
-    return width * height  # Shape: (N, M)
+    return PolygonArray(boxes1).intersection_area(PolygonArray(boxes2))  # Shape: (N, M)
 
 
 def matrix_distance(boxes1: List[List[float]], boxes2: List[List[float]]) -> np.ndarray:
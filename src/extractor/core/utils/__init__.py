@@ -15,6 +15,7 @@ Provides additional functionality for:
 try:
     from extractor.core.utils.embedding_utils import (
         get_embedding,
+        get_embeddings,
         get_embedder_model,
         cosine_similarity,
         calculate_cosine_similarity,
@@ -26,6 +27,7 @@ except ImportError:
 # Export other utilities
 __all__ = [
     'get_embedding',
+    'get_embeddings',
     'get_embedder_model',
     'cosine_similarity',
     'calculate_cosine_similarity'
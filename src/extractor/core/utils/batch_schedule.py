@@ -0,0 +1,189 @@
+"""
+Module: batch_schedule.py
+Description: Page-count balanced task planning and a resumable manifest for batch conversion
+
+Converting a folder one file per task leaves the pool idle behind whichever
+worker drew the largest PDF.  Here large PDFs are split into page ranges so no
+task is much larger than the others, and tasks are queued largest first, so
+the pool's shared queue hands the small ones to whichever worker frees up.
+Each finished task is recorded in a manifest, so an interrupted batch resumes
+where it stopped.
+
+External Dependencies:
+- pypdfium2: https://pypdfium2.readthedocs.io/
+
+Sample Input:
+>>> plan_tasks(["a.pdf", "b.pdf"], {"a.pdf": 900, "b.pdf": 12}, pages_per_task=100)
+
+Expected Output:
+>>> # 9 tasks of 100 pages for a.pdf, then one 12 page task for b.pdf
+[ConversionTask(filepath='a.pdf', page_range=(0, 100), pages=100), ...]
+
+Example Usage:
+>>> from extractor.core.utils.batch_schedule import ConversionManifest, plan_tasks
+>>> manifest = ConversionManifest("output/convert_manifest.json", options_fingerprint, resume=True)
+>>> tasks = [t for t in plan_tasks(files, page_counts, 100) if not manifest.is_done(t)]
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+
+class ConversionTask(NamedTuple):
+    filepath: str
+    page_range: Optional[Tuple[int, int]]  # [start, end) page indices, None for the whole file
+    pages: int  # Used to balance tasks, 1 when the page count is unknown
+
+    @property
+    def key(self) -> str:
+        if self.page_range is None:
+            return self.filepath
+        return f"{self.filepath}:{self.page_range[0]}-{self.page_range[1]}"
+
+    @property
+    def page_range_str(self) -> Optional[str]:
+        """The page range in the --page_range option format."""
+        if self.page_range is None:
+            return None
+        return f"{self.page_range[0]}-{self.page_range[1] - 1}"
+
+
+def count_file_pages(filepath: str) -> Optional[int]:
+    """Count the pages of a PDF, or None for other files and unreadable PDFs."""
+    from extractor.core.providers.pdf import PdfProvider
+    from extractor.core.providers.registry import provider_from_filepath
+
+    try:
+        if provider_from_filepath(filepath) is not PdfProvider:
+            return None
+        return PdfProvider.count_pages(filepath)
+    except Exception as e:
+        logger.warning(f"Could not count pages of {filepath}: {e}")
+        return None
+
+
+def auto_pages_per_task(total_pages: int, workers: int, minimum: int = 25) -> int:
+    """Aim for several tasks per worker, so the last ones finish close together."""
+    return max(minimum, math.ceil(total_pages / max(1, workers * 4)))
+
+
+def plan_tasks(
+    files: Iterable[str],
+    page_counts: Dict[str, Optional[int]],
+    pages_per_task: Optional[int],
+) -> List[ConversionTask]:
+    """
+    Split files into conversion tasks, largest first.
+
+    Args:
+        files: Files to convert
+        page_counts: Page count per file, None if unknown
+        pages_per_task: Split PDFs longer than this into page ranges. None or 0 disables splitting.
+
+    Returns:
+        Tasks sorted by descending page count
+    """
+    tasks = []
+    for filepath in files:
+        pages = page_counts.get(filepath)
+        if not pages or not pages_per_task or pages <= pages_per_task:
+            tasks.append(ConversionTask(filepath, None, pages or 1))
+            continue
+
+        # Equal sized parts, so the last part of a file isn't a sliver
+        parts = math.ceil(pages / pages_per_task)
+        size = math.ceil(pages / parts)
+        for start in range(0, pages, size):
+            end = min(pages, start + size)
+            tasks.append(ConversionTask(filepath, (start, end), end - start))
+
+    # Longest processing time first keeps the tail short
+    return sorted(tasks, key=lambda task: task.pages, reverse=True)
+
+
+def options_fingerprint(options: Dict) -> str:
+    """Fingerprint the CLI options that affect converted output."""
+    ignored = {"workers", "debug_print", "max_tasks_per_worker", "chunk_idx", "num_chunks", "max_files", "skip_existing", "resume", "manifest"}
+    payload = json.dumps({k: v for k, v in options.items() if k not in ignored}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ConversionManifest:
+    """
+    Progress of a batch conversion, saved after every finished task.
+
+    Entries are keyed by task, and by file once all of a file's parts are
+    merged.  Earlier progress is only loaded when resuming; files that changed
+    on disk, or a run with different options, start over regardless.
+    """
+
+    def __init__(self, path: str, fingerprint: str, resume: bool = False):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.tasks: Dict[str, Dict] = {}
+        self.files: Dict[str, Dict] = {}
+        if resume:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            return
+
+        if data.get("fingerprint") != self.fingerprint:
+            logger.info("Conversion options changed since the manifest was written, starting over")
+            return
+        self.tasks = data.get("tasks", {})
+        self.files = data.get("files", {})
+
+    @staticmethod
+    def _file_state(filepath: str) -> Dict:
+        stat = os.stat(filepath)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def _current(self, entry: Optional[Dict], filepath: str) -> bool:
+        return entry is not None and entry.get("source") == self._file_state(filepath)
+
+    def is_done(self, task: ConversionTask) -> bool:
+        return self.file_done(task.filepath) or self._current(self.tasks.get(task.key), task.filepath)
+
+    def file_done(self, filepath: str) -> bool:
+        return self._current(self.files.get(filepath), filepath)
+
+    def part_path(self, task: ConversionTask) -> Optional[str]:
+        entry = self.tasks.get(task.key)
+        return entry.get("part") if self._current(entry, task.filepath) else None
+
+    def mark_task(self, task: ConversionTask, part: Optional[str] = None):
+        self.tasks[task.key] = {"source": self._file_state(task.filepath), "part": part}
+        self.save()
+
+    def mark_file(self, filepath: str, task_keys: Iterable[str] = ()):
+        self.files[filepath] = {"source": self._file_state(filepath)}
+        for key in task_keys:
+            self.tasks.pop(key, None)
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = {"fingerprint": self.fingerprint, "tasks": self.tasks, "files": self.files}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,385 @@
+"""
+Module: camelot_search.py
+Description: Parallel Camelot parameter search with early termination
+
+camelot.read_pdf opens the whole PDF and splits out the requested page on
+every call, so trying a dozen parameter sets on one page of a large filing
+parses it a dozen times.  The search here copies the page into a one-page
+PDF once, scores the candidates in a process pool against that copy, and
+stops as soon as one clears the quality threshold.  Winning parameters are
+remembered per page layout fingerprint and tried first on similar pages.
+
+Daemonic processes (e.g. the workers of convert_cli's multiprocessing pool)
+cannot start a pool of their own, so there the candidates run in-process.
+
+External Dependencies:
+- camelot: https://camelot-py.readthedocs.io/en/master/
+- pymupdf: https://pymupdf.readthedocs.io/
+
+Sample Input:
+>>> search = CamelotParameterSearch(max_workers=4, quality_threshold=0.9, namespace="quality_evaluator")
+>>> candidates = [{"flavor": "lattice", "line_scale": 40}, {"flavor": "stream", "edge_tol": 500}]
+
+Expected Output:
+>>> result = search.search("filing.pdf", 11, candidates, score_tables)
+>>> result.params, round(result.quality, 2), result.attempts
+({'flavor': 'lattice', 'line_scale': 40}, 0.93, 1)
+
+Example Usage:
+>>> from extractor.core.utils.camelot_search import CamelotParameterSearch
+>>> result = search.search(filepath, page_num, candidates, score_tables, table_areas=["72,700,540,400"])
+>>> tables = result.tables
+"""
+
+import hashlib
+import json
+import math
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import fitz
+from loguru import logger
+
+from extractor.core.utils.table_cache import TableExtractionCache
+
+try:
+    import camelot
+    CAMELOT_AVAILABLE = True
+except ImportError:
+    CAMELOT_AVAILABLE = False
+
+# score_fn(tables, params, seconds) -> quality between 0 and 1
+ScoreFn = Callable[[List[Any], Dict[str, Any], float], float]
+
+# How often to check which pooled candidates have started, when attempts have a timeout
+ATTEMPT_POLL_SECONDS = 0.1
+
+
+class SearchResult:
+    """Best extraction found by a parameter search."""
+
+    def __init__(
+        self,
+        tables: Optional[List[Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        quality: float = 0.0,
+        attempts: int = 0,
+        memoized: bool = False,
+    ):
+        self.tables = tables
+        self.params = params or {}
+        self.quality = quality
+        self.attempts = attempts
+        self.memoized = memoized
+
+
+def extract_page(filepath: str, page_num: int, out_dir: str) -> str:
+    """Copy one page (0-based) of a PDF into its own file and return its path."""
+    out_path = os.path.join(out_dir, f"page_{page_num}.pdf")
+    with fitz.open(filepath) as src, fitz.open() as dst:
+        dst.insert_pdf(src, from_page=page_num, to_page=page_num)
+        dst.save(out_path)
+    return out_path
+
+
+def layout_fingerprint(page_pdf: str, table_areas: Optional[List[Any]] = None) -> str:
+    """
+    Fingerprint the layout of a one-page PDF.
+
+    Pages from the same report template share page size, rotation and a
+    similar amount of ruling and text, so they get the same fingerprint even
+    when the numbers in their tables differ.
+    """
+    with fitz.open(page_pdf) as doc:
+        page = doc[0]
+        drawings = page.get_drawings()
+        words = page.get_text("words")
+        features = {
+            "size": [round(page.rect.width / 10), round(page.rect.height / 10)],
+            "rotation": page.rotation,
+            # Counts are bucketed by powers of two so small differences don't matter
+            "drawings": int(math.log2(len(drawings) + 1)),
+            "words": int(math.log2(len(words) + 1)),
+            "areas": table_areas,
+        }
+    return hashlib.sha256(json.dumps(features, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def evaluate_candidate(page_pdf: str, params: Dict[str, Any], score_fn: ScoreFn) -> Tuple[Dict[str, Any], Optional[List[Any]], float, float]:
+    """
+    Run Camelot on a one-page PDF with one parameter set.
+
+    Module-level so it can be sent to worker processes.
+
+    Returns:
+        Tuple of (params, tables or None, quality, seconds)
+    """
+    start = time.time()
+    try:
+        tables = camelot.read_pdf(page_pdf, pages="1", **params)
+    except Exception as e:
+        logger.debug(f"Camelot failed with params {params}: {e}")
+        return params, None, 0.0, time.time() - start
+
+    seconds = time.time() - start
+    tables = [table for table in tables if not table.df.empty]
+    if not tables:
+        return params, None, 0.0, seconds
+
+    try:
+        quality = max(0.0, min(1.0, float(score_fn(tables, params, seconds))))
+    except Exception as e:
+        logger.debug(f"Scoring failed for params {params}: {e}")
+        quality = 0.0
+    return params, tables, quality, seconds
+
+
+_executors: Dict[int, ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(max_workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Get the shared process pool for a worker count.
+
+    Pools are kept for the life of the process, so Camelot is imported once
+    per worker rather than once per table.  Workers are spawned, since the
+    parent may hold model threads that do not survive fork.
+
+    Returns None in a daemonic process, which is not allowed to have children.
+    """
+    if mp.current_process().daemon:
+        return None
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp.get_context("spawn"))
+            _executors[max_workers] = executor
+        return executor
+
+
+def discard_executor(executor: ProcessPoolExecutor):
+    """Forget a pool that could not start or broke, so the next search gets a new one."""
+    with _executors_lock:
+        for workers, shared in list(_executors.items()):
+            if shared is executor:
+                del _executors[workers]
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class CamelotParameterSearch:
+    """
+    Searches Camelot parameters for one table, in parallel, with early stopping.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        quality_threshold: float = 0.9,
+        timeout: Optional[float] = None,
+        attempt_timeout: Optional[float] = None,
+        memoize: bool = True,
+        namespace: str = "default",
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the search.
+
+        Args:
+            max_workers: Worker processes. 1 evaluates candidates in this process.
+            quality_threshold: Stop once a candidate scores at least this (0-1).
+            timeout: Seconds to wait for the whole search. None waits for every candidate.
+            attempt_timeout: Seconds one candidate may take. Slower candidates are
+                scored 0. A candidate running in-process can't be interrupted, so its
+                result is only discarded afterwards. None lets candidates run as long
+                as they need.
+            memoize: Remember winning parameters per layout fingerprint. The memo
+                database is only opened when a search first uses it.
+            namespace: Keeps memoized parameters of different callers apart.
+            cache_dir: Directory for memoized parameters. Defaults to ~/.marker/cache/camelot_params.
+        """
+        self.max_workers = max(1, max_workers)
+        self.quality_threshold = quality_threshold
+        self.timeout = timeout
+        self.attempt_timeout = attempt_timeout
+        self.memoize = memoize
+        self.namespace = namespace
+        self.cache_dir = cache_dir
+        self._memo = None
+
+    @property
+    def memo(self) -> Optional[TableExtractionCache]:
+        if not self.memoize:
+            return None
+        if self._memo is None:
+            cache_dir = self.cache_dir or os.path.join(os.path.expanduser("~"), ".marker", "cache", "camelot_params")
+            self._memo = TableExtractionCache(cache_dir, max_size=5000, max_bytes=None)
+        return self._memo
+
+    def _memo_key(self, fingerprint: str) -> str:
+        return self.memo._compute_key(self.namespace, fingerprint)
+
+    def search(
+        self,
+        filepath: str,
+        page_num: int,
+        candidates: List[Dict[str, Any]],
+        score_fn: ScoreFn,
+        memoize: Optional[bool] = None,
+        **read_kwargs,
+    ) -> SearchResult:
+        """
+        Find the best parameters for a table.
+
+        Args:
+            filepath: Path to the PDF file
+            page_num: Page number (0-based)
+            candidates: Parameter sets to try, best guesses first
+            score_fn: Scores the tables extracted with a parameter set, 0-1
+            memoize: Overrides the instance setting for this search
+            **read_kwargs: Passed to camelot.read_pdf with every candidate, e.g. table_areas
+
+        Returns:
+            The best result found
+        """
+        if not CAMELOT_AVAILABLE:
+            logger.warning("Camelot is not available. Cannot search table extraction parameters.")
+            return SearchResult()
+
+        # Filled in as candidates are scored, so a failure part way keeps the best so far
+        result = SearchResult()
+        work_dir = tempfile.mkdtemp(prefix="camelot_search_")
+        try:
+            page_pdf = extract_page(filepath, page_num, work_dir)
+
+            memo = self.memo if (self.memoize if memoize is None else memoize) else None
+            fingerprint = None
+            memoized = None
+            if memo is not None:
+                fingerprint = layout_fingerprint(page_pdf, read_kwargs.get("table_areas"))
+                memoized = memo.get(self._memo_key(fingerprint))
+            if memoized is not None:
+                candidates = [memoized] + [c for c in candidates if c != memoized]
+
+            self._run(result, page_pdf, candidates, score_fn, read_kwargs)
+            result.memoized = memoized is not None and result.params == memoized and result.attempts == 1
+
+            if fingerprint is not None and result.tables and result.params != memoized:
+                memo.set(self._memo_key(fingerprint), result.params)
+            logger.info(
+                f"Best table quality on page {page_num + 1}: {result.quality:.4f} "
+                f"after {result.attempts} of {len(candidates)} candidates"
+                + (" (memoized parameters)" if result.memoized else "")
+            )
+            return result
+        except Exception as e:
+            logger.error(f"Camelot parameter search failed on page {page_num + 1}: {e}")
+            return result
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _run(self, best: SearchResult, page_pdf: str, candidates: List[Dict[str, Any]], score_fn: ScoreFn, read_kwargs: Dict[str, Any]):
+        deadline = time.time() + self.timeout if self.timeout is not None else None
+
+        def consider(params, tables, quality):
+            best.attempts += 1
+            if tables and quality > best.quality:
+                best.tables, best.params, best.quality = tables, params, quality
+            return quality >= self.quality_threshold
+
+        def run_inline(candidates):
+            for candidate in candidates:
+                if deadline is not None and time.time() > deadline:
+                    logger.warning(f"Camelot parameter search timed out after {self.timeout} seconds")
+                    return
+                _, tables, quality, seconds = evaluate_candidate(page_pdf, {**candidate, **read_kwargs}, score_fn)
+                if self.attempt_timeout is not None and seconds > self.attempt_timeout:
+                    logger.debug(f"Candidate {candidate} took {seconds:.1f}s, over the {self.attempt_timeout}s attempt timeout")
+                    tables, quality = None, 0.0
+                if consider(candidate, tables, quality):
+                    return
+
+        if not candidates:
+            return
+
+        # The first candidate (memoized or historically best) often clears the
+        # threshold alone, which avoids dispatching to the pool at all
+        first, rest = candidates[0], candidates[1:]
+        before = best.attempts
+        run_inline([first])
+        if best.attempts == before or best.quality >= self.quality_threshold or not rest:
+            return
+
+        executor = get_executor(self.max_workers) if self.max_workers > 1 else None
+        if executor is None:
+            run_inline(rest)
+            return
+
+        futures: Dict[Future, Dict[str, Any]] = {}
+        try:
+            for candidate in rest:
+                futures[executor.submit(evaluate_candidate, page_pdf, {**candidate, **read_kwargs}, score_fn)] = candidate
+        except Exception as e:
+            logger.warning(f"Could not start Camelot worker processes, searching in-process: {e}")
+            for future in futures:
+                future.cancel()
+            discard_executor(executor)
+            run_inline(rest)
+            return
+
+        started: Dict[Future, float] = {}
+        pending = set(futures)
+        unfinished: List[Dict[str, Any]] = []
+        try:
+            while pending:
+                now = time.time()
+                waits = []
+                if deadline is not None:
+                    waits.append(deadline - now)
+                if self.attempt_timeout is not None:
+                    for future in pending:
+                        if future not in started and future.running():
+                            started[future] = now
+                    waits.append(ATTEMPT_POLL_SECONDS)
+                    waits.extend(started[future] + self.attempt_timeout - now for future in pending if future in started)
+                remaining = max(0.0, min(waits)) if waits else None
+
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        _, tables, quality, _ = future.result()
+                    except BrokenProcessPool:
+                        unfinished.append(futures[future])
+                        continue
+                    except Exception as e:
+                        logger.debug(f"Candidate {futures[future]} failed: {e}")
+                        tables, quality = None, 0.0
+                    if consider(futures[future], tables, quality):
+                        return
+
+                if pending and deadline is not None and time.time() >= deadline:
+                    logger.warning(f"Camelot parameter search timed out after {self.timeout} seconds")
+                    return
+                if self.attempt_timeout is not None:
+                    # A running candidate can't be stopped, it finishes unobserved
+                    expired = {future for future in pending if future in started and time.time() - started[future] > self.attempt_timeout}
+                    for future in expired:
+                        logger.debug(f"Candidate {futures[future]} exceeded the {self.attempt_timeout}s attempt timeout")
+                        consider(futures[future], None, 0.0)
+                    pending -= expired
+        finally:
+            # Candidates that have not started yet are dropped, running ones finish unobserved
+            for future in pending:
+                future.cancel()
+
+        if unfinished:
+            logger.warning("Camelot worker pool broke, finishing the search in-process")
+            discard_executor(executor)
+            run_inline(unfinished)
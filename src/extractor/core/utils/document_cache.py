@@ -0,0 +1,252 @@
+"""
+Content-addressed cache for fully built documents.
+Module: document_cache.py
+
+This module stores the serialized Document produced by PdfConverter so that an
+identical file converted with an identical configuration skips layout, OCR,
+tables and every LLM processor.  The cached object is the Document itself, not
+the rendered output, so any renderer can be run against a cache hit.  Page
+images are left out; the converter gives a cached document a fresh image
+source, the same way it does for pages restored by incremental conversion.
+
+Keys combine:
+- sha256 of the file contents
+- a fingerprint of the config dict
+- the builder and processor classes in pipeline order
+
+References:
+- Python pickle documentation: https://docs.python.org/3/library/pickle.html
+
+Sample input:
+- Path to a PDF, the converter config and its processor list
+
+Expected output:
+- The previously built Document, or None on a miss
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from enum import Enum
+from pathlib import PurePath
+from typing import Any, Iterable, Optional
+
+from loguru import logger
+from pydantic import BaseModel
+
+
+def hash_file(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Hash a file's contents in chunks.
+
+    Args:
+        filepath: Path to the file
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Hex sha256 digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stable_value(value: Any) -> Any:
+    # Called by json.dumps for anything it can't serialize itself.  A value
+    # without a stable form is rejected: str() of an arbitrary object embeds
+    # its memory address, which would silently give every run a new key.
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, PurePath):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=lambda item: json.dumps(item, sort_keys=True, default=_stable_value))
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    raise TypeError(f"Can't fingerprint a value of type {type(value).__name__}: {value!r}")
+
+
+def config_fingerprint(config: Optional[BaseModel | dict], components: Iterable[Any] = ()) -> str:
+    """
+    Fingerprint a converter configuration.
+
+    Args:
+        config: Converter config dict or pydantic model
+        components: Builder/processor classes or instances, in pipeline order
+
+    Returns:
+        Hex sha256 digest that changes whenever the config or pipeline changes
+
+    Raises:
+        TypeError: If the config holds a value with no stable serialized form
+    """
+    if isinstance(config, BaseModel):
+        config = config.model_dump(mode="json")
+    component_names = []
+    for component in components:
+        if component is None:
+            continue
+        component_names.append(_stable_value(component if isinstance(component, type) else type(component)))
+        # Meta processors wrap a list of processors that also affect the output
+        for nested in getattr(component, "processors", None) or []:
+            component_names.append(_stable_value(type(nested)))
+    payload = json.dumps(
+        {"config": config or {}, "components": component_names},
+        sort_keys=True,
+        default=_stable_value,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def strip_page_images(document: Any) -> Any:
+    """
+    A shallow copy of a document whose pages hold no rendered images.
+
+    Page images are most of a pickled document's size and are cheap to render
+    again, so they are dropped along with the page image sources.
+    """
+    pages = []
+    for page in document.pages:
+        page = page.model_copy(update={"lowres_image": None, "highres_image": None})
+        page.set_image_source(None)
+        pages.append(page)
+    return document.model_copy(update={"pages": pages})
+
+
+class DocumentCache:
+    """
+    Disk-based cache for built Document objects.
+
+    Each entry is one pickle file named after its key, written atomically so
+    concurrent converters sharing a cache directory never read partial files.
+    Entries are evicted least recently used first, once there are more than
+    max_entries of them or they take up more than max_bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 500, max_bytes: Optional[int] = 2 << 30):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory to store cache files. Defaults to ~/.marker/cache/documents.
+            max_entries: Maximum number of documents to keep.
+            max_bytes: Maximum total size of the cache files, None for no limit.
+        """
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".marker", "cache", "documents")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def compute_key(self, filepath: str, fingerprint: str) -> str:
+        """
+        Compute the cache key for a file and config fingerprint.
+
+        Args:
+            filepath: Path to the source file
+            fingerprint: Result of config_fingerprint()
+
+        Returns:
+            Cache key as a string
+        """
+        return hashlib.sha256(f"{hash_file(filepath)}:{fingerprint}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a document from the cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached Document, without page images, or None if not found
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                document = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.error(f"Error loading cached document {key}: {str(e)}")
+            return None
+
+        # Touch the entry so eviction drops the least recently used documents
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return document
+
+    def set(self, key: str, document: Any) -> None:
+        """
+        Store a document in the cache, without its page images.
+
+        Documents larger than max_bytes on their own are not stored.
+
+        Args:
+            key: Cache key
+            document: Document to store, left unchanged
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(strip_page_images(document), f, protocol=pickle.HIGHEST_PROTOCOL)
+            if self.max_bytes is not None and os.path.getsize(tmp_path) > self.max_bytes:
+                logger.warning(f"Not caching document {key}, it is larger than the cache")
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, self._path(key))
+        except (OSError, pickle.PicklingError, TypeError) as e:
+            logger.error(f"Error saving cached document {key}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".pkl"):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Newest first; everything past the first entry that breaks a limit goes
+        entries.sort(reverse=True)
+        kept = 0
+        kept_bytes = 0
+        for _, size, path in entries:
+            kept += 1
+            kept_bytes += size
+            if kept <= self.max_entries and (self.max_bytes is None or kept_bytes <= self.max_bytes):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Clear all cached documents."""
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(".pkl"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, filename))
+                except OSError:
+                    pass
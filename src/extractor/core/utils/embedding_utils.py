@@ -2,6 +2,10 @@
 Module: embedding_utils.py
 Description: Utility functions and helpers for embedding utils
 
+get_embeddings embeds many texts at once: texts are grouped by length into
+padded mini-batches and each embedding is memoized on disk by model and text
+hash, so re-importing a corpus only runs the model on new text.
+
 External Dependencies:
 - numpy: https://numpy.org/doc/
 - loguru: [Documentation URL]
@@ -10,18 +14,24 @@ External Dependencies:
 - transformers: [Documentation URL]
 
 Sample Input:
->>> # Add specific examples based on module functionality
+>>> texts = ["Introduction to Python", "Python is a high-level language."]
 
 Expected Output:
->>> # Add expected output examples
+>>> vectors = get_embeddings(texts)
+>>> len(vectors), len(vectors[0])
+(2, 1024)
 
 Example Usage:
->>> # Add usage examples
+>>> from extractor.core.utils.embedding_utils import get_embeddings, cosine_similarity
+>>> a, b = get_embeddings(["first block", "second block"], batch_size=64)
+>>> cosine_similarity(a, b)
 """
 
 # marker/utils/embedding_utils.py
 import os
+import base64
 import hashlib
+import threading
 import numpy as np
 from typing import List, Dict, Any, Optional, Union
 import sys
@@ -29,6 +39,8 @@ import time
 from loguru import logger
 from dotenv import load_dotenv
 
+from extractor.core.utils.table_cache import TableExtractionCache
+
 # Initialize flags and settings
 load_dotenv()
 has_transformers = False
@@ -45,10 +57,61 @@ except ImportError:
 # Model config (load from env or use defaults)
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "BAAI/bge-large-en")
 EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", 1024))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 200000))
 
 # Initialize model variables
 _model = None
 _tokenizer = None
+_model_lock = threading.Lock()
+_cache = None
+
+
+class EmbeddingCache(TableExtractionCache):
+    """
+    Disk-based cache of embedding vectors, keyed by model and text hash.
+
+    Vectors are stored as base64 float32 bytes, about a quarter of the size
+    of a JSON list of floats.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_size: int = EMBEDDING_CACHE_SIZE,
+        max_bytes: Optional[int] = 1024 * 1024 * 1024,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory to store the cache database. Defaults to ~/.marker/cache/embeddings.
+            max_size: Maximum number of embeddings to keep.
+            max_bytes: Maximum total size of cached embeddings in bytes. None disables the limit.
+        """
+        cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".marker", "cache", "embeddings")
+        super().__init__(cache_dir, max_size=max_size, max_bytes=max_bytes)
+
+    @staticmethod
+    def compute_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def encode(embedding: np.ndarray) -> str:
+        return base64.b64encode(np.asarray(embedding, dtype=np.float32).tobytes()).decode("ascii")
+
+    @staticmethod
+    def decode(value: str) -> List[float]:
+        return np.frombuffer(base64.b64decode(value), dtype=np.float32).tolist()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the shared embedding cache for this process."""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(EMBEDDING_CACHE_DIR)
+    return _cache
 
 def _initialize_model():
     """Initialize the BAAI/bge embedding model and tokenizer."""
@@ -86,61 +149,125 @@ def get_embedding(text: str, model: str = None) -> Optional[List[float]]:
     Returns:
         List of embedding values or None if embedding failed
     """
-    global _model, _tokenizer
+    return get_embeddings([text], model=model)[0]
+
+def get_embeddings(
+    texts: List[str],
+    model: str = None,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    use_cache: bool = True
+) -> List[List[float]]:
+    """
+    Get embedding vectors for many texts using BAAI/bge model.
+    
+    Duplicate texts are embedded once. Texts not in the cache are sorted by
+    length and run through the model in padded mini-batches, so each batch
+    pads to a similar length.
     
-    # Use default model if not specified
+    Args:
+        texts: The texts to embed
+        model: Optional model name (defaults to config value)
+        batch_size: Number of texts per forward pass
+        use_cache: Read and write the on-disk embedding cache
+        
+    Returns:
+        List of embedding vectors, in the same order as texts
+    """
     model = model or EMBEDDING_MODEL
+    if not texts:
+        return []
     
-    logger.info(f"Generating embedding for text: {text[:50]}...")
+    unique_texts = list(dict.fromkeys(texts))
+    embeddings: Dict[str, List[float]] = {}
     
-    if has_transformers:
-        # Initialize model if not done yet
-        if _model is None or _tokenizer is None:
-            success = _initialize_model()
-            if not success:
-                return _fallback_embedding(text)
+    cache = get_embedding_cache() if use_cache else None
+    keys = {}
+    if cache is not None:
+        keys = {text: cache.compute_key(model, text) for text in unique_texts}
+        cached = cache.get_many(list(keys.values()))
+        for text, key in keys.items():
+            if key in cached:
+                embeddings[text] = cache.decode(cached[key])
+    
+    missing = [text for text in unique_texts if text not in embeddings]
+    if missing:
+        start = time.time()
+        computed = _compute_embeddings(missing, batch_size)
+        if cache is not None and computed:
+            cache.set_many({keys[text]: cache.encode(vector) for text, vector in computed.items()})
+        for text in missing:
+            embeddings[text] = computed[text].tolist() if text in computed else _fallback_embedding(text, warn=False)
         
+        fallback_count = len(missing) - len(computed)
+        if fallback_count:
+            logger.warning(f"Used fallback (hash-based) embeddings for {fallback_count} texts")
+        logger.info(
+            f"Embedded {len(missing)} texts in {time.time() - start:.2f}s "
+            f"({len(unique_texts) - len(missing)} cached, {len(texts) - len(unique_texts)} duplicates)"
+        )
+    
+    return [embeddings[text] for text in texts]
+
+def _compute_embeddings(texts: List[str], batch_size: int) -> Dict[str, np.ndarray]:
+    """
+    Run the model over texts in length-sorted mini-batches.
+    
+    Returns:
+        Normalized embeddings by text. Texts whose batch failed are left out.
+    """
+    if not has_transformers:
+        return {}
+    
+    with _model_lock:
+        if _model is None or _tokenizer is None:
+            if not _initialize_model():
+                return {}
+    
+    results = {}
+    ordered = sorted(texts, key=len, reverse=True)
+    batch_size = max(1, batch_size)
+    for i in range(0, len(ordered), batch_size):
+        batch = ordered[i:i + batch_size]
         try:
-            # Prepare inputs
-            encoded_input = _tokenizer(text, padding=True, truncation=True, 
-                                      return_tensors='pt', max_length=512)
+            encoded_input = _tokenizer(batch, padding=True, truncation=True,
+                                       return_tensors='pt', max_length=512)
             
             # Move inputs to GPU if available
             if torch.cuda.is_available():
                 encoded_input = {k: v.to("cuda") for k, v in encoded_input.items()}
             
-            # Compute embedding
+            # CLS pooling, as recommended for BGE models
             with torch.no_grad():
                 model_output = _model(**encoded_input)
-                embedding = model_output.last_hidden_state[:, 0, :].cpu().numpy()[0]
+                batch_embeddings = model_output.last_hidden_state[:, 0, :].float().cpu().numpy()
             
-            # Normalize embedding
-            norm = np.linalg.norm(embedding)
-            if norm > 0:
-                embedding = embedding / norm
+            # Normalize embeddings
+            norms = np.linalg.norm(batch_embeddings, axis=1, keepdims=True)
+            batch_embeddings = batch_embeddings / np.where(norms > 0, norms, 1)
             
-            return embedding.tolist()
+            for text, embedding in zip(batch, batch_embeddings):
+                results[text] = embedding
+            logger.debug(f"Embedded batch of {len(batch)} texts (max {len(batch[0])} chars)")
         
         except Exception as e:
-            logger.error(f"Error generating embedding with {EMBEDDING_MODEL}: {e}")
-            # Fall back to hash-based method
-            return _fallback_embedding(text)
+            logger.error(f"Error generating embeddings with {EMBEDDING_MODEL}: {e}")
     
-    # Use fallback method if transformers not available
-    return _fallback_embedding(text)
+    return results
 
-def _fallback_embedding(text: str) -> List[float]:
+def _fallback_embedding(text: str, warn: bool = True) -> List[float]:
     """
     Generate a deterministic fallback embedding using text hash.
     This is only used when the primary embedding method fails.
     
     Args:
         text: The text to embed
+        warn: Log a warning for this text
         
     Returns:
         List of embedding values
     """
-    logger.warning("Using fallback embedding method (hash-based)")
+    if warn:
+        logger.warning("Using fallback embedding method (hash-based)")
     
     # Use text hash as seed
     text_hash = hashlib.md5(text.encode()).hexdigest()
@@ -298,7 +425,23 @@ def validate_embedding_utils():
         description="Check get_embedding returns a non-empty vector"
     )
     
-    # Test 7: Cosine similarity calculation
+    # Test 7: Batch embedding keeps input order and dimensions
+    batch_texts = ["First batch text", "Second, somewhat longer batch text", "First batch text"]
+    batch_embeddings = get_embeddings(batch_texts, use_cache=False)
+    validator.check(
+        "get_embeddings returns one vector per text",
+        expected=len(batch_texts),
+        actual=len(batch_embeddings),
+        description="Check get_embeddings returns a vector for every input, including duplicates"
+    )
+    validator.check(
+        "get_embeddings returns equal vectors for duplicate texts",
+        expected=True,
+        actual=batch_embeddings[0] == batch_embeddings[2],
+        description="Check duplicate texts get the same embedding"
+    )
+    
+    # Test 8: Cosine similarity calculation
     vector1 = [1.0, 0.0, 0.0]
     vector2 = [1.0, 0.0, 0.0]
     vector3 = [0.0, 1.0, 0.0]
@@ -328,7 +471,7 @@ def validate_embedding_utils():
         description="Check cosine similarity of opposite vectors = -1.0"
     )
     
-    # Test 8: Zero vector handling
+    # Test 9: Zero vector handling
     zero_vector = [0.0, 0.0, 0.0]
     similarity_with_zero = cosine_similarity(vector1, zero_vector)
     validator.check(
@@ -338,7 +481,7 @@ def validate_embedding_utils():
         description="Check cosine similarity with zero vector = 0.0"
     )
     
-    # Test 9: calculate_cosine_similarity alias
+    # Test 10: calculate_cosine_similarity alias
     validator.check(
         "calculate_cosine_similarity is alias of cosine_similarity",
         expected=True,
@@ -0,0 +1,275 @@
+"""
+Per-page cache for incremental re-conversion of revised PDFs.
+Module: page_cache.py
+
+When a new revision of a document changes only a few pages, the pages that did
+not change can reuse the PageGroup built for them in an earlier run.  Pages are
+compared by a hash of what they draw (content streams, images, form XObjects,
+fonts, links and annotations), so a revision that rewrites the whole file but
+keeps most pages intact still matches page by page.
+
+Stored pages are the state after the builders and page-local processors, before
+any document-level processor ran, so the document-level processors always see
+the same input they would in a full conversion.
+
+Each document gets a directory holding a manifest and one pickle per page,
+written atomically so concurrent converters never read partial files.
+
+References:
+- PyMuPDF Page API: https://pymupdf.readthedocs.io/en/latest/page.html
+
+Sample input:
+- Path to a PDF and the page ids to hash
+
+Expected output:
+- Page hashes, and the stored PageGroups of pages whose hash did not change
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional
+
+import fitz
+from loguru import logger
+
+from extractor.core.schema.blocks import BlockId
+from extractor.core.schema.groups.page import PageGroup
+
+
+def _page_digest(doc: fitz.Document, page: fitz.Page, stream_digests: Dict[int, str]) -> str:
+    def stream_digest(xref: int) -> str:
+        # Shared images and XObjects are hashed once per document
+        if xref not in stream_digests:
+            stream_digests[xref] = hashlib.sha256(doc.xref_stream_raw(xref) or b"").hexdigest()
+        return stream_digests[xref]
+
+    digest = hashlib.sha256()
+    # Object numbers change whenever a PDF is rewritten, so only content is hashed
+    geometry = [list(page.rect), list(page.mediabox), page.rotation]
+    digest.update(json.dumps(geometry).encode())
+    digest.update(page.read_contents())
+    for image in page.get_images(full=True):
+        digest.update(stream_digest(image[0]).encode())
+    for xobject in page.get_xobjects():
+        digest.update(stream_digest(xobject[0]).encode())
+    fonts = sorted(font[1:] for font in page.get_fonts(full=True))
+    digest.update(json.dumps(fonts, default=str).encode())
+    # Link targets are page numbers, so a page whose target moved is changed too
+    links = [[link.get("kind"), list(link["from"]), link.get("page"), link.get("uri")] for link in page.get_links()]
+    digest.update(json.dumps(links, default=str).encode())
+    annots = [[annot.type[1], list(annot.rect), annot.info.get("content")] for annot in page.annots()]
+    digest.update(json.dumps(annots, default=str).encode())
+    return digest.hexdigest()
+
+
+def hash_pdf_pages(filepath: str, page_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+    """
+    Hash the content of PDF pages.
+
+    Args:
+        filepath: Path to the PDF
+        page_ids: Page indices to hash
+
+    Returns:
+        Mapping of page id to hex sha256 digest, or None for pages that could not be hashed
+    """
+    hashes: Dict[int, Optional[str]] = {}
+    stream_digests: Dict[int, str] = {}
+    with fitz.open(filepath) as doc:
+        for page_id in page_ids:
+            try:
+                hashes[page_id] = _page_digest(doc, doc[page_id], stream_digests)
+            except Exception as e:
+                # An unhashable page is simply converted again
+                logger.warning(f"Could not hash page {page_id} of {filepath}: {e}")
+                hashes[page_id] = None
+    return hashes
+
+
+def remap_page(page: PageGroup, page_id: int) -> PageGroup:
+    """
+    Move a stored page to a new page id, updating its blocks and structure.
+
+    Args:
+        page: Page restored from the cache
+        page_id: Page id in the current document
+
+    Returns:
+        The same page, updated in place
+    """
+    old_page_id = page.page_id
+    if old_page_id == page_id:
+        return page
+
+    def move(block_id: BlockId) -> BlockId:
+        if block_id.page_id != old_page_id:
+            return block_id
+        return BlockId(page_id=page_id, block_id=block_id.block_id, block_type=block_id.block_type)
+
+    page.page_id = page_id
+    if page.structure is not None:
+        page.structure = [move(block_id) for block_id in page.structure]
+    for block in page.children or []:
+        block.page_id = page_id
+        if block.structure is not None:
+            block.structure = [move(block_id) for block_id in block.structure]
+    return page
+
+
+def plan_reuse(hashes: Dict[int, Optional[str]], stored: Dict[int, Dict[str, Any]]) -> Dict[int, int]:
+    """
+    Match the current pages against the pages stored by an earlier run.
+
+    A page is matched to the stored page with the same id and hash first, then
+    to any stored page with the same hash.  Pages with link targets (refs) are
+    only reused at their old position, since the targets are named after the
+    page id.
+
+    Args:
+        hashes: Current page id to page hash
+        stored: Stored page id to manifest entry
+
+    Returns:
+        Mapping of current page id to the stored page id to restore it from
+    """
+    by_hash: Dict[str, List[int]] = {}
+    for stored_id, entry in sorted(stored.items()):
+        if entry.get("hash") and entry.get("movable"):
+            by_hash.setdefault(entry["hash"], []).append(stored_id)
+
+    plan = {}
+    for page_id, page_hash in hashes.items():
+        if page_hash is None:
+            continue
+        entry = stored.get(page_id)
+        if entry is not None and entry.get("hash") == page_hash:
+            plan[page_id] = page_id
+        elif by_hash.get(page_hash):
+            plan[page_id] = by_hash[page_hash][0]
+    return plan
+
+
+def snapshot_page(page: PageGroup) -> bytes:
+    """Serialize a page without its rendered images, which are cheap to render again."""
+    snapshot = page.model_copy(update={"lowres_image": None, "highres_image": None})
+    snapshot.set_image_source(None)
+    return pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class PageCache:
+    """
+    Disk-based cache of built pages, keyed by document and page hash.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory to store cache files. Defaults to ~/.marker/cache/pages.
+        """
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".marker", "cache", "pages")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _document_dir(self, document_key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(document_key.encode()).hexdigest())
+
+    def _write_atomic(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self, document_key: str, fingerprint: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Load the manifest of a document's stored pages.
+
+        Args:
+            document_key: Identifies the document across revisions, e.g. its path
+            fingerprint: Result of config_fingerprint() for the current pipeline
+
+        Returns:
+            Mapping of stored page id to manifest entry.  Empty when nothing was
+            stored or the pipeline changed since.
+        """
+        path = os.path.join(self._document_dir(document_key), "manifest.json")
+        try:
+            with open(path, "r") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading page manifest for {document_key}: {str(e)}")
+            return {}
+
+        if manifest.get("fingerprint") != fingerprint:
+            return {}
+        return {int(page_id): entry for page_id, entry in manifest.get("pages", {}).items()}
+
+    def get_page(self, document_key: str, entry: Dict[str, Any]) -> Optional[PageGroup]:
+        """
+        Load a stored page.
+
+        Args:
+            document_key: Identifies the document across revisions
+            entry: Manifest entry returned by load()
+
+        Returns:
+            The stored PageGroup or None if it can't be read
+        """
+        path = os.path.join(self._document_dir(document_key), entry["file"])
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.error(f"Error loading cached page {entry['file']}: {str(e)}")
+            return None
+
+    def save(
+        self,
+        document_key: str,
+        fingerprint: str,
+        entries: Dict[int, Dict[str, Any]],
+        snapshots: Dict[int, bytes],
+    ):
+        """
+        Store a document's pages, replacing the previous revision.
+
+        Args:
+            document_key: Identifies the document across revisions
+            fingerprint: Result of config_fingerprint() for the current pipeline
+            entries: Page id to manifest entry ({"hash", "movable"}, plus "file" for reused pages)
+            snapshots: Page id to snapshot_page() bytes for pages that were built in this run
+        """
+        document_dir = self._document_dir(document_key)
+        os.makedirs(document_dir, exist_ok=True)
+        try:
+            pages = {}
+            for page_id, entry in entries.items():
+                entry = dict(entry)
+                if page_id in snapshots:
+                    entry["file"] = f"{entry['hash'] or 'unhashed'}_{page_id}.pkl"
+                    self._write_atomic(os.path.join(document_dir, entry["file"]), snapshots[page_id])
+                if entry.get("file"):
+                    pages[str(page_id)] = entry
+
+            manifest = {"fingerprint": fingerprint, "pages": pages}
+            self._write_atomic(os.path.join(document_dir, "manifest.json"), json.dumps(manifest).encode())
+
+            # Drop pages of earlier revisions that are no longer referenced
+            referenced = {entry["file"] for entry in pages.values()}
+            for name in os.listdir(document_dir):
+                if name.endswith(".pkl") and name not in referenced:
+                    os.remove(os.path.join(document_dir, name))
+        except Exception as e:
+            logger.error(f"Error saving cached pages for {document_key}: {str(e)}")
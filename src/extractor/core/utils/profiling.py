@@ -0,0 +1,518 @@
+"""
+Module: profiling.py
+Description: Per-stage profiling of the conversion pipeline with Chrome trace and OpenTelemetry export
+
+Each builder and processor runs inside a stage that records wall time, CPU
+time, the peak resident memory above the level it started at, GPU memory when
+torch is using CUDA, and the model and LLM calls the stage made.  Model and
+LLM calls are counted by swapping the stage's `*_model` and `llm_service`
+attributes for recording wrappers while it runs, so no builder or processor
+needs to know about profiling.
+
+Stages nest: the DocumentBuilder stage contains the layout, line and OCR
+builder stages, and with per-page profiling a processor stage contains one
+stage per page.  Counts of nested stages are included in their parents.
+
+External Dependencies:
+- psutil: https://psutil.readthedocs.io/ (resident memory, optional)
+
+Sample Input:
+>>> profiler = PipelineProfiler()
+>>> with profiler.stage("LayoutBuilder", "builder", pages=12):
+...     layout_builder(document, provider)
+
+Expected Output:
+>>> profiler.to_dict()["stages"][0]
+{'name': 'LayoutBuilder', 'category': 'builder', 'wall_time': 3.21, 'cpu_time': 9.87,
+ 'memory_peak_delta': 412090368, 'pages': 12,
+ 'model_calls': {'layout_model': {'calls': 1, 'items': 12, 'batch_size': 6, 'time': 3.1}}, ...}
+
+Example Usage:
+>>> profiler.run(processor, "processor", document)
+>>> profiler.save_trace("document.trace.json")                 # chrome://tracing or Perfetto
+>>> profiler.save_trace("document.otel.json", format="otel")   # OTLP/JSON spans
+"""
+
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+@dataclass
+class StageProfile:
+    """Measurements of one pipeline stage."""
+
+    name: str
+    category: str
+    index: int
+    parent: Optional[int]
+    depth: int
+    start: float  # Seconds since the profile started
+    thread_id: int
+    page_id: Optional[int] = None
+    pages: Optional[int] = None
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    memory_peak_delta: Optional[int] = None  # Bytes of resident memory above the level at stage start
+    gpu_memory_peak_delta: Optional[int] = None
+    model_calls: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    llm_calls: int = 0
+    llm_failures: int = 0
+    llm_time: float = 0.0
+    error: Optional[str] = None
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+
+    def record_model_call(self, model: str, items: Optional[int], batch_size: Optional[int], duration: float):
+        stats = self.model_calls.setdefault(model, {"calls": 0, "items": 0, "batch_size": 0, "time": 0.0})
+        stats["calls"] += 1
+        stats["items"] += items or 0
+        stats["batch_size"] = max(stats["batch_size"], batch_size or 0)
+        stats["time"] += duration
+
+    def add_counts(self, other: "StageProfile"):
+        for model, stats in other.model_calls.items():
+            total = self.model_calls.setdefault(model, {"calls": 0, "items": 0, "batch_size": 0, "time": 0.0})
+            total["calls"] += stats["calls"]
+            total["items"] += stats["items"]
+            total["batch_size"] = max(total["batch_size"], stats["batch_size"])
+            total["time"] += stats["time"]
+        self.llm_calls += other.llm_calls
+        self.llm_failures += other.llm_failures
+        self.llm_time += other.llm_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "category": self.category,
+            "parent": self.parent,
+            "start": round(self.start, 6),
+            "wall_time": round(self.wall_time, 6),
+            "cpu_time": round(self.cpu_time, 6),
+            "memory_peak_delta": self.memory_peak_delta,
+            "gpu_memory_peak_delta": self.gpu_memory_peak_delta,
+            "pages": self.pages,
+            "page_id": self.page_id,
+            "model_calls": {
+                model: {**stats, "time": round(stats["time"], 6)} for model, stats in self.model_calls.items()
+            },
+            "llm_calls": self.llm_calls,
+            "llm_failures": self.llm_failures,
+            "llm_time": round(self.llm_time, 6),
+        }
+        if self.error:
+            data["error"] = self.error
+        return data
+
+    def trace_args(self) -> Dict[str, Any]:
+        """Flat numeric attributes for trace viewers."""
+        args = {
+            "category": self.category,
+            "cpu_time": round(self.cpu_time, 6),
+            "llm_calls": self.llm_calls,
+            "llm_failures": self.llm_failures,
+        }
+        for key in ("pages", "page_id", "memory_peak_delta", "gpu_memory_peak_delta", "error"):
+            value = getattr(self, key)
+            if value is not None:
+                args[key] = value
+        for model, stats in self.model_calls.items():
+            args[f"{model}.calls"] = stats["calls"]
+            args[f"{model}.items"] = stats["items"]
+            args[f"{model}.batch_size"] = stats["batch_size"]
+        return args
+
+
+class _CallRecorder:
+    """
+    Stands in for a model or LLM service attribute while a stage runs.
+
+    Calls are timed and counted on the stage, everything else, including
+    attribute writes like `disable_tqdm`, goes to the wrapped object.
+    """
+
+    def __init__(self, target: Any, name: str, stage: StageProfile, lock: threading.Lock, llm: bool):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_stage", stage)
+        object.__setattr__(self, "_lock", lock)
+        object.__setattr__(self, "_llm", llm)
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self._target(*args, **kwargs)
+            return response
+        finally:
+            duration = time.perf_counter() - start
+            # LLM processors call from worker threads
+            with self._lock:
+                if self._llm:
+                    self._stage.llm_calls += 1
+                    self._stage.llm_time += duration
+                    # Services return an empty response when a call fails
+                    if not response:
+                        self._stage.llm_failures += 1
+                else:
+                    self._stage.record_model_call(self._name, _batch_items(args, kwargs), _batch_size(kwargs), duration)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target, name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._target, name, value)
+
+
+def _batch_items(args, kwargs) -> Optional[int]:
+    # Predictors take their inputs as the first argument or as images=
+    inputs = args[0] if args else kwargs.get("images")
+    try:
+        return len(inputs)
+    except TypeError:
+        return None
+
+
+def _batch_size(kwargs) -> Optional[int]:
+    for key, value in kwargs.items():
+        if key.endswith("batch_size") and isinstance(value, int):
+            return value
+    return None
+
+
+class _MemorySampler:
+    """Polls resident memory on a background thread while stages are open."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.process = psutil.Process() if PSUTIL_AVAILABLE else None
+        self.peaks: Dict[int, int] = {}  # Stage index -> highest RSS seen while it was open
+        self.lock = threading.Lock()
+        self.stop_event: Optional[threading.Event] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def rss(self) -> Optional[int]:
+        if self.process is None:
+            return None
+        try:
+            return self.process.memory_info().rss
+        except Exception:
+            return None
+
+    def _sample(self):
+        rss = self.rss()
+        if rss is None:
+            return
+        with self.lock:
+            for index, peak in self.peaks.items():
+                if rss > peak:
+                    self.peaks[index] = rss
+
+    def _loop(self, stop_event: threading.Event):
+        while not stop_event.wait(self.interval):
+            self._sample()
+
+    def open(self, index: int) -> Optional[int]:
+        rss = self.rss()
+        if rss is None:
+            return None
+        with self.lock:
+            self.peaks[index] = rss
+            if self.thread is None:
+                self.stop_event = threading.Event()
+                self.thread = threading.Thread(target=self._loop, args=(self.stop_event,), name="profile-memory", daemon=True)
+                self.thread.start()
+        return rss
+
+    def close(self, index: int) -> Optional[int]:
+        self._sample()
+        with self.lock:
+            peak = self.peaks.pop(index, None)
+            # The thread only runs while some stage is open
+            if not self.peaks and self.thread is not None:
+                self.stop_event.set()
+                self.thread = None
+        return peak
+
+
+class PipelineProfiler:
+    """
+    Records nested pipeline stages.
+
+    Stages are expected to run one at a time on the calling thread, as the
+    builders and processors do.  Calls a stage makes from its own worker
+    threads are still attributed to it.
+    """
+
+    def __init__(self, name: str = "document", trace_memory: bool = True, memory_interval: float = 0.01):
+        self.name = name
+        self.stages: List[StageProfile] = []
+        self._open: List[StageProfile] = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._start_ns = time.time_ns()
+        self._memory = _MemorySampler(memory_interval) if trace_memory and PSUTIL_AVAILABLE else None
+        self._trace_id = secrets.token_hex(16)
+
+    def _instrument(self, obj: Any, stage: StageProfile) -> List[tuple]:
+        """Swap the model and LLM service attributes of obj, and of the processors it wraps."""
+        targets = [obj]
+        processors = getattr(obj, "processors", None)
+        if isinstance(processors, list):
+            targets.extend(processors)
+
+        swapped = []
+        for target in targets:
+            try:
+                attributes = vars(target)
+            except TypeError:
+                continue
+            for name, value in list(attributes.items()):
+                if value is None or isinstance(value, _CallRecorder):
+                    continue
+                if name == "llm_service":
+                    recorder = _CallRecorder(value, name, stage, self._lock, llm=True)
+                elif name.endswith("_model"):
+                    recorder = _CallRecorder(value, name, stage, self._lock, llm=False)
+                else:
+                    continue
+                setattr(target, name, recorder)
+                swapped.append((target, name, value))
+        return swapped
+
+    @staticmethod
+    def _gpu():
+        torch = sys.modules.get("torch")  # Only measured when something else already loaded torch
+        try:
+            if torch is not None and torch.cuda.is_available() and torch.cuda.is_initialized():
+                return torch.cuda
+        except Exception:
+            pass
+        return None
+
+    @contextmanager
+    def stage(
+        self,
+        name: str,
+        category: str,
+        pages: Optional[int] = None,
+        page_id: Optional[int] = None,
+        instrument: Any = None,
+    ) -> Iterator[StageProfile]:
+        """
+        Measure the code run inside the block as one stage.
+
+        Args:
+            name: Stage name, usually the class name
+            category: "provider", "builder", "processor", "page", "cache", ...
+            pages: Number of pages the stage covers
+            page_id: The page, for per-page stages
+            instrument: Count the model and LLM calls made through this object's attributes
+        """
+        parent = self._open[-1] if self._open else None
+        stage = StageProfile(
+            name=name,
+            category=category,
+            index=len(self.stages),
+            parent=parent.index if parent else None,
+            depth=len(self._open),
+            start=time.perf_counter() - self._start,
+            thread_id=threading.get_ident(),
+            page_id=page_id,
+            pages=pages,
+        )
+        self.stages.append(stage)
+        self._open.append(stage)
+
+        gpu = self._gpu()
+        gpu_start = None
+        if gpu is not None:
+            # Peaks are reset per stage, so fold the parent's peak so far into it first
+            if parent is not None:
+                parent.gpu_memory_peak_delta = max(parent.gpu_memory_peak_delta or 0, gpu.max_memory_allocated())
+            gpu_start = gpu.memory_allocated()
+            gpu.reset_peak_memory_stats()
+        rss_start = self._memory.open(stage.index) if self._memory else None
+        swapped = self._instrument(instrument, stage) if instrument is not None else []
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield stage
+        except BaseException as e:
+            stage.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stage.wall_time = time.perf_counter() - wall_start
+            stage.cpu_time = time.process_time() - cpu_start
+            for target, attribute, value in swapped:
+                setattr(target, attribute, value)
+            if self._memory:
+                peak = self._memory.close(stage.index)
+                if peak is not None and rss_start is not None:
+                    stage.memory_peak_delta = max(0, peak - rss_start)
+            if gpu is not None:
+                # gpu_memory_peak_delta holds absolute peaks until the stage closes
+                peak = max(stage.gpu_memory_peak_delta or 0, gpu.max_memory_allocated())
+                if parent is not None:
+                    parent.gpu_memory_peak_delta = max(parent.gpu_memory_peak_delta or 0, peak)
+                stage.gpu_memory_peak_delta = max(0, peak - gpu_start)
+
+            self._open.pop()
+            if parent is not None:
+                parent.add_counts(stage)
+
+    def run(self, stage_callable: Any, category: str, *args, name: Optional[str] = None, pages: Optional[int] = None, page_id: Optional[int] = None, **kwargs):
+        """Call a builder, processor or provider class inside a stage named after it."""
+        if name is None:
+            name = stage_callable.__name__ if isinstance(stage_callable, type) else type(stage_callable).__name__
+        instrument = None if isinstance(stage_callable, type) else stage_callable
+        with self.stage(name, category, pages=pages, page_id=page_id, instrument=instrument):
+            return stage_callable(*args, **kwargs)
+
+    def wrap(self, stage_callable: Any, category: str, pages: Optional[int] = None) -> "ProfiledStage":
+        """A callable that runs stage_callable inside a stage, for code that calls it itself."""
+        return ProfiledStage(self, stage_callable, category, pages)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Totals per stage name, slowest first.  Per-page stages are included in their processor."""
+        totals: Dict[tuple, Dict[str, Any]] = {}
+        for stage in self.stages:
+            if stage.category == "page":
+                continue
+            key = (stage.category, stage.name)
+            total = totals.setdefault(key, {
+                "name": stage.name,
+                "category": stage.category,
+                "runs": 0,
+                "wall_time": 0.0,
+                "cpu_time": 0.0,
+                "memory_peak_delta": None,
+                "model_calls": 0,
+                "model_items": 0,
+                "llm_calls": 0,
+                "llm_failures": 0,
+            })
+            total["runs"] += 1
+            total["wall_time"] += stage.wall_time
+            total["cpu_time"] += stage.cpu_time
+            if stage.memory_peak_delta is not None:
+                total["memory_peak_delta"] = max(total["memory_peak_delta"] or 0, stage.memory_peak_delta)
+            total["model_calls"] += sum(stats["calls"] for stats in stage.model_calls.values())
+            total["model_items"] += sum(stats["items"] for stats in stage.model_calls.values())
+            total["llm_calls"] += stage.llm_calls
+            total["llm_failures"] += stage.llm_failures
+
+        rows = sorted(totals.values(), key=lambda row: row["wall_time"], reverse=True)
+        for row in rows:
+            row["wall_time"] = round(row["wall_time"], 6)
+            row["cpu_time"] = round(row["cpu_time"], 6)
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The profile as stored in document.metadata["profile"]."""
+        top_level = [stage for stage in self.stages if stage.parent is None]
+        return {
+            "name": self.name,
+            "wall_time": round(sum(stage.wall_time for stage in top_level), 6),
+            "summary": self.summary(),
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Trace Event Format, for chrome://tracing, Perfetto or speedscope."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        for stage in self.stages:
+            events.append({
+                "name": stage.name,
+                "cat": stage.category,
+                "ph": "X",
+                "ts": round(stage.start * 1e6, 3),
+                "dur": round(stage.wall_time * 1e6, 3),
+                "pid": pid,
+                "tid": stage.thread_id,
+                "args": stage.trace_args(),
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_otel(self) -> Dict[str, Any]:
+        """OTLP/JSON spans, as accepted by OpenTelemetry collectors."""
+        def attribute(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                typed = {"boolValue": value}
+            elif isinstance(value, int):
+                typed = {"intValue": str(value)}
+            elif isinstance(value, float):
+                typed = {"doubleValue": value}
+            else:
+                typed = {"stringValue": str(value)}
+            return {"key": key, "value": typed}
+
+        spans = []
+        for stage in self.stages:
+            start_ns = self._start_ns + int(stage.start * 1e9)
+            span = {
+                "traceId": self._trace_id,
+                "spanId": stage.span_id,
+                "name": stage.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + int(stage.wall_time * 1e9)),
+                "attributes": [attribute(key, value) for key, value in stage.trace_args().items()],
+                "status": {"code": 2, "message": stage.error} if stage.error else {"code": 1},
+            }
+            if stage.parent is not None:
+                span["parentSpanId"] = self.stages[stage.parent].span_id
+            spans.append(span)
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    attribute("service.name", "extractor"),
+                    attribute("document", self.name),
+                ]},
+                "scopeSpans": [{"scope": {"name": "extractor.pipeline"}, "spans": spans}],
+            }]
+        }
+
+    def save_trace(self, path: str, format: str = "chrome"):
+        """Write the trace as Chrome Trace Event JSON ("chrome") or OTLP/JSON ("otel")."""
+        if format == "chrome":
+            data = self.to_chrome_trace()
+        elif format == "otel":
+            data = self.to_otel()
+        else:
+            raise ValueError(f"Unknown trace format: {format}")
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+
+class ProfiledStage:
+    """A builder or processor that runs inside a profiler stage when called."""
+
+    def __init__(self, profiler: PipelineProfiler, stage_callable: Any, category: str, pages: Optional[int] = None):
+        self.profiler = profiler
+        self.stage_callable = stage_callable
+        self.category = category
+        self.pages = pages
+
+    def __call__(self, *args, **kwargs):
+        return self.profiler.run(self.stage_callable, self.category, *args, pages=self.pages, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stage_callable, name)
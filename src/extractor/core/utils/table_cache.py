@@ -4,9 +4,11 @@ Module: table_cache.py
 
 This module provides a caching mechanism for table extraction results to improve
 performance when processing multiple documents or when reprocessing the same document.
+Results are stored in one SQLite database that is safe to share between processes.
 
 References:
-- Python documentation on functools.lru_cache: https://docs.python.org/3/library/functools.html#functools.lru_cache
+- Python documentation on sqlite3: https://docs.python.org/3/library/sqlite3.html
+- SQLite write-ahead logging: https://www.sqlite.org/wal.html
 
 Sample input:
 - Functions to cache
@@ -16,15 +18,36 @@ Expected output:
 - Cached function results for improved performance
 """
 
+import dataclasses
 import functools
 import hashlib
+import inspect
 import json
 import os
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
 
 from loguru import logger
 
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
 class TableExtractionCache:
     """
     Cache for table extraction results.
@@ -32,51 +55,105 @@ class TableExtractionCache:
     This class provides a disk-based cache for table extraction results
     to improve performance when processing multiple documents or when
     reprocessing the same document.
+
+    Entries live in a single SQLite database in WAL mode, so several
+    convert_cli worker processes can read and write the same cache directory
+    concurrently.  Reads take no write lock: access times and hit/miss counts
+    are buffered and written in batches, with the next write or when
+    access_flush_size accesses are pending.  Entries are evicted
+    least-recently-used first once the entry or byte limits are exceeded, and
+    expire after ttl_seconds.
     """
     
-    def __init__(self, cache_dir: Optional[str] = None, max_size: int = 100):
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_size: int = 100,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None,
+        access_flush_size: int = 256,
+    ):
         """
         Initialize the cache.
         
         Args:
-            cache_dir: Directory to store cache files. If None, a temporary directory is used.
+            cache_dir: Directory to store the cache database. Defaults to ~/.marker/cache/tables.
             max_size: Maximum number of cache entries to keep.
+            max_bytes: Maximum total size of cached values in bytes. None disables the limit.
+            ttl_seconds: Seconds after which an entry expires. None disables expiry.
+            access_flush_size: Number of buffered reads after which access times are written.
         """
         self.cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".marker", "cache", "tables")
         self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.access_flush_size = access_flush_size
+        self.db_path = os.path.join(self.cache_dir, "cache.sqlite3")
+        self.hits = 0
+        self.misses = 0
         
         # Create cache directory if it doesn't exist
         os.makedirs(self.cache_dir, exist_ok=True)
-        
-        # Load cache index
-        self.cache_index = self._load_cache_index()
-    
-    def _load_cache_index(self) -> Dict[str, str]:
+
+        # Reads buffered until the next flush: key -> last access time, and hit/miss counts
+        self._lock = threading.Lock()
+        self._pending_access: Dict[str, float] = {}
+        self._pending_stats = {"hits": 0, "misses": 0}
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
         """
-        Load the cache index from disk.
-        
+        Get the SQLite connection for this thread and process.
+
+        Each thread has its own connection, so threads read concurrently.
+        Connections are not shared across fork, so a new one is opened
+        whenever the cache is used from a different process.
+
         Returns:
-            Dict mapping cache keys to cache file paths.
+            Open SQLite connection
         """
-        index_path = os.path.join(self.cache_dir, "index.json")
-        if os.path.exists(index_path):
-            try:
-                with open(index_path, "r") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                logger.error(f"Error loading cache index: {str(e)}")
-        
-        return {}
-    
-    def _save_cache_index(self) -> None:
-        """Save the cache index to disk."""
-        index_path = os.path.join(self.cache_dir, "index.json")
-        try:
-            with open(index_path, "w") as f:
-                json.dump(self.cache_index, f)
-        except IOError as e:
-            logger.error(f"Error saving cache index: {str(e)}")
-    
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _key_default(value: Any) -> Any:
+        """
+        Serialize arguments that JSON can't handle in a stable way.
+
+        Objects (e.g. the evaluator passed as self) are keyed by type and by
+        what their `cache_key()` method returns, so instances configured
+        differently don't share entries.  Dataclasses and pydantic models are
+        keyed by their fields.
+
+        Args:
+            value: Value that json.dumps could not serialize
+
+        Returns:
+            JSON-serializable stand-in for the value
+
+        Raises:
+            TypeError: If the value has no stable representation
+        """
+        name = f"{type(value).__module__}.{type(value).__qualname__}"
+        cache_key = getattr(value, "cache_key", None)
+        if callable(cache_key):
+            return [name, cache_key()]
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            return [name, dataclasses.asdict(value)]
+        if callable(getattr(value, "model_dump", None)):
+            return [name, value.model_dump(mode="json")]
+        if isinstance(value, (set, frozenset)):
+            return sorted(value, key=repr)
+        raise TypeError(f"Can't build a cache key from {name}, give it a cache_key() method")
+
     def _compute_key(self, *args, **kwargs) -> str:
         """
         Compute a cache key based on the function arguments.
@@ -87,23 +164,77 @@ class TableExtractionCache:
             
         Returns:
             Cache key as a string
+
+        Raises:
+            TypeError: If an argument has no stable representation
         """
-        # Special handling for file paths
-        if args and isinstance(args[0], str) and os.path.exists(args[0]):
-            # For file paths, use the file modification time in the key
-            filepath = args[0]
-            mtime = os.path.getmtime(filepath)
-            args_to_hash = [mtime] + list(args[1:])
-        else:
-            args_to_hash = args
-        
-        # Convert arguments to JSON and compute hash
-        arg_hash = hashlib.md5(
-            json.dumps((args_to_hash, sorted(kwargs.items())), sort_keys=True).encode()
+        # File paths are keyed by modification time and size so edits invalidate entries
+        args_to_hash = []
+        for arg in args:
+            if isinstance(arg, str) and os.path.isfile(arg):
+                stat = os.stat(arg)
+                args_to_hash.append([arg, stat.st_mtime, stat.st_size])
+            else:
+                args_to_hash.append(arg)
+
+        return hashlib.sha256(
+            json.dumps((args_to_hash, sorted(kwargs.items())), sort_keys=True, default=self._key_default).encode()
         ).hexdigest()
-        
-        return arg_hash
-    
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _note_access(self, hit_keys: List[str], misses: int, now: float) -> None:
+        """Buffer the access times and counts of a read, writing them once enough are pending."""
+        with self._lock:
+            for key in hit_keys:
+                self._pending_access[key] = now
+            self._pending_stats["hits"] += len(hit_keys)
+            self._pending_stats["misses"] += misses
+            self.hits += len(hit_keys)
+            self.misses += misses
+            due = len(self._pending_access) + self._pending_stats["misses"] >= self.access_flush_size
+        if due:
+            self.flush()
+
+    def _take_pending(self):
+        with self._lock:
+            access, stats = self._pending_access, self._pending_stats
+            self._pending_access = {}
+            self._pending_stats = {"hits": 0, "misses": 0}
+        return access, stats
+
+    def _write_pending(self, conn: sqlite3.Connection, access: Dict[str, float], stats: Dict[str, int]) -> None:
+        """Write buffered reads inside the caller's write transaction."""
+        conn.executemany(
+            "UPDATE entries SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in access.items()],
+        )
+        for name, count in stats.items():
+            if count:
+                conn.execute(
+                    "INSERT INTO stats (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (name, count),
+                )
+
+    def flush(self) -> None:
+        """Write buffered access times and hit/miss counts to the database."""
+        access, stats = self._take_pending()
+        if not access and not any(stats.values()):
+            return
+
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._write_pending(conn, access, stats)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            # Only LRU order and shared stats lose precision
+            logger.warning(f"Error recording cache accesses: {str(e)}")
+
     def get(self, key: str) -> Optional[Any]:
         """
         Get an item from the cache.
@@ -114,20 +245,24 @@ class TableExtractionCache:
         Returns:
             Cached item or None if not found
         """
-        if key not in self.cache_index:
+        now = time.time()
+        try:
+            row = self._connection().execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading cache entry: {str(e)}")
             return None
-        
-        cache_path = os.path.join(self.cache_dir, self.cache_index[key])
-        if not os.path.exists(cache_path):
-            # Remove from index if file doesn't exist
-            del self.cache_index[key]
-            self._save_cache_index()
+
+        # Expired entries are deleted by the next write
+        if row is None or self._expired(row[1], now):
+            self._note_access([], 1, now)
             return None
-        
+
+        self._note_access([key], 0, now)
         try:
-            with open(cache_path, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            return json.loads(row[0])
+        except json.JSONDecodeError as e:
             logger.error(f"Error loading cache entry: {str(e)}")
             return None
     
@@ -139,68 +274,164 @@ class TableExtractionCache:
             key: Cache key
             value: Value to cache
         """
-        # Generate a filename for the cache entry
-        filename = f"{key}.json"
-        cache_path = os.path.join(self.cache_dir, filename)
-        
+        self.set_many({key: value})
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several items from the cache in one read.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Cached items by key. Keys that are not cached are left out.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        now = time.time()
+        rows = []
+        conn = self._connection()
         try:
-            # Save the cache entry
-            with open(cache_path, "w") as f:
-                json.dump(value, f)
-            
-            # Update the index
-            self.cache_index[key] = filename
-            self._save_cache_index()
-            
-            # Clean up old entries if we've exceeded the max size
-            if len(self.cache_index) > self.max_size:
-                self._clean_cache()
-        except IOError as e:
-            logger.error(f"Error saving cache entry: {str(e)}")
-    
-    def _clean_cache(self) -> None:
-        """Clean up old cache entries."""
-        # Get a list of cache entries sorted by modification time
-        entries = []
-        for key, filename in self.cache_index.items():
-            cache_path = os.path.join(self.cache_dir, filename)
-            if os.path.exists(cache_path):
-                mtime = os.path.getmtime(cache_path)
-                entries.append((key, mtime))
-        
-        # Sort by modification time (oldest first)
-        entries.sort(key=lambda x: x[1])
-        
-        # Remove oldest entries until we're under the max size
-        entries_to_remove = len(entries) - self.max_size
-        if entries_to_remove > 0:
-            for i in range(entries_to_remove):
-                key, _ = entries[i]
-                filename = self.cache_index[key]
-                cache_path = os.path.join(self.cache_dir, filename)
-                
-                try:
-                    os.remove(cache_path)
-                except IOError:
-                    pass
-                
-                del self.cache_index[key]
-            
-            # Save the updated index
-            self._save_cache_index()
+            # One read transaction, so all keys come from the same snapshot
+            conn.execute("BEGIN")
+            # Stay well under SQLite's bound parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(conn.execute(
+                    f"SELECT key, value, created_at FROM entries WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error(f"Error reading cache entries: {str(e)}")
+            return {}
+
+        rows = [row for row in rows if not self._expired(row[2], now)]
+        self._note_access([row[0] for row in rows], len(keys) - len(rows), now)
+        results = {}
+        for key, value, _ in rows:
+            try:
+                results[key] = json.loads(value)
+            except json.JSONDecodeError as e:
+                logger.error(f"Error loading cache entry: {str(e)}")
+        return results
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        """
+        Set several items in the cache in one transaction.
+
+        Buffered reads are written in the same transaction, before eviction
+        picks the least recently used entries.
+
+        Args:
+            items: Values to cache by key
+        """
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            payload = json.dumps(value)
+            rows.append((key, payload, len(payload.encode()), now, now))
+        access, stats = self._take_pending()
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._write_pending(conn, access, stats)
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error(f"Error saving cache entries: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Remove expired entries, then least recently used ones until within limits."""
+        evicted = 0
+        if self.ttl_seconds is not None:
+            evicted += conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+
+        count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count > self.max_size:
+            # Oldest first, straight off the accessed_at index
+            evicted += conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_size,),
+            ).rowcount
+            total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+        if self.max_bytes is not None and total_bytes > self.max_bytes:
+            # Keep the most recently used entries whose sizes add up to at most max_bytes
+            evicted += conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM (SELECT key, SUM(size) OVER ("
+                "ORDER BY accessed_at DESC, key DESC ROWS UNBOUNDED PRECEDING) AS newer_bytes FROM entries) "
+                "WHERE newer_bytes > ?)",
+                (self.max_bytes,),
+            ).rowcount
+
+        if evicted:
+            conn.execute(
+                "INSERT INTO stats (name, value) VALUES ('evictions', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (evicted,),
+            )
+
+    def __contains__(self, key: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with entry count, total bytes, hit/miss counts shared by all
+            processes, and the hit/miss counts of this instance.
+        """
+        self.flush()
+        conn = self._connection()
+        count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        shared = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+
+        hits = shared.get("hits", 0)
+        misses = shared.get("misses", 0)
+        return {
+            "entries": count,
+            "bytes": total_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": shared.get("evictions", 0),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "session_hits": self.hits,
+            "session_misses": self.misses,
+        }
     
     def clear(self) -> None:
         """Clear all cache entries."""
-        for filename in self.cache_index.values():
-            cache_path = os.path.join(self.cache_dir, filename)
-            try:
-                if os.path.exists(cache_path):
-                    os.remove(cache_path)
-            except IOError:
-                pass
-        
-        self.cache_index = {}
-        self._save_cache_index()
+        self._take_pending()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM stats")
+        conn.execute("COMMIT")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
 
 
 # Global cache instance
@@ -230,18 +461,27 @@ def cached(func: Callable) -> Callable:
     Returns:
         Decorated function
     """
+    # Functions that take cache_enabled themselves still see it, e.g. to skip their own memos
+    forwards_flag = "cache_enabled" in inspect.signature(func).parameters
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         # Skip caching if cache_enabled is False
         cache_enabled = kwargs.pop("cache_enabled", True)
         if not cache_enabled:
+            if forwards_flag:
+                kwargs["cache_enabled"] = False
             return func(*args, **kwargs)
         
         # Get the cache
         cache = get_cache()
         
         # Compute the cache key
-        key = cache._compute_key(func.__name__, *args, **kwargs)
+        try:
+            key = cache._compute_key(func.__name__, *args, **kwargs)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Not caching {func.__name__}: {e}")
+            return func(*args, **kwargs)
         
         # Check if we have a cached result
         cached_result = cache.get(key)
@@ -299,7 +539,7 @@ if __name__ == "__main__":
                 all_validation_failures.append(f"Cache get returned unexpected value: {result}")
             
             # Check that the index was updated
-            if "test" not in cache.cache_index:
+            if "test" not in cache:
                 all_validation_failures.append("Cache index was not updated")
     except Exception as e:
         all_validation_failures.append(f"Error in test 1: {str(e)}")
@@ -367,14 +607,14 @@ if __name__ == "__main__":
             cache.set("test3", {"value": 3})
             
             # Check that the oldest entry was removed
-            if "test1" in cache.cache_index:
+            if "test1" in cache:
                 all_validation_failures.append("Cache cleaning failed: oldest entry was not removed")
             
             # Check that the newer entries are still there
-            if "test2" not in cache.cache_index:
+            if "test2" not in cache:
                 all_validation_failures.append("Cache cleaning removed too many entries: test2 missing")
             
-            if "test3" not in cache.cache_index:
+            if "test3" not in cache:
                 all_validation_failures.append("Cache cleaning removed too many entries: test3 missing")
     except Exception as e:
         all_validation_failures.append(f"Error in test 3: {str(e)}")
@@ -29,6 +29,7 @@ import camelot
 import pandas as pd
 from loguru import logger
 
+from extractor.core.utils.camelot_search import CamelotParameterSearch
 from extractor.core.utils.table_cache import cached
 from extractor.core.utils.table_quality_metrics import (
     calculate_accuracy_score,
@@ -63,6 +64,12 @@ class ExtractionResult:
         self.params = params or {}
 
 
+def score_table_confidence(tables: List[Any], params: Dict[str, Any], seconds: float) -> float:
+    """Average Camelot table confidence on a 0-1 scale, used to rank search candidates."""
+    scores = [calculate_table_confidence(table)['confidence'] / 100.0 for table in tables if not table.df.empty]
+    return sum(scores) / len(scores) if scores else 0.0
+
+
 class TableQualityEvaluator:
     """
     The TableQualityEvaluator class evaluates the quality of tables extracted
@@ -86,6 +93,27 @@ class TableQualityEvaluator:
             'consistency': 0.1,
             'whitespace': 0.2
         })
+        self.quality_threshold = self.config.get('quality_threshold', 0.9)
+        self.parameter_search = CamelotParameterSearch(
+            max_workers=self.config.get('search_workers', min(4, os.cpu_count() or 1)),
+            quality_threshold=self.quality_threshold,
+            timeout=self.config.get('search_timeout'),
+            memoize=self.config.get('memoize_params', self.config.get('cache_enabled', True)),
+            namespace="quality_evaluator"
+        )
+    
+    def cache_key(self) -> Dict[str, Any]:
+        """
+        Settings that @cached results of this evaluator depend on.
+        
+        Returns:
+            JSON-serializable settings, added to the cache key of every call
+        """
+        return {
+            'max_search_iterations': self.max_search_iterations,
+            'quality_threshold': self.quality_threshold,
+            'search_timeout': self.config.get('search_timeout'),
+        }
     
     def evaluate_extraction(
         self,
@@ -212,8 +240,6 @@ class TableQualityEvaluator:
         """
         logger.info(f'Finding best table extraction for page {page_num + 1}')
         
-        best_result = ExtractionResult()
-        
         # Define parameter combinations to try
         # Start with the ones that have worked well in the past
         param_combinations = list(chain(
@@ -228,45 +254,19 @@ class TableQualityEvaluator:
         # Limit the number of attempts
         param_combinations = param_combinations[:self.max_search_iterations]
         
-        total_attempts = 0
-        for current_params in param_combinations:
-            total_attempts += 1
-            logger.debug(f'Attempt {total_attempts} with params: {current_params}')
-            
-            # Add bbox if provided
-            params_with_bbox = current_params.copy()
-            if bbox:
-                params_with_bbox['table_areas'] = [bbox]
-            
-            # Try to extract tables
-            tables = self.extract_table_with_params(
-                page_num, filepath, 
-                cache_enabled=cache_enabled, 
-                **params_with_bbox
-            )
-            if not tables:
-                logger.debug('No tables extracted with these params')
-                continue
-            
-            # Evaluate the quality
-            quality_result = self.calculate_table_quality(tables)
-            current_quality = quality_result.get('average_table_extraction_quality', 0.0)
-            
-            # Make sure quality is in valid range
-            current_quality = max(0.0, min(1.0, current_quality))
-            
-            # Update best result if this is better
-            if current_quality > best_result.quality:
-                best_result = ExtractionResult(tables=tables, quality=current_quality, params=current_params)
-                logger.info(f'New best quality found: {current_quality:.4f} with params: {current_params}')
-            
-            # Early exit if quality is good enough
-            if current_quality >= 0.9:
-                logger.info(f'Found excellent quality table ({current_quality:.4f}), stopping search')
-                break
+        # The page is parsed once and candidates run in parallel until one clears quality_threshold
+        read_kwargs = {'table_areas': [bbox]} if bbox else {}
+        result = self.parameter_search.search(
+            filepath, page_num, param_combinations, score_table_confidence,
+            memoize=None if cache_enabled else False, **read_kwargs
+        )
+        
+        if result.tables:
+            param_key = str(result.params)
+            self.success_count[param_key] = self.success_count.get(param_key, 0) + 1
         
-        logger.info(f'Best quality achieved: {best_result.quality:.4f} after {total_attempts} attempts')
-        return best_result.tables, best_result.params
+        logger.info(f'Best quality achieved: {result.quality:.4f} after {result.attempts} attempts')
+        return result.tables, result.params
     
     def extract_table_with_params(
         self,
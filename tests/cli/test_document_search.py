@@ -0,0 +1,169 @@
+"""
+Module: test_document_search.py
+Description: Indexed document search returns what a full walk of the tree returns, and saved indexes are reused only for the same document
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/cli/test_document_search.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/cli/test_document_search.py -v
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from extractor.cli import search
+from extractor.cli.search import DocumentIndex, DocumentSearcher, SearchCriteria, index_path_for, load_searcher
+
+
+def block(block_id, block_type, html, bbox, children=None, images=None, **extra):
+    return {"id": block_id, "block_type": block_type, "html": html, "bbox": bbox, "children": children, "images": images, **extra}
+
+
+def make_document():
+    pages = []
+    for page_id in range(3):
+        prefix = f"/page/{page_id}"
+        pages.append(block(f"{prefix}/Page/0", "Page", "", [0, 0, 600, 800], children=[
+            block(f"{prefix}/SectionHeader/1", "SectionHeader", f"<h1>Results part {page_id}</h1>", [40, 40, 560, 80], level=1),
+            block(f"{prefix}/Text/2", "Text", f"<p>Revenue grew in quarter {page_id}</p>", [40, 100, 560, 200]),
+            block(f"{prefix}/Figure/3", "Figure", "<p>A chart</p>", [40, 300, 300, 500], images={"chart.png": "..."}),
+            block(f"{prefix}/ListGroup/4", "ListGroup", "<ul>Costs</ul>", [40, 600, 560, 760], children=[
+                block(f"{prefix}/ListItem/{5 + i}", "ListItem", f"<li>Item {i} costs</li>", [60, 610 + 40 * i, 540, 640 + 40 * i])
+                for i in range(page_id + 1)
+            ]),
+        ]))
+    return {"id": "/document/0", "block_type": "Document", "html": "", "bbox": [0, 0, 600, 800], "children": pages, "images": None}
+
+
+@pytest.fixture
+def document_path(tmp_path):
+    path = tmp_path / "doc.json"
+    path.write_text(json.dumps(make_document()))
+    return path
+
+
+def walk_search(node, criteria, path=()):
+    """The full-tree walk the index replaces, reduced to the ids it matches."""
+    results = []
+    node_id = node.id
+    path = path + (node_id,)
+    html = node.html or ""
+    children = node.children or []
+    reasons = []
+    if criteria.text and html and criteria.text.lower() in html.lower():
+        reasons.append("text")
+    if criteria.block_type:
+        if node.block_type == criteria.block_type:
+            reasons.append("type")
+        elif not hasattr(node, "children"):
+            return results
+    if criteria.section_id and node_id == criteria.section_id:
+        reasons.append("id")
+    if criteria.has_images is not None and bool(node.images) == criteria.has_images:
+        reasons.append("images")
+    if criteria.min_children is not None and len(children) >= criteria.min_children:
+        reasons.append("min")
+    if criteria.max_children is not None and len(children) <= criteria.max_children:
+        reasons.append("max")
+    if criteria.bbox_contains:
+        x, y = criteria.bbox_contains
+        if node.bbox[0] <= x <= node.bbox[2] and node.bbox[1] <= y <= node.bbox[3]:
+            reasons.append("point")
+    if criteria.metadata_key and criteria.metadata_key in vars(node):
+        reasons.append("metadata")
+    if reasons and (criteria.within_id is None or criteria.within_id in path):
+        results.append(node_id)
+    for child in children:
+        results.extend(walk_search(child, criteria, path))
+    return results
+
+
+CRITERIA = [
+    SearchCriteria(text="costs"),
+    SearchCriteria(text="REVENUE grew"),
+    SearchCriteria(text="rt 1</h1"),
+    SearchCriteria(block_type="ListItem"),
+    SearchCriteria(block_type="Text", text="costs"),
+    SearchCriteria(section_id="/page/1/Figure/3"),
+    SearchCriteria(has_images=True),
+    SearchCriteria(min_children=2),
+    SearchCriteria(max_children=1, min_children=3),
+    SearchCriteria(bbox_contains=(100, 650)),
+    SearchCriteria(bbox_contains=(600, 800)),
+    SearchCriteria(metadata_key="level"),
+    SearchCriteria(text="costs", within_id="/page/2/Page/0"),
+    SearchCriteria(bbox_contains=(100, 650), within_id="/page/1/ListGroup/4"),
+    SearchCriteria(text="item", max_results=3),
+]
+
+
+@pytest.mark.parametrize("criteria", CRITERIA, ids=lambda criteria: criteria.model_dump_json(exclude_defaults=True))
+def test_matches_a_full_walk(document_path, criteria):
+    searcher = load_searcher(document_path, persist_index=False)
+    expected = walk_search(searcher.document, criteria)[:criteria.max_results]
+
+    assert [result.id for result in searcher.search(criteria)] == expected
+
+
+def test_results_keep_paths_and_reasons(document_path):
+    searcher = load_searcher(document_path, persist_index=False)
+    result, = searcher.search(SearchCriteria(text="item 2", bbox_contains=(100, 700), within_id="/page/2/ListItem/7"))
+
+    assert result.path == ["/document/0", "/page/2/Page/0", "/page/2/ListGroup/4", "/page/2/ListItem/7"]
+    assert result.match_reason == "text contains 'item 2'; bbox contains point (100.0, 700.0)"
+    assert result.children_count == 0
+    assert searcher.get_node_by_id("/page/2/ListItem/7")["html"] == "<li>Item 2 costs</li>"
+    assert searcher.get_node_by_id("/page/9/Text/0") is None
+
+
+def test_large_boxes_are_found_from_any_cell(document_path):
+    index = DocumentIndex(load_searcher(document_path, persist_index=False).document, bbox_cell_size=8)
+    assert index.large_bboxes
+    assert {index.ids[pos] for pos in index.point_matches(599, 799)} == {"/document/0", "/page/0/Page/0", "/page/1/Page/0", "/page/2/Page/0"}
+
+
+def test_deep_documents_do_not_recurse():
+    node = SimpleNamespace(id="leaf", block_type="Text", html="<p>deep</p>", bbox=[0, 0, 1, 1], children=None)
+    for depth in range(5000):
+        node = SimpleNamespace(id=f"group/{depth}", block_type="Group", html="", bbox=[0, 0, 1, 1], children=[node])
+
+    searcher = DocumentSearcher(node)
+    assert [result.id for result in searcher.search(SearchCriteria(text="deep"))] == ["leaf"]
+
+
+def test_saved_index_is_reused_until_the_document_changes(document_path, monkeypatch):
+    searcher = load_searcher(document_path)
+    index_path = index_path_for(document_path)
+    assert index_path.name == "doc.json.index.json"
+    assert json.loads(index_path.read_text())["source_hash"] == search.hash_file(document_path)
+
+    saves = []
+    monkeypatch.setattr(DocumentIndex, "save", lambda self, path, source_hash=None: saves.append(source_hash))
+    reloaded = load_searcher(document_path)
+    assert saves == []
+    assert reloaded.index.tokens == searcher.index.tokens
+    assert [r.id for r in reloaded.search(SearchCriteria(text="costs"))] == [r.id for r in searcher.search(SearchCriteria(text="costs"))]
+
+    document = make_document()
+    document["children"][0]["children"][1]["html"] = "<p>Profit fell</p>"
+    document_path.write_text(json.dumps(document))
+    changed = load_searcher(document_path)
+    assert saves == [search.hash_file(document_path)]
+    assert [result.id for result in changed.search(SearchCriteria(text="profit"))] == ["/page/0/Text/2"]
+
+
+def test_unreadable_indexes_are_rebuilt(document_path):
+    index_path_for(document_path).write_text("{not json")
+    searcher = load_searcher(document_path)
+
+    assert [result.id for result in searcher.search(SearchCriteria(section_id="/page/0/Text/2"))] == ["/page/0/Text/2"]
+    assert json.loads(index_path_for(document_path).read_text())["nodes"] == len(searcher.index.nodes)
@@ -0,0 +1,190 @@
+"""
+Module: test_bulk_import.py
+Description: Bulk imports send batched JSONL to the import API, resend failed batches and leave out edges to failed vertices
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+- requests: https://requests.readthedocs.io/
+
+Sample Input:
+>>> pytest tests/core/arangodb/test_bulk_import.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/arangodb/test_bulk_import.py -v
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from extractor.core.arangodb.pipeline import ArangoDBPipeline
+
+
+class StubArango:
+    """Just enough of the ArangoDB HTTP API to import into, with injectable failures."""
+
+    def __init__(self):
+        self.imports = []
+        self.documents = {}
+        self.fail_next = []
+        self.rejected_keys = set()
+        self.lock = threading.Lock()
+
+    def handle(self, method, path, params, body):
+        if path == "/_api/version":
+            return 200, {"version": "3.11.0"}
+        if path.endswith("/_api/collection"):
+            return 200, {}
+        if not path.endswith("/_api/import"):
+            return 404, {}
+
+        with self.lock:
+            if self.fail_next:
+                return self.fail_next.pop(0), {"error": True}
+            collection = params["collection"][0]
+            docs = [json.loads(line) for line in body.splitlines() if line]
+            self.imports.append((collection, params["onDuplicate"][0], docs))
+            result = {"created": 0, "updated": 0, "ignored": 0, "errors": 0, "details": []}
+            for position, doc in enumerate(docs):
+                if doc["_key"] in self.rejected_keys:
+                    result["errors"] += 1
+                    result["details"].append(f"at position {position}: creating document failed")
+                    continue
+                result["updated" if doc["_key"] in self.documents else "created"] += 1
+                self.documents[doc["_key"]] = (collection, doc)
+            return 201, result
+
+
+@pytest.fixture
+def arango():
+    stub = StubArango()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.respond()
+
+        def do_POST(self):
+            self.respond()
+
+        def respond(self):
+            url = urlparse(self.path)
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+            status, payload = stub.handle(self.command, url.path, parse_qs(url.query), body)
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.port = server.server_address[1]
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+def make_pipeline(arango, **config):
+    return ArangoDBPipeline({"port": arango.port, "bulk_import": True, "retry_backoff": 0.01, **config})
+
+
+def marker_output(blocks: int = 5):
+    return {
+        "vertices": {
+            "documents": [{"_id": "doc", "title": "Paper"}],
+            "blocks": [{"_id": f"block-{i}", "text": f"Block {i}"} for i in range(blocks)],
+        },
+        "edges": {
+            "contains": [{"_from": "doc", "_to": f"block-{i}", "type": "contains"} for i in range(blocks)],
+        },
+    }
+
+
+def test_imports_in_batches(arango):
+    pipeline = make_pipeline(arango, batch_size=2)
+    stats = pipeline.import_marker_output(marker_output(), source_file="paper.pdf")
+
+    assert stats["errors"] == []
+    assert (stats["documents"], stats["vertices"], stats["edges"]) == (1, 6, 5)
+    assert [(collection, len(docs)) for collection, _, docs in arango.imports] == [
+        ("documents", 1), ("blocks", 2), ("blocks", 2), ("blocks", 1), ("contains", 2), ("contains", 2), ("contains", 1),
+    ]
+    assert all(on_duplicate == "update" for _, on_duplicate, _ in arango.imports)
+    # Edges point at the client-side keys of their vertices
+    block_ids = {f"blocks/{doc['_key']}" for collection, doc in arango.documents.values() if collection == "blocks"}
+    assert {doc["_to"] for collection, doc in arango.documents.values() if collection == "contains"} == block_ids
+    assert len(stats["batches"]) == 7 and all(batch["retries"] == 0 for batch in stats["batches"])
+
+
+def test_reimports_update_the_same_documents(arango):
+    pipeline = make_pipeline(arango)
+    pipeline.import_marker_output(marker_output(), source_file="paper.pdf")
+    changed = marker_output()
+    changed["vertices"]["blocks"][0]["text"] = "Edited"
+    stats = pipeline.import_marker_output(changed, source_file="paper.pdf")
+
+    assert len(arango.documents) == 11
+    assert sum(batch["updated"] for batch in stats["batches"]) == 11
+    assert "Edited" in [doc.get("text") for _, doc in arango.documents.values()]
+
+
+def test_resends_batches_with_backoff(arango, monkeypatch):
+    waits = []
+    monkeypatch.setattr("extractor.core.arangodb.pipeline.time.sleep", waits.append)
+    arango.fail_next = [503, 503]
+    pipeline = make_pipeline(arango)
+    stats = pipeline.import_marker_output(marker_output())
+
+    assert stats["errors"] == []
+    assert stats["vertices"] == 6
+    assert stats["batches"][0]["retries"] == 2
+    assert waits == [0.01, 0.02]
+
+
+def test_gives_up_after_max_retries(arango, monkeypatch):
+    monkeypatch.setattr("extractor.core.arangodb.pipeline.time.sleep", lambda seconds: None)
+    arango.fail_next = [503] * 3
+    pipeline = make_pipeline(arango, max_retries=2)
+    stats = pipeline.import_marker_output(marker_output())
+
+    # The document vertex never made it, so none of its edges are sent
+    assert stats["documents"] == 0
+    assert stats["batches"][0]["retries"] == 2
+    assert stats["edges"] == 0
+    assert len([error for error in stats["errors"] if error.startswith("Skipped edge")]) == 5
+    assert [collection for collection, _, _ in arango.imports] == ["blocks"]
+
+
+def test_client_errors_are_not_retried(arango):
+    arango.fail_next = [400]
+    pipeline = make_pipeline(arango)
+    stats = pipeline.import_marker_output(marker_output())
+
+    assert stats["batches"][0]["retries"] == 0
+    assert stats["documents"] == 0
+    assert any("failed" in error for error in stats["errors"])
+
+
+def test_skips_edges_to_rejected_vertices(arango):
+    output = marker_output()
+    pipeline = make_pipeline(arango)
+    pipeline.import_marker_output(output)
+    rejected = next(doc["_key"] for _, doc in arango.documents.values() if doc.get("text") == "Block 3")
+    arango.documents.clear()
+    arango.rejected_keys.add(rejected)
+
+    stats = pipeline.import_marker_output(output)
+    assert stats["vertices"] == 5
+    assert stats["edges"] == 4
+    assert "at position 3: creating document failed" in stats["errors"]
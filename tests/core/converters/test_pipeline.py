@@ -0,0 +1,91 @@
+"""
+Module: test_pipeline.py
+Description: Pipelined conversion renders the same output as converting each file on its own
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/converters/test_pipeline.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/converters/test_pipeline.py -v
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from extractor.core.builders.line import LineBuilder
+from extractor.core.builders.llm_layout import LLMLayoutBuilder
+from extractor.core.converters.pdf import PdfConverter
+from extractor.core.converters.pipeline import PipelinedPdfConverter
+
+FIXTURES = [
+    str(Path(__file__).parents[3] / "data" / "input" / name)
+    for name in ("Arango_AQL_Example.pdf", "python-type-checking-readthedocs-io-en-latest.pdf")
+]
+MODELS = ("layout_model", "texify_model", "recognition_model", "table_rec_model", "detection_model", "ocr_error_model", "inline_detection_model")
+# Layout is forced and OCR is off, so the fixtures convert from their text layer without models
+CONFIG = {"force_layout_block": "Text", "disable_ocr": True, "page_range": [0, 1, 2], "disable_tqdm": True}
+# Table processors run the recognition model
+PROCESSORS = [f"{p.__module__}.{p.__name__}" for p in PdfConverter.default_processors if "Table" not in p.__name__]
+
+
+@pytest.fixture(autouse=True)
+def text_layer_lines(monkeypatch):
+    monkeypatch.setattr(LineBuilder, "ocr_error_detection", lambda self, pages, page_lines: SimpleNamespace(labels=["good"] * len(pages)))
+    monkeypatch.setattr(
+        LineBuilder, "get_detection_results",
+        lambda self, images, run_detection, inline: ([None] * len(run_detection), [None] * len(run_detection)),
+    )
+
+
+def make_converter(cls, **config):
+    return cls(artifact_dict={name: None for name in MODELS}, processor_list=PROCESSORS, config={**CONFIG, **config})
+
+
+def test_pipelined_output_matches_sequential():
+    sequential = make_converter(PdfConverter)
+    pipelined = make_converter(PipelinedPdfConverter, pipeline_batch_pages=4, pipeline_workers=2)
+
+    expected = [sequential(filepath).markdown for filepath in FIXTURES]
+    results = list(pipelined.convert_many(FIXTURES))
+
+    assert [filepath for filepath, _ in results] == FIXTURES
+    assert [rendered.markdown for _, rendered in results] == expected
+    assert all(expected)
+
+
+def test_relabel_failures_keep_the_layout(monkeypatch):
+    def fail(self, document):
+        raise RuntimeError("LLM unavailable")
+
+    monkeypatch.setattr(LLMLayoutBuilder, "relabel_blocks", fail)
+    converter = make_converter(PipelinedPdfConverter)
+    converter.layout_builder_class = LLMLayoutBuilder
+
+    [(_, document)] = list(converter.build_documents(FIXTURES[:1]))
+    assert len(document.pages) == 3
+
+
+def test_cached_documents_skip_the_builders(tmp_path, monkeypatch):
+    converter = make_converter(PipelinedPdfConverter, use_document_cache=True, document_cache_dir=str(tmp_path))
+    first = [rendered.markdown for _, rendered in converter.convert_many(FIXTURES)]
+
+    def no_build(self, batch):
+        assert not batch, "A cached document was built again"
+        return []
+
+    monkeypatch.setattr(PipelinedPdfConverter, "build_batch", no_build)
+    assert [rendered.markdown for _, rendered in converter.convert_many(FIXTURES)] == first
+
+
+def test_profiled_documents_keep_their_stages():
+    converter = make_converter(PipelinedPdfConverter, profile_pipeline=True)
+    [(_, document)] = list(converter.build_documents(FIXTURES[:1]))
+    assert document.metadata["profile"]
@@ -0,0 +1,154 @@
+"""
+Module: test_engine.py
+Description: Fused page-local processors give the same document as running every processor in order
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/processors/test_engine.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/processors/test_engine.py -v
+"""
+
+from collections import defaultdict
+
+import pytest
+
+from benchmarks.throughput.main import StageTimer
+from extractor.core.converters.pdf import PdfConverter
+from extractor.core.processors.blockquote import BlockquoteProcessor
+from extractor.core.processors.document_toc import DocumentTOCProcessor
+from extractor.core.processors.engine import ProcessorEngine, plan_processors
+from extractor.core.processors.footnote import FootnoteProcessor
+from extractor.core.processors.ignoretext import IgnoreTextProcessor
+from extractor.core.processors.line_merge import LineMergeProcessor
+from extractor.core.processors.line_numbers import LineNumbersProcessor
+from extractor.core.processors.list import ListProcessor
+from extractor.core.processors.order import OrderProcessor
+from extractor.core.processors.page_header import PageHeaderProcessor
+from extractor.core.processors.sectionheader import SectionHeaderProcessor
+from extractor.core.schema.blocks import Footnote, ListItem, PageHeader, SectionHeader, Text
+from extractor.core.schema.document import Document
+from extractor.core.schema.groups.list import ListGroup
+from extractor.core.schema.groups.page import PageGroup
+from extractor.core.schema.polygon import PolygonBox
+from extractor.core.schema.text.line import Line
+from extractor.core.schema.text.span import Span
+
+PAGE_COUNT = 6
+
+
+def processors():
+    return [
+        OrderProcessor(),
+        LineMergeProcessor(None),
+        BlockquoteProcessor(None),
+        DocumentTOCProcessor(),
+        FootnoteProcessor(),
+        IgnoreTextProcessor(),
+        LineNumbersProcessor(None),
+        ListProcessor(None),
+        PageHeaderProcessor(),
+        SectionHeaderProcessor(),
+    ]
+
+
+def add_block(page: PageGroup, block_cls, texts, top: float, left: float = 50, position: int = 0):
+    """A block holding one line per text, each line a number span and a text span."""
+    block = page.add_block(block_cls, PolygonBox.from_bbox([left, top, 550, top + 12 * len(texts)]))
+    for i, text in enumerate(texts):
+        y = top + 12 * i
+        line = page.add_block(Line, PolygonBox.from_bbox([left, y, 550, y + 10]))
+        for j, (part, x0, x1) in enumerate(((str(i + 1), left, left + 10), (text, left + 15, 550))):
+            span = page.add_full_block(Span(
+                polygon=PolygonBox.from_bbox([x0, y, x1, y + 10]),
+                page_id=page.page_id,
+                text=part,
+                font="Times",
+                font_weight=400,
+                font_size=10 + len(texts) % 3,
+                minimum_position=position + 10 * i + 2 * j,
+                maximum_position=position + 10 * i + 2 * j + 1,
+                formats=["plain"],
+            ))
+            line.add_structure(span)
+        block.add_structure(line)
+    return block
+
+
+def make_document() -> Document:
+    pages = []
+    for page_id in range(PAGE_COUNT):
+        page = PageGroup(
+            page_id=page_id,
+            polygon=PolygonBox.from_bbox([0, 0, 600, 800]),
+            text_extraction_method="pdftext",
+            layout_sliced=page_id % 2 == 0,
+        )
+        blocks = [
+            add_block(page, SectionHeader, [f"Section {page_id}"], 40, position=500),
+            add_block(page, Text, ["Body text that goes on for a while"] * 4, 80, position=100),
+            add_block(page, Footnote, [f"{page_id} A footnote"], 150, position=900),
+            add_block(page, Text, ["An indented quote of the body text"] * 2, 210, left=90, position=300),
+        ]
+        group = page.add_block(ListGroup, PolygonBox.from_bbox([50, 300, 550, 400]))
+        for i in range(3):
+            item = add_block(page, ListItem, [f"item {i}"], 300 + 30 * i, left=50 + 20 * (i % 2), position=600 + 20 * i)
+            group.add_structure(item)
+        blocks.append(group)
+        blocks.append(add_block(page, Text, ["Running footer of the document"], 760, position=950))
+        blocks.append(add_block(page, PageHeader, ["Journal of Tests"], 10, position=0))
+        for block in blocks:
+            page.add_structure(block)
+        pages.append(page)
+    return Document(filepath="test.pdf", pages=pages)
+
+
+def snapshot(document: Document):
+    return (
+        [
+            (list(page.structure), [child.model_dump(exclude={"lowres_image", "highres_image"}) for child in page.children])
+            for page in document.pages
+        ],
+        document.table_of_contents,
+    )
+
+
+def test_plan_fuses_page_local_processors():
+    names = [step.names for step in plan_processors(processors())]
+    assert names[0] == ["OrderProcessor", "LineMergeProcessor", "BlockquoteProcessor", "FootnoteProcessor"]
+    assert ["LineNumbersProcessor", "PageHeaderProcessor"] in names
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_fused_matches_sequential(workers):
+    expected = make_document()
+    for processor in processors():
+        processor(expected)
+
+    fused = make_document()
+    ProcessorEngine(processors(), workers=workers)(fused)
+
+    assert snapshot(fused) == snapshot(expected)
+
+
+def test_reassigned_processor_list_runs(monkeypatch):
+    converter = PdfConverter(
+        artifact_dict={name: None for name in ("layout_model", "texify_model", "recognition_model", "table_rec_model", "detection_model", "ocr_error_model", "inline_detection_model")},
+        processor_list=["extractor.core.processors.order.OrderProcessor"],
+        config={"processor_workers": 2},
+    )
+    monkeypatch.setattr(converter, "_build_pages", lambda filepath, config: (make_document(), None, None))
+
+    # How the throughput benchmark times each processor
+    timings = defaultdict(float)
+    converter.processor_list = [StageTimer(processor, timings) for processor in processors()]
+    converter.build_document("test.pdf")
+
+    assert set(timings) == {type(processor).__name__ for processor in processors()}
+    assert all(t > 0 for t in timings.values())
@@ -0,0 +1,169 @@
+"""
+Module: test_llm_scheduler.py
+Description: LLM processors keep their order, share one request budget, and never edit the document concurrently
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/processors/test_llm_scheduler.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/processors/test_llm_scheduler.py -v
+"""
+
+import threading
+import time
+
+from pydantic import BaseModel
+
+from extractor.core.converters import BaseConverter
+from extractor.core.processors.llm import BaseLLMComplexBlockProcessor, BaseLLMSimpleBlockProcessor
+from extractor.core.processors.llm.llm_equation import LLMEquationProcessor
+from extractor.core.processors.llm.llm_form import LLMFormProcessor
+from extractor.core.processors.llm.llm_mathblock import LLMMathBlockProcessor
+from extractor.core.processors.llm.llm_scheduler import BudgetedService, LLMSchedulerProcessor
+from extractor.core.processors.llm.llm_table import LLMTableProcessor
+from extractor.core.processors.llm.llm_table_merge import LLMTableMergeProcessor
+from extractor.core.processors.text import TextProcessor
+from extractor.core.schema import BlockTypes
+from extractor.core.schema.blocks import Text
+from extractor.core.schema.document import Document
+from extractor.core.schema.groups.page import PageGroup
+from extractor.core.schema.polygon import PolygonBox
+
+CONFIG = {"use_llm": True, "disable_tqdm": True}
+
+
+class Answer(BaseModel):
+    text: str
+
+
+class SlowService:
+    """Answers after a delay, recording how many requests were in flight at once."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt, image, block, schema, *args, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.calls.append(time.perf_counter())
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return {"text": prompt}
+
+
+class RecordingProcessor(BaseLLMSimpleBlockProcessor):
+    block_types = (BlockTypes.Text,)
+
+    def __init__(self, name: str, applied: list, config=None):
+        super().__init__(config)
+        self.name = name
+        self.applied = applied
+
+    def block_prompts(self, document: Document):
+        return [
+            {"prompt": f"{self.name} {data['block'].block_id}", "image": None, "block": data["block"], "schema": Answer, "page": data["page"]}
+            for data in self.inference_blocks(document)
+        ]
+
+    def rewrite_block(self, response: dict, prompt_data, document: Document):
+        self.applied.append(response["text"])
+
+
+class EditingProcessor(BaseLLMComplexBlockProcessor):
+    """Edits the document before and after each request, and checks no other job does so at the same time."""
+    block_types = (BlockTypes.Text,)
+
+    def __init__(self, llm_service, config=None):
+        super().__init__(llm_service, config)
+        self.editing = 0
+        self.overlaps = 0
+
+    def edit(self):
+        self.editing += 1
+        if self.editing > 1:
+            self.overlaps += 1
+        time.sleep(0.005)
+        self.editing -= 1
+
+    def process_rewriting(self, document: Document, page: PageGroup, block):
+        self.edit()
+        self.llm_response("prompt", None, block, Answer)
+        self.edit()
+
+
+def make_document(blocks: int = 6) -> Document:
+    page = PageGroup(page_id=0, polygon=PolygonBox.from_bbox([0, 0, 600, 800]))
+    for i in range(blocks):
+        page.add_structure(page.add_block(Text, PolygonBox.from_bbox([0, i * 20, 600, i * 20 + 10])))
+    return Document(filepath="test.pdf", pages=[page])
+
+
+def test_complex_processors_keep_their_place():
+    service = SlowService()
+    converter = BaseConverter(CONFIG)
+    converter.llm_service = service
+    converter.artifact_dict = {"llm_service": service}
+    processors = converter.initialize_processors([
+        LLMTableProcessor, LLMTableMergeProcessor, LLMFormProcessor, TextProcessor, LLMEquationProcessor, LLMMathBlockProcessor,
+    ])
+
+    assert [type(p) for p in processors] == [
+        LLMTableProcessor, LLMTableMergeProcessor, TextProcessor, LLMSchedulerProcessor, LLMMathBlockProcessor,
+    ]
+    assert [type(p) for p in processors[3].processors] == [LLMFormProcessor, LLMEquationProcessor]
+    # Complex processors run on their own but share the scheduler's rate budget
+    for processor in (processors[0], processors[1], processors[4]):
+        assert isinstance(processor.llm_service, BudgetedService)
+        assert processor.llm_service.scheduler is processors[3]
+
+
+def test_responses_apply_in_processor_order_within_the_concurrency_limit():
+    service = SlowService()
+    applied = []
+    scheduler = LLMSchedulerProcessor(
+        [RecordingProcessor("first", applied, CONFIG), RecordingProcessor("second", applied, CONFIG)],
+        service,
+        {**CONFIG, "llm_global_concurrency": 3},
+    )
+    scheduler(make_document())
+
+    assert len(applied) == 12
+    assert all(text.startswith("first") for text in applied[:6])
+    assert all(text.startswith("second") for text in applied[6:])
+    assert service.max_in_flight == 3
+
+
+def test_requests_wait_on_the_rate_budget():
+    service = SlowService(delay=0)
+    scheduler = LLMSchedulerProcessor(
+        [RecordingProcessor("only", [], CONFIG)],
+        service,
+        {**CONFIG, "llm_requests_per_second": 20, "llm_burst_size": 1},
+    )
+    scheduler(make_document())
+
+    gaps = [b - a for a, b in zip(service.calls, service.calls[1:])]
+    assert len(service.calls) == 6
+    assert min(gaps) >= 0.04
+
+
+def test_complex_jobs_overlap_only_in_requests():
+    service = SlowService()
+    processor = EditingProcessor(service, {**CONFIG, "max_concurrency": 4})
+    processor(make_document())
+
+    assert len(service.calls) == 6
+    assert service.max_in_flight > 1
+    assert processor.overlaps == 0
@@ -0,0 +1,79 @@
+"""
+Module: test_stream_windows.py
+Description: Page counts come from the PDF without extracting text, and streaming converts one window of pages at a time
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+- pypdfium2: https://pypdfium2.readthedocs.io/
+
+Sample Input:
+>>> pytest tests/core/providers/pdf/test_stream_windows.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/providers/pdf/test_stream_windows.py -v
+"""
+
+import pypdfium2 as pdfium
+import pytest
+
+from extractor.core.converters.pdf import PdfConverter
+from extractor.core.providers.pdf import PdfProvider
+from extractor.core.schema.document import Document
+from extractor.core.schema.groups.page import PageGroup
+from extractor.core.schema.polygon import PolygonBox
+
+MODELS = ("layout_model", "texify_model", "recognition_model", "table_rec_model", "detection_model", "ocr_error_model", "inline_detection_model")
+
+
+def make_pdf(path, pages: int) -> str:
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(pages):
+        pdf.new_page(200, 300)
+    pdf.save(str(path))
+    return str(path)
+
+
+def make_converter(monkeypatch, **config):
+    converter = PdfConverter(artifact_dict={name: None for name in MODELS}, config=config)
+    windows = []
+
+    def build(filepath, config=None):
+        page_range = (config or {}).get("page_range")
+        windows.append(list(page_range))
+        return Document(filepath=filepath, pages=[
+            PageGroup(page_id=page_id, polygon=PolygonBox.from_bbox([0, 0, 200, 300])) for page_id in page_range
+        ])
+
+    monkeypatch.setattr(converter, "_build_document", build)
+    monkeypatch.setattr(converter, "resolve_dependencies", lambda cls: lambda document: [page.page_id for page in document.pages])
+    return converter, windows
+
+
+def test_count_pages(tmp_path):
+    assert PdfProvider.count_pages(make_pdf(tmp_path / "five.pdf", 5)) == 5
+    assert PdfProvider.count_pages(make_pdf(tmp_path / "one.pdf", 1)) == 1
+
+
+def test_count_pages_rejects_other_files(tmp_path):
+    path = tmp_path / "notes.pdf"
+    path.write_text("not a pdf")
+    with pytest.raises(pdfium.PdfiumError):
+        PdfProvider.count_pages(str(path))
+
+
+def test_stream_converts_one_window_at_a_time(tmp_path, monkeypatch):
+    converter, windows = make_converter(monkeypatch, stream_window_pages=2)
+    results = list(converter.stream(make_pdf(tmp_path / "doc.pdf", 5)))
+
+    assert windows == [[0, 1], [2, 3], [4]]
+    assert results == [([0, 1], [0, 1]), ([2, 3], [2, 3]), ([4], [4])]
+
+
+def test_stream_windows_the_page_range(tmp_path, monkeypatch):
+    converter, windows = make_converter(monkeypatch, stream_window_pages=2, page_range=[1, 3, 4])
+    list(converter.stream(make_pdf(tmp_path / "doc.pdf", 5)))
+
+    assert windows == [[1, 3], [4]]
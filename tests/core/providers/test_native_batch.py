@@ -0,0 +1,100 @@
+"""
+Module: test_native_batch.py
+Description: Bulk native extraction writes one document per line, records failures without stopping, and gives the same documents from a process pool
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/providers/test_native_batch.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/providers/test_native_batch.py -v
+"""
+
+import json
+
+import pytest
+
+from extractor.core.providers import native_batch
+from extractor.core.providers.native_batch import extract_native_batch, find_native_files
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def inbox(tmp_path):
+    inbox = tmp_path / "inbox"
+    (inbox / "nested").mkdir(parents=True)
+    for i in range(3):
+        (inbox / f"page{i}.html").write_text(f"<html><head><title>Page {i}</title></head><body><h1>Heading {i}</h1><p>Body {i}</p></body></html>")
+    (inbox / "feed.xml").write_text('<?xml version="1.0"?><root><section><title>Feed</title><para>Entry</para></section></root>')
+    (inbox / "nested" / "broken.xml").write_text("<root><unclosed>")
+    (inbox / "notes.txt").write_text("plain text")
+    return inbox
+
+
+def test_finds_native_files(inbox):
+    names = lambda files: [path.rsplit("/", 1)[-1] for path in files]
+
+    assert names(find_native_files([str(inbox)])) == ["feed.xml", "page0.html", "page1.html", "page2.html"]
+    assert "broken.xml" in names(find_native_files([str(inbox)], recursive=True))
+    assert find_native_files([str(inbox / "notes.txt"), str(inbox / "feed.xml")]) == [str(inbox / "feed.xml")]
+
+
+def test_failures_are_recorded_and_the_batch_continues(inbox, tmp_path):
+    files = find_native_files([str(inbox)], recursive=True) + [str(inbox / "notes.txt")]
+    stats = extract_native_batch(files, str(tmp_path / "out.jsonl"), workers=1, show_progress=False)
+
+    documents = read_jsonl(tmp_path / "out.jsonl")
+    assert sorted(document["source_path"].rsplit("/", 1)[-1] for document in documents) == ["feed.xml", "page0.html", "page1.html", "page2.html"]
+    errors = {error["path"].rsplit("/", 1)[-1]: error for error in read_jsonl(tmp_path / "out.errors.jsonl")}
+    assert set(errors) == {"broken.xml", "notes.txt"}
+    assert errors["broken.xml"]["traceback"].startswith("Traceback")
+    assert errors["notes.txt"]["error"] == "Unsupported file type: .txt"
+
+    assert (stats["files"], stats["failed"]) == (6, 2)
+    assert {name: (values["files"], values["failed"]) for name, values in stats["formats"].items()} == {
+        "html": (3, 0), "xml": (2, 1), "unsupported": (1, 1),
+    }
+    assert stats["formats"]["html"]["bytes"] == sum((inbox / f"page{i}.html").stat().st_size for i in range(3))
+
+
+def test_each_file_gets_a_fresh_provider(inbox, tmp_path):
+    files = [str(inbox / f"page{i}.html") for i in range(3)]
+    extract_native_batch(files, str(tmp_path / "out.jsonl"), workers=1, show_progress=False)
+
+    # Block ids count from one in every document
+    assert [[block["id"] for block in document["blocks"]] for document in read_jsonl(tmp_path / "out.jsonl")] == [["html-block-1", "html-block-2"]] * 3
+
+
+def test_missing_provider_dependencies_only_fail_their_format(inbox, tmp_path, monkeypatch):
+    monkeypatch.setitem(native_batch.NATIVE_PROVIDERS, ".docx", ("docx", "extractor.core.providers.not_installed", "NativeDOCXProvider"))
+    monkeypatch.setattr(native_batch, "_provider_classes", {})
+    (inbox / "report.docx").write_bytes(b"PK")
+
+    stats = extract_native_batch([str(inbox / "report.docx"), str(inbox / "feed.xml")], str(tmp_path / "out.jsonl"), workers=1, show_progress=False)
+
+    assert stats["formats"]["docx"]["failed"] == 1
+    assert stats["formats"]["xml"]["failed"] == 0
+    assert read_jsonl(tmp_path / "out.errors.jsonl")[0]["error"].startswith("ModuleNotFoundError")
+
+
+@pytest.mark.slow
+def test_pool_matches_in_process_extraction(inbox, tmp_path):
+    files = find_native_files([str(inbox)], recursive=True)
+    extract_native_batch(files, str(tmp_path / "serial.jsonl"), workers=1, show_progress=False)
+    stats = extract_native_batch(files, str(tmp_path / "pool.jsonl"), workers=2, chunksize=2, show_progress=False)
+
+    def by_path(path):
+        return {document["source_path"]: (document["blocks"], document["full_text"]) for document in read_jsonl(path)}
+
+    assert by_path(tmp_path / "pool.jsonl") == by_path(tmp_path / "serial.jsonl")
+    assert [error["path"] for error in read_jsonl(tmp_path / "pool.errors.jsonl")] == [str(inbox / "nested" / "broken.xml")]
+    assert (stats["files"], stats["failed"]) == (5, 1)
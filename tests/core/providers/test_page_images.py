@@ -0,0 +1,123 @@
+"""
+Module: test_page_images.py
+Description: Page images render on first use, stay within their memory budget and pickle without the provider
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+- pypdfium2: https://pypdfium2.readthedocs.io/
+
+Sample Input:
+>>> pytest tests/core/providers/test_page_images.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/providers/test_page_images.py -v
+"""
+
+import gc
+import os
+import pickle
+
+import pypdfium2 as pdfium
+from PIL import Image
+
+from extractor.core.builders.document import DocumentBuilder
+from extractor.core.providers.page_images import PageImageCache, PdfPageRenderer, image_nbytes
+from extractor.core.providers.utils import TemporaryPdf
+from extractor.core.schema.groups.page import PageGroup
+from extractor.core.schema.polygon import PolygonBox
+
+
+class CountingRenderer:
+    def __init__(self):
+        self.rendered = []
+
+    def __call__(self, page_ids, dpi):
+        self.rendered.extend((page_id, dpi) for page_id in page_ids)
+        return [Image.new("RGB", (dpi, dpi)) for _ in page_ids]
+
+
+def make_pdf(path, pages: int = 3) -> str:
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(pages):
+        pdf.new_page(200, 300)
+    pdf.save(str(path))
+    return str(path)
+
+
+def test_renders_on_first_use():
+    renderer = CountingRenderer()
+    cache = PageImageCache(renderer, 10, 20, page_ids=range(3))
+    assert renderer.rendered == []
+
+    assert cache.get(1, highres=True).size == (20, 20)
+    assert cache.get(1, highres=True) is cache.get(1, highres=True)
+    assert renderer.rendered == [(1, 20)]
+
+
+def test_evicts_least_recently_used_over_budget():
+    renderer = CountingRenderer()
+    cache = PageImageCache(renderer, 10, 20, max_bytes=2 * image_nbytes(Image.new("RGB", (10, 10))))
+    for page_id in (0, 1, 0, 2):
+        cache.get(page_id, highres=False)
+
+    assert list(cache.images) == [(0, False), (2, False)]
+    assert cache.nbytes <= cache.max_bytes
+    cache.get(1, highres=False)
+    assert renderer.rendered.count((1, 10)) == 2
+
+    # The image asked for is kept even when it is over budget on its own
+    assert cache.get(0, highres=True).size == (20, 20)
+    assert list(cache.images) == [(0, True)]
+
+
+def test_spills_evicted_images(tmp_path):
+    renderer = CountingRenderer()
+    cache = PageImageCache(renderer, 10, 20, max_bytes=1, spill_dir=str(tmp_path))
+    cache.get(0, highres=False)
+    cache.get(1, highres=False)
+
+    assert cache.get(0, highres=False).size == (10, 10)
+    assert renderer.rendered == [(0, 10), (1, 10)]
+    cache.release()
+    assert cache.spilled == {} and cache.images == {}
+
+
+def test_pickles_rendered_images_and_a_path(tmp_path):
+    path = make_pdf(tmp_path / "doc.pdf")
+    cache = PageImageCache(PdfPageRenderer(path, keep_alive=object()), 72, 144, max_bytes=10 ** 8, page_ids=range(3))
+    cache.get(2, highres=False)
+
+    restored = pickle.loads(pickle.dumps(cache))
+    assert list(restored.images) == [(2, False)]
+    assert restored.render_pages.filepath == path
+    assert restored.render_pages.keep_alive is None
+    assert restored.get(0, highres=True).size == (400, 600)
+    assert restored.renders == 1
+
+
+def test_pages_render_through_a_shared_cache(tmp_path):
+    pages = [PageGroup(page_id=page_id, polygon=PolygonBox.from_bbox([0, 0, 200, 300])) for page_id in range(3)]
+    builder = DocumentBuilder({"lazy_page_images": True})
+    builder.attach_page_images(PdfPageRenderer(make_pdf(tmp_path / "doc.pdf")), pages)
+
+    assert all(page.lowres_image is None and page.highres_image is None for page in pages)
+    cache = pages[0]._image_source
+    assert all(page._image_source is cache for page in pages)
+    pages[1].get_image(highres=False)
+    assert cache.renders == 1
+
+
+def test_temporary_pdf_outlives_its_provider():
+    temp_pdf = TemporaryPdf()
+    renderer = PdfPageRenderer(temp_pdf.path, keep_alive=temp_pdf)
+    path = temp_pdf.path
+    del temp_pdf
+    gc.collect()
+    assert os.path.exists(path)
+
+    del renderer
+    gc.collect()
+    assert not os.path.exists(path)
@@ -0,0 +1,132 @@
+"""
+Module: test_xml_streaming.py
+Description: Streaming XML extraction returns the tree mode's blocks while only holding the open elements in memory
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/providers/test_xml_streaming.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/providers/test_xml_streaming.py -v
+"""
+
+import pytest
+
+from extractor.core.providers.xml_native import NativeXMLProvider
+
+CATALOG = """<?xml version="1.0"?>
+<catalog xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <metadata><title>Parts catalog</title><author>Ops team</author><keywords>parts, bolts</keywords></metadata>
+  <section><title>Overview</title><para>Intro text<emphasis>bold</emphasis> tail here</para></section>
+  <table><row><cell>A</cell><cell>B</cell></row><row><cell>1</cell><cell>2</cell></row></table>
+  <items>
+{items}
+  </items>
+</catalog>
+"""
+
+
+def write_catalog(path, count: int = 4) -> str:
+    items = "\n".join(f"    <item><sku>{i}</sku><name>Part {i}</name></item>" for i in range(count))
+    path.write_text(CATALOG.format(items=items))
+    return str(path)
+
+
+def hierarchy_shape(node):
+    return (node.title, node.level, [hierarchy_shape(child) for child in node.children])
+
+
+def table_rows(table):
+    rows = {}
+    for cell in table.cells:
+        rows.setdefault(cell.row, []).append(cell.content)
+    return [rows[row] for row in sorted(rows)]
+
+
+def test_matches_tree_mode(tmp_path):
+    path = write_catalog(tmp_path / "catalog.xml")
+    tree = NativeXMLProvider().extract_document(path)
+    stream = NativeXMLProvider({"streaming": True}).extract_document(path)
+
+    # Only block ids differ
+    assert [block.model_dump(exclude={"id"}) for block in stream.blocks] == [block.model_dump(exclude={"id"}) for block in tree.blocks]
+    assert [block.type for block in stream.blocks][-2:] == ["table", "table"]
+    assert hierarchy_shape(stream.hierarchy) == hierarchy_shape(tree.hierarchy)
+    assert stream.full_text == tree.full_text
+    assert sorted(stream.keywords) == sorted(tree.keywords) == ["bolts", "parts"]
+    assert (stream.metadata.title, stream.metadata.author) == ("Parts catalog", "Ops team")
+    assert stream.metadata.format_metadata["namespaces"] == {"dc": "http://purl.org/dc/elements/1.1/"}
+
+
+def test_streams_files_over_the_threshold(tmp_path):
+    path = tmp_path / "catalog.xml"
+    write_catalog(path)
+
+    assert NativeXMLProvider({"streaming_threshold_mb": path.stat().st_size / 1024 ** 2})._should_stream(path)
+    assert not NativeXMLProvider({"streaming_threshold_mb": 1})._should_stream(path)
+    assert not NativeXMLProvider()._should_stream(path)
+
+
+def test_long_repeated_structures_are_emitted_in_parts(tmp_path):
+    path = write_catalog(tmp_path / "catalog.xml", count=7)
+    tree_table = NativeXMLProvider().extract_document(path).blocks[-1]
+    parts = [block for block in NativeXMLProvider({"streaming": True, "stream_max_table_rows": 3}).iter_blocks(path)
+             if block.metadata.attributes.get("detection_method") == "repeated_structure"]
+
+    assert [part.metadata.attributes["row_offset"] for part in parts] == [0, 3, 6]
+    assert all(table_rows(part)[0] == ["sku", "name"] for part in parts)
+    assert [row for part in parts for row in table_rows(part)[1:]] == table_rows(tree_table)[1:]
+
+
+def test_finished_elements_are_released(tmp_path):
+    path = write_catalog(tmp_path / "catalog.xml", count=5000)
+    provider = NativeXMLProvider({"streaming": True})
+    iterparse = provider._iterparse
+    open_children = []
+
+    def watch(filepath):
+        root = items = None
+        for event, element in iterparse(filepath):
+            if event == "start" and root is None:
+                root = element
+            elif event == "start" and element.tag == "items":
+                items = element
+            elif event == "end" and element.tag == "item":
+                open_children.append((len(root), len(items)))
+            yield event, element
+
+    provider._iterparse = watch
+    list(provider.iter_blocks(path))
+
+    # lxml parses ahead of the events by one read buffer, so only that much is held
+    assert len(open_children) == 5000
+    assert max(root for root, _ in open_children) == 1
+    assert max(items for _, items in open_children) < 1000
+
+
+def test_blocks_arrive_before_the_file_is_read(tmp_path):
+    with open(write_catalog(tmp_path / "catalog.xml")) as f:
+        (tmp_path / "truncated.xml").write_text(f.read()[:400])
+    path = tmp_path / "truncated.xml"
+    blocks = []
+
+    with pytest.raises(Exception):
+        for block in NativeXMLProvider({"streaming": True}).iter_blocks(path):
+            blocks.append(block.content)
+    assert blocks[:3] == ["Parts catalog", "Ops team", "parts, bolts"]
+
+
+def test_hierarchy_is_bounded(tmp_path):
+    path = write_catalog(tmp_path / "catalog.xml", count=50)
+    document = NativeXMLProvider({"streaming": True, "stream_hierarchy_depth": 1, "stream_max_hierarchy_nodes": 10}).extract_document(path)
+
+    nodes = [document.hierarchy]
+    for node in nodes:
+        nodes.extend(node.children)
+    assert len(nodes) == 5
+    assert max(node.level for node in nodes) == 1
@@ -0,0 +1,155 @@
+"""
+Module: test_render_paths.py
+Description: One-pass HTML assembly and shared renders give the same output as rendering each format on its own
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+- beautifulsoup4: https://www.crummy.com/software/BeautifulSoup/
+
+Sample Input:
+>>> pytest tests/core/renderers/test_render_paths.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/renderers/test_render_paths.py -v
+"""
+
+import textwrap
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from bs4 import BeautifulSoup
+
+from extractor.core.builders.line import LineBuilder
+from extractor.core.converters.pdf import PdfConverter
+from extractor.core.renderers.html import HTMLRenderer
+from extractor.core.renderers.json import JSONRenderer
+from extractor.core.renderers.markdown import MarkdownRenderer
+from extractor.core.schema.blocks import Picture
+from extractor.core.schema.polygon import PolygonBox
+from extractor.core.settings import settings
+
+FIXTURE = str(Path(__file__).parents[3] / "data" / "input" / "Arango_AQL_Example.pdf")
+MODELS = ("layout_model", "texify_model", "recognition_model", "table_rec_model", "detection_model", "ocr_error_model", "inline_detection_model")
+CONFIG = {"force_layout_block": "Text", "disable_ocr": True, "page_range": [0, 1, 2], "disable_tqdm": True}
+PROCESSORS = [f"{p.__module__}.{p.__name__}" for p in PdfConverter.default_processors if "Table" not in p.__name__]
+
+
+def legacy_extract_html(self, document, document_output, level=0):
+    """HTMLRenderer.extract_html before one-pass assembly, which parsed every fragment again."""
+    soup = BeautifulSoup(document_output.html, 'html.parser')
+
+    content_refs = soup.find_all('content-ref')
+    ref_block_id = None
+    images = {}
+    for ref in content_refs:
+        src = ref.get('src')
+        sub_images = {}
+        content = ""
+        for item in document_output.children:
+            if item.id == src:
+                content, sub_images_ = self.extract_html(document, item, level + 1)
+                sub_images.update(sub_images_)
+                ref_block_id = item.id
+                break
+
+        if ref_block_id.block_type in self.image_blocks:
+            if self.extract_images:
+                image = self.extract_image(document, ref_block_id)
+                image_name = f"{ref_block_id.to_path()}.{settings.OUTPUT_IMAGE_FORMAT.lower()}"
+                images[image_name] = image
+                ref.replace_with(BeautifulSoup(f"<p>{content}<img src='{image_name}'></p>", 'html.parser'))
+            else:
+                ref.replace_with(BeautifulSoup(f"{content}", 'html.parser'))
+        elif ref_block_id.block_type in self.page_blocks:
+            images.update(sub_images)
+            if self.paginate_output:
+                content = f"<div class='page' data-page-id='{ref_block_id.page_id}'>{content}</div>"
+            ref.replace_with(BeautifulSoup(f"{content}", 'html.parser'))
+        else:
+            images.update(sub_images)
+            ref.replace_with(BeautifulSoup(f"{content}", 'html.parser'))
+
+    output = str(soup)
+    if level == 0:
+        output = self.merge_consecutive_tags(output, 'b')
+        output = self.merge_consecutive_tags(output, 'i')
+        output = self.merge_consecutive_math(output)
+        output = textwrap.dedent(f"""
+            <!DOCTYPE html>
+            <html>
+                <head>
+                    <meta charset="utf-8" />
+                </head>
+                <body>
+                    {output}
+                </body>
+            </html>
+""")
+
+    return output, images
+
+
+class LegacyHTMLRenderer(HTMLRenderer):
+    extract_html = legacy_extract_html
+
+
+class LegacyMarkdownRenderer(MarkdownRenderer):
+    extract_html = legacy_extract_html
+
+
+@pytest.fixture(scope="module")
+def document():
+    # Layout is forced and OCR is off, so the fixture converts from its text layer without models
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(LineBuilder, "ocr_error_detection", lambda self, pages, page_lines: SimpleNamespace(labels=["good"] * len(pages)))
+        patch.setattr(
+            LineBuilder, "get_detection_results",
+            lambda self, images, run_detection, inline: ([None] * len(run_detection), [None] * len(run_detection)),
+        )
+        converter = PdfConverter(artifact_dict={name: None for name in MODELS}, processor_list=PROCESSORS, config=CONFIG)
+        document = converter.build_document(FIXTURE)
+
+    # A picture exercises the image branch of the assembly
+    page = document.pages[0]
+    picture = page.add_block(Picture, PolygonBox.from_bbox([50, 50, 250, 200]))
+    page.add_structure(picture)
+    return document
+
+
+def images_equal(first, second):
+    assert first.keys() == second.keys()
+    return all(first[name].tobytes() == second[name].tobytes() for name in first)
+
+
+@pytest.mark.parametrize("config", [{}, {"paginate_output": True}])
+def test_html_matches_legacy_assembly(document, config):
+    rendered = HTMLRenderer(config)(document)
+    legacy = LegacyHTMLRenderer(config)(document)
+
+    assert rendered.html == legacy.html
+    assert rendered.images and images_equal(rendered.images, legacy.images)
+    assert rendered.metadata == legacy.metadata
+
+
+@pytest.mark.parametrize("config", [{}, {"paginate_output": True}])
+def test_markdown_matches_legacy_assembly(document, config):
+    rendered = MarkdownRenderer(config)(document)
+    legacy = LegacyMarkdownRenderer(config)(document)
+
+    assert rendered.markdown == legacy.markdown
+    assert "AQL" in rendered.markdown
+    assert images_equal(rendered.images, legacy.images)
+    assert rendered.metadata == legacy.metadata
+
+
+def test_shared_render_matches_legacy_renders(document):
+    converter = PdfConverter(artifact_dict={name: None for name in MODELS}, processor_list=PROCESSORS, config=CONFIG)
+    outputs = converter.render_many(document, [MarkdownRenderer, HTMLRenderer, JSONRenderer])
+
+    assert outputs["MarkdownRenderer"].markdown == LegacyMarkdownRenderer(CONFIG)(document).markdown
+    assert outputs["HTMLRenderer"].html == LegacyHTMLRenderer(CONFIG)(document).html
+    assert outputs["JSONRenderer"] == JSONRenderer(CONFIG)(document)
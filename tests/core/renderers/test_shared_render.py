@@ -0,0 +1,129 @@
+"""
+Module: test_shared_render.py
+Description: Renderers handed one SharedRender render the block tree, page stats and image crops once between them
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/renderers/test_shared_render.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/renderers/test_shared_render.py -v
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from extractor.core.builders.line import LineBuilder
+from extractor.core.converters.pdf import PdfConverter
+from extractor.core.renderers import BaseRenderer, SharedRender
+from extractor.core.renderers.arangodb_json import ArangoDBRenderer
+from extractor.core.renderers.html import HTMLRenderer
+from extractor.core.renderers.json import JSONRenderer
+from extractor.core.renderers.markdown import MarkdownRenderer
+from extractor.core.schema.blocks import Picture
+from extractor.core.schema.document import Document
+from extractor.core.schema.polygon import PolygonBox
+
+FIXTURE = str(Path(__file__).parents[3] / "data" / "input" / "Arango_AQL_Example.pdf")
+MODELS = ("layout_model", "texify_model", "recognition_model", "table_rec_model", "detection_model", "ocr_error_model", "inline_detection_model")
+CONFIG = {"force_layout_block": "Text", "disable_ocr": True, "page_range": [0, 1], "disable_tqdm": True}
+PROCESSORS = [f"{p.__module__}.{p.__name__}" for p in PdfConverter.default_processors if "Table" not in p.__name__]
+
+
+@pytest.fixture(scope="module")
+def converter():
+    return PdfConverter(artifact_dict={name: None for name in MODELS}, processor_list=PROCESSORS, config=CONFIG)
+
+
+@pytest.fixture(scope="module")
+def document(converter):
+    # Layout is forced and OCR is off, so the fixture converts from its text layer without models
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(LineBuilder, "ocr_error_detection", lambda self, pages, page_lines: SimpleNamespace(labels=["good"] * len(pages)))
+        patch.setattr(
+            LineBuilder, "get_detection_results",
+            lambda self, images, run_detection, inline: ([None] * len(run_detection), [None] * len(run_detection)),
+        )
+        document = converter.build_document(FIXTURE)
+
+    page = document.pages[0]
+    picture = page.add_block(Picture, PolygonBox.from_bbox([50, 50, 250, 200]))
+    page.add_structure(picture)
+    return document
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Counts block tree renders, page stats and image crops."""
+    counts = {"render": 0, "page_stats": 0, "crop": 0}
+
+    def counted(name, function):
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(Document, "render", counted("render", Document.render))
+    monkeypatch.setattr(BaseRenderer, "_page_stats", counted("page_stats", BaseRenderer._page_stats))
+    monkeypatch.setattr(Picture, "get_image", counted("crop", Picture.get_image))
+    return counts
+
+
+RENDERERS = [MarkdownRenderer, HTMLRenderer, JSONRenderer]
+
+
+def test_renders_once_for_every_format(converter, document, calls):
+    outputs = converter.render_many(document, RENDERERS)
+
+    assert list(outputs) == ["MarkdownRenderer", "HTMLRenderer", "JSONRenderer"]
+    assert calls == {"render": 1, "page_stats": 1, "crop": 1}
+
+
+def test_each_renderer_alone_renders_again(converter, document, calls):
+    for renderer_cls in RENDERERS:
+        converter.resolve_dependencies(renderer_cls)(document)
+
+    assert calls == {"render": 3, "page_stats": 3, "crop": 3}
+
+
+def test_outputs_match_separate_renders(converter, document):
+    outputs = converter.render_many(document, ["extractor.core.renderers.markdown.MarkdownRenderer", HTMLRenderer, ArangoDBRenderer])
+
+    markdown = MarkdownRenderer(CONFIG)(document)
+    assert outputs["MarkdownRenderer"].markdown == markdown.markdown
+    assert outputs["MarkdownRenderer"].images.keys() == markdown.images.keys()
+    assert outputs["MarkdownRenderer"].metadata == markdown.metadata
+    assert outputs["HTMLRenderer"].html == HTMLRenderer(CONFIG)(document).html
+
+    shared, alone = outputs["ArangoDBRenderer"], ArangoDBRenderer(CONFIG)(document)
+    blocks = lambda output: [block.model_dump() for page in output.document.pages for block in page.blocks]
+    assert blocks(shared) == blocks(alone)
+    assert shared.raw_corpus == alone.raw_corpus
+
+
+def test_base64_images_are_encoded_once(document, calls):
+    shared = SharedRender(document)
+    picture = document.pages[0].structure[-1]
+
+    encoded = shared.image(picture, highres=True, to_base64=True)
+    assert shared.image(picture, highres=True, to_base64=True) is encoded
+    assert shared.image(picture, highres=True).size[0] > 0
+    shared.image(picture, highres=False)
+    assert calls["crop"] == 2
+
+
+def test_other_documents_are_not_shared(document, calls):
+    renderer = MarkdownRenderer()
+    renderer.shared = SharedRender(Document(filepath="other.pdf", pages=[]))
+
+    assert renderer.shared_for(document) is None
+    renderer(document)
+    renderer(document)
+    assert calls["render"] == 2
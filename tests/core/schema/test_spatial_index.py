@@ -0,0 +1,135 @@
+"""
+Module: test_spatial_index.py
+Description: Page spatial queries match a brute force scan, and follow polygons as they change
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/schema/test_spatial_index.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/schema/test_spatial_index.py -v
+"""
+
+import pickle
+import random
+
+import pytest
+
+from extractor.core.schema import BlockTypes
+from extractor.core.schema.blocks import Code, Text
+from extractor.core.schema.groups.page import PageGroup
+from extractor.core.schema.polygon import PolygonBox
+from extractor.core.schema.spatial import SpatialIndex, bbox_gap
+
+
+def overlaps(a, b) -> bool:
+    return min(a[2], b[2]) > max(a[0], b[0]) and min(a[3], b[3]) > max(a[1], b[1])
+
+
+def random_bbox(rng: random.Random):
+    x, y = rng.uniform(0, 550), rng.uniform(0, 750)
+    return [x, y, x + rng.uniform(1, 120), y + rng.uniform(1, 40)]
+
+
+@pytest.fixture
+def page():
+    rng = random.Random(0)
+    page = PageGroup(page_id=0, polygon=PolygonBox.from_bbox([0, 0, 600, 800]))
+    for _ in range(300):
+        page.add_block(Text, PolygonBox.from_bbox(random_bbox(rng)))
+    return page
+
+
+def intersecting_ids(page: PageGroup, bbox):
+    return [b.block_id for b in page.blocks_intersecting(bbox)]
+
+
+def scanned_ids(page: PageGroup, bbox):
+    return sorted(b.block_id for b in page.children if not b.removed and overlaps(b.polygon.bbox, bbox))
+
+
+def test_queries_match_scan():
+    rng = random.Random(1)
+    bboxes = {i: random_bbox(rng) for i in range(500)}
+    index = SpatialIndex(cell_size=40)
+    for block_id, bbox in bboxes.items():
+        index.insert(block_id, bbox)
+
+    for _ in range(50):
+        query = random_bbox(rng)
+        assert index.intersecting(query) == sorted(i for i, b in bboxes.items() if overlaps(b, query))
+
+        gaps = sorted((bbox_gap(query, b), i) for i, b in bboxes.items())
+        nearest = index.nearest(query, k=5)
+        assert [bbox_gap(query, bboxes[i]) for i in nearest] == [gap for gap, _ in gaps[:5]]
+
+        below = sorted(
+            (b[1] - query[3], i) for i, b in bboxes.items()
+            if b[1] >= query[3] and min(query[2], b[2]) > max(query[0], b[0])
+        )
+        assert index.below(query) == [i for _, i in below]
+
+
+def test_page_queries_filter_types_and_removed(page):
+    query = [100, 100, 400, 400]
+    assert intersecting_ids(page, query) == scanned_ids(page, query)
+
+    hit = page.blocks_intersecting(query)[0]
+    code = Code.from_block(hit)
+    page.replace_block(hit, code)
+    assert hit.block_id not in intersecting_ids(page, query)
+    assert [b.block_id for b in page.blocks_intersecting(query, (BlockTypes.Code,))] == [code.block_id]
+    assert intersecting_ids(page, query) == scanned_ids(page, query)
+
+    # A replaced block that moves later stays out of the index
+    hit.polygon = PolygonBox.from_bbox([0, 0, 600, 800])
+    assert hit.block_id not in intersecting_ids(page, [0, 0, 10, 10])
+
+
+def test_reassigned_polygon_is_followed(page):
+    page.spatial_index
+    block = page.children[0]
+    block.polygon = PolygonBox.from_bbox([590, 790, 600, 800])
+    assert block.block_id in intersecting_ids(page, [595, 795, 600, 800])
+    assert intersecting_ids(page, [0, 0, 600, 800]) == scanned_ids(page, [0, 0, 600, 800])
+
+
+def test_polygon_changed_in_place_is_followed(page):
+    page.spatial_index
+    block = page.children[1]
+    old_bbox = block.polygon.bbox
+
+    # fit_to_bounds assigns new corners to the box the block already holds
+    block.polygon.fit_to_bounds([old_bbox[0], old_bbox[1], old_bbox[0] + 1, old_bbox[1] + 1])
+    assert page.spatial_index.bboxes[block.block_id] == tuple(block.polygon.bbox)
+    for query in (old_bbox, [0, 0, 600, 800], [200, 300, 450, 700]):
+        assert intersecting_ids(page, query) == scanned_ids(page, query)
+
+
+def test_copies_do_not_move_the_original(page):
+    page.spatial_index
+    block = page.children[2]
+    before = block.polygon.bbox
+
+    copied = block.polygon.model_copy()
+    copied.polygon = PolygonBox.from_bbox([0, 0, 1, 1]).polygon
+    assert page.spatial_index.bboxes[block.block_id] == tuple(before)
+    assert copied != block.polygon
+    assert copied == PolygonBox.from_bbox([0, 0, 1, 1])
+
+
+def test_pickled_page_builds_its_own_index(page):
+    page.spatial_index
+    restored = pickle.loads(pickle.dumps(page))
+    block = restored.children[3]
+    old_bbox = block.polygon.bbox
+
+    block.polygon.fit_to_bounds([old_bbox[0], old_bbox[1], old_bbox[0] + 1, old_bbox[1] + 1])
+    assert restored.spatial_index.bboxes[block.block_id] == tuple(block.polygon.bbox)
+    assert page.spatial_index.bboxes[block.block_id] == tuple(old_bbox)
+    assert intersecting_ids(restored, old_bbox) == scanned_ids(restored, old_bbox)
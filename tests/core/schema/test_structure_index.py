@@ -0,0 +1,164 @@
+"""
+Module: test_structure_index.py
+Description: The page structure index matches a full structure walk after every kind of edit
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/schema/test_structure_index.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/schema/test_structure_index.py -v
+"""
+
+import pickle
+
+import pytest
+
+from extractor.core.schema import BlockTypes
+from extractor.core.schema.blocks import Block, Code, Text
+from extractor.core.schema.document import Document
+from extractor.core.schema.groups.page import PageGroup
+from extractor.core.schema.polygon import PolygonBox
+from extractor.core.schema.structure import StructureList
+from extractor.core.schema.text.line import Line
+
+QUERIES = [None, (BlockTypes.Text,), (BlockTypes.Line,), (BlockTypes.Text, BlockTypes.Code, BlockTypes.Line)]
+
+
+def box(i: int) -> PolygonBox:
+    return PolygonBox.from_bbox([0, i * 10, 600, i * 10 + 8])
+
+
+def add_text(page: PageGroup, lines: int = 2, block_cls=Text) -> Block:
+    block = page.add_block(block_cls, box(len(page.children or [])))
+    for _ in range(lines):
+        line = page.add_block(Line, box(len(page.children)))
+        block.add_structure(line)
+    return block
+
+
+@pytest.fixture
+def document():
+    page = PageGroup(page_id=0, polygon=PolygonBox.from_bbox([0, 0, 600, 800]))
+    for _ in range(4):
+        page.add_structure(add_text(page))
+    return Document(filepath="test.pdf", pages=[page])
+
+
+def assert_matches_walk(document: Document):
+    """Every query served by the index equals the recursive walk it replaces."""
+    page = document.pages[0]
+    for block_types in QUERIES:
+        expected = Block.contained_blocks(page, document, block_types)
+        assert [b.id for b in page.contained_blocks(document, block_types)] == [b.id for b in expected]
+    for block in Block.contained_blocks(page, document):
+        holder = page.get_parent(document, block)
+        # Retyping a block leaves the ids that hold it as they were, so ids are compared without their type
+        assert (block.page_id, block.block_id) in [(item.page_id, item.block_id) for item in holder.structure]
+
+
+def test_index_is_patched_not_rebuilt(document):
+    page = document.pages[0]
+    index = page.structure_index(document)
+    page.add_structure(add_text(page))
+
+    assert page.structure_index(document) is index
+    assert not index.stale
+    assert_matches_walk(document)
+
+
+def test_add(document):
+    page = document.pages[0]
+    assert_matches_walk(document)
+
+    # Appended to the page, inserted between blocks, and appended to a block in the middle
+    page.add_structure(add_text(page, lines=3))
+    page.structure.insert(1, add_text(page, lines=1, block_cls=Code).id)
+    middle = page.get_block(page.structure[2])
+    middle.add_structure(page.add_block(Line, box(99)))
+    page.structure.extend([add_text(page).id, add_text(page).id])
+
+    assert not page.structure_index(document).stale
+    assert_matches_walk(document)
+
+
+def test_replace(document):
+    page = document.pages[0]
+    assert_matches_walk(document)
+
+    old = page.get_block(page.structure[1])
+    new = Code.from_block(old)
+    page.replace_block(old, new)
+    assert_matches_walk(document)
+    lines = page.contained_blocks(document, (BlockTypes.Line,))
+    assert page.get_parent(document, lines[2]) is new
+
+    # Replacing a line inside a block
+    text = page.get_block(page.structure[0])
+    line = page.add_block(Line, box(50))
+    text.structure[-1] = line.id
+    assert not page.structure_index(document).stale
+    assert_matches_walk(document)
+
+
+def test_remove(document):
+    page = document.pages[0]
+    assert_matches_walk(document)
+
+    page.get_block(page.structure[0]).removed = True
+    page.structure.remove(page.structure[1])
+    last = page.get_block(page.structure[-1])
+    del last.structure[0]
+    last.remove_structure_items([last.structure[0]])
+
+    assert not page.structure_index(document).stale
+    assert_matches_walk(document)
+
+
+def test_unremove_and_retype(document):
+    page = document.pages[0]
+    block = page.get_block(page.structure[2])
+    assert_matches_walk(document)
+
+    block.removed = True
+    assert_matches_walk(document)
+    block.removed = False
+    assert_matches_walk(document)
+
+    block.block_type = BlockTypes.Code
+    assert_matches_walk(document)
+
+
+def test_structure_reassigned_and_reordered(document):
+    page = document.pages[0]
+    assert_matches_walk(document)
+
+    block = page.get_block(page.structure[1])
+    block.structure = list(reversed(block.structure))
+    assert_matches_walk(document)
+
+    page.structure.reverse()
+    assert_matches_walk(document)
+
+
+def test_plain_list_structures_are_tracked_after_unpickling(document):
+    page = document.pages[0]
+    block = page.get_block(page.structure[0])
+    # How structures were stored before they were tracked
+    block.__dict__["structure"] = list(block.structure)
+    page.__dict__["structure"] = list(page.structure)
+
+    restored = pickle.loads(pickle.dumps(document))
+    restored_page = restored.pages[0]
+    restored_block = restored_page.get_block(restored_page.structure[0])
+    assert type(restored_block.structure) is StructureList
+    assert restored_block.structure.owner is restored_block
+
+    assert_matches_walk(restored)
+    restored_block.add_structure(restored_page.add_block(Line, box(77)))
+    assert_matches_walk(restored)
@@ -0,0 +1,168 @@
+"""
+Module: test_batch_resume.py
+Description: Batch conversion splits large PDFs into balanced tasks, and only skips earlier work when asked to resume the same run
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+- click: https://click.palletsprojects.com/
+
+Sample Input:
+>>> pytest tests/core/scripts/test_batch_resume.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/scripts/test_batch_resume.py -v
+"""
+
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+from extractor.core.renderers.markdown import MarkdownOutput
+from extractor.core.scripts import convert
+from extractor.core.utils.batch_schedule import ConversionManifest, ConversionTask, options_fingerprint, plan_tasks
+
+
+def test_large_files_split_into_equal_parts_largest_first():
+    tasks = plan_tasks(["a.pdf", "b.pdf", "c.docx"], {"a.pdf": 250, "b.pdf": 40, "c.docx": None}, pages_per_task=100)
+
+    assert [(task.filepath, task.page_range) for task in tasks] == [
+        ("a.pdf", (0, 84)), ("a.pdf", (84, 168)), ("a.pdf", (168, 250)), ("b.pdf", None), ("c.docx", None),
+    ]
+    assert tasks[2].page_range_str == "168-249"
+    assert [task.pages for task in plan_tasks(["a.pdf"], {"a.pdf": 250}, pages_per_task=0)] == [250]
+
+
+def test_chunks_are_balanced_by_pages():
+    page_counts = {"big.pdf": 90, "a.pdf": 30, "b.pdf": 30, "c.pdf": 30}
+    chunks = [convert.assign_chunk(list(page_counts), page_counts, idx, 2) for idx in range(2)]
+
+    assert chunks == [["big.pdf"], ["a.pdf", "b.pdf", "c.pdf"]]
+
+
+def test_fingerprint_ignores_scheduling_options():
+    options = {"output_format": "markdown", "workers": 4, "resume": False}
+    assert options_fingerprint(options) == options_fingerprint({**options, "workers": 8, "resume": True})
+    assert options_fingerprint(options) != options_fingerprint({**options, "output_format": "html"})
+
+
+@pytest.fixture
+def finished_manifest(tmp_path):
+    source = tmp_path / "doc.pdf"
+    source.write_bytes(b"%PDF")
+    path = str(tmp_path / "manifest.json")
+    task = ConversionTask(str(source), (0, 10), 10)
+    ConversionManifest(path, "fp").mark_task(task, "part.pkl")
+    return path, task
+
+
+def test_manifests_are_only_read_when_resuming(finished_manifest):
+    path, task = finished_manifest
+
+    assert not ConversionManifest(path, "fp").is_done(task)
+    assert ConversionManifest(path, "fp", resume=True).is_done(task)
+    assert ConversionManifest(path, "fp", resume=True).part_path(task) == "part.pkl"
+
+
+def test_other_options_start_over(finished_manifest):
+    path, task = finished_manifest
+    manifest = ConversionManifest(path, "other", resume=True)
+
+    assert not manifest.is_done(task)
+    manifest.save()
+    assert json.load(open(path)) == {"fingerprint": "other", "tasks": {}, "files": {}}
+
+
+def test_changed_files_start_over(finished_manifest):
+    path, task = finished_manifest
+    with open(task.filepath, "ab") as f:
+        f.write(b"-1.7")
+
+    assert not ConversionManifest(path, "fp", resume=True).is_done(task)
+
+
+def test_unreadable_manifests_start_over(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{")
+    source = tmp_path / "doc.pdf"
+    source.write_bytes(b"%PDF")
+
+    assert not ConversionManifest(str(path), "fp", resume=True).file_done(str(source))
+
+
+class InlinePool:
+    def __init__(self, processes, initializer, initargs, maxtasksperchild):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap_unordered(self, fn, iterable):
+        return map(fn, iterable)
+
+
+@pytest.fixture
+def batch(tmp_path, monkeypatch):
+    """Runs convert_cli in-process, rendering each page range as text and failing the ranges in `failing`."""
+    in_folder = tmp_path / "in"
+    in_folder.mkdir()
+    for name in ("long.pdf", "short.pdf"):
+        (in_folder / name).write_bytes(b"%PDF " + name.encode())
+    page_counts = {"long.pdf": 5, "short.pdf": 1}
+    output_dir = tmp_path / "out"
+    state = SimpleNamespace(rendered=[], failing=set())
+
+    def render_file(fpath, cli_options):
+        key = (os.path.basename(fpath), cli_options.get("page_range"))
+        state.rendered.append(key)
+        if key in state.failing:
+            return None
+        return MarkdownOutput(markdown=f"{key[0]} pages {key[1]}", images={}, metadata={})
+
+    monkeypatch.setattr(convert, "render_file", render_file)
+    monkeypatch.setattr(convert, "count_file_pages", lambda f: page_counts[os.path.basename(f)])
+    monkeypatch.setattr(convert, "create_model_dict", lambda: {})
+    monkeypatch.setattr(convert, "mp", SimpleNamespace(set_start_method=lambda method: None, Pool=InlinePool))
+
+    def run(*args):
+        state.rendered.clear()
+        result = CliRunner().invoke(convert.convert_cli, [str(in_folder), "--output_dir", str(output_dir), "--pages_per_task", "2", *args])
+        assert result.exit_code == 0, result.output
+        return sorted(state.rendered, key=str)
+
+    state.run = run
+    state.output = lambda stem: (output_dir / stem / f"{stem}.md").read_text()
+    return state
+
+
+def test_reruns_convert_everything_unless_resuming(batch):
+    batch.failing = {("long.pdf", "4-4")}
+    assert batch.run() == [("long.pdf", "0-1"), ("long.pdf", "2-3"), ("long.pdf", "4-4"), ("short.pdf", None)]
+    assert batch.output("short") == "short.pdf pages None"
+
+    # Without --resume the manifest from the interrupted run is ignored
+    assert batch.run() == [("long.pdf", "0-1"), ("long.pdf", "2-3"), ("long.pdf", "4-4"), ("short.pdf", None)]
+
+    batch.failing = set()
+    assert batch.run("--resume") == [("long.pdf", "4-4")]
+    assert batch.output("long") == "long.pdf pages 0-1\n\nlong.pdf pages 2-3\n\nlong.pdf pages 4-4"
+
+    assert batch.run("--resume") == []
+
+
+def test_resuming_with_other_options_starts_over(batch):
+    batch.failing = {("long.pdf", "4-4")}
+    batch.run()
+
+    batch.failing = set()
+    assert batch.run("--resume", "--disable_image_extraction") == [
+        ("long.pdf", "0-1"), ("long.pdf", "2-3"), ("long.pdf", "4-4"), ("short.pdf", None),
+    ]
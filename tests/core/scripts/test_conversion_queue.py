@@ -0,0 +1,128 @@
+"""
+Module: test_conversion_queue.py
+Description: Server conversions queue up to a limit, move through their statuses and are pruned after their TTL
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+- fastapi: https://fastapi.tiangolo.com/
+
+Sample Input:
+>>> pytest tests/core/scripts/test_conversion_queue.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/scripts/test_conversion_queue.py -v
+"""
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from extractor.core.scripts import server
+
+
+class Conversion:
+    """Stands in for a conversion, which finishes once released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def __call__(self, params):
+        self.started.set()
+        self.release.wait(5)
+        if params.filepath == "bad.pdf":
+            return {"success": False, "error": "Could not open bad.pdf"}
+        return {"success": True, "output": f"converted {params.filepath}"}
+
+
+@pytest.fixture
+def conversion(monkeypatch):
+    conversion = Conversion()
+    monkeypatch.setattr(server, "_run_conversion", conversion)
+    yield conversion
+    conversion.release.set()
+
+
+def make_client(monkeypatch, **settings):
+    queue = server.ConversionQueue(**{"workers": 1, "max_queue_size": 2, "job_timeout": 5, "job_ttl": 60, **settings})
+    monkeypatch.setitem(server.app_data, "queue", queue)
+    return TestClient(server.app), queue
+
+
+def wait_for(client, job_id, status):
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        response = client.get(f"/marker/jobs/{job_id}")
+        if response.json().get("status") == status:
+            return response.json()
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} never reached {status}")
+
+
+def submit(client, filepath="doc.pdf"):
+    return client.post("/marker/jobs", json={"filepath": filepath})
+
+
+def test_full_queue_returns_429(conversion, monkeypatch):
+    client, _ = make_client(monkeypatch)
+    assert submit(client).status_code == 202
+    assert submit(client).status_code == 202
+
+    assert submit(client).status_code == 429
+    assert client.post("/marker", json={"filepath": "doc.pdf"}).status_code == 429
+
+
+def test_job_statuses(conversion, monkeypatch):
+    client, _ = make_client(monkeypatch)
+    running = submit(client).json()["job_id"]
+    queued = submit(client).json()["job_id"]
+
+    wait_for(client, running, "running")
+    assert client.get(f"/marker/jobs/{queued}").json()["status"] == "queued"
+    assert client.get(f"/marker/jobs/{running}/result").status_code == 202
+
+    conversion.release.set()
+    done = wait_for(client, running, "completed")
+    assert done["started_at"] <= done["finished_at"]
+    assert client.get(f"/marker/jobs/{running}/result").json()["output"] == "converted doc.pdf"
+    wait_for(client, queued, "completed")
+
+    failing = submit(client, "bad.pdf").json()["job_id"]
+    wait_for(client, failing, "failed")
+    assert client.get(f"/marker/jobs/{failing}/result").json()["success"] is False
+    assert client.get("/marker/jobs/unknown").status_code == 404
+
+
+def test_timed_out_jobs_hold_capacity_until_they_return(conversion, monkeypatch):
+    client, queue = make_client(monkeypatch, max_queue_size=1, job_timeout=0.05)
+    job_id = submit(client).json()["job_id"]
+    conversion.started.wait(5)
+    time.sleep(0.1)
+
+    assert client.get(f"/marker/jobs/{job_id}").json()["status"] == "timeout"
+    assert client.get(f"/marker/jobs/{job_id}/result").status_code == 504
+    # The worker is still busy with the timed out conversion
+    assert submit(client).status_code == 429
+
+    conversion.release.set()
+    queue.jobs[job_id]["future"].result(5)
+    assert client.get(f"/marker/jobs/{job_id}").json()["status"] == "timeout"
+    assert queue.result(job_id) is None
+    assert submit(client).status_code == 202
+
+
+def test_finished_jobs_are_pruned_after_their_ttl(conversion, monkeypatch):
+    client, queue = make_client(monkeypatch, job_ttl=0.05)
+    conversion.release.set()
+    job_id = submit(client).json()["job_id"]
+    wait_for(client, job_id, "completed")
+
+    time.sleep(0.1)
+    assert submit(client).status_code == 202
+    assert client.get(f"/marker/jobs/{job_id}").status_code == 404
+    assert job_id not in queue.jobs
@@ -0,0 +1,54 @@
+"""
+Module: test_llm_response_cache.py
+Description: LLM response cache keys cover the generation settings of a request
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/services/utils/test_llm_response_cache.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/services/utils/test_llm_response_cache.py -v
+"""
+
+from PIL import Image
+from pydantic import BaseModel
+
+from extractor.core.services import BaseService
+from extractor.core.services.utils.llm_response_cache import LLMResponseCache
+
+
+class Answer(BaseModel):
+    text: str
+
+
+class TemperatureService(BaseService):
+    temperature: float = 0.0
+
+    def generation_settings(self) -> dict:
+        return {"temperature": self.temperature}
+
+
+def test_settings_change_the_key(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+    image = Image.new("RGB", (4, 4))
+    key = cache.compute_key("model", "prompt", image, Answer, {"temperature": 0.0, "max_tokens": 100})
+
+    assert key == cache.compute_key("model", "prompt", image, Answer, {"max_tokens": 100, "temperature": 0.0})
+    assert key != cache.compute_key("model", "prompt", image, Answer, {"temperature": 0.7, "max_tokens": 100})
+    assert key != cache.compute_key("model", "prompt", image, Answer, {"temperature": 0.0, "max_tokens": 200})
+    assert key != cache.compute_key("model", "prompt", image, Answer)
+
+
+def test_services_key_on_their_settings(tmp_path):
+    config = {"use_response_cache": True, "response_cache_dir": str(tmp_path)}
+    cold = TemperatureService(config)
+    warm = TemperatureService({**config, "temperature": 0.9})
+    cold.cache_response(cold.response_cache_key("model", "prompt", None, Answer), {"text": "cold"})
+
+    assert cold.get_cached_response(cold.response_cache_key("model", "prompt", None, Answer)) == {"text": "cold"}
+    assert warm.get_cached_response(warm.response_cache_key("model", "prompt", None, Answer)) is None
@@ -0,0 +1,133 @@
+"""
+Module: test_tree_sitter_cache.py
+Description: Tree-sitter parsers and metadata queries are built once per language and thread, and failed queries raise a new error on every call
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/services/utils/test_tree_sitter_cache.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/services/utils/test_tree_sitter_cache.py -v
+"""
+
+import threading
+import traceback
+
+import pytest
+
+from extractor.core.services.utils import tree_sitter_utils
+from extractor.core.services.utils.tree_sitter_utils import get_parser, get_query
+
+
+class FakeLanguagePack:
+    """Stands in for tree_sitter_language_pack, whose grammars are downloaded on first use."""
+
+    def __init__(self):
+        self.parsers = 0
+        self.compiles = 0
+
+    def get_parser(self, language_id):
+        self.parsers += 1
+        return object()
+
+    def get_language(self, language_id):
+        return self
+
+    def query(self, query_str):
+        self.compiles += 1
+        if "broken" in query_str:
+            raise SyntaxError("Invalid syntax at offset 1")
+        return object()
+
+
+@pytest.fixture
+def pack(monkeypatch):
+    pack = FakeLanguagePack()
+    monkeypatch.setattr(tree_sitter_utils, "tlp", pack)
+    monkeypatch.setitem(tree_sitter_utils.QUERY_PATTERNS, "broken_lang", "(broken")
+    return pack
+
+
+def in_thread(function):
+    """Run function on a new thread, which starts with empty caches, and return or raise its outcome."""
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = function()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def test_parsers_are_reused_within_a_thread(pack):
+    first, second, other = in_thread(lambda: (get_parser("python"), get_parser("python"), get_parser("rust")))
+
+    assert first is second
+    assert other is not first
+    assert pack.parsers == 2
+
+
+def test_each_thread_gets_its_own_parser(pack):
+    parsers = [in_thread(lambda: get_parser("python")) for _ in range(3)]
+    barrier = threading.Barrier(4)
+
+    def concurrent():
+        barrier.wait()
+        return get_parser("python")
+
+    threads = []
+    results = []
+    for _ in range(4):
+        thread = threading.Thread(target=lambda: results.append(concurrent()))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    assert len({id(parser) for parser in parsers + results}) == 7
+    assert pack.parsers == 7
+
+
+def test_queries_compile_once_per_thread(pack):
+    first, second = in_thread(lambda: (get_query("python"), get_query("python")))
+
+    assert first is second
+    assert in_thread(lambda: get_query("python")) is not first
+    assert pack.compiles == 2
+
+
+def test_failed_queries_raise_a_new_error_each_call(pack):
+    def attempts():
+        errors = []
+        for _ in range(3):
+            with pytest.raises(ValueError) as excinfo:
+                get_query("broken_lang")
+            errors.append(excinfo.value)
+        return errors
+
+    errors = in_thread(attempts)
+
+    assert pack.compiles == 1
+    assert len({id(error) for error in errors}) == 3
+    assert str(errors[0]) == "Metadata query for broken_lang does not compile: SyntaxError: Invalid syntax at offset 1"
+    # The traceback doesn't grow with every call
+    assert len({len(traceback.extract_tb(error.__traceback__)) for error in errors}) == 1
+
+
+def test_languages_without_a_pattern_use_the_python_query(pack, monkeypatch):
+    monkeypatch.setitem(tree_sitter_utils.QUERY_PATTERNS, "python", "(broken python pattern")
+
+    with pytest.raises(ValueError, match="Metadata query for lua does not compile"):
+        in_thread(lambda: get_query("lua"))
@@ -0,0 +1,126 @@
+"""
+Module: test_camelot_search.py
+Description: Camelot parameter search stops at the first good candidate, remembers winners and runs in-process where it must
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+- pypdfium2: https://pypdfium2.readthedocs.io/
+
+Sample Input:
+>>> pytest tests/core/utils/test_camelot_search.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/utils/test_camelot_search.py -v
+"""
+
+import time
+from types import SimpleNamespace
+
+import pypdfium2 as pdfium
+import pytest
+
+from extractor.core.utils import camelot_search
+from extractor.core.utils.camelot_search import CamelotParameterSearch, get_executor
+
+
+class FakeCamelot:
+    """Finds one table, whose quality is the candidate's "score"."""
+
+    def __init__(self):
+        self.calls = []
+
+    def read_pdf(self, page_pdf, pages, **params):
+        self.calls.append(params["name"])
+        time.sleep(params.get("delay", 0))
+        if params.get("fail"):
+            raise ValueError("No tables found")
+        return [SimpleNamespace(df=SimpleNamespace(empty=False), params=params)]
+
+
+def score(tables, params, seconds):
+    return params["score"]
+
+
+@pytest.fixture
+def camelot(monkeypatch):
+    fake = FakeCamelot()
+    monkeypatch.setattr(camelot_search, "camelot", fake, raising=False)
+    monkeypatch.setattr(camelot_search, "CAMELOT_AVAILABLE", True)
+    return fake
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    doc = pdfium.PdfDocument.new()
+    for _ in range(3):
+        doc.new_page(200, 300)
+    doc.save(str(tmp_path / "doc.pdf"))
+    return str(tmp_path / "doc.pdf")
+
+
+def make_search(tmp_path, **kwargs):
+    return CamelotParameterSearch(**{"max_workers": 1, "quality_threshold": 0.9, "cache_dir": str(tmp_path / "memo"), **kwargs})
+
+
+CANDIDATES = [{"name": "weak", "score": 0.5}, {"name": "good", "score": 0.95}, {"name": "later", "score": 1.0}]
+
+
+def test_stops_at_the_first_good_candidate(camelot, pdf, tmp_path):
+    result = make_search(tmp_path, memoize=False).search(pdf, 1, CANDIDATES, score)
+
+    assert camelot.calls == ["weak", "good"]
+    assert result.params["name"] == "good"
+    assert result.quality == 0.95
+    assert result.attempts == 2
+
+
+def test_keeps_the_best_when_nothing_clears_the_threshold(camelot, pdf, tmp_path):
+    candidates = [{"name": "weak", "score": 0.5}, {"name": "broken", "score": 1.0, "fail": True}, {"name": "fair", "score": 0.7}]
+    result = make_search(tmp_path, memoize=False).search(pdf, 0, candidates, score)
+
+    assert result.params["name"] == "fair"
+    assert result.attempts == 3
+
+
+def test_remembers_winners_per_layout(camelot, pdf, tmp_path):
+    search = make_search(tmp_path)
+    search.search(pdf, 0, CANDIDATES, score)
+    camelot.calls.clear()
+
+    # Pages 0 and 2 share a layout, so the winner is tried first
+    result = search.search(pdf, 2, CANDIDATES, score)
+    assert camelot.calls == ["good"]
+    assert result.memoized
+
+
+def test_slow_candidates_score_zero(camelot, pdf, tmp_path):
+    candidates = [{"name": "slow", "score": 1.0, "delay": 0.2}, {"name": "fair", "score": 0.6}]
+    result = make_search(tmp_path, memoize=False, attempt_timeout=0.05).search(pdf, 0, candidates, score)
+
+    assert result.params["name"] == "fair"
+
+
+def test_daemonic_workers_search_in_process(camelot, pdf, tmp_path, monkeypatch):
+    monkeypatch.setattr(camelot_search.mp, "current_process", lambda: SimpleNamespace(daemon=True))
+    assert get_executor(4) is None
+
+    result = make_search(tmp_path, memoize=False, max_workers=4).search(pdf, 0, CANDIDATES, score)
+    assert result.params["name"] == "good"
+
+
+def test_pools_that_fail_to_start_fall_back_in_process(camelot, pdf, tmp_path, monkeypatch):
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise RuntimeError("daemonic processes are not allowed to have children")
+
+        def shutdown(self, **kwargs):
+            pass
+
+    monkeypatch.setattr(camelot_search, "get_executor", lambda workers: BrokenPool())
+    result = make_search(tmp_path, memoize=False, max_workers=4).search(pdf, 0, CANDIDATES, score)
+
+    assert result.params["name"] == "good"
+    assert camelot.calls == ["weak", "good"]
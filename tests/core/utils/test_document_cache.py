@@ -0,0 +1,151 @@
+"""
+Module: test_document_cache.py
+Description: Document cache keys are stable, entries leave out page images and stay within their limits
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/utils/test_document_cache.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/utils/test_document_cache.py -v
+"""
+
+import os
+import time
+
+import pypdfium2 as pdfium
+import pytest
+from PIL import Image
+
+from extractor.core.builders.document import DocumentBuilder
+from extractor.core.converters.pdf import PdfConverter
+from extractor.core.providers.pdf import PdfProvider
+from extractor.core.schema import BlockTypes
+from extractor.core.schema.document import Document
+from extractor.core.schema.groups.page import PageGroup
+from extractor.core.schema.polygon import PolygonBox
+from extractor.core.utils.document_cache import DocumentCache, config_fingerprint
+
+
+class ImageSource:
+    def get(self, page_id, highres):
+        return Image.new("RGB", (10, 10))
+
+
+def make_document(pages: int = 2) -> Document:
+    document = Document(filepath="test.pdf", pages=[
+        PageGroup(
+            page_id=page_id,
+            polygon=PolygonBox.from_bbox([0, 0, 600, 800]),
+            lowres_image=Image.new("RGB", (600, 800)),
+            highres_image=Image.new("RGB", (1200, 1600)),
+        )
+        for page_id in range(pages)
+    ])
+    for page in document.pages:
+        page.set_image_source(ImageSource())
+    return document
+
+
+def test_fingerprint_is_stable():
+    config = {"page_range": {3, 1, 2}, "block_type": BlockTypes.Table, "output_dir": "out"}
+    assert config_fingerprint(config, [DocumentCache]) == config_fingerprint(dict(config), [DocumentCache])
+    assert config_fingerprint(config) != config_fingerprint({**config, "block_type": BlockTypes.Text})
+
+
+def test_fingerprint_rejects_unknown_values():
+    with pytest.raises(TypeError):
+        config_fingerprint({"renderer": object()})
+
+
+def test_entries_leave_out_page_images(tmp_path):
+    cache = DocumentCache(str(tmp_path))
+    document = make_document()
+    cache.set("key", document)
+
+    restored = cache.get("key")
+    assert [page.page_id for page in restored.pages] == [0, 1]
+    assert all(page.lowres_image is None and page.highres_image is None for page in restored.pages)
+    assert all(page._image_source is None for page in restored.pages)
+    # The document being converted keeps its images
+    assert all(page.lowres_image is not None and page._image_source is not None for page in document.pages)
+    assert os.path.getsize(tmp_path / "key.pkl") < 100_000
+
+
+def test_evicts_least_recently_used_over_byte_limit(tmp_path):
+    cache = DocumentCache(str(tmp_path))
+    for i, key in enumerate("abc"):
+        cache.set(key, make_document())
+        os.utime(tmp_path / f"{key}.pkl", (time.time() - 100 + i, time.time() - 100 + i))
+    cache.get("a")
+    entry_size = os.path.getsize(tmp_path / "a.pkl")
+
+    cache.max_bytes = entry_size * 2
+    cache.set("d", make_document())
+    assert sorted(os.listdir(tmp_path)) == ["a.pkl", "d.pkl"]
+
+    cache.max_entries = 1
+    cache.set("e", make_document())
+    assert os.listdir(tmp_path) == ["e.pkl"]
+
+
+def test_skips_documents_larger_than_the_cache(tmp_path):
+    cache = DocumentCache(str(tmp_path), max_bytes=10)
+    cache.set("key", make_document())
+    assert cache.get("key") is None
+    assert os.listdir(tmp_path) == []
+
+
+def make_converter(tmp_path, build):
+    converter = PdfConverter(
+        artifact_dict={name: None for name in ("layout_model", "texify_model", "recognition_model", "table_rec_model", "detection_model", "ocr_error_model", "inline_detection_model")},
+        config={"use_document_cache": True, "document_cache_dir": str(tmp_path / "cache")},
+    )
+    converter._build_document = build
+    return converter
+
+
+def test_hits_restore_images_without_a_provider(tmp_path, monkeypatch):
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(2):
+        pdf.new_page(200, 300)
+    pdf.save(str(tmp_path / "doc.pdf"))
+    builds = []
+
+    def build(filepath):
+        builds.append(filepath)
+        return make_document()
+
+    converter = make_converter(tmp_path, build)
+    converter.build_document(str(tmp_path / "doc.pdf"))
+
+    def no_provider(*args, **kwargs):
+        raise AssertionError("A cache hit extracted the PDF's text")
+
+    monkeypatch.setattr(PdfProvider, "__init__", no_provider)
+    document = converter.build_document(str(tmp_path / "doc.pdf"))
+    assert len(builds) == 1
+    # Rendered from the file on first use
+    dpi = DocumentBuilder.lowres_image_dpi
+    assert document.pages[1].get_image().size == (round(200 * dpi / 72), round(300 * dpi / 72))
+
+
+def test_other_formats_are_not_cached(tmp_path):
+    path = tmp_path / "doc.html"
+    path.write_text("<html><body><p>Hello</p></body></html>")
+    builds = []
+
+    def build(filepath):
+        builds.append(filepath)
+        return make_document()
+
+    converter = make_converter(tmp_path, build)
+    converter.build_document(str(path))
+    converter.build_document(str(path))
+    assert len(builds) == 2
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,103 @@
+"""
+Module: test_embedding_utils.py
+Description: Batched embeddings run each new text through the model once, in length-sorted batches, and reuse cached vectors
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+- torch: https://pytorch.org/
+
+Sample Input:
+>>> pytest tests/core/utils/test_embedding_utils.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/utils/test_embedding_utils.py -v
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+
+from extractor.core.utils import embedding_utils
+from extractor.core.utils.embedding_utils import EmbeddingCache, get_embedding, get_embeddings
+
+
+class FakeTokenizer:
+    """Encodes each text as its length, recording the batches it sees."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    def __call__(self, batch, **kwargs):
+        if self.fail:
+            raise RuntimeError("Out of memory")
+        self.batches.append(list(batch))
+        return {"lengths": torch.tensor([[float(len(text))] for text in batch])}
+
+
+class FakeModel:
+    def __call__(self, lengths):
+        # CLS vector (length, 1), so every text has a distinct direction
+        return SimpleNamespace(last_hidden_state=torch.cat([lengths, torch.ones_like(lengths)], dim=1).unsqueeze(1))
+
+
+@pytest.fixture
+def tokenizer(tmp_path, monkeypatch):
+    tokenizer = FakeTokenizer()
+    monkeypatch.setattr(embedding_utils, "has_transformers", True)
+    monkeypatch.setattr(embedding_utils, "_tokenizer", tokenizer)
+    monkeypatch.setattr(embedding_utils, "_model", FakeModel())
+    monkeypatch.setattr(embedding_utils, "_cache", EmbeddingCache(str(tmp_path)))
+    return tokenizer
+
+
+def expected(text: str):
+    vector = np.array([len(text), 1.0])
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def test_batches_are_sorted_by_length(tokenizer):
+    get_embeddings(["a", "aaaaa", "aaa", "aaaa", "aa"], batch_size=2, use_cache=False)
+    assert tokenizer.batches == [["aaaaa", "aaaa"], ["aaa", "aa"], ["a"]]
+
+
+def test_duplicates_are_embedded_once_and_returned_in_order(tokenizer):
+    vectors = get_embeddings(["one", "three", "one"])
+
+    assert tokenizer.batches == [["three", "one"]]
+    assert vectors[0] == vectors[2]
+    assert np.allclose(vectors[1], expected("three"))
+    assert np.allclose(get_embedding("one"), expected("one"))
+
+
+def test_cached_texts_skip_the_model(tokenizer):
+    first = get_embeddings(["cached", "text"])
+    tokenizer.batches.clear()
+
+    assert get_embeddings(["text", "new", "cached"]) == [first[1], pytest.approx(expected("new")), first[0]]
+    assert tokenizer.batches == [["new"]]
+
+    # Vectors are keyed by model
+    get_embeddings(["text"], model="other-model")
+    assert tokenizer.batches[-1] == ["text"]
+
+
+def test_failed_batches_fall_back_without_being_cached(tokenizer):
+    tokenizer.fail = True
+    vector = get_embeddings(["flaky"])[0]
+    assert len(vector) == embedding_utils.EMBEDDING_DIMENSIONS
+
+    tokenizer.fail = False
+    assert np.allclose(get_embeddings(["flaky"])[0], expected("flaky"))
+    assert tokenizer.batches == [["flaky"]]
+
+
+def test_vectors_round_trip_as_float32():
+    vector = np.array([0.25, -1.5, 3.0])
+    assert EmbeddingCache.decode(EmbeddingCache.encode(vector)) == [0.25, -1.5, 3.0]
+    assert EmbeddingCache.compute_key("a", "b") != EmbeddingCache.compute_key("a\0b", "")
@@ -0,0 +1,141 @@
+"""
+Module: test_page_cache.py
+Description: Incremental conversion reuses only unchanged pages, moves them to their new ids and prunes stale pages
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+- pymupdf: https://pymupdf.readthedocs.io/
+
+Sample Input:
+>>> pytest tests/core/utils/test_page_cache.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/utils/test_page_cache.py -v
+"""
+
+import os
+
+import fitz
+from PIL import Image
+
+from extractor.core.builders.document import DocumentBuilder
+from extractor.core.converters.pdf import PdfConverter
+from extractor.core.schema import BlockTypes
+from extractor.core.schema.blocks import Text
+from extractor.core.schema.document import Document
+from extractor.core.schema.groups.page import PageGroup
+from extractor.core.schema.polygon import PolygonBox
+from extractor.core.schema.text.line import Line
+from extractor.core.utils.page_cache import PageCache, hash_pdf_pages, plan_reuse, remap_page, snapshot_page
+
+
+def make_pdf(path, texts) -> str:
+    doc = fitz.open()
+    for text in texts:
+        doc.new_page(width=200, height=300).insert_text((20, 40), text)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def make_page(page_id: int) -> PageGroup:
+    page = PageGroup(page_id=page_id, polygon=PolygonBox.from_bbox([0, 0, 200, 300]), lowres_image=Image.new("RGB", (20, 30)))
+    line = page.add_block(Line, PolygonBox.from_bbox([10, 10, 190, 20]))
+    text = page.add_block(Text, PolygonBox.from_bbox([10, 10, 190, 40]))
+    text.add_structure(line)
+    page.add_structure(text)
+    return page
+
+
+def entries(hashes, movable=True):
+    return {page_id: {"hash": page_hash, "movable": movable} for page_id, page_hash in hashes.items()}
+
+
+def test_moved_and_edited_pages(tmp_path):
+    before = hash_pdf_pages(make_pdf(tmp_path / "v1.pdf", ["Intro", "Methods", "Results"]), range(3))
+    # A new first page, and an edited last page
+    after = hash_pdf_pages(make_pdf(tmp_path / "v2.pdf", ["Preface", "Intro", "Methods", "Results v2"]), range(4))
+
+    assert after[1] == before[0] and after[2] == before[1]
+    assert after[3] != before[2]
+    assert plan_reuse(after, entries(before)) == {1: 0, 2: 1}
+
+
+def test_pages_with_links_only_stay_in_place():
+    stored = {0: {"hash": "a", "movable": False}, 1: {"hash": "b", "movable": True}}
+    assert plan_reuse({0: "b", 1: "a"}, stored) == {0: 1}
+    assert plan_reuse({0: "a", 1: "b", 2: None}, stored) == {0: 0, 1: 1}
+
+
+def test_remap_rewrites_structure_ids():
+    page = remap_page(make_page(0), 3)
+
+    text = page.get_block(page.structure[0])
+    assert page.page_id == 3
+    assert all(block_id.page_id == 3 for block_id in page.structure + text.structure)
+    assert all(block.page_id == 3 for block in page.children)
+    assert page.get_block(text.structure[0]).block_type == BlockTypes.Line
+    assert text.id.page_id == 3
+
+
+def test_snapshots_leave_out_images(tmp_path):
+    cache = PageCache(str(tmp_path))
+    page = make_page(0)
+    cache.save("doc.pdf", "fp", entries({0: "a"}), {0: snapshot_page(page)})
+
+    restored = cache.get_page("doc.pdf", cache.load("doc.pdf", "fp")[0])
+    assert restored.lowres_image is None
+    assert [block.id for block in restored.children] == [block.id for block in page.children]
+    assert page.lowres_image is not None
+
+
+def test_other_pipelines_see_no_pages(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.save("doc.pdf", "fp", entries({0: "a"}), {0: snapshot_page(make_page(0))})
+
+    assert cache.load("doc.pdf", "other") == {}
+    assert cache.load("other.pdf", "fp") == {}
+
+
+def test_saving_a_revision_prunes_stale_pages(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.save("doc.pdf", "fp", entries({0: "a", 1: "b", 2: "c"}), {page_id: snapshot_page(make_page(page_id)) for page_id in range(3)})
+    stored = cache.load("doc.pdf", "fp")
+
+    # The next revision drops page 0, moves "b" to 0 and rebuilds page 1
+    revision = {0: {**stored[1]}, 1: {"hash": "d", "movable": True}}
+    cache.save("doc.pdf", "fp", revision, {1: snapshot_page(make_page(1))})
+
+    files = sorted(os.listdir(cache._document_dir("doc.pdf")))
+    assert files == ["b_1.pkl", "d_1.pkl", "manifest.json"]
+    stored = cache.load("doc.pdf", "fp")
+    assert {page_id: entry["file"] for page_id, entry in stored.items()} == {0: "b_1.pkl", 1: "d_1.pkl"}
+    assert remap_page(cache.get_page("doc.pdf", stored[0]), 0).page_id == 0
+
+
+def test_incremental_conversion_builds_only_changed_pages(tmp_path, monkeypatch):
+    models = ("layout_model", "texify_model", "recognition_model", "table_rec_model", "detection_model", "ocr_error_model", "inline_detection_model")
+    converter = PdfConverter(
+        artifact_dict={name: None for name in models},
+        config={"incremental": True, "page_cache_dir": str(tmp_path / "pages"), "incremental_document_key": "report"},
+    )
+    built = []
+
+    def build_pages(filepath, config):
+        built.append(list(config["page_range"]))
+        document = Document(filepath=filepath, pages=[make_page(page_id) for page_id in config["page_range"]])
+        return document, None, DocumentBuilder(config)
+
+    monkeypatch.setattr(converter, "_build_pages", build_pages)
+    monkeypatch.setattr(converter, "split_processors", lambda: ([], []))
+    monkeypatch.setattr(DocumentBuilder, "attach_page_images", lambda self, source, pages: None)
+
+    converter.build_document(make_pdf(tmp_path / "v1.pdf", ["Intro", "Methods", "Results"]))
+    document = converter.build_document(make_pdf(tmp_path / "v2.pdf", ["Preface", "Intro", "Methods", "Results v2"]))
+
+    assert built == [[0, 1, 2], [0, 3]]
+    assert [page.page_id for page in document.pages] == [0, 1, 2, 3]
+    assert all(block_id.page_id == page.page_id for page in document.pages for block_id in page.structure)
@@ -0,0 +1,171 @@
+"""
+Module: test_profiling.py
+Description: Pipeline profiles nest stages, count the model and LLM calls each stage makes, and export Chrome and OpenTelemetry traces
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/utils/test_profiling.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/utils/test_profiling.py -v
+"""
+
+import json
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from extractor.core.builders.line import LineBuilder
+from extractor.core.converters.pdf import PdfConverter
+from extractor.core.utils import profiling
+from extractor.core.utils.profiling import PipelineProfiler
+
+FIXTURE = str(Path(__file__).parents[3] / "data" / "input" / "Arango_AQL_Example.pdf")
+MODELS = ("layout_model", "texify_model", "recognition_model", "table_rec_model", "detection_model", "ocr_error_model", "inline_detection_model")
+
+
+class FakeModel:
+    def __init__(self):
+        self.disable_tqdm = False
+
+    def __call__(self, images, batch_size=None):
+        return [None] * len(images)
+
+
+class FakeLLM:
+    def __call__(self, prompt, image, block, response_schema):
+        return {} if prompt == "fail" else {"answer": prompt}
+
+
+class Stage:
+    def __init__(self):
+        self.layout_model = FakeModel()
+        self.llm_service = FakeLLM()
+        self.detection_model = None
+
+    def __call__(self, pages, prompts=()):
+        self.layout_model.disable_tqdm = True
+        self.layout_model(pages, batch_size=4)
+        self.layout_model(pages[:1])
+        threads = [threading.Thread(target=self.llm_service, args=(prompt, None, None, None)) for prompt in prompts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(pages)
+
+
+def test_model_and_llm_calls_are_counted():
+    profiler = PipelineProfiler(trace_memory=False)
+    stage = Stage()
+    model = stage.layout_model
+
+    assert profiler.run(stage, "processor", list(range(6)), prompts=["a", "fail", "b"], pages=6) == 6
+
+    [profile] = profiler.stages
+    assert profile.name == "Stage" and profile.pages == 6
+    assert {key: value for key, value in profile.model_calls["layout_model"].items() if key != "time"} == {"calls": 2, "items": 7, "batch_size": 4}
+    assert (profile.llm_calls, profile.llm_failures) == (3, 1)
+    # The real attributes are back, and writes went through to them
+    assert stage.layout_model is model and model.disable_tqdm
+    assert stage.detection_model is None
+
+
+def test_nested_stages_roll_up_into_their_parents():
+    profiler = PipelineProfiler(trace_memory=False)
+    with profiler.stage("DocumentBuilder", "builder", pages=2):
+        profiler.run(Stage(), "builder", [0, 1], name="LayoutBuilder")
+        with profiler.stage("OcrBuilder", "builder"):
+            pass
+    for page_id in range(2):
+        with profiler.stage("LineMergeProcessor", "processor", pages=1):
+            profiler.run(Stage(), "page", [page_id], name="LineMergeProcessor", page_id=page_id)
+
+    assert [(stage.name, stage.parent, stage.depth) for stage in profiler.stages] == [
+        ("DocumentBuilder", None, 0), ("LayoutBuilder", 0, 1), ("OcrBuilder", 0, 1),
+        ("LineMergeProcessor", None, 0), ("LineMergeProcessor", 3, 1),
+        ("LineMergeProcessor", None, 0), ("LineMergeProcessor", 5, 1),
+    ]
+    assert profiler.stages[0].model_calls["layout_model"]["items"] == 3
+
+    summary = {(row["category"], row["name"]): row for row in profiler.summary()}
+    assert set(summary) == {("builder", "DocumentBuilder"), ("builder", "LayoutBuilder"), ("builder", "OcrBuilder"), ("processor", "LineMergeProcessor")}
+    assert summary[("processor", "LineMergeProcessor")]["runs"] == 2
+    assert summary[("processor", "LineMergeProcessor")]["model_items"] == 4
+
+
+def test_errors_are_recorded_and_raised():
+    profiler = PipelineProfiler(trace_memory=False)
+    with pytest.raises(ValueError):
+        with profiler.stage("Broken", "processor"):
+            raise ValueError("bad page")
+
+    assert profiler.stages[0].error == "ValueError: bad page"
+    assert profiler.to_otel()["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["status"] == {"code": 2, "message": "ValueError: bad page"}
+
+
+def test_traces(tmp_path):
+    profiler = PipelineProfiler("doc.pdf", trace_memory=False)
+    with profiler.stage("DocumentBuilder", "builder", pages=2):
+        profiler.run(Stage(), "builder", [0, 1], name="LayoutBuilder")
+
+    profiler.save_trace(str(tmp_path / "traces" / "doc.trace.json"))
+    events = json.loads((tmp_path / "traces" / "doc.trace.json").read_text())["traceEvents"]
+    assert [(event["name"], event["ph"]) for event in events] == [("process_name", "M"), ("DocumentBuilder", "X"), ("LayoutBuilder", "X")]
+    assert events[2]["args"]["layout_model.items"] == 3
+    assert events[1]["ts"] <= events[2]["ts"] and events[2]["dur"] <= events[1]["dur"]
+
+    profiler.save_trace(str(tmp_path / "doc.otel.json"), format="otel")
+    spans = json.loads((tmp_path / "doc.otel.json").read_text())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert "parentSpanId" not in spans[0]
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+    assert spans[0]["traceId"] == spans[1]["traceId"]
+    assert {"key": "pages", "value": {"intValue": "2"}} in spans[0]["attributes"]
+
+    with pytest.raises(ValueError):
+        profiler.save_trace(str(tmp_path / "doc.txt"), format="text")
+
+
+@pytest.mark.skipif(not profiling.PSUTIL_AVAILABLE, reason="psutil is not installed")
+def test_memory_peaks_are_measured():
+    profiler = PipelineProfiler()
+    with profiler.stage("Allocate", "processor"):
+        block = b"\1" * (64 * 1024 ** 2)
+    del block
+
+    assert profiler.stages[0].memory_peak_delta >= 32 * 1024 ** 2
+
+
+def test_converter_profiles_each_stage(tmp_path, monkeypatch):
+    monkeypatch.setattr(LineBuilder, "ocr_error_detection", lambda self, pages, page_lines: SimpleNamespace(labels=["good"] * len(pages)))
+    monkeypatch.setattr(
+        LineBuilder, "get_detection_results",
+        lambda self, images, run_detection, inline: ([None] * len(run_detection), [None] * len(run_detection)),
+    )
+    converter = PdfConverter(
+        artifact_dict={name: None for name in MODELS},
+        processor_list=["extractor.core.processors.line_merge.LineMergeProcessor", "extractor.core.processors.text.TextProcessor"],
+        config={
+            "force_layout_block": "Text", "disable_ocr": True, "page_range": [0, 1, 2], "disable_tqdm": True,
+            "profile_pipeline": True, "profile_pages": True, "profile_trace_dir": str(tmp_path),
+        },
+    )
+    document = converter.build_document(FIXTURE)
+
+    profile = document.metadata["profile"]
+    stages = [(stage["category"], stage["name"]) for stage in profile["stages"]]
+    assert stages[0] == ("provider", "PdfProvider")
+    assert ("builder", "DocumentBuilder") in stages and ("builder", "LayoutBuilder") in stages
+    assert ("processor", "TextProcessor") in stages
+    pages = [stage["page_id"] for stage in profile["stages"] if stage["category"] == "page" and stage["name"] == "LineMergeProcessor"]
+    assert pages == [0, 1, 2]
+    assert len(document.pages) == 3
+    assert converter.profiler is None
+    assert (tmp_path / "Arango_AQL_Example.trace.json").exists()
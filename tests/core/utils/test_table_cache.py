@@ -0,0 +1,134 @@
+"""
+Module: test_table_cache.py
+Description: SQLite table cache reads without a write lock, evicts in SQL and keys objects by their settings
+
+External Dependencies:
+- pytest: https://docs.pytest.org/
+
+Sample Input:
+>>> pytest tests/core/utils/test_table_cache.py -v
+
+Expected Output:
+>>> All tests pass
+
+Example Usage:
+>>> pytest tests/core/utils/test_table_cache.py -v
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from extractor.core.utils import table_cache
+from extractor.core.utils.table_cache import TableExtractionCache, cached
+
+
+class Evaluator:
+    def __init__(self, threshold):
+        self.threshold = threshold
+
+    def cache_key(self):
+        return {"threshold": self.threshold}
+
+
+def test_reads_do_not_wait_for_writers(tmp_path):
+    cache = TableExtractionCache(cache_dir=str(tmp_path))
+    cache.set("a", {"value": 1})
+
+    # Another process holding the write lock
+    writer = sqlite3.connect(cache.db_path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.perf_counter()
+        assert cache.get("a") == {"value": 1}
+        assert cache.get_many(["a", "b"]) == {"a": {"value": 1}}
+        assert time.perf_counter() - start < 1
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+
+def test_buffered_access_times_reach_eviction(tmp_path):
+    cache = TableExtractionCache(cache_dir=str(tmp_path), max_size=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+
+    # Read after b was written, so b is now the least recently used
+    assert cache.get("a") == 1
+    time.sleep(0.01)
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    stats = cache.stats()
+    assert (stats["hits"], stats["evictions"]) == (1, 1)
+
+
+def test_access_times_flush_once_enough_are_pending(tmp_path):
+    cache = TableExtractionCache(cache_dir=str(tmp_path), access_flush_size=3)
+    cache.set_many({"a": 1, "b": 2})
+    cache.get("a")
+    cache.get_many(["a", "b", "missing"])
+
+    conn = sqlite3.connect(cache.db_path)
+    shared = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+    conn.close()
+    assert shared == {"hits": 3, "misses": 1}
+
+
+def test_byte_limit_keeps_most_recent(tmp_path):
+    cache = TableExtractionCache(cache_dir=str(tmp_path), max_size=100, max_bytes=25)
+    for i in range(5):
+        cache.set(f"k{i}", "x" * 8)  # 10 bytes as JSON
+        time.sleep(0.01)
+
+    assert [f"k{i}" in cache for i in range(5)] == [False, False, False, True, True]
+    assert cache.stats()["bytes"] == 20
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = TableExtractionCache(cache_dir=str(tmp_path), ttl_seconds=0.05)
+    cache.set("a", 1)
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.get_many(["a"]) == {}
+
+
+def test_objects_are_keyed_by_their_settings(tmp_path):
+    cache = TableExtractionCache(cache_dir=str(tmp_path))
+    assert cache._compute_key("f", Evaluator(0.5)) == cache._compute_key("f", Evaluator(0.5))
+    assert cache._compute_key("f", Evaluator(0.5)) != cache._compute_key("f", Evaluator(0.9))
+
+    with pytest.raises(TypeError):
+        cache._compute_key("f", object())
+
+
+def test_cached_methods_respect_instance_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(table_cache, "_global_cache", TableExtractionCache(cache_dir=str(tmp_path)))
+    calls = []
+
+    class Scorer(Evaluator):
+        @cached
+        def score(self, value):
+            calls.append(self.threshold)
+            return value > self.threshold
+
+    assert Scorer(0.5).score(0.7) is True
+    assert Scorer(0.9).score(0.7) is False
+    assert Scorer(0.5).score(0.7) is True
+    assert calls == [0.5, 0.9]
+
+    class Unkeyed:
+        @cached
+        def score(self, value):
+            calls.append(None)
+            return value
+
+    # No stable key, so the call runs uncached every time
+    Unkeyed().score(1)
+    Unkeyed().score(1)
+    assert calls[-2:] == [None, None]